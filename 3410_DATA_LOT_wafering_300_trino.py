@@ -0,0 +1,29 @@
+from wafering_runner import run_script
+from wafering_sql import DEFAULT_PARAMS, load_template, render_literal
+
+# 결과 캐시 재검증용 팩트/보정 테이블 (일자별 건수 + MAX(DATA_CHG_DTTM) 비교)
+PROBE_TABLES = ('DM_PP_AC_TOTALREJDTLSTD_S', 'DW_BA_CM_TOTALREJMANUAL_S')
+
+TEMPLATE = 'scrap_lot_grid'       # sql/scrap_lot_grid.sql
+
+# ==============================================================================
+# 쿼리 생성 함수
+# ==============================================================================
+def query_params(base_dt):
+    """템플릿 바인딩 파라미터 (base_dt: 'YYYYMMDD')"""
+    return {**DEFAULT_PARAMS, 'base_dt': base_dt}
+
+
+def build_query(base_dt):
+    """LOT 단위 폐기 Grid 리터럴 SQL (EXPLAIN / 캐시 키용)"""
+    return render_literal(load_template(TEMPLATE), query_params(base_dt))
+
+# ==============================================================================
+# 메인 실행 함수 (실행 옵션 / 조회 / 출력은 wafering_runner.run_script 공용)
+# ==============================================================================
+def main():
+    run_script(TEMPLATE)
+
+# ✅ 실행
+if __name__ == "__main__":
+    main()
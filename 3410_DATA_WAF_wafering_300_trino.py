@@ -0,0 +1,29 @@
+from wafering_runner import run_script
+from wafering_sql import DEFAULT_PARAMS, load_template, render_literal
+
+# PROBE_TABLES 없음: WAF 폐기 팩트(TOTALREJDTLWAFSTD_S)는 원본 쿼리도 DATA_CHG_DTTM 을 NULL 로 내보내
+# 컬럼 유무가 확인되지 않아 결과 캐시 재검증 대상에서 제외
+
+TEMPLATE = 'scrap_waf_grid'       # sql/scrap_waf_grid.sql
+
+# ==============================================================================
+# 쿼리 생성 함수
+# ==============================================================================
+def query_params(base_dt):
+    """템플릿 바인딩 파라미터 (base_dt: 'YYYYMMDD')"""
+    return {**DEFAULT_PARAMS, 'base_dt': base_dt}
+
+
+def build_query(base_dt):
+    """WAF 단위 폐기 Grid 리터럴 SQL (EXPLAIN / 캐시 키용)"""
+    return render_literal(load_template(TEMPLATE), query_params(base_dt))
+
+# ==============================================================================
+# 메인 실행 함수 (실행 옵션 / 조회 / 출력은 wafering_runner.run_script 공용)
+# ==============================================================================
+def main():
+    run_script(TEMPLATE)
+
+# ✅ 실행
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,28 @@
+from wafering_runner import run_script
+from wafering_sql import DEFAULT_PARAMS, load_template, render_literal
+
+# PROBE_TABLES 없음: 분모(생산실적 DM_PP_AC_ENTRWFACRL_S)는 프로브로 변경 여부를 알 수 없어 결과 캐시 재검증 대상에서 제외
+
+TEMPLATE = 'scrap_rate'           # sql/scrap_rate.sql
+
+# ==============================================================================
+# 쿼리 생성 함수
+# ==============================================================================
+def query_params(base_dt):
+    """템플릿 바인딩 파라미터 (base_dt: 'YYYYMMDD')"""
+    return {**DEFAULT_PARAMS, 'base_dt': base_dt}
+
+
+def build_query(base_dt):
+    """일별 팀 폐기율 (ScrapYieldService.SELECT_TEAM_SCRAP_RATE_REV04) 리터럴 SQL (EXPLAIN / 캐시 키용)"""
+    return render_literal(load_template(TEMPLATE), query_params(base_dt))
+
+# ==============================================================================
+# 메인 실행 함수 (실행 옵션 / 조회 / 출력은 wafering_runner.run_script 공용)
+# ==============================================================================
+def main():
+    run_script(TEMPLATE)
+
+# ✅ 실행
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+-- =============================================
+-- [wafering_derive] WAF 단위 기준 데이터: 원본 불량코드(Alias 미적용) + 기준일/제품/공정 정보
+--   base CTE 는 derive_fact.sql 과 같은 팩트 조회
+-- =============================================
+WITH base AS (
+    SELECT
+        A.WAF_ID, A.WAF_SEQ, A.WAF_SIZE, A.BASE_DT, A.DIV_CD, A.REJ_DIV_CD,
+        A.FAC_ID, A.OPER_ID, A.OWNR_CD, A.CRET_CD, A.PROD_ID, A.IGOT_ID,
+        A.BLK_ID, A.SUBLOT_ID, A.USER_LOT_ID, A.EQP_ID, A.BEF_BAD_RSN_CD,
+        A.AFT_BAD_RSN_CD, A.REJ_GROUP, A.OPER1_GROUP, A.OPER2_GROUP,
+        A.RESPON, A.ALLO_GROUP, A.RESPON_RATIO, A.IN_QTY, A.OUT_QTY,
+        A.LOSS_QTY, A.REAL_DPT_GROUP, A.HST_REG_DTTM, 'ORI' AS DATA_TYPE, A.DATA_CHG_DTTM
+    FROM oracle.PMDW_MGR.DM_PP_AC_TOTALFAULTDTLWAFSTD_S A
+    WHERE A.WAF_SIZE = #{waf_size}
+      AND A.BASE_DT = #{base_dt}
+      AND A.FAC_ID IN (#{fac_ids})
+
+    UNION ALL
+
+    SELECT
+        A.WAF_ID, A.WAF_SEQ, A.WAF_SIZE, A.BASE_DT, A.DIV_CD, A.REJ_DIV_CD,
+        A.FAC_ID, A.OPER_ID, A.OWNR_CD, A.CRET_CD, A.PROD_ID, A.IGOT_ID,
+        A.BLK_ID, A.SUBLOT_ID, A.USER_LOT_ID, A.EQP_ID, A.BEF_BAD_RSN_CD,
+        A.AFT_BAD_RSN_CD, A.REJ_GROUP, A.OPER1_GROUP, A.OPER2_GROUP,
+        A.RESPON, A.ALLO_GROUP, A.RESPON_RATIO, A.IN_QTY, A.OUT_QTY,
+        A.LOSS_QTY, A.REAL_DPT_GROUP, NULL AS HST_REG_DTTM, 'MNL' AS DATA_TYPE, A.DATA_CHG_DTTM
+    FROM oracle.PMDW_MGR.DW_BA_CM_TOTALFAULTMANUAL_S A
+    WHERE A.WAF_SIZE = #{waf_size}
+      AND A.BASE_DT = #{base_dt}
+      AND A.FAC_ID IN (#{fac_ids})
+)
+SELECT
+    b.*,
+    bd.BASE_DT AS BASE_DT_NAME,
+    SUBSTR(bd.BESOF_BASE_YW_NM, 3) AS WEEK_DAY_NM,
+    mp.CUST_SITE_NM,
+    mp.GRD_CD_NM,
+    mp.GRD_CD_NM_PS,
+    so.OPER_DIV_L
+FROM base b
+JOIN oracle.PMDW_MGR.DW_BA_CM_BASEDATE_M bd ON bd.BASE_DT = b.BASE_DT
+LEFT JOIN oracle.PMDW_MGR.DW_BA_MS_PROD_M mp ON mp.PROD_ID = b.PROD_ID AND mp.SPEC_DIV_CD = 'PS'
+JOIN oracle.PMDW_MGR.DW_BA_CM_STDPOPER_M so ON so.FAC_ID = b.FAC_ID AND so.OPER_ID = b.OPER_ID
+WHERE so.OPER_DIV_L = #{oper_div_l}
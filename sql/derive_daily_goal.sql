@@ -0,0 +1,16 @@
+-- =============================================
+-- [wafering_derive] 월 불량률 목표 (BAD-RATE)
+-- =============================================
+SELECT YLD_DIV3_CD AS REJ_GROUP, SUM(GOAL_VAL) AS GOAL_RATIO
+FROM (
+    SELECT DISTINCT BASE_YM, WAF_SIZE, YLD_DIV1_CD, YLD_DIV3_CD, GOAL_DIV_CD,
+                    YLD_PLAN_TYPE, REF_DIV2, GOAL_VAL
+    FROM oracle.PMDW_MGR.DW_BA_CM_YLDPLAN_M
+    WHERE WAF_SIZE = #{waf_size}
+      AND YLD_DIV1_CD = #{oper_div_l}
+      AND GOAL_DIV_CD = 'BAD-RATE'
+      AND YLD_PLAN_TYPE = 'BP'
+      AND REF_DIV2 = 'PN'
+      AND BASE_YM = SUBSTR(#{base_dt}, 1, 6)
+) A
+GROUP BY YLD_DIV3_CD
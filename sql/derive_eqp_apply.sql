@@ -0,0 +1,7 @@
+-- =============================================
+-- [wafering_derive] 적용 설비
+-- =============================================
+SELECT FAC_ID, EQP_ID
+FROM oracle.PMDW_MGR.DW_BA_CM_STDPEQP_M
+WHERE FAC_ID IN (#{fac_ids})
+  AND APPLY_YN = 'Y'
@@ -0,0 +1,8 @@
+-- =============================================
+-- [wafering_derive] 기준일자에 유효한 설비 이력
+-- =============================================
+SELECT FAC_ID, EQP_ID, EQP_NM, ED_DT
+FROM oracle.PMDW_MGR.DW_BA_CM_STDPEQP_H
+WHERE FAC_ID IN (#{fac_ids})
+  AND ST_DT <= #{base_dt}
+  AND (ED_DT >= #{base_dt} OR ED_DT IS NULL OR ED_DT = '99991231')
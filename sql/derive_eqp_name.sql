@@ -0,0 +1,7 @@
+-- =============================================
+-- [wafering_derive] 설비명
+-- =============================================
+SELECT FAC_ID, EQP_ID, MIN(EQP_NM) AS EQP_NM
+FROM oracle.PMDW_MGR.DW_BA_CM_STDPEQP_M
+WHERE FAC_ID IN (#{fac_ids})
+GROUP BY FAC_ID, EQP_ID
@@ -0,0 +1,29 @@
+-- =============================================
+-- [wafering_derive] 불량 WAF 팩트(원본 + 보정) 행만 조회
+--   기준정보 조인은 로컬 스냅샷(wafering_masters)으로 처리할 때 사용
+-- =============================================
+SELECT
+    A.WAF_ID, A.WAF_SEQ, A.WAF_SIZE, A.BASE_DT, A.DIV_CD, A.REJ_DIV_CD,
+    A.FAC_ID, A.OPER_ID, A.OWNR_CD, A.CRET_CD, A.PROD_ID, A.IGOT_ID,
+    A.BLK_ID, A.SUBLOT_ID, A.USER_LOT_ID, A.EQP_ID, A.BEF_BAD_RSN_CD,
+    A.AFT_BAD_RSN_CD, A.REJ_GROUP, A.OPER1_GROUP, A.OPER2_GROUP,
+    A.RESPON, A.ALLO_GROUP, A.RESPON_RATIO, A.IN_QTY, A.OUT_QTY,
+    A.LOSS_QTY, A.REAL_DPT_GROUP, A.HST_REG_DTTM, 'ORI' AS DATA_TYPE, A.DATA_CHG_DTTM
+FROM oracle.PMDW_MGR.DM_PP_AC_TOTALFAULTDTLWAFSTD_S A
+WHERE A.WAF_SIZE = #{waf_size}
+  AND A.BASE_DT = #{base_dt}
+  AND A.FAC_ID IN (#{fac_ids})
+
+UNION ALL
+
+SELECT
+    A.WAF_ID, A.WAF_SEQ, A.WAF_SIZE, A.BASE_DT, A.DIV_CD, A.REJ_DIV_CD,
+    A.FAC_ID, A.OPER_ID, A.OWNR_CD, A.CRET_CD, A.PROD_ID, A.IGOT_ID,
+    A.BLK_ID, A.SUBLOT_ID, A.USER_LOT_ID, A.EQP_ID, A.BEF_BAD_RSN_CD,
+    A.AFT_BAD_RSN_CD, A.REJ_GROUP, A.OPER1_GROUP, A.OPER2_GROUP,
+    A.RESPON, A.ALLO_GROUP, A.RESPON_RATIO, A.IN_QTY, A.OUT_QTY,
+    A.LOSS_QTY, A.REAL_DPT_GROUP, NULL AS HST_REG_DTTM, 'MNL' AS DATA_TYPE, A.DATA_CHG_DTTM
+FROM oracle.PMDW_MGR.DW_BA_CM_TOTALFAULTMANUAL_S A
+WHERE A.WAF_SIZE = #{waf_size}
+  AND A.BASE_DT = #{base_dt}
+  AND A.FAC_ID IN (#{fac_ids})
@@ -0,0 +1,6 @@
+-- =============================================
+-- [wafering_derive] 등급 코드명
+-- =============================================
+SELECT CD_VAL, CD_NM
+FROM oracle.DMS_MGR.TB_FX_CODES
+WHERE UP_CD = 'DMS010' AND SYS_CD = 'DMS'
@@ -0,0 +1,35 @@
+-- =============================================
+-- [wafering_derive] 일별 Loss Rate 용 LOT 팩트 합계 + 공정 구분 + PN 제품 행 수
+--   fact CTE 는 derive_loss_fact.sql 과 같은 조회
+--   PN_ROWS: loss_rate.sql 분자의 LEFT JOIN DW_BA_MS_PROD_M (PS, PN) 이 늘리는 행 수 (매칭 없으면 NULL = 1배)
+-- =============================================
+WITH fact AS (
+    SELECT
+        A.WAF_SIZE, A.FAC_ID, A.OPER_ID, A.PROD_ID, A.REJ_GROUP, A.DIV_CD, A.BEF_BAD_RSN_CD, A.AFT_BAD_RSN_CD,
+        SUM(A.LOSS_QTY) AS LOSS_QTY,
+        SUM(A.IN_QTY) AS IN_QTY
+    FROM (
+        SELECT WAF_SIZE, FAC_ID, OPER_ID, PROD_ID, REJ_GROUP, DIV_CD, BEF_BAD_RSN_CD, AFT_BAD_RSN_CD, LOSS_QTY, IN_QTY
+        FROM oracle.PMDW_MGR.DM_PP_AC_TOTALFAULTDTLSTD_S
+        WHERE WAF_SIZE = #{waf_size} AND BASE_DT = #{base_dt} AND FAC_ID IN (#{fac_ids})
+
+        UNION ALL
+
+        SELECT WAF_SIZE, FAC_ID, OPER_ID, PROD_ID, REJ_GROUP, DIV_CD, BEF_BAD_RSN_CD, AFT_BAD_RSN_CD, LOSS_QTY, IN_QTY
+        FROM oracle.PMDW_MGR.DW_BA_CM_TOTALFAULTMANUAL_S
+        WHERE WAF_SIZE = #{waf_size} AND BASE_DT = #{base_dt} AND FAC_ID IN (#{fac_ids})
+    ) A
+    GROUP BY
+        A.WAF_SIZE, A.FAC_ID, A.OPER_ID, A.PROD_ID, A.REJ_GROUP, A.DIV_CD, A.BEF_BAD_RSN_CD, A.AFT_BAD_RSN_CD
+),
+pn AS (
+    SELECT PROD_ID, COUNT(*) AS PN_ROWS
+    FROM oracle.PMDW_MGR.DW_BA_MS_PROD_M
+    WHERE SPEC_DIV_CD = 'PS' AND (GRD_CD_NM = 'PN' OR GRD_CD_NM_PS = 'PN')
+    GROUP BY PROD_ID
+)
+SELECT f.*, so.OPER_DIV_L, pn.PN_ROWS
+FROM fact f
+JOIN oracle.PMDW_MGR.DW_BA_CM_STDPOPER_M so ON so.FAC_ID = f.FAC_ID AND so.OPER_ID = f.OPER_ID
+LEFT JOIN pn ON pn.PROD_ID = f.PROD_ID
+WHERE so.OPER_DIV_L = #{oper_div_l}
@@ -0,0 +1,23 @@
+-- =============================================
+-- [wafering_derive] 일별 Loss Rate 용 LOT 팩트(원본 + 보정) 합계
+--   loss_rate.sql LOSS_INFO 의 팩트 조회 (WAF 테이블 합계가 아닌 LOT 테이블 그대로)
+--   기준정보 조인은 로컬 스냅샷(wafering_masters)으로 처리할 때 사용
+--   조인 배수는 (FAC_ID, OPER_ID, PROD_ID) 로만 정해지므로 집계 키 단위로 미리 합산해도 결과가 같다
+-- =============================================
+SELECT
+    A.WAF_SIZE, A.FAC_ID, A.OPER_ID, A.PROD_ID, A.REJ_GROUP, A.DIV_CD, A.BEF_BAD_RSN_CD, A.AFT_BAD_RSN_CD,
+    SUM(A.LOSS_QTY) AS LOSS_QTY,
+    SUM(A.IN_QTY) AS IN_QTY
+FROM (
+    SELECT WAF_SIZE, FAC_ID, OPER_ID, PROD_ID, REJ_GROUP, DIV_CD, BEF_BAD_RSN_CD, AFT_BAD_RSN_CD, LOSS_QTY, IN_QTY
+    FROM oracle.PMDW_MGR.DM_PP_AC_TOTALFAULTDTLSTD_S
+    WHERE WAF_SIZE = #{waf_size} AND BASE_DT = #{base_dt} AND FAC_ID IN (#{fac_ids})
+
+    UNION ALL
+
+    SELECT WAF_SIZE, FAC_ID, OPER_ID, PROD_ID, REJ_GROUP, DIV_CD, BEF_BAD_RSN_CD, AFT_BAD_RSN_CD, LOSS_QTY, IN_QTY
+    FROM oracle.PMDW_MGR.DW_BA_CM_TOTALFAULTMANUAL_S
+    WHERE WAF_SIZE = #{waf_size} AND BASE_DT = #{base_dt} AND FAC_ID IN (#{fac_ids})
+) A
+GROUP BY
+    A.WAF_SIZE, A.FAC_ID, A.OPER_ID, A.PROD_ID, A.REJ_GROUP, A.DIV_CD, A.BEF_BAD_RSN_CD, A.AFT_BAD_RSN_CD
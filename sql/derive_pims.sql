@@ -0,0 +1,7 @@
+-- =============================================
+-- [wafering_derive] PART_NO 계산용 PIMS_PROD CREQ 항목 (prod_ids 는 PIMS_IN_CHUNK 단위)
+-- =============================================
+SELECT ms_code, creq_t1, creq_t2, creq_t3, creq_v1, creq_v2, creq_v3
+FROM iceberg.ibg_lake.pims_prod
+WHERE spec_type = 'CS'
+  AND ms_code IN (#{prod_ids})
@@ -0,0 +1,13 @@
+-- =============================================
+-- [wafering_derive] 폐기율 분모용 생산실적 (EPI 제외) PROD_ID 별 합계
+-- =============================================
+SELECT A.PROD_ID, B.TST_FORML_FLAG, SUM(A.QTY) AS QTY
+FROM oracle.PMDW_MGR.DM_PP_AC_ENTRWFACRL_S A
+LEFT JOIN oracle.PMDW_MGR.DW_BA_MS_PROD_M B
+    ON B.PROD_ID = A.PROD_ID AND B.SPEC_DIV_CD = 'PS'
+WHERE A.FAC_ID IN (#{fac_ids})
+  AND A.INCH = CASE WHEN #{waf_size} = '300' THEN '12' ELSE '08' END
+  AND COALESCE(A.PROD_KIND_DIV_CD, '') <> 'EPI'
+  AND A.BASE_DT = #{base_dt}
+  AND A.PROD_ID NOT LIKE '08Y029%'
+GROUP BY A.PROD_ID, B.TST_FORML_FLAG
@@ -0,0 +1,12 @@
+-- =============================================
+-- [wafering_derive] derive_production.sql 에서 제품 조인(TST_FORML_FLAG) 제외
+--   TST_FORML_FLAG 는 제품 스냅샷으로 로컬 조인
+-- =============================================
+SELECT A.PROD_ID, SUM(A.QTY) AS QTY
+FROM oracle.PMDW_MGR.DM_PP_AC_ENTRWFACRL_S A
+WHERE A.FAC_ID IN (#{fac_ids})
+  AND A.INCH = CASE WHEN #{waf_size} = '300' THEN '12' ELSE '08' END
+  AND COALESCE(A.PROD_KIND_DIV_CD, '') <> 'EPI'
+  AND A.BASE_DT = #{base_dt}
+  AND A.PROD_ID NOT LIKE '08Y029%'
+GROUP BY A.PROD_ID
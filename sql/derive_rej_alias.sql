@@ -0,0 +1,7 @@
+-- =============================================
+-- [wafering_derive] 불량코드 Alias
+-- =============================================
+SELECT REJ_RSN_GRP, REJ_RSN_CD, ALIAS_RSN_CD
+FROM oracle.PMDW_MGR.DW_BA_CM_REJRSNINFO_M
+WHERE WAF_SIZE = #{waf_size}
+  AND PROD_DIV_CD = CASE WHEN #{oper_div_l} = 'WF' THEN 'PW' ELSE 'EPI' END
@@ -0,0 +1,8 @@
+-- =============================================
+-- [wafering_derive] 폐기 그룹 정렬 순서
+-- =============================================
+SELECT CD_VAL, SORT_ORDER
+FROM oracle.DMS_MGR.TB_FX_CODES
+WHERE UP_CD = 'COM000' AND SYS_CD = 'DMS'
+  AND CASE WHEN CD_EXT1 = 'PW' THEN 'WF' ELSE CD_EXT1 END = #{oper_div_l}
+  AND CD_EXT2 = #{waf_size}
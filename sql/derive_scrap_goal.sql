@@ -0,0 +1,13 @@
+-- =============================================
+-- [wafering_derive] 월 폐기율 목표 (DIS-RATE, R&D 제외)
+-- =============================================
+SELECT YLD_DIV3_CD AS RJ_GROUP, SUM(GOAL_VAL) AS GOAL
+FROM oracle.PMDW_MGR.DW_BA_CM_YLDPLAN_M
+WHERE WAF_SIZE = #{waf_size}
+  AND YLD_DIV1_CD = #{oper_div_l}
+  AND GOAL_DIV_CD = 'DIS-RATE'
+  AND YLD_PLAN_TYPE = 'BP'
+  AND REF_DIV2 = 'PN'
+  AND BASE_YM = SUBSTR(#{base_dt}, 1, 6)
+  AND YLD_DIV3_CD <> 'R&D'
+GROUP BY YLD_DIV3_CD
@@ -0,0 +1,47 @@
+-- =============================================
+-- [wafering_derive] 폐기 WAF 팩트(derive_scrap_waf_fact.sql) + 기준일/제품(PS)/공정 조인
+--   제품 등급은 팩트의 GRD_CD_NM 과 구분해 PROD_ 접두어
+-- =============================================
+WITH scrap AS (
+    SELECT
+        A.WAF_ID, A.WAF_SEQ,
+        A.BASE_DT, A.WAF_SIZE, A.REJ_DIV_CD, A.REJ_DTL_DIV_CD, A.TRST_DTTM, A.FAC_ID, A.IGOT_ID, A.LOT_ID,
+        A.USER_LOT_ID, A.PROD_ID, A.BEF_PROD_ID, A.WRKR_ID, A.OWNR_CD, A.CRET_CD, A.EQP_ID, A.OPER_ID,
+        A.ORG_OPER_ID, A.LAST_OPER_ID, A.REJ_RSN_CD, A.REJ_RSN_CD2, A.ORG_REJ_RSN_CD, A.REV_REJ_RSN_CD,
+        A.STD_REJ_RSN_CD, A.RJ_GROUP, A.RSN_DIV_CD, A.PROD_DIV_CD, A.REJ_RSN_DIV_CD, A.MT_ID, A.GRD_CD_NM,
+        A.TEST_TYPE, A.CUST_STIE, A.OPER1_GROUP, A.OPER2_GROUP, A.RESPON, A.ALLO_GROUP, A.RATIO, A.QTY,
+        A.REAL_DPT_GROUP,
+        'ORI' AS DATA_TYPE, A.MT_INFO, CAST(NULL AS TIMESTAMP) AS DATA_CHG_DTTM
+    FROM oracle.PMDW_MGR.DM_PP_AC_TOTALREJDTLWAFSTD_S A
+    WHERE A.WAF_SIZE = #{waf_size}
+      AND A.BASE_DT = #{base_dt}
+      AND A.FAC_ID IN (#{fac_ids})
+      AND COALESCE(A.REJ_DTL_DIV_CD, '') <> '창고'
+
+    UNION ALL
+
+    SELECT
+        A.WAF_ID, A.WAF_SEQ,
+        A.BASE_DT, A.WAF_SIZE, A.REJ_DIV_CD, A.REJ_DTL_DIV_CD, A.TRST_DTTM, A.FAC_ID, A.IGOT_ID, A.LOT_ID,
+        A.USER_LOT_ID, A.PROD_ID, A.BEF_PROD_ID, A.WRKR_ID, A.OWNR_CD, A.CRET_CD, A.EQP_ID, A.OPER_ID,
+        A.ORG_OPER_ID, A.LAST_OPER_ID, A.REJ_RSN_CD, A.REJ_RSN_CD2, A.ORG_REJ_RSN_CD, A.REV_REJ_RSN_CD,
+        A.STD_REJ_RSN_CD, A.RJ_GROUP, A.RSN_DIV_CD, A.PROD_DIV_CD, A.REJ_RSN_DIV_CD, A.MT_ID, A.GRD_CD_NM,
+        A.TEST_TYPE, A.CUST_STIE, A.OPER1_GROUP, A.OPER2_GROUP, A.RESPON, A.ALLO_GROUP, A.RATIO, A.QTY,
+        A.REAL_DPT_GROUP,
+        'MNL' AS DATA_TYPE, NULL AS MT_INFO, A.DATA_CHG_DTTM
+    FROM oracle.PMDW_MGR.DW_BA_CM_TOTALREJMANUAL_S A
+    WHERE A.WAF_SIZE = #{waf_size}
+      AND A.BASE_DT = #{base_dt}
+      AND A.FAC_ID IN (#{fac_ids})
+)
+SELECT
+    s.*,
+    SUBSTR(bd.BESOF_BASE_YW_NM, 3) AS WEEK_DAY_NM,
+    mp.GRD_CD_NM AS PROD_GRD_CD_NM,
+    mp.GRD_CD_NM_PS AS PROD_GRD_CD_NM_PS
+FROM scrap s
+JOIN oracle.PMDW_MGR.DW_BA_CM_BASEDATE_M bd ON bd.BASE_DT = s.BASE_DT
+LEFT JOIN oracle.PMDW_MGR.DW_BA_MS_PROD_M mp ON mp.PROD_ID = s.PROD_ID AND mp.SPEC_DIV_CD = 'PS'
+JOIN oracle.PMDW_MGR.DW_BA_CM_STDPOPER_M so ON so.FAC_ID = s.FAC_ID AND so.OPER_ID = s.OPER_ID
+WHERE so.WAF_SIZE = #{waf_size}
+  AND so.OPER_DIV_L = #{oper_div_l}
@@ -0,0 +1,34 @@
+-- =============================================
+-- [wafering_derive] 폐기 WAF 원본(창고폐기 제외) + 보정 행
+--   보정(MNL)은 LOT Grid / 폐기율에서 창고폐기 포함으로 사용
+-- =============================================
+SELECT
+    A.WAF_ID, A.WAF_SEQ,
+    A.BASE_DT, A.WAF_SIZE, A.REJ_DIV_CD, A.REJ_DTL_DIV_CD, A.TRST_DTTM, A.FAC_ID, A.IGOT_ID, A.LOT_ID,
+    A.USER_LOT_ID, A.PROD_ID, A.BEF_PROD_ID, A.WRKR_ID, A.OWNR_CD, A.CRET_CD, A.EQP_ID, A.OPER_ID,
+    A.ORG_OPER_ID, A.LAST_OPER_ID, A.REJ_RSN_CD, A.REJ_RSN_CD2, A.ORG_REJ_RSN_CD, A.REV_REJ_RSN_CD,
+    A.STD_REJ_RSN_CD, A.RJ_GROUP, A.RSN_DIV_CD, A.PROD_DIV_CD, A.REJ_RSN_DIV_CD, A.MT_ID, A.GRD_CD_NM,
+    A.TEST_TYPE, A.CUST_STIE, A.OPER1_GROUP, A.OPER2_GROUP, A.RESPON, A.ALLO_GROUP, A.RATIO, A.QTY,
+    A.REAL_DPT_GROUP,
+    'ORI' AS DATA_TYPE, A.MT_INFO, CAST(NULL AS TIMESTAMP) AS DATA_CHG_DTTM
+FROM oracle.PMDW_MGR.DM_PP_AC_TOTALREJDTLWAFSTD_S A
+WHERE A.WAF_SIZE = #{waf_size}
+  AND A.BASE_DT = #{base_dt}
+  AND A.FAC_ID IN (#{fac_ids})
+  AND COALESCE(A.REJ_DTL_DIV_CD, '') <> '창고'
+
+UNION ALL
+
+SELECT
+    A.WAF_ID, A.WAF_SEQ,
+    A.BASE_DT, A.WAF_SIZE, A.REJ_DIV_CD, A.REJ_DTL_DIV_CD, A.TRST_DTTM, A.FAC_ID, A.IGOT_ID, A.LOT_ID,
+    A.USER_LOT_ID, A.PROD_ID, A.BEF_PROD_ID, A.WRKR_ID, A.OWNR_CD, A.CRET_CD, A.EQP_ID, A.OPER_ID,
+    A.ORG_OPER_ID, A.LAST_OPER_ID, A.REJ_RSN_CD, A.REJ_RSN_CD2, A.ORG_REJ_RSN_CD, A.REV_REJ_RSN_CD,
+    A.STD_REJ_RSN_CD, A.RJ_GROUP, A.RSN_DIV_CD, A.PROD_DIV_CD, A.REJ_RSN_DIV_CD, A.MT_ID, A.GRD_CD_NM,
+    A.TEST_TYPE, A.CUST_STIE, A.OPER1_GROUP, A.OPER2_GROUP, A.RESPON, A.ALLO_GROUP, A.RATIO, A.QTY,
+    A.REAL_DPT_GROUP,
+    'MNL' AS DATA_TYPE, NULL AS MT_INFO, A.DATA_CHG_DTTM
+FROM oracle.PMDW_MGR.DW_BA_CM_TOTALREJMANUAL_S A
+WHERE A.WAF_SIZE = #{waf_size}
+  AND A.BASE_DT = #{base_dt}
+  AND A.FAC_ID IN (#{fac_ids})
@@ -0,0 +1,14 @@
+-- =============================================
+-- [wafering_derive] 팀부서그룹 (team_targets: TARGET_DIV_CD A=전체, L=Loss, R=폐기)
+-- =============================================
+SELECT S1.DPT_CD, S1.ST_DT, S2.TEAMGRP_NM, S2.SORT_SEQ
+FROM oracle.PMDW_MGR.DW_BA_CM_LOSSREJGRPDTL_M S1
+JOIN oracle.PMDW_MGR.DW_BA_CM_LOSSREJGRP_M S2
+    ON S1.TEAMGRP_CD = S2.TEAMGRP_CD
+   AND S1.WAF_SIZE = S2.WAF_SIZE
+   AND S1.OPER_DIV_L = S2.OPER_DIV_L
+WHERE S1.TARGET_DIV_CD IN (#{team_targets})
+  AND S1.WAF_SIZE = #{waf_size}
+  AND S1.OPER_DIV_L = #{oper_div_l}
+  AND S1.ED_DT >= #{base_dt}
+  AND S1.ST_DT <= #{base_dt}
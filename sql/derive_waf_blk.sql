@@ -0,0 +1,7 @@
+-- =============================================
+-- [wafering_derive] 폐기 WAF Grid 의 BLK_ID : (IGOT_ID, WAF_SEQ) 당 1건 (igot_ids 는 PIMS_IN_CHUNK 단위)
+-- =============================================
+SELECT IGOT_ID, WAF_SEQ, MIN(BLK_ID) AS BLK_ID
+FROM oracle.PMDW_MGR.VI_DW_QM_PW_WAF_I_OGG
+WHERE IGOT_ID IN (#{igot_ids})
+GROUP BY IGOT_ID, WAF_SEQ
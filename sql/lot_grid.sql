@@ -0,0 +1,274 @@
+ WITH
+-- (1) Z: 원본 + 보정 데이터 통합
+Z AS (
+-- (1-1) 원본 데이터
+SELECT
+A.WAF_SIZE,
+A.BASE_DT,
+A.DIV_CD,
+A.REJ_DIV_CD,
+A.FAC_ID,
+A.OPER_ID,
+A.OWNR_CD,
+A.CRET_CD,
+A.PROD_ID,
+A.IGOT_ID,
+A.BLK_ID,
+A.SUBLOT_ID,
+A.USER_LOT_ID,
+A.EQP_ID,
+COALESCE(TRIM(BEF_ALIAS.ALIAS_RSN_CD), A.BEF_BAD_RSN_CD) AS BEF_BAD_RSN_CD,
+COALESCE(TRIM(AFT_ALIAS.ALIAS_RSN_CD), A.AFT_BAD_RSN_CD) AS AFT_BAD_RSN_CD,
+A.REJ_GROUP,
+A.OPER1_GROUP,
+A.OPER2_GROUP,
+A.RESPON,
+A.ALLO_GROUP,
+A.RESPON_RATIO,
+A.IN_QTY,
+A.OUT_QTY,
+A.LOSS_QTY,
+A.REAL_DPT_GROUP,
+D.CD_NM AS GRD_CD_NM_CS,
+E.CD_NM AS GRD_CD_NM_PS,
+C.CUST_SITE_NM,
+SUBSTR(B.BESOF_BASE_YW_NM, 3) AS WEEK_DAY_NM,
+A.DATA_CHG_DTTM
+FROM oracle.PMDW_MGR.DM_PP_AC_TOTALFAULTDTLSTD_S A
+
+-- BEF 매핑
+LEFT JOIN (
+SELECT
+XX.REJ_RSN_GRP,
+XX.REJ_RSN_CD,
+XX.ALIAS_RSN_CD,
+ROW_NUMBER() OVER (PARTITION BY XX.REJ_RSN_GRP, XX.REJ_RSN_CD ORDER BY XX.REJ_RSN_GRP) AS RN
+FROM oracle.PMDW_MGR.DW_BA_CM_REJRSNINFO_M XX
+WHERE XX.WAF_SIZE = #{waf_size}
+AND XX.PROD_DIV_CD = CASE WHEN #{oper_div_l} = 'WF' THEN 'PW' ELSE 'EPI' END
+) AS BEF_ALIAS
+ON BEF_ALIAS.REJ_RSN_GRP = A.REJ_GROUP
+AND BEF_ALIAS.REJ_RSN_CD = A.BEF_BAD_RSN_CD
+AND BEF_ALIAS.RN = 1
+
+-- AFT 매핑
+LEFT JOIN (
+SELECT
+XX.REJ_RSN_GRP,
+XX.REJ_RSN_CD,
+XX.ALIAS_RSN_CD,
+ROW_NUMBER() OVER (PARTITION BY XX.REJ_RSN_GRP, XX.REJ_RSN_CD ORDER BY XX.REJ_RSN_GRP) AS RN
+FROM oracle.PMDW_MGR.DW_BA_CM_REJRSNINFO_M XX
+WHERE XX.WAF_SIZE = #{waf_size}
+AND XX.PROD_DIV_CD = CASE WHEN #{oper_div_l} = 'WF' THEN 'PW' ELSE 'EPI' END
+) AS AFT_ALIAS
+ON AFT_ALIAS.REJ_RSN_GRP = A.REJ_GROUP
+AND AFT_ALIAS.REJ_RSN_CD = A.AFT_BAD_RSN_CD
+AND AFT_ALIAS.RN = 1
+
+JOIN oracle.PMDW_MGR.DW_BA_CM_BASEDATE_M B
+ON B.BASE_DT = A.BASE_DT
+
+LEFT JOIN oracle.PMDW_MGR.DW_BA_MS_PROD_M C
+ON C.PROD_ID = A.PROD_ID
+AND C.SPEC_DIV_CD = 'PS'
+
+LEFT JOIN oracle.DMS_MGR.TB_FX_CODES D
+ON D.UP_CD = 'DMS010'
+AND D.SYS_CD = 'DMS'
+AND D.CD_VAL = C.GRD_CD_NM
+
+LEFT JOIN oracle.DMS_MGR.TB_FX_CODES E
+ON E.UP_CD = 'DMS010'
+AND E.SYS_CD = 'DMS'
+AND E.CD_VAL = C.GRD_CD_NM_PS
+
+JOIN oracle.PMDW_MGR.DW_BA_CM_STDPOPER_M Z1
+ON Z1.FAC_ID = A.FAC_ID
+AND Z1.OPER_ID = A.OPER_ID
+
+WHERE
+1 = 1
+AND Z1.OPER_DIV_L = #{oper_div_l}
+AND (CASE WHEN 'PN' = 'PN' THEN TRUE ELSE C.GRD_CD_NM = 'PN' END)
+AND (CASE WHEN 'PN' = 'PN' THEN TRUE ELSE C.GRD_CD_NM_PS = 'PN' END)
+AND Z1.FAC_ID IN (#{fac_ids})
+AND 'N' = 'N'
+AND A.WAF_SIZE = #{waf_size}
+AND A.BASE_DT = #{base_dt}  --  어제 하루만
+--  분할 실행(wafering_split)의 OPER_ID 범위 [split_from, split_to), 미지정(NULL)이면 조건 없음
+AND (#{split_from} IS NULL OR A.OPER_ID >= #{split_from})
+AND (#{split_to} IS NULL OR A.OPER_ID < #{split_to})
+
+UNION ALL
+
+-- (1-2) 보정 데이터
+SELECT
+A.WAF_SIZE,
+A.BASE_DT,
+A.DIV_CD,
+A.REJ_DIV_CD,
+A.FAC_ID,
+A.OPER_ID,
+A.OWNR_CD,
+A.CRET_CD,
+A.PROD_ID,
+A.IGOT_ID,
+A.BLK_ID,
+A.SUBLOT_ID,
+A.USER_LOT_ID,
+A.EQP_ID,
+COALESCE(TRIM(BEF_ALIAS.ALIAS_RSN_CD), A.BEF_BAD_RSN_CD) AS BEF_BAD_RSN_CD,
+COALESCE(TRIM(AFT_ALIAS.ALIAS_RSN_CD), A.AFT_BAD_RSN_CD) AS AFT_BAD_RSN_CD,
+A.REJ_GROUP,
+A.OPER1_GROUP,
+A.OPER2_GROUP,
+A.RESPON,
+A.ALLO_GROUP,
+A.RESPON_RATIO,
+SUM(A.IN_QTY) AS IN_QTY,
+SUM(A.OUT_QTY) AS OUT_QTY,
+SUM(A.LOSS_QTY) AS LOSS_QTY,
+A.REAL_DPT_GROUP,
+D.CD_NM AS GRD_CD_NM_CS,
+E.CD_NM AS GRD_CD_NM_PS,
+C.CUST_SITE_NM,
+SUBSTR(B.BESOF_BASE_YW_NM, 3) AS WEEK_DAY_NM,
+MAX(A.DATA_CHG_DTTM) AS DATA_CHG_DTTM
+FROM (
+SELECT *
+FROM oracle.PMDW_MGR.DW_BA_CM_TOTALFAULTMANUAL_S
+) A
+
+-- BEF 매핑
+LEFT JOIN (
+SELECT
+XX.REJ_RSN_GRP,
+XX.REJ_RSN_CD,
+XX.ALIAS_RSN_CD,
+ROW_NUMBER() OVER (PARTITION BY XX.REJ_RSN_GRP, XX.REJ_RSN_CD ORDER BY XX.REJ_RSN_GRP) AS RN
+FROM oracle.PMDW_MGR.DW_BA_CM_REJRSNINFO_M XX
+WHERE XX.WAF_SIZE = #{waf_size}
+AND XX.PROD_DIV_CD = CASE WHEN #{oper_div_l} = 'WF' THEN 'PW' ELSE 'EPI' END
+) AS BEF_ALIAS
+ON BEF_ALIAS.REJ_RSN_GRP = A.REJ_GROUP
+AND BEF_ALIAS.REJ_RSN_CD = A.BEF_BAD_RSN_CD
+AND BEF_ALIAS.RN = 1
+
+-- AFT 매핑
+LEFT JOIN (
+SELECT
+XX.REJ_RSN_GRP,
+XX.REJ_RSN_CD,
+XX.ALIAS_RSN_CD,
+ROW_NUMBER() OVER (PARTITION BY XX.REJ_RSN_GRP, XX.REJ_RSN_CD ORDER BY XX.REJ_RSN_GRP) AS RN
+FROM oracle.PMDW_MGR.DW_BA_CM_REJRSNINFO_M XX
+WHERE XX.WAF_SIZE = #{waf_size}
+AND XX.PROD_DIV_CD = CASE WHEN #{oper_div_l} = 'WF' THEN 'PW' ELSE 'EPI' END
+) AS AFT_ALIAS
+ON AFT_ALIAS.REJ_RSN_GRP = A.REJ_GROUP
+AND AFT_ALIAS.REJ_RSN_CD = A.AFT_BAD_RSN_CD
+AND AFT_ALIAS.RN = 1
+
+JOIN oracle.PMDW_MGR.DW_BA_CM_BASEDATE_M B
+ON B.BASE_DT = A.BASE_DT
+
+LEFT JOIN oracle.PMDW_MGR.DW_BA_MS_PROD_M C
+ON C.PROD_ID = A.PROD_ID
+AND C.SPEC_DIV_CD = 'PS'
+
+LEFT JOIN oracle.DMS_MGR.TB_FX_CODES D
+ON D.UP_CD = 'DMS010'
+AND D.SYS_CD = 'DMS'
+AND D.CD_VAL = C.GRD_CD_NM
+
+LEFT JOIN oracle.DMS_MGR.TB_FX_CODES E
+ON E.UP_CD = 'DMS010'
+AND E.SYS_CD = 'DMS'
+AND E.CD_VAL = C.GRD_CD_NM_PS
+
+JOIN oracle.PMDW_MGR.DW_BA_CM_STDPOPER_M Z1
+ON Z1.FAC_ID = A.FAC_ID
+AND Z1.OPER_ID = A.OPER_ID
+
+WHERE
+1 = 1
+AND Z1.OPER_DIV_L = #{oper_div_l}
+AND (CASE WHEN 'PN' = 'PN' THEN TRUE ELSE C.GRD_CD_NM = 'PN' END)
+AND (CASE WHEN 'PN' = 'PN' THEN TRUE ELSE C.GRD_CD_NM_PS = 'PN' END)
+AND Z1.FAC_ID IN (#{fac_ids})
+AND 'N' = 'N'
+AND A.WAF_SIZE = #{waf_size}
+AND A.BASE_DT = #{base_dt}  --  어제 하루만
+--  분할 실행(wafering_split)의 OPER_ID 범위 [split_from, split_to), 미지정(NULL)이면 조건 없음
+AND (#{split_from} IS NULL OR A.OPER_ID >= #{split_from})
+AND (#{split_to} IS NULL OR A.OPER_ID < #{split_to})
+
+GROUP BY
+A.WAF_SIZE, A.BASE_DT, A.DIV_CD, A.REJ_DIV_CD, A.FAC_ID, A.OPER_ID,
+A.OWNR_CD, A.CRET_CD, A.PROD_ID, A.IGOT_ID, A.BLK_ID, A.SUBLOT_ID,
+A.USER_LOT_ID, A.EQP_ID, A.REJ_GROUP, A.OPER1_GROUP, A.OPER2_GROUP,
+A.RESPON, A.ALLO_GROUP, A.RESPON_RATIO, A.REAL_DPT_GROUP,
+D.CD_NM, E.CD_NM, C.CUST_SITE_NM, SUBSTR(B.BESOF_BASE_YW_NM, 3),
+BEF_ALIAS.ALIAS_RSN_CD, AFT_ALIAS.ALIAS_RSN_CD,
+A.BEF_BAD_RSN_CD, A.AFT_BAD_RSN_CD
+),
+-- (2) Z_WITH_PIMS: Z + PIMS_PROD 조인
+Z_WITH_PIMS AS (
+SELECT
+Z.*,
+P.CREQ_T1, P.CREQ_T2, P.CREQ_T3,
+P.CREQ_V1, P.CREQ_V2, P.CREQ_V3
+-- Z LEFT JOIN PIMS_PROD 와 같은 결과: PIMS_PROD 를 RIGHT JOIN 의 probe 쪽에 두어
+-- Z(build) 의 PROD_ID 동적 필터로 PIMS_PROD 스캔을 줄임 (Z / 팩트 테이블은 1회만 계산)
+FROM iceberg.ibg_lake.PIMS_PROD P
+RIGHT JOIN Z
+ON P.MS_CODE = Z.PROD_ID
+AND P.SPEC_TYPE = 'CS'
+)
+--  최종 SELECT
+SELECT
+Z.*,
+X1.EQP_NM,
+X.TEAMGRP_NM,
+X.SORT_CD,
+COALESCE(X.TEAMGRP_NM, Z.REAL_DPT_GROUP) AS N_DPT_GROUP,
+--  PART_NO: 일반 CASE 문 (상관 없음)
+CASE
+WHEN STRPOS(UPPER(Z.CREQ_T1), 'PART') > 0 THEN TRIM(SUBSTR(Z.CREQ_V1, STRPOS(Z.CREQ_V1, ':') + 1, 100))
+WHEN STRPOS(UPPER(Z.CREQ_T2), 'PART') > 0 THEN TRIM(SUBSTR(Z.CREQ_V2, STRPOS(Z.CREQ_V2, ':') + 1, 100))
+WHEN STRPOS(UPPER(Z.CREQ_T3), 'PART') > 0 THEN TRIM(SUBSTR(Z.CREQ_V3, STRPOS(Z.CREQ_V3, ':') + 1, 100))
+ELSE ' '
+END AS PART_NO
+FROM Z_WITH_PIMS Z
+--  Step 5: 팀부서그룹 매핑 (LATERAL)
+LEFT JOIN LATERAL (
+SELECT
+S2.TEAMGRP_NM,
+S2.SORT_SEQ AS SORT_CD
+FROM oracle.PMDW_MGR.DW_BA_CM_LOSSREJGRPDTL_M S1
+INNER JOIN oracle.PMDW_MGR.DW_BA_CM_LOSSREJGRP_M S2
+ON S1.TEAMGRP_CD = S2.TEAMGRP_CD
+AND S1.WAF_SIZE = S2.WAF_SIZE
+AND S1.OPER_DIV_L = S2.OPER_DIV_L
+WHERE
+S1.TARGET_DIV_CD IN ('A', 'L')
+AND S1.WAF_SIZE = #{waf_size}
+AND S1.OPER_DIV_L = #{oper_div_l}
+AND S1.ED_DT >= #{base_dt}  --  어제 포함 범위
+AND S1.ST_DT <= #{base_dt}  --  어제 포함 범위
+AND S1.DPT_CD = Z.REAL_DPT_GROUP
+ORDER BY S1.ST_DT DESC
+LIMIT 1
+) X ON TRUE
+--  Step 4: EQP_NM 매핑
+LEFT JOIN oracle.PMDW_MGR.DW_BA_CM_STDPEQP_H X1
+ON X1.FAC_ID = Z.FAC_ID
+AND X1.EQP_ID = Z.EQP_ID
+AND X1.ST_DT <= Z.BASE_DT
+AND (X1.ED_DT >= Z.BASE_DT OR X1.ED_DT IS NULL OR X1.ED_DT = '99991231')
+LEFT JOIN oracle.PMDW_MGR.DW_BA_CM_STDPEQP_M X2
+ON X2.FAC_ID = X1.FAC_ID
+AND X2.EQP_ID = X1.EQP_ID
+AND X2.APPLY_YN = 'Y'
+    
@@ -0,0 +1,22 @@
+-- =============================================
+-- [wafering_rollup] 일자 분모 COM_QTY 합계 (loss_rate.sql LOSS_INFO 통합 분모와 같은 조건)
+-- =============================================
+-- 일별 결과에 분모가 실리지 않은 일자(불량 행이 없는 날)만 조회, COM_QTY 행이 없으면 MGR_QTY 는 NULL
+SELECT SUM(A.IN_QTY) AS MGR_QTY
+FROM (
+    SELECT WAF_SIZE, FAC_ID, BASE_DT, OPER_ID, DIV_CD, IN_QTY
+    FROM oracle.PMDW_MGR.DM_PP_AC_TOTALFAULTDTLSTD_S
+    WHERE WAF_SIZE = #{waf_size} AND BASE_DT = #{base_dt}
+
+    UNION ALL
+
+    SELECT WAF_SIZE, FAC_ID, BASE_DT, OPER_ID, DIV_CD, IN_QTY
+    FROM oracle.PMDW_MGR.DW_BA_CM_TOTALFAULTMANUAL_S
+    WHERE WAF_SIZE = #{waf_size} AND BASE_DT = #{base_dt}
+) A
+INNER JOIN oracle.PMDW_MGR.DW_BA_CM_STDPOPER_M B
+    ON B.FAC_ID = A.FAC_ID AND B.OPER_ID = A.OPER_ID
+   AND B.OPER_DIV_L = #{oper_div_l} AND B.FAC_ID IN (#{fac_ids})
+WHERE
+    A.DIV_CD = 'COM_QTY'
+    AND CONCAT(A.WAF_SIZE, B.OPER_DIV_L) NOT IN ('200WF', '300EPI')
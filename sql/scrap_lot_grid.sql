@@ -0,0 +1,174 @@
+    -- =============================================
+    -- [Trino] ScrapYieldService.SELECT_TEAM_SCRAP_RATE_GRID_REV04 (어제 자동 입력)
+    --   3410_DATA(LOT)_wafering_300 (Oracle) 전환
+    --   - NVL → COALESCE, DECODE → CASE, ROWNUM <= 1 상관 서브쿼리 → 1건으로 줄인 뒤 LEFT JOIN
+    --   - F_GET_PART_NO → PIMS_PROD CREQ 항목 (waf_grid.sql 과 같은 규칙)
+    --   - FN_SIC_FACID_YN(FAC_ID) = 'N' → 대상 FAC_ID 목록(#{fac_ids})으로 대체
+    --   - 결과 컬럼에 쓰이지 않는 Z3(200mm 전용) OUTER APPLY 는 제외
+    -- =============================================
+    WITH REJ_ALIAS AS (
+        SELECT REJ_RSN_GRP, REJ_RSN_CD, ALIAS_RSN_CD,
+               ROW_NUMBER() OVER (PARTITION BY REJ_RSN_GRP, REJ_RSN_CD ORDER BY REJ_RSN_GRP) AS RN
+        FROM oracle.PMDW_MGR.DW_BA_CM_REJRSNINFO_M
+        WHERE WAF_SIZE = #{waf_size}
+          AND PROD_DIV_CD = CASE WHEN #{oper_div_l} = 'WF' THEN 'PW' ELSE 'EPI' END
+    ),
+    -- 팀부서그룹 (폐기: TARGET_DIV_CD A=전체, R=폐기), 부서별 ST_DT 최신 1건
+    TEAM_GRP AS (
+        SELECT DPT_CD, TEAMGRP_NM, SORT_SEQ
+        FROM (
+            SELECT
+                S1.DPT_CD,
+                S2.TEAMGRP_NM,
+                S2.SORT_SEQ,
+                ROW_NUMBER() OVER (PARTITION BY S1.DPT_CD ORDER BY S1.ST_DT DESC) AS RN
+            FROM oracle.PMDW_MGR.DW_BA_CM_LOSSREJGRPDTL_M S1
+            JOIN oracle.PMDW_MGR.DW_BA_CM_LOSSREJGRP_M S2
+                ON S1.TEAMGRP_CD = S2.TEAMGRP_CD
+                AND S1.WAF_SIZE = S2.WAF_SIZE
+                AND S1.OPER_DIV_L = S2.OPER_DIV_L
+            WHERE S1.TARGET_DIV_CD IN ('A', 'R')
+              AND S1.WAF_SIZE = #{waf_size}
+              AND S1.OPER_DIV_L = #{oper_div_l}
+              AND S1.ED_DT >= #{base_dt}
+              AND S1.ST_DT <= #{base_dt}
+        ) A
+        WHERE RN = 1
+    ),
+    -- F_GET_PART_NO
+    PART_NO_SOURCE AS (
+        SELECT
+            a.ms_code AS PROD_ID,
+            CASE
+                WHEN STRPOS(UPPER(a.creq_t1), 'PART') > 0 THEN TRIM(a.creq_v1)
+                WHEN STRPOS(UPPER(a.creq_t2), 'PART') > 0 THEN TRIM(a.creq_v2)
+                WHEN STRPOS(UPPER(a.creq_t3), 'PART') > 0 THEN TRIM(a.creq_v3)
+                ELSE ' '
+            END AS PART_NO
+        FROM iceberg.ibg_lake.pims_prod a
+        WHERE a.spec_type = 'CS'
+    ),
+    -- (1) Z: 원본 + 보정 데이터 통합
+    Z AS (
+        -- (1-1) 원본 데이터 (LOT)
+        SELECT
+            A.BASE_DT, A.WAF_SIZE, A.REJ_DIV_CD, A.REJ_DTL_DIV_CD, A.TRST_DTTM, A.FAC_ID, A.IGOT_ID, A.LOT_ID,
+            A.USER_LOT_ID, A.PROD_ID, A.BEF_PROD_ID, A.WRKR_ID, A.OWNR_CD, A.CRET_CD, A.EQP_ID, A.OPER_ID,
+            A.ORG_OPER_ID, A.LAST_OPER_ID,
+            A.REJ_RSN_CD,                                   -- 300mm: Alias 미적용 (200mm 만 Alias)
+            A.REJ_RSN_CD2, A.ORG_REJ_RSN_CD, A.REV_REJ_RSN_CD,
+            COALESCE(NULLIF(TRIM(AL.ALIAS_RSN_CD), ''), A.STD_REJ_RSN_CD) AS STD_REJ_RSN_CD,
+            A.RJ_GROUP, A.RSN_DIV_CD, A.PROD_DIV_CD, A.REJ_RSN_DIV_CD, A.MT_ID, A.GRD_CD_NM, A.TEST_TYPE,
+            A.CUST_STIE, A.OPER1_GROUP, A.OPER2_GROUP, A.RESPON, A.ALLO_GROUP, A.RATIO, A.QTY,
+            CASE WHEN A.BASE_DT < '20210101' AND A.OWNR_CD = 'EPIRW' AND #{waf_size} = '300' AND A.PROD_DIV_CD = 'EPI'
+                      AND A.RESPON = 'ALLO' AND A.RATIO < 1 THEN 'EPI기술2팀'
+                 ELSE A.REAL_DPT_GROUP END AS REAL_DPT_GROUP,
+            A.DATA_CHG_DTTM,
+            SUBSTR(X.BESOF_BASE_YW_NM, 3) AS WEEK_DAY_NM,
+            E.CD_NM AS GRD_CD_NM_CS,
+            F.CD_NM AS GRD_CD_NM_PS
+        FROM oracle.PMDW_MGR.DM_PP_AC_TOTALREJDTLSTD_S A
+        JOIN oracle.PMDW_MGR.DW_BA_CM_STDPOPER_M Z
+            ON Z.FAC_ID = A.FAC_ID AND Z.OPER_ID = A.OPER_ID
+        JOIN oracle.PMDW_MGR.DW_BA_CM_BASEDATE_M X
+            ON X.BASE_DT = A.BASE_DT
+        LEFT JOIN oracle.PMDW_MGR.DW_BA_MS_PROD_M D
+            ON D.PROD_ID = A.PROD_ID AND D.SPEC_DIV_CD = 'PS'
+        LEFT JOIN oracle.DMS_MGR.TB_FX_CODES E
+            ON E.UP_CD = 'DMS010' AND E.SYS_CD = 'DMS' AND E.CD_VAL = D.GRD_CD_NM
+        LEFT JOIN oracle.DMS_MGR.TB_FX_CODES F
+            ON F.UP_CD = 'DMS010' AND F.SYS_CD = 'DMS' AND F.CD_VAL = D.GRD_CD_NM_PS
+        LEFT JOIN REJ_ALIAS AL
+            ON AL.REJ_RSN_GRP = A.RJ_GROUP AND AL.REJ_RSN_CD = A.STD_REJ_RSN_CD AND AL.RN = 1
+        WHERE
+            Z.WAF_SIZE = #{waf_size}
+            AND Z.OPER_DIV_L = #{oper_div_l}
+            AND Z.FAC_ID IN (#{fac_ids})
+            -- '300' || REJ_DTL_DIV_CD <> '300창고' : Oracle 은 NULL 연결 시 '300' 이므로 NULL 행 유지
+            AND COALESCE(A.REJ_DTL_DIV_CD, '') <> '창고'
+            AND (CASE WHEN 'PN' = 'PN' THEN TRUE ELSE D.GRD_CD_NM = 'PN' END)
+            AND (CASE WHEN 'PN' = 'PN' THEN TRUE ELSE D.GRD_CD_NM_PS = 'PN' END)
+            AND A.WAF_SIZE = #{waf_size}
+            AND A.BASE_DT = #{base_dt}
+            -- 분할 실행(wafering_split)의 OPER_ID 범위 [split_from, split_to), 미지정(NULL)이면 조건 없음
+            AND (#{split_from} IS NULL OR A.OPER_ID >= #{split_from})
+            AND (#{split_to} IS NULL OR A.OPER_ID < #{split_to})
+
+        UNION ALL
+
+        -- (1-2) 보정 데이터 (WAF 단위 → LOT 단위 합계, 창고폐기 필터 없음)
+        SELECT
+            A.BASE_DT, A.WAF_SIZE, A.REJ_DIV_CD, A.REJ_DTL_DIV_CD, A.TRST_DTTM, A.FAC_ID, A.IGOT_ID, A.LOT_ID,
+            A.USER_LOT_ID, A.PROD_ID, A.BEF_PROD_ID, A.WRKR_ID, A.OWNR_CD, A.CRET_CD, A.EQP_ID, A.OPER_ID,
+            A.ORG_OPER_ID, A.LAST_OPER_ID,
+            A.REJ_RSN_CD, A.REJ_RSN_CD2, A.ORG_REJ_RSN_CD, A.REV_REJ_RSN_CD,
+            COALESCE(NULLIF(TRIM(AL.ALIAS_RSN_CD), ''), A.STD_REJ_RSN_CD) AS STD_REJ_RSN_CD,
+            A.RJ_GROUP, A.RSN_DIV_CD, A.PROD_DIV_CD, A.REJ_RSN_DIV_CD, A.MT_ID, A.GRD_CD_NM, A.TEST_TYPE,
+            A.CUST_STIE, A.OPER1_GROUP, A.OPER2_GROUP, A.RESPON, A.ALLO_GROUP, A.RATIO,
+            SUM(A.QTY) AS QTY,
+            CASE WHEN A.BASE_DT < '20210101' AND A.OWNR_CD = 'EPIRW' AND #{waf_size} = '300' AND A.PROD_DIV_CD = 'EPI'
+                      AND A.RESPON = 'ALLO' AND A.RATIO < 1 THEN 'EPI기술2팀'
+                 ELSE A.REAL_DPT_GROUP END AS REAL_DPT_GROUP,
+            A.DATA_CHG_DTTM,
+            SUBSTR(X.BESOF_BASE_YW_NM, 3) AS WEEK_DAY_NM,
+            E.CD_NM AS GRD_CD_NM_CS,
+            F.CD_NM AS GRD_CD_NM_PS
+        FROM oracle.PMDW_MGR.DW_BA_CM_TOTALREJMANUAL_S A
+        JOIN oracle.PMDW_MGR.DW_BA_CM_STDPOPER_M Z
+            ON Z.FAC_ID = A.FAC_ID AND Z.OPER_ID = A.OPER_ID
+        JOIN oracle.PMDW_MGR.DW_BA_CM_BASEDATE_M X
+            ON X.BASE_DT = A.BASE_DT
+        LEFT JOIN oracle.PMDW_MGR.DW_BA_MS_PROD_M D
+            ON D.PROD_ID = A.PROD_ID AND D.SPEC_DIV_CD = 'PS'
+        LEFT JOIN oracle.DMS_MGR.TB_FX_CODES E
+            ON E.UP_CD = 'DMS010' AND E.SYS_CD = 'DMS' AND E.CD_VAL = D.GRD_CD_NM
+        LEFT JOIN oracle.DMS_MGR.TB_FX_CODES F
+            ON F.UP_CD = 'DMS010' AND F.SYS_CD = 'DMS' AND F.CD_VAL = D.GRD_CD_NM_PS
+        LEFT JOIN REJ_ALIAS AL
+            ON AL.REJ_RSN_GRP = A.RJ_GROUP AND AL.REJ_RSN_CD = A.STD_REJ_RSN_CD AND AL.RN = 1
+        WHERE
+            Z.WAF_SIZE = #{waf_size}
+            AND Z.OPER_DIV_L = #{oper_div_l}
+            AND Z.FAC_ID IN (#{fac_ids})
+            AND (CASE WHEN 'PN' = 'PN' THEN TRUE ELSE D.GRD_CD_NM = 'PN' END)
+            AND (CASE WHEN 'PN' = 'PN' THEN TRUE ELSE D.GRD_CD_NM_PS = 'PN' END)
+            AND A.WAF_SIZE = #{waf_size}
+            AND A.BASE_DT = #{base_dt}
+            -- 분할 실행(wafering_split)의 OPER_ID 범위 [split_from, split_to), 미지정(NULL)이면 조건 없음
+            AND (#{split_from} IS NULL OR A.OPER_ID >= #{split_from})
+            AND (#{split_to} IS NULL OR A.OPER_ID < #{split_to})
+        GROUP BY
+            A.BASE_DT, A.WAF_SIZE, A.REJ_DIV_CD, A.REJ_DTL_DIV_CD, A.TRST_DTTM, A.FAC_ID, A.IGOT_ID, A.LOT_ID,
+            A.USER_LOT_ID, A.PROD_ID, A.BEF_PROD_ID, A.WRKR_ID, A.OWNR_CD, A.CRET_CD, A.EQP_ID, A.OPER_ID,
+            A.ORG_OPER_ID, A.LAST_OPER_ID, A.REJ_RSN_CD, A.REJ_RSN_CD2, A.ORG_REJ_RSN_CD, A.REV_REJ_RSN_CD,
+            COALESCE(NULLIF(TRIM(AL.ALIAS_RSN_CD), ''), A.STD_REJ_RSN_CD),
+            A.RJ_GROUP, A.RSN_DIV_CD, A.PROD_DIV_CD, A.REJ_RSN_DIV_CD, A.MT_ID, A.GRD_CD_NM, A.TEST_TYPE,
+            A.CUST_STIE, A.OPER1_GROUP, A.OPER2_GROUP, A.RESPON, A.ALLO_GROUP, A.RATIO,
+            CASE WHEN A.BASE_DT < '20210101' AND A.OWNR_CD = 'EPIRW' AND #{waf_size} = '300' AND A.PROD_DIV_CD = 'EPI'
+                      AND A.RESPON = 'ALLO' AND A.RATIO < 1 THEN 'EPI기술2팀'
+                 ELSE A.REAL_DPT_GROUP END,
+            A.DATA_CHG_DTTM, SUBSTR(X.BESOF_BASE_YW_NM, 3), E.CD_NM, F.CD_NM
+    )
+    -- 최종 출력
+    SELECT
+        Z.*,
+        COALESCE(T.TEAMGRP_NM, Z.REAL_DPT_GROUP) AS N_DPT_GROUP,
+        X1.EQP_NM,
+        COALESCE(PN.PART_NO, ' ') AS PART_NO
+    -- Z LEFT JOIN PART_NO_SOURCE 와 같은 결과: pims_prod 를 RIGHT JOIN 의 probe 쪽에 두어
+    -- Z(build) 의 PROD_ID 동적 필터로 pims_prod 스캔을 줄임
+    FROM PART_NO_SOURCE PN
+    RIGHT JOIN Z
+        ON PN.PROD_ID = Z.PROD_ID
+    LEFT JOIN oracle.PMDW_MGR.DW_BA_CM_STDPEQP_H X1
+        ON X1.FAC_ID = Z.FAC_ID
+        AND X1.EQP_ID = Z.EQP_ID
+        AND X1.ST_DT <= Z.BASE_DT
+        AND X1.ED_DT >= Z.BASE_DT
+    LEFT JOIN oracle.PMDW_MGR.DW_BA_CM_STDPEQP_M X2
+        ON X2.FAC_ID = X1.FAC_ID
+        AND X2.EQP_ID = X1.EQP_ID
+        AND X2.APPLY_YN = 'Y'
+    LEFT JOIN TEAM_GRP T
+        ON T.DPT_CD = Z.REAL_DPT_GROUP
+    ORDER BY Z.BASE_DT
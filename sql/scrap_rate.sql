@@ -0,0 +1,302 @@
+    -- =============================================
+    -- [Trino] ScrapYieldService.SELECT_TEAM_SCRAP_RATE_REV04 (어제 자동 입력, 일 단위)
+    --   3410_DATA_wafering_300 (Oracle) 전환
+    --   - 조회 구분 'D' 기준: 분기/월/주 목표·실적 분기(UNION)는 비활성이라 제외
+    --   - Q/M/W-DIS_RSN 도 하루치 데이터에 기간명만 붙인 값이라 제외 (기간 집계는 일자 파티션에서 계산)
+    --   - NVL → COALESCE, DECODE → CASE, OUTER APPLY(ROWNUM = 1) → 부서별 1건으로 줄인 뒤 LEFT JOIN
+    --   - FN_SIC_FACID_YN(FAC_ID) = 'N' → 대상 FAC_ID 목록(#{fac_ids})으로 대체
+    --   - Oracle '' = NULL 이므로 DIV_CD / REJ_RSN_CD / OPER_ID 의 '' 는 NULL 로 처리
+    -- =============================================
+    WITH REJ_ALIAS AS (
+        SELECT REJ_RSN_GRP, REJ_RSN_CD, ALIAS_RSN_CD,
+               ROW_NUMBER() OVER (PARTITION BY REJ_RSN_GRP, REJ_RSN_CD ORDER BY REJ_RSN_GRP) AS RN
+        FROM oracle.PMDW_MGR.DW_BA_CM_REJRSNINFO_M
+        WHERE WAF_SIZE = #{waf_size}
+          AND PROD_DIV_CD = CASE WHEN #{oper_div_l} = 'WF' THEN 'PW' ELSE 'EPI' END
+    ),
+    -- 팀부서그룹 (폐기: TARGET_DIV_CD A=전체, R=폐기), 부서별 ST_DT 최신 1건
+    TEAM_GRP AS (
+        SELECT DPT_CD, TEAMGRP_NM, SORT_SEQ
+        FROM (
+            SELECT
+                S1.DPT_CD,
+                S2.TEAMGRP_NM,
+                S2.SORT_SEQ,
+                ROW_NUMBER() OVER (PARTITION BY S1.DPT_CD ORDER BY S1.ST_DT DESC) AS RN
+            FROM oracle.PMDW_MGR.DW_BA_CM_LOSSREJGRPDTL_M S1
+            JOIN oracle.PMDW_MGR.DW_BA_CM_LOSSREJGRP_M S2
+                ON S1.TEAMGRP_CD = S2.TEAMGRP_CD
+                AND S1.WAF_SIZE = S2.WAF_SIZE
+                AND S1.OPER_DIV_L = S2.OPER_DIV_L
+            WHERE S1.TARGET_DIV_CD IN ('A', 'R')
+              AND S1.WAF_SIZE = #{waf_size}
+              AND S1.OPER_DIV_L = #{oper_div_l}
+              AND S1.ED_DT >= #{base_dt}
+              AND S1.ST_DT <= #{base_dt}
+        ) A
+        WHERE RN = 1
+    ),
+    -- 폐기 데이터 (원본 LOT + 보정), 부서/불량코드 단위
+    FF AS (
+        SELECT
+            Z.OPER_DIV_L, A.BASE_DT, A.RJ_GROUP, A.STD_REJ_RSN_CD AS REJ_RSN_CD, A.OPER_ID,
+            CASE WHEN A.BASE_DT < '20210101' AND A.OWNR_CD = 'EPIRW' AND #{waf_size} = '300' AND A.PROD_DIV_CD = 'EPI'
+                      AND A.RESPON = 'ALLO' AND A.RATIO < 1 THEN 'EPI기술2팀'
+                 ELSE A.REAL_DPT_GROUP END AS DPT_GROUP,
+            SUM(A.QTY) AS DIS_QTY
+        FROM oracle.PMDW_MGR.DM_PP_AC_TOTALREJDTLSTD_S A
+        JOIN oracle.PMDW_MGR.DW_BA_CM_STDPOPER_M Z
+            ON Z.FAC_ID = A.FAC_ID AND Z.OPER_ID = A.OPER_ID
+        LEFT JOIN oracle.PMDW_MGR.DW_BA_MS_PROD_M D
+            ON D.PROD_ID = A.PROD_ID AND D.SPEC_DIV_CD = 'PS'
+        WHERE
+            Z.WAF_SIZE = #{waf_size}
+            AND Z.OPER_DIV_L = #{oper_div_l}
+            AND A.FAC_ID IN (#{fac_ids})
+            -- '300' || REJ_DTL_DIV_CD <> '300창고' : Oracle 은 NULL 연결 시 '300' 이므로 NULL 행 유지
+            AND COALESCE(A.REJ_DTL_DIV_CD, '') <> '창고'
+            AND (CASE WHEN 'PN' = 'PN' THEN TRUE ELSE D.GRD_CD_NM = 'PN' END)
+            AND (CASE WHEN 'PN' = 'PN' THEN TRUE ELSE D.GRD_CD_NM_PS = 'PN' END)
+            AND A.WAF_SIZE = #{waf_size}
+            AND A.BASE_DT = #{base_dt}
+        GROUP BY 1, 2, 3, 4, 5, 6
+
+        UNION ALL
+
+        SELECT
+            Z.OPER_DIV_L, A.BASE_DT, A.RJ_GROUP, A.STD_REJ_RSN_CD AS REJ_RSN_CD, A.OPER_ID,
+            CASE WHEN A.BASE_DT < '20210101' AND A.OWNR_CD = 'EPIRW' AND #{waf_size} = '300' AND A.PROD_DIV_CD = 'EPI'
+                      AND A.RESPON = 'ALLO' AND A.RATIO < 1 THEN 'EPI기술2팀'
+                 ELSE A.REAL_DPT_GROUP END AS DPT_GROUP,
+            SUM(A.QTY) AS DIS_QTY
+        FROM oracle.PMDW_MGR.DW_BA_CM_TOTALREJMANUAL_S A
+        JOIN oracle.PMDW_MGR.DW_BA_CM_STDPOPER_M Z
+            ON Z.FAC_ID = A.FAC_ID AND Z.OPER_ID = A.OPER_ID
+        LEFT JOIN oracle.PMDW_MGR.DW_BA_MS_PROD_M D
+            ON D.PROD_ID = A.PROD_ID AND D.SPEC_DIV_CD = 'PS'
+        WHERE
+            Z.WAF_SIZE = #{waf_size}
+            AND Z.OPER_DIV_L = #{oper_div_l}
+            AND A.FAC_ID IN (#{fac_ids})
+            AND (CASE WHEN 'PN' = 'PN' THEN TRUE ELSE D.GRD_CD_NM = 'PN' END)
+            AND (CASE WHEN 'PN' = 'PN' THEN TRUE ELSE D.GRD_CD_NM_PS = 'PN' END)
+            AND A.WAF_SIZE = #{waf_size}
+            AND A.BASE_DT = #{base_dt}
+        GROUP BY 1, 2, 3, 4, 5, 6
+    ),
+    -- SCRAP_DATA: REJ_RSN_CD → Alias, 부서 → 팀그룹 (원본 코드 단위로 묶은 뒤 Alias 표시)
+    SCRAP_DATA AS (
+        SELECT
+            FF.OPER_DIV_L,
+            FF.BASE_DT,
+            FF.RJ_GROUP,
+            COALESCE(NULLIF(TRIM(AL.ALIAS_RSN_CD), ''), FF.REJ_RSN_CD) AS REJ_RSN_CD,
+            FF.OPER_ID,
+            COALESCE(T.TEAMGRP_NM, FF.DPT_GROUP) AS DPT_GROUP,
+            SUM(FF.DIS_QTY) AS DIS_QTY,
+            SUM(FF.DIS_QTY) AS TOT_DIS_QTY
+        FROM FF
+        LEFT JOIN REJ_ALIAS AL
+            ON AL.REJ_RSN_GRP = FF.RJ_GROUP AND AL.REJ_RSN_CD = FF.REJ_RSN_CD AND AL.RN = 1
+        LEFT JOIN TEAM_GRP T
+            ON T.DPT_CD = FF.DPT_GROUP
+        GROUP BY
+            FF.OPER_DIV_L, FF.BASE_DT, FF.RJ_GROUP, FF.REJ_RSN_CD, AL.ALIAS_RSN_CD, FF.OPER_ID,
+            COALESCE(T.TEAMGRP_NM, FF.DPT_GROUP)
+    ),
+    -- 폐기율 분모 (생산실적 + 폐기실적)
+    DIS_QTY_INFO AS (
+        SELECT OPER_DIV_L, BASE_DT, SUM(ACC_QTY) AS ACC_QTY, SUM(MGR_QTY) AS MGR_QTY
+        FROM (
+            -- 생산실적 (12인치, EPI 제외)
+            SELECT
+                CASE WHEN A.PROD_KIND_DIV_CD = 'EPI' THEN 'EPI' ELSE 'WF' END AS OPER_DIV_L,
+                A.BASE_DT,
+                SUM(A.QTY) AS ACC_QTY,
+                SUM(A.QTY) AS MGR_QTY
+            FROM oracle.PMDW_MGR.DM_PP_AC_ENTRWFACRL_S A
+            LEFT JOIN oracle.PMDW_MGR.DW_BA_MS_PROD_M B
+                ON B.PROD_ID = A.PROD_ID AND B.SPEC_DIV_CD = 'PS'
+            WHERE
+                A.FAC_ID IN (#{fac_ids})
+                AND CASE A.INCH WHEN '08' THEN '200' WHEN '12' THEN '300' END = #{waf_size}
+                AND CASE WHEN A.PROD_KIND_DIV_CD = 'EPI' THEN 'EPI' ELSE 'WF' END = #{oper_div_l}
+                AND A.BASE_DT = #{base_dt}
+                AND COALESCE(B.TST_FORML_FLAG, ' ') NOT IN ('L', 'N', 'V')
+                AND A.PROD_ID NOT LIKE '08Y029%'
+                AND (CASE WHEN 'PN' = 'PN' THEN TRUE ELSE B.GRD_CD_NM = 'PN' END)
+                AND (CASE WHEN 'PN' = 'PN' THEN TRUE ELSE B.GRD_CD_NM_PS = 'PN' END)
+            GROUP BY 1, 2
+
+            UNION ALL
+
+            -- 폐기실적
+            SELECT OPER_DIV_L, BASE_DT, SUM(TOT_DIS_QTY) AS ACC_QTY, 0 AS MGR_QTY
+            FROM SCRAP_DATA
+            GROUP BY OPER_DIV_L, BASE_DT
+        ) A1
+        GROUP BY OPER_DIV_L, BASE_DT
+    ),
+    -- 일 목표 (R&D 제외, 팀 구분은 합계에 영향이 없어 생략)
+    GOAL_INFO AS (
+        SELECT
+            A.YLD_DIV1_CD,
+            A.YLD_DIV3_CD,
+            date_format(date_parse(Z.BASE_DT, '%Y%m%d'), '%y-%m-%d') AS BASE_DT_NM,
+            'D' AS CATEGORY,
+            SUM(A.GOAL_VAL) AS GOAL
+        FROM oracle.PMDW_MGR.DW_BA_CM_BASEDATE_M Z
+        JOIN oracle.PMDW_MGR.DW_BA_CM_YLDPLAN_M A
+            ON A.BASE_YM = Z.BASE_YM
+            AND A.GOAL_DIV_CD = 'DIS-RATE'
+            AND A.YLD_PLAN_TYPE = 'BP'
+            AND A.WAF_SIZE = #{waf_size}
+            AND A.YLD_DIV1_CD = #{oper_div_l}
+            AND A.REF_DIV2 = 'PN'
+        WHERE Z.BASE_DT = #{base_dt}
+          AND A.YLD_DIV3_CD <> 'R&D'
+        GROUP BY A.YLD_DIV1_CD, A.YLD_DIV3_CD, Z.BASE_DT
+    ),
+    -- 분자 (그룹별 폐기량)
+    S1 AS (
+        SELECT
+            Z.OPER_DIV_L,
+            date_format(date_parse(Z.BASE_DT, '%Y%m%d'), '%y-%m-%d') AS BASE_DT_NM,
+            Z.RJ_GROUP,
+            SUM(Z.DIS_QTY) AS DIS_QTY,
+            'D' AS CATEGORY
+        FROM SCRAP_DATA Z
+        JOIN oracle.PMDW_MGR.DW_BA_CM_BASEDATE_M Y
+            ON Y.BASE_DT = Z.BASE_DT
+        GROUP BY Z.OPER_DIV_L, Z.BASE_DT, Z.RJ_GROUP
+        HAVING SUM(Z.DIS_QTY) <> 0
+    ),
+    -- 분모 (일자별 합계)
+    S2 AS (
+        SELECT
+            A.OPER_DIV_L,
+            date_format(date_parse(A.BASE_DT, '%Y%m%d'), '%y-%m-%d') AS BASE_DT_NM,
+            SUM(A.ACC_QTY) AS ACC_QTY,
+            SUM(A.MGR_QTY) AS MGR_QTY,
+            'D' AS CATEGORY
+        FROM DIS_QTY_INFO A
+        JOIN oracle.PMDW_MGR.DW_BA_CM_BASEDATE_M B
+            ON B.BASE_DT = A.BASE_DT
+        GROUP BY A.OPER_DIV_L, A.BASE_DT
+    ),
+    -- 그룹별 폐기율 + 목표
+    GROUP_RATE AS (
+        SELECT
+            CATEGORY,
+            BASE_DT_NM,
+            RJ_GROUP,
+            SUM(DIS_RATIO) AS DIS_RATIO,
+            SUM(DIS_QTY) AS DIS_QTY,
+            SUM(MGR_QTY) AS MGR_QTY,
+            SUM(GOAL_RATIO) AS GOAL_RATIO
+        FROM (
+            SELECT
+                S1.CATEGORY,
+                S1.BASE_DT_NM,
+                S1.RJ_GROUP,
+                CASE WHEN COALESCE(SUM(S2.ACC_QTY), 0) <> 0
+                     THEN CAST(SUM(S1.DIS_QTY) AS DOUBLE) / SUM(S2.ACC_QTY) END AS DIS_RATIO,
+                COALESCE(SUM(S1.DIS_QTY), 0) AS DIS_QTY,
+                SUM(S2.MGR_QTY) AS MGR_QTY,
+                0 AS GOAL_RATIO
+            FROM S1
+            LEFT JOIN S2
+                ON S2.BASE_DT_NM = S1.BASE_DT_NM
+                AND S2.OPER_DIV_L = S1.OPER_DIV_L
+                AND S2.CATEGORY = S1.CATEGORY
+            GROUP BY S1.CATEGORY, S1.BASE_DT_NM, S1.RJ_GROUP
+
+            UNION ALL
+
+            SELECT CATEGORY, BASE_DT_NM, YLD_DIV3_CD AS RJ_GROUP, 0 AS DIS_RATIO, 0 AS DIS_QTY, 0 AS MGR_QTY,
+                   GOAL AS GOAL_RATIO
+            FROM GOAL_INFO
+        ) AA
+        GROUP BY CATEGORY, BASE_DT_NM, RJ_GROUP
+    ),
+    -- 불량코드(REJ_RSN_CD) / 공정별 상세
+    RSN_RATE AS (
+        SELECT
+            Z.CATEGORY, Z.BASE_DT_NM, Z.RJ_GROUP, Z.REJ_RSN_CD, Z.OPER_ID,
+            CASE WHEN Y.ACC_QTY <> 0 THEN CAST(Z.DIS_QTY AS DOUBLE) / Y.ACC_QTY END AS DIS_RATIO,
+            0.0 AS GOAL_RATIO,
+            0.0 AS GOAL_RATIO_SUM,
+            0.0 AS GAP_RATIO,
+            Z.DIS_QTY,
+            0 AS MGR_QTY
+        FROM (
+            SELECT
+                'D-DIS_RSN' AS CATEGORY,
+                date_format(date_parse(Z.BASE_DT, '%Y%m%d'), '%y-%m-%d') AS BASE_DT_NM,
+                Z.RJ_GROUP,
+                COALESCE(Z.REJ_RSN_CD, 'UNKNOWN') AS REJ_RSN_CD,
+                Z.OPER_ID,
+                SUM(Z.DIS_QTY) AS DIS_QTY
+            FROM SCRAP_DATA Z
+            JOIN oracle.PMDW_MGR.DW_BA_CM_BASEDATE_M Y
+                ON Y.BASE_DT = Z.BASE_DT
+            GROUP BY Z.BASE_DT, Z.RJ_GROUP, Z.REJ_RSN_CD, Z.OPER_ID
+            HAVING SUM(Z.DIS_QTY) <> 0
+        ) Z
+        LEFT JOIN S2 Y
+            ON Y.BASE_DT_NM = Z.BASE_DT_NM
+    ),
+    ZZ AS (
+        SELECT
+            FF.CATEGORY,
+            FF.BASE_DT_NM,
+            FF.RJ_GROUP,
+            CAST(NULL AS VARCHAR) AS REJ_RSN_CD,
+            CAST(NULL AS VARCHAR) AS OPER_ID,
+            FF.DIS_RATIO,
+            COALESCE(FF.GOAL_RATIO, 0) AS GOAL_RATIO,
+            COALESCE(FF3.GOAL, 0) AS GOAL_RATIO_SUM,
+            FF.DIS_RATIO - COALESCE(FF.GOAL_RATIO, 0) AS GAP_RATIO,
+            FF.DIS_QTY,
+            FF.MGR_QTY
+        FROM GROUP_RATE FF
+        -- 목표 (일자별 계)
+        LEFT JOIN (
+            SELECT YLD_DIV1_CD, BASE_DT_NM, CATEGORY, SUM(GOAL) AS GOAL
+            FROM GOAL_INFO
+            GROUP BY YLD_DIV1_CD, BASE_DT_NM, CATEGORY
+        ) FF3
+            ON FF3.YLD_DIV1_CD = #{oper_div_l}
+            AND FF3.BASE_DT_NM = FF.BASE_DT_NM
+            AND FF3.CATEGORY = FF.CATEGORY
+
+        UNION ALL
+
+        SELECT CATEGORY, BASE_DT_NM, RJ_GROUP, REJ_RSN_CD, OPER_ID, DIS_RATIO, GOAL_RATIO, GOAL_RATIO_SUM,
+               GAP_RATIO, DIS_QTY, MGR_QTY
+        FROM RSN_RATE
+    )
+    -- 최종 출력
+    SELECT
+        ZZ.CATEGORY,
+        ZZ.BASE_DT_NM,
+        ZZ.RJ_GROUP,
+        ZZ.REJ_RSN_CD,
+        ZZ.OPER_ID,
+        CAST(ZZ.DIS_RATIO AS DECIMAL(24,16)) AS DIS_RATIO,
+        -- R&D 개별 목표는 0.9% 로 일괄 표시
+        CAST(CASE WHEN ZZ.RJ_GROUP = 'R&D' THEN 0.009 ELSE ZZ.GOAL_RATIO END AS DECIMAL(24,16)) AS GOAL_RATIO,
+        CAST(ZZ.GOAL_RATIO_SUM AS DECIMAL(24,16)) AS GOAL_RATIO_SUM,
+        CAST(ZZ.GAP_RATIO AS DECIMAL(24,16)) AS GAP_RATIO,
+        ZZ.DIS_QTY,
+        ZZ.MGR_QTY,
+        COALESCE(ZZ2.SORT_ORDER, 99999) AS SORT_CD
+    FROM ZZ
+    -- REJECT 정렬코드
+    LEFT JOIN oracle.DMS_MGR.TB_FX_CODES ZZ2
+        ON ZZ2.UP_CD = 'COM000'
+        AND ZZ2.SYS_CD = 'DMS'
+        AND CASE WHEN ZZ2.CD_EXT1 = 'PW' THEN 'WF' ELSE ZZ2.CD_EXT1 END = #{oper_div_l}
+        AND ZZ2.CD_EXT2 = #{waf_size}
+        AND ZZ2.CD_VAL = ZZ.RJ_GROUP
+    ORDER BY ZZ.CATEGORY, ZZ.BASE_DT_NM, SORT_CD, ZZ.RJ_GROUP
@@ -0,0 +1,164 @@
+    -- =============================================
+    -- [Trino] ScrapYieldService.SELECT_TEAM_SCRAP_RATE_GRID_WAF_REV04 (어제 자동 입력)
+    --   3410_DATA(WAF)_wafering_300 (Oracle) 전환
+    --   - NVL → COALESCE, DECODE → CASE, ROWNUM <= 1 상관 서브쿼리 → 1건으로 줄인 뒤 LEFT JOIN
+    --   - F_GET_PART_NO → PIMS_PROD CREQ 항목 (waf_grid.sql 과 같은 규칙)
+    --   - FN_SIC_FACID_YN(FAC_ID) = 'N' → 대상 FAC_ID 목록(#{fac_ids})으로 대체
+    --   - 결과 컬럼에 쓰이지 않는 Z2(공정별 설비 이력) / Z3(200mm 전용) OUTER APPLY 는 제외
+    -- =============================================
+    WITH REJ_ALIAS AS (
+        SELECT REJ_RSN_GRP, REJ_RSN_CD, ALIAS_RSN_CD,
+               ROW_NUMBER() OVER (PARTITION BY REJ_RSN_GRP, REJ_RSN_CD ORDER BY REJ_RSN_GRP) AS RN
+        FROM oracle.PMDW_MGR.DW_BA_CM_REJRSNINFO_M
+        WHERE WAF_SIZE = #{waf_size}
+          AND PROD_DIV_CD = CASE WHEN #{oper_div_l} = 'WF' THEN 'PW' ELSE 'EPI' END
+    ),
+    -- 팀부서그룹 (폐기: TARGET_DIV_CD A=전체, R=폐기), 부서별 ST_DT 최신 1건
+    TEAM_GRP AS (
+        SELECT DPT_CD, TEAMGRP_NM, SORT_SEQ
+        FROM (
+            SELECT
+                S1.DPT_CD,
+                S2.TEAMGRP_NM,
+                S2.SORT_SEQ,
+                ROW_NUMBER() OVER (PARTITION BY S1.DPT_CD ORDER BY S1.ST_DT DESC) AS RN
+            FROM oracle.PMDW_MGR.DW_BA_CM_LOSSREJGRPDTL_M S1
+            JOIN oracle.PMDW_MGR.DW_BA_CM_LOSSREJGRP_M S2
+                ON S1.TEAMGRP_CD = S2.TEAMGRP_CD
+                AND S1.WAF_SIZE = S2.WAF_SIZE
+                AND S1.OPER_DIV_L = S2.OPER_DIV_L
+            WHERE S1.TARGET_DIV_CD IN ('A', 'R')
+              AND S1.WAF_SIZE = #{waf_size}
+              AND S1.OPER_DIV_L = #{oper_div_l}
+              AND S1.ED_DT >= #{base_dt}
+              AND S1.ST_DT <= #{base_dt}
+        ) A
+        WHERE RN = 1
+    ),
+    -- 원본(WAF) + 보정 데이터
+    SCRAP_BASE AS (
+        SELECT
+            A.WAF_ID, A.WAF_SEQ, A.BASE_DT, A.WAF_SIZE, A.REJ_DIV_CD, A.REJ_DTL_DIV_CD, A.TRST_DTTM, A.FAC_ID,
+            A.IGOT_ID, A.LOT_ID, A.USER_LOT_ID, A.PROD_ID, A.BEF_PROD_ID, A.WRKR_ID, A.OWNR_CD, A.CRET_CD, A.EQP_ID,
+            A.OPER_ID, A.ORG_OPER_ID, A.LAST_OPER_ID, A.REJ_RSN_CD, A.REJ_RSN_CD2, A.ORG_REJ_RSN_CD, A.REV_REJ_RSN_CD,
+            A.STD_REJ_RSN_CD, A.RJ_GROUP, A.RSN_DIV_CD, A.PROD_DIV_CD, A.REJ_RSN_DIV_CD, A.MT_ID, A.GRD_CD_NM,
+            A.TEST_TYPE, A.CUST_STIE, A.OPER1_GROUP, A.OPER2_GROUP, A.RESPON, A.ALLO_GROUP, A.RATIO, A.QTY,
+            A.REAL_DPT_GROUP, 'ORI' AS DATA_TYPE, A.MT_INFO
+        FROM oracle.PMDW_MGR.DM_PP_AC_TOTALREJDTLWAFSTD_S A
+        WHERE A.WAF_SIZE = #{waf_size} AND A.BASE_DT = #{base_dt} AND A.FAC_ID IN (#{fac_ids})
+          -- 분할 실행(wafering_split)의 OPER_ID 범위 [split_from, split_to), 미지정(NULL)이면 조건 없음
+          AND (#{split_from} IS NULL OR A.OPER_ID >= #{split_from})
+          AND (#{split_to} IS NULL OR A.OPER_ID < #{split_to})
+
+        UNION ALL
+
+        SELECT
+            A.WAF_ID, A.WAF_SEQ, A.BASE_DT, A.WAF_SIZE, A.REJ_DIV_CD, A.REJ_DTL_DIV_CD, A.TRST_DTTM, A.FAC_ID,
+            A.IGOT_ID, A.LOT_ID, A.USER_LOT_ID, A.PROD_ID, A.BEF_PROD_ID, A.WRKR_ID, A.OWNR_CD, A.CRET_CD, A.EQP_ID,
+            A.OPER_ID, A.ORG_OPER_ID, A.LAST_OPER_ID, A.REJ_RSN_CD, A.REJ_RSN_CD2, A.ORG_REJ_RSN_CD, A.REV_REJ_RSN_CD,
+            A.STD_REJ_RSN_CD, A.RJ_GROUP, A.RSN_DIV_CD, A.PROD_DIV_CD, A.REJ_RSN_DIV_CD, A.MT_ID, A.GRD_CD_NM,
+            A.TEST_TYPE, A.CUST_STIE, A.OPER1_GROUP, A.OPER2_GROUP, A.RESPON, A.ALLO_GROUP, A.RATIO, A.QTY,
+            A.REAL_DPT_GROUP, 'MNL' AS DATA_TYPE, NULL AS MT_INFO
+        FROM oracle.PMDW_MGR.DW_BA_CM_TOTALREJMANUAL_S A
+        WHERE A.WAF_SIZE = #{waf_size} AND A.BASE_DT = #{base_dt} AND A.FAC_ID IN (#{fac_ids})
+          -- 분할 실행(wafering_split)의 OPER_ID 범위 [split_from, split_to), 미지정(NULL)이면 조건 없음
+          AND (#{split_from} IS NULL OR A.OPER_ID >= #{split_from})
+          AND (#{split_to} IS NULL OR A.OPER_ID < #{split_to})
+    ),
+    -- BLK_ID / WAF_CUT_LO : (IGOT_ID, WAF_SEQ) 당 1건 (해당 일자 잉곳만 조회)
+    WAF_BLK AS (
+        SELECT IGOT_ID, WAF_SEQ, MIN(BLK_ID) AS BLK_ID
+        FROM oracle.PMDW_MGR.VI_DW_QM_PW_WAF_I_OGG
+        WHERE IGOT_ID IN (SELECT IGOT_ID FROM SCRAP_BASE)
+        GROUP BY IGOT_ID, WAF_SEQ
+    ),
+    WAF_CUT AS (
+        SELECT IGOT_ID, WAF_SEQ, MIN(WAF_CUT_LO) AS WAF_CUT_LO
+        FROM oracle.PMDW_MGR.DW_QM_PW_WAF_I
+        WHERE IGOT_ID IN (SELECT IGOT_ID FROM SCRAP_BASE)
+        GROUP BY IGOT_ID, WAF_SEQ
+    ),
+    -- F_GET_PART_NO
+    PART_NO_SOURCE AS (
+        SELECT
+            a.ms_code AS PROD_ID,
+            CASE
+                WHEN STRPOS(UPPER(a.creq_t1), 'PART') > 0 THEN TRIM(a.creq_v1)
+                WHEN STRPOS(UPPER(a.creq_t2), 'PART') > 0 THEN TRIM(a.creq_v2)
+                WHEN STRPOS(UPPER(a.creq_t3), 'PART') > 0 THEN TRIM(a.creq_v3)
+                ELSE ' '
+            END AS PART_NO
+        FROM iceberg.ibg_lake.pims_prod a
+        WHERE a.spec_type = 'CS'
+    ),
+    -- 설비명 (FAC_ID, EQP_ID 당 1건)
+    EQP_NAME AS (
+        SELECT FAC_ID, EQP_ID, MIN(EQP_NM) AS EQP_NM
+        FROM oracle.PMDW_MGR.DW_BA_CM_STDPEQP_M
+        WHERE FAC_ID IN (#{fac_ids})
+        GROUP BY FAC_ID, EQP_ID
+    ),
+    SCRAP_WAF AS (
+        SELECT
+            A.WAF_ID, A.WAF_SEQ, A.BASE_DT, A.WAF_SIZE, A.REJ_DIV_CD, A.REJ_DTL_DIV_CD, A.TRST_DTTM, A.FAC_ID,
+            A.IGOT_ID, A.LOT_ID, A.USER_LOT_ID, A.PROD_ID, A.BEF_PROD_ID, A.WRKR_ID, A.OWNR_CD, A.CRET_CD, A.EQP_ID,
+            A.OPER_ID, A.ORG_OPER_ID, A.LAST_OPER_ID,
+            A.REJ_RSN_CD,                                   -- 300mm: Alias 미적용 (200mm 만 Alias)
+            A.REJ_RSN_CD2, A.ORG_REJ_RSN_CD, A.REV_REJ_RSN_CD,
+            COALESCE(NULLIF(TRIM(AL.ALIAS_RSN_CD), ''), A.STD_REJ_RSN_CD) AS STD_REJ_RSN_CD,
+            A.RJ_GROUP, A.RSN_DIV_CD, A.PROD_DIV_CD, A.REJ_RSN_DIV_CD, A.MT_ID, A.GRD_CD_NM,
+            A.TEST_TYPE, A.CUST_STIE, A.OPER1_GROUP, A.OPER2_GROUP, A.RESPON, A.ALLO_GROUP, A.RATIO, A.QTY,
+            CASE WHEN A.BASE_DT < '20210101' AND A.OWNR_CD = 'EPIRW' AND #{waf_size} = '300' AND A.PROD_DIV_CD = 'EPI'
+                      AND A.RESPON = 'ALLO' AND A.RATIO < 1 THEN 'EPI기술2팀'
+                 ELSE A.REAL_DPT_GROUP END AS REAL_DPT_GROUP,
+            BLK.BLK_ID,
+            CAST(NULL AS TIMESTAMP) AS DATA_CHG_DTTM,
+            SUBSTR(X.BESOF_BASE_YW_NM, 3) AS WEEK_DAY_NM,
+            -- WAF_ID 가 없는 행은 Oracle 함수 F_GET_WAF_CUT_POS(…, '3300') 값 → Trino 에서 호출 불가, NULL
+            CASE WHEN NULLIF(TRIM(A.WAF_ID), '') IS NULL THEN NULL ELSE CUT.WAF_CUT_LO END AS WAF_CUT_LO,
+            A.DATA_TYPE,
+            E.CD_NM AS GRD_CD_NM_CS,
+            F.CD_NM AS GRD_CD_NM_PS,
+            COALESCE(PN.PART_NO, ' ') AS PART_NO,
+            A.MT_INFO
+        -- SCRAP_BASE LEFT JOIN PART_NO_SOURCE 와 같은 결과: pims_prod 를 RIGHT JOIN 의 probe 쪽에 두어
+        -- SCRAP_BASE(build) 의 PROD_ID 동적 필터로 pims_prod 스캔을 줄임
+        FROM PART_NO_SOURCE PN
+        RIGHT JOIN SCRAP_BASE A
+            ON PN.PROD_ID = A.PROD_ID
+        JOIN oracle.PMDW_MGR.DW_BA_CM_STDPOPER_M Z
+            ON Z.FAC_ID = A.FAC_ID AND Z.OPER_ID = A.OPER_ID
+        JOIN oracle.PMDW_MGR.DW_BA_CM_BASEDATE_M X
+            ON X.BASE_DT = A.BASE_DT
+        LEFT JOIN oracle.PMDW_MGR.DW_BA_MS_PROD_M D
+            ON D.PROD_ID = A.PROD_ID AND D.SPEC_DIV_CD = 'PS'
+        LEFT JOIN oracle.DMS_MGR.TB_FX_CODES E
+            ON E.UP_CD = 'DMS010' AND E.SYS_CD = 'DMS' AND E.CD_VAL = D.GRD_CD_NM
+        LEFT JOIN oracle.DMS_MGR.TB_FX_CODES F
+            ON F.UP_CD = 'DMS010' AND F.SYS_CD = 'DMS' AND F.CD_VAL = D.GRD_CD_NM_PS
+        LEFT JOIN REJ_ALIAS AL
+            ON AL.REJ_RSN_GRP = A.RJ_GROUP AND AL.REJ_RSN_CD = A.STD_REJ_RSN_CD AND AL.RN = 1
+        LEFT JOIN WAF_BLK BLK
+            ON BLK.IGOT_ID = A.IGOT_ID AND BLK.WAF_SEQ = A.WAF_SEQ
+        LEFT JOIN WAF_CUT CUT
+            ON CUT.IGOT_ID = A.IGOT_ID AND CUT.WAF_SEQ = A.WAF_SEQ
+        WHERE
+            Z.WAF_SIZE = #{waf_size}
+            AND Z.OPER_DIV_L = #{oper_div_l}
+            AND Z.FAC_ID IN (#{fac_ids})
+            -- '300' || REJ_DTL_DIV_CD <> '300창고' : Oracle 은 NULL 연결 시 '300' 이므로 NULL 행 유지
+            AND COALESCE(A.REJ_DTL_DIV_CD, '') <> '창고'
+            AND (CASE WHEN 'PN' = 'PN' THEN TRUE ELSE D.GRD_CD_NM = 'PN' END)
+            AND (CASE WHEN 'PN' = 'PN' THEN TRUE ELSE D.GRD_CD_NM_PS = 'PN' END)
+    )
+    -- 최종 출력
+    SELECT
+        A.*,
+        COALESCE(T.TEAMGRP_NM, A.REAL_DPT_GROUP) AS N_DPT_GROUP,
+        EQ.EQP_NM
+    FROM SCRAP_WAF A
+    LEFT JOIN TEAM_GRP T
+        ON T.DPT_CD = A.REAL_DPT_GROUP
+    LEFT JOIN EQP_NAME EQ
+        ON EQ.FAC_ID = A.FAC_ID AND EQ.EQP_ID = A.EQP_ID
+    ORDER BY A.BASE_DT, A.WAF_ID, A.WAF_SEQ
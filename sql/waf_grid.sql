@@ -0,0 +1,137 @@
+WITH step1_base AS (
+    SELECT 
+        A.WAF_ID, A.WAF_SEQ, A.WAF_SIZE, A.BASE_DT, A.DIV_CD, A.REJ_DIV_CD,
+        A.FAC_ID, A.OPER_ID, A.OWNR_CD, A.CRET_CD, A.PROD_ID, A.IGOT_ID,
+        A.BLK_ID, A.SUBLOT_ID, A.USER_LOT_ID, A.EQP_ID, A.BEF_BAD_RSN_CD,
+        A.AFT_BAD_RSN_CD, A.REJ_GROUP, A.OPER1_GROUP, A.OPER2_GROUP,
+        A.RESPON, A.ALLO_GROUP, A.RESPON_RATIO, A.IN_QTY, A.OUT_QTY,
+        A.LOSS_QTY, A.REAL_DPT_GROUP, A.HST_REG_DTTM, 'ORI' AS DATA_TYPE, A.DATA_CHG_DTTM
+    FROM oracle.PMDW_MGR.DM_PP_AC_TOTALFAULTDTLWAFSTD_S A
+    WHERE A.WAF_SIZE = #{waf_size}
+      AND A.BASE_DT = #{base_dt}        -- ✅ 어제 날짜 자동 삽입
+      AND A.FAC_ID IN (#{fac_ids})
+      AND (#{changed_since} IS NULL OR A.DATA_CHG_DTTM >= CAST(#{changed_since} AS TIMESTAMP))
+      -- 분할 실행(wafering_split)의 OPER_ID 범위 [split_from, split_to), 미지정(NULL)이면 조건 없음
+      AND (#{split_from} IS NULL OR A.OPER_ID >= #{split_from})
+      AND (#{split_to} IS NULL OR A.OPER_ID < #{split_to})
+
+    UNION ALL
+
+    SELECT 
+        A.WAF_ID, A.WAF_SEQ, A.WAF_SIZE, A.BASE_DT, A.DIV_CD, A.REJ_DIV_CD,
+        A.FAC_ID, A.OPER_ID, A.OWNR_CD, A.CRET_CD, A.PROD_ID, A.IGOT_ID,
+        A.BLK_ID, A.SUBLOT_ID, A.USER_LOT_ID, A.EQP_ID, A.BEF_BAD_RSN_CD,
+        A.AFT_BAD_RSN_CD, A.REJ_GROUP, A.OPER1_GROUP, A.OPER2_GROUP,
+        A.RESPON, A.ALLO_GROUP, A.RESPON_RATIO, A.IN_QTY, A.OUT_QTY,
+        A.LOSS_QTY, A.REAL_DPT_GROUP, NULL AS HST_REG_DTTM, 'MNL' AS DATA_TYPE, A.DATA_CHG_DTTM
+    FROM oracle.PMDW_MGR.DW_BA_CM_TOTALFAULTMANUAL_S A
+    WHERE A.WAF_SIZE = #{waf_size}
+      AND A.BASE_DT = #{base_dt}        -- ✅ 어제 날짜 자동 삽입
+      AND A.FAC_ID IN (#{fac_ids})
+      AND (#{changed_since} IS NULL OR A.DATA_CHG_DTTM >= CAST(#{changed_since} AS TIMESTAMP))
+      -- 분할 실행(wafering_split)의 OPER_ID 범위 [split_from, split_to), 미지정(NULL)이면 조건 없음
+      AND (#{split_from} IS NULL OR A.OPER_ID >= #{split_from})
+      AND (#{split_to} IS NULL OR A.OPER_ID < #{split_to})
+),
+step2_joined AS (
+    SELECT 
+        b.*,
+        bd.BASE_DT AS BASE_DT_NAME,
+        mp.CUST_SITE_NM,
+        mp.GRD_CD_NM AS GRD_CD_NM_CS,
+        mp.GRD_CD_NM_PS,
+        so.OPER_DIV_L,
+        SUBSTR(bd.BESOF_BASE_YW_NM, 3) AS WEEK_DAY_NM  -- 예: '26-04'
+    FROM step1_base b
+    JOIN oracle.PMDW_MGR.DW_BA_CM_BASEDATE_M bd ON bd.BASE_DT = b.BASE_DT
+    LEFT JOIN oracle.PMDW_MGR.DW_BA_MS_PROD_M mp ON mp.PROD_ID = b.PROD_ID AND mp.SPEC_DIV_CD = 'PS'
+    JOIN oracle.PMDW_MGR.DW_BA_CM_STDPOPER_M so ON so.FAC_ID = b.FAC_ID AND so.OPER_ID = b.OPER_ID
+    WHERE 
+        so.OPER_DIV_L = #{oper_div_l}
+        AND b.FAC_ID IN (#{fac_ids})
+        AND (CASE WHEN 'PN' = 'PN' THEN TRUE ELSE mp.GRD_CD_NM = 'PN' END)
+        AND (CASE WHEN 'PN' = 'PN' THEN TRUE ELSE mp.GRD_CD_NM_PS = 'PN' END)
+),
+step3_rej_alias AS (
+    WITH rej_alias_map AS (
+        SELECT 
+            REJ_RSN_GRP,
+            REJ_RSN_CD,
+            ALIAS_RSN_CD
+        FROM oracle.PMDW_MGR.DW_BA_CM_REJRSNINFO_M
+        WHERE WAF_SIZE = #{waf_size}
+          AND PROD_DIV_CD = CASE WHEN #{oper_div_l} = 'WF' THEN 'PW' ELSE 'EPI' END
+    )
+    SELECT 
+        j.WAF_ID,
+        j.WAF_SEQ,
+        j.WAF_SIZE,
+        j.BASE_DT,
+        j.DIV_CD,
+        j.REJ_DIV_CD,
+        j.FAC_ID,
+        j.OPER_ID,
+        j.OWNR_CD,
+        j.CRET_CD,
+        j.PROD_ID,
+        j.IGOT_ID,
+        j.BLK_ID,
+        j.SUBLOT_ID,
+        j.USER_LOT_ID,
+        j.EQP_ID,
+        j.CUST_SITE_NM,
+        j.REJ_GROUP,
+        j.OPER1_GROUP,
+        j.OPER2_GROUP,
+        j.RESPON,
+        j.ALLO_GROUP,
+        j.RESPON_RATIO,
+        j.IN_QTY,
+        j.OUT_QTY,
+        j.LOSS_QTY,
+        j.REAL_DPT_GROUP,
+        j.HST_REG_DTTM,
+        j.DATA_TYPE,
+        j.DATA_CHG_DTTM,
+        j.BASE_DT_NAME,
+        j.GRD_CD_NM_CS,
+        j.GRD_CD_NM_PS,
+        j.OPER_DIV_L,
+        j.WEEK_DAY_NM,
+        COALESCE(ram1.ALIAS_RSN_CD, j.BEF_BAD_RSN_CD) AS BEF_BAD_RSN_CD,
+        COALESCE(ram2.ALIAS_RSN_CD, j.AFT_BAD_RSN_CD) AS AFT_BAD_RSN_CD
+    FROM step2_joined j
+    LEFT JOIN rej_alias_map ram1 
+        ON ram1.REJ_RSN_GRP = j.REJ_GROUP 
+       AND ram1.REJ_RSN_CD = j.BEF_BAD_RSN_CD
+    LEFT JOIN rej_alias_map ram2 
+        ON ram2.REJ_RSN_GRP = j.REJ_GROUP 
+       AND ram2.REJ_RSN_CD = j.AFT_BAD_RSN_CD
+),
+-- ✅ STEP 5: F_GET_PART_NO 정확 재현 (이미지 데이터 기반)
+step5_part_no AS (
+    WITH part_no_source AS (
+        SELECT 
+            a.ms_code AS PROD_ID,
+            CASE 
+                WHEN STRPOS(UPPER(a.creq_t1), 'PART') > 0 THEN TRIM(a.creq_v1)
+                WHEN STRPOS(UPPER(a.creq_t2), 'PART') > 0 THEN TRIM(a.creq_v2)
+                WHEN STRPOS(UPPER(a.creq_t3), 'PART') > 0 THEN TRIM(a.creq_v3)
+                ELSE ' '
+            END AS PART_NO
+        FROM iceberg.ibg_lake.pims_prod a
+        WHERE a.spec_type = 'CS'
+    )
+    SELECT 
+        j.*,
+        COALESCE(pns.PART_NO, ' ') AS PART_NO
+    -- j LEFT JOIN pns 와 같은 결과: pims_prod 를 RIGHT JOIN 의 probe 쪽에 두어
+    -- j(build) 의 PROD_ID 동적 필터로 pims_prod 스캔을 줄임
+    FROM part_no_source pns
+    RIGHT JOIN step3_rej_alias j
+        ON pns.PROD_ID = j.PROD_ID
+)
+
+SELECT *
+FROM step5_part_no
+    
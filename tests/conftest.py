@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# 루트의 wafering_*.py 모듈을 pytest 실행 위치와 관계없이 import
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
@@ -0,0 +1,121 @@
+import json
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from wafering_derive import compare_frames, derive_loss_rate, derive_params, enrich_loss_facts
+from wafering_masters import MasterStore
+from wafering_offline import FactSnapshotStore, OfflineEngine
+from wafering_part_no import PartNoStore
+from wafering_sql import load_template
+
+# ==============================================================================
+# 고정 입력 (기준일자 1일) + 저장된 loss_rate.sql 결과
+# ==============================================================================
+# tests/fixtures/loss_rate_<BASE_DT>.parquet 은 아래 입력으로 OfflineEngine.run_report('loss_rate') 를 1회 실행한 결과
+BASE_DT = '20261016'
+EXPECTED = Path(__file__).resolve().parent / 'fixtures' / f'loss_rate_{BASE_DT}.parquet'
+
+FACT_COLUMNS = ('FAC_ID', 'OPER_ID', 'PROD_ID', 'REJ_GROUP', 'DIV_CD', 'BEF_BAD_RSN_CD', 'AFT_BAD_RSN_CD',
+                'REAL_DPT_GROUP', 'LOSS_QTY', 'IN_QTY')
+# P1 은 PN 제품 행이 2건 (GRD_CD_NM / GRD_CD_NM_PS 각각) → 분자 2배, P2 1건, P3 PN 아님, P4 제품 마스터 없음
+LOT_ROWS = {
+    BASE_DT: [
+        ('WF7', 'OP01', 'P1', 'RG1', 'LOSS', 'B1', 'A1', 'D1', 5, 100),
+        ('WF7', 'OP01', 'P1', 'RG1', 'LOSS', 'B1', 'A1', 'D2', 3, 100),
+        ('WF7', 'OP02', 'P2', 'RG1', 'LOSS', 'B2', 'A2', 'D1', 7, 50),
+        ('WF8', 'OP01', 'P3', 'RG2', 'RESC_HG_QTY', 'B3', 'A3', 'D1', 4, 0),
+        ('WF8', 'OP02', 'P4', 'RG2', 'LOSS', 'B1', None, 'D1', 2, 0),
+        ('WF7', 'OP01', None, None, 'LOSS', 'B4', 'A4', 'D1', 6, 0),
+        ('WF7', 'OP02', 'P1', 'RG3', 'LOSS', 'B5', 'A5', 'D1', None, 0),
+        ('WF7', 'OP09', 'P1', 'RG1', 'LOSS', 'B1', 'A1', 'D1', 9, 0),
+        ('XX1', 'OP01', 'P1', 'RG1', 'LOSS', 'B1', 'A1', 'D1', 11, 0),
+        ('WF7', 'OP01', 'P1', 'TOTAL', 'COM_QTY', None, None, 'D1', 0, 1000),
+        ('WF8', 'OP02', 'P2', 'TOTAL', 'COM_QTY', None, 'C1', 'D2', 0, 500),
+    ],
+    '20261015': [
+        ('WF7', 'OP01', 'P1', 'RG1', 'LOSS', 'B1', 'A1', 'D1', 40, 0),
+        ('WF7', 'OP01', 'P1', 'TOTAL', 'COM_QTY', None, None, 'D1', 0, 900),
+    ],
+}
+MANUAL_ROWS = {
+    BASE_DT: [
+        ('WF7', 'OP01', 'P2', 'RG2', 'LOSS', 'B3', 'A3', 'D1', 1, 0),
+        ('WF7', 'OP01', 'P1', 'RG1', 'LOSS', 'B1', 'A1', 'D1', 2, 0),
+        ('WF7', 'OP01', 'P1', 'TOTAL', 'COM_QTY', None, None, 'D1', 0, 250),
+    ],
+}
+MASTERS = {
+    'stdpoper': {'fac_id': ['WF7', 'WF7', 'WF8', 'WF8', 'WF7', 'XX1'],
+                 'oper_id': ['OP01', 'OP02', 'OP01', 'OP02', 'OP09', 'OP01'],
+                 'oper_div_l': ['WF', 'WF', 'WF', 'WF', 'EPI', 'WF'], 'waf_size': ['300'] * 6},
+    'prod': {'prod_id': ['P1', 'P1', 'P2', 'P3'], 'spec_div_cd': ['PS'] * 4, 'cust_site_nm': ['C1'] * 4,
+             'grd_cd_nm': ['PN', 'G2', 'PN', 'G1'], 'grd_cd_nm_ps': ['G1', 'PN', 'PN', 'G2'],
+             'tst_forml_flag': ['N'] * 4},
+    'lossrejgrp': {'teamgrp_cd': ['T1'], 'waf_size': ['300'], 'oper_div_l': ['WF'], 'teamgrp_nm': ['팀1'],
+                   'sort_seq': [1]},
+    'lossrejgrpdtl': {'teamgrp_cd': ['T1'], 'waf_size': ['300'], 'oper_div_l': ['WF'], 'target_div_cd': ['L'],
+                      'dpt_cd': ['D1'], 'st_dt': ['20260101'], 'ed_dt': ['99991231']},
+    'yldplan': {'base_ym': ['202610'] * 3, 'waf_size': ['300'] * 3, 'yld_div1_cd': ['WF'] * 3,
+                'yld_div3_cd': ['RG1', 'RG1', 'RG2'], 'goal_div_cd': ['BAD-RATE'] * 3, 'yld_plan_type': ['BP'] * 3,
+                'ref_div2': ['PN'] * 3,
+                'goal_val': pa.array([0.01, 0.01, 0.02]).cast(pa.decimal128(24, 16))},
+}
+
+
+def _fact_table(rows, base_dt):
+    columns = dict(zip(FACT_COLUMNS, zip(*rows)))
+    data = {name: pa.array(columns[name], pa.string()) for name in FACT_COLUMNS[:-2]}
+    data.update({name: pa.array(columns[name], pa.int64()) for name in FACT_COLUMNS[-2:]})
+    return pa.table({'WAF_SIZE': ['300'] * len(rows), 'BASE_DT': [base_dt] * len(rows), **data,
+                     'EQP_ID': ['E1'] * len(rows)})
+
+
+def write_inputs(root):
+    """root 아래 masters / facts / part_no 스냅샷을 만들고 OfflineEngine 반환"""
+    root = Path(root)
+    for name, columns in MASTERS.items():
+        (root / 'masters' / name).mkdir(parents=True)
+        pq.write_table(pa.table(columns), root / 'masters' / name / 'v00001.parquet')
+        (root / 'masters' / name / 'manifest.json').write_text(json.dumps({'version': 1}))
+    for table, days in (('DM_PP_AC_TOTALFAULTDTLSTD_S', LOT_ROWS), ('DW_BA_CM_TOTALFAULTMANUAL_S', MANUAL_ROWS)):
+        for base_dt, rows in days.items():
+            part = root / 'facts' / table / f'BASE_DT={base_dt}'
+            part.mkdir(parents=True)
+            pq.write_table(_fact_table(rows, base_dt), part / 'data.parquet')
+            (part / 'manifest.json').write_text('{}')
+    return OfflineEngine(MasterStore(root / 'masters'), FactSnapshotStore(root / 'facts'),
+                         part_nos=PartNoStore(root / 'part_no'))
+
+
+def query_frame(engine, template_name, params):
+    """wafering_derive._query_frame 과 같은 후처리 (소문자 컬럼, category → 일반 컬럼)"""
+    df = engine.run_sql(load_template(template_name), params)
+    return df.rename(columns=str.lower).astype({c: object for c, t in df.dtypes.items()
+                                                if isinstance(t, pd.CategoricalDtype)})
+
+# ==============================================================================
+# 테스트
+# ==============================================================================
+def test_stored_result_is_current_sql(tmp_path):
+    """저장된 기대값이 지금의 loss_rate.sql 결과와 같은지 (템플릿이 바뀌면 기대값을 다시 만들어야 함)"""
+    engine = write_inputs(tmp_path)
+    assert compare_frames(pd.read_parquet(EXPECTED), engine.run_report('loss_rate', BASE_DT)) == {}
+
+
+def test_derive_from_lot_facts_with_masters(tmp_path):
+    engine = write_inputs(tmp_path)
+    params = derive_params(BASE_DT)
+    data = {'loss': enrich_loss_facts(query_frame(engine, 'derive_loss_fact', params), engine.masters, params),
+            'daily_goal': query_frame(engine, 'derive_daily_goal', params)}
+    assert compare_frames(pd.read_parquet(EXPECTED), derive_loss_rate(data, BASE_DT)) == {}
+
+
+def test_derive_from_lot_base_query(tmp_path):
+    engine = write_inputs(tmp_path)
+    params = derive_params(BASE_DT)
+    data = {'loss': query_frame(engine, 'derive_loss_base', params),
+            'daily_goal': query_frame(engine, 'derive_daily_goal', params)}
+    assert compare_frames(pd.read_parquet(EXPECTED), derive_loss_rate(data, BASE_DT)) == {}
@@ -0,0 +1,59 @@
+from decimal import Decimal
+
+import pandas as pd
+import pytest
+
+from wafering_bench import SyntheticDataset, _fetch_all_rows, legacy_convert_dtypes
+from wafering_derive import compare_frames
+from wafering_fetch import ColumnarResultBuilder, fetch_frame, iter_pages, shutdown_decode_pool
+
+# ==============================================================================
+# ColumnarResultBuilder / fetch_frame = 기존 스크립트 방식 (fetchall → DataFrame → dtype 변환)
+# ==============================================================================
+ROWS = 3000
+PAGE_ROWS = 700     # 마지막 페이지가 덜 찬 상태로 batch_size 와 어긋나게
+BATCH_SIZE = 1000
+
+
+@pytest.fixture(scope='module', autouse=True)
+def decode_pool():
+    yield
+    shutdown_decode_pool()
+
+
+@pytest.fixture(scope='module', params=['waf', 'lot'])
+def dataset(request):
+    return SyntheticDataset(request.param, ROWS, seed=7, page_rows=PAGE_ROWS)
+
+
+def legacy_frame(dataset, decimal_mode):
+    """변환 cursor(conn.cursor()) 의 fetchall 결과, float64 방식이면 DECIMAL 컬럼을 float 로"""
+    cur = dataset.cursor('rows', raw=False)
+    df = legacy_convert_dtypes(pd.DataFrame(_fetch_all_rows(cur, BATCH_SIZE), columns=[d[0] for d in cur.description]))
+    if decimal_mode == 'float64':
+        for name, type_code, *_ in cur.description:
+            if type_code.startswith('decimal') and df[name].dtype == object:
+                df[name] = df[name].map(lambda v: None if v is None else float(v)).astype('float64')
+    return df
+
+
+@pytest.mark.parametrize('decimal_mode', ['object', 'float64'])
+@pytest.mark.parametrize('decode_processes', [0, 2])
+@pytest.mark.parametrize('encoding', ['rows', 'json', 'json+zstd'])
+def test_fetch_frame_matches_fetchall(dataset, encoding, decode_processes, decimal_mode):
+    expected = legacy_frame(dataset, decimal_mode)
+    df = fetch_frame(dataset.cursor(encoding, raw=True, decode_processes=decode_processes),
+                     batch_size=BATCH_SIZE, decimal_modes=decimal_mode)
+    assert compare_frames(expected, df) == {}
+    if decimal_mode == 'float64':
+        assert df['respon_ratio'].dtype == 'float64'
+
+
+def test_builder_keeps_decimal_objects(dataset):
+    cur = dataset.cursor('json', raw=True, decode_processes=0)
+    builder = ColumnarResultBuilder(cur.description)
+    for rows, converters in iter_pages(cur, BATCH_SIZE):
+        builder.append_page(rows, converters)
+    df = builder.to_frame()
+    assert builder.row_count == len(df) == ROWS
+    assert all(v is None or isinstance(v, Decimal) for v in df['respon_ratio'])
@@ -0,0 +1,61 @@
+import pyarrow as pa
+
+from wafering_incremental import merge_snapshot
+
+# ==============================================================================
+# merge_snapshot (병합 키: WAF_ID, WAF_SEQ, DIV_CD, OPER_ID, DATA_TYPE)
+# ==============================================================================
+SCHEMA = pa.schema([('waf_id', pa.string()), ('waf_seq', pa.int64()), ('div_cd', pa.string()),
+                    ('oper_id', pa.string()), ('data_type', pa.string()), ('loss_qty', pa.int64())])
+
+
+def _table(rows, schema=SCHEMA):
+    return pa.table({name: [r[i] for r in rows] for i, name in enumerate(schema.names)}, schema=schema)
+
+
+def _keys(rows):
+    return pa.table({name: [r[i] for r in rows] for i, name in enumerate(['WAF_ID', 'WAF_SEQ', 'DIV_CD', 'OPER_ID',
+                                                                          'DATA_TYPE'])})
+
+
+SNAPSHOT = [
+    ('W1', 1, 'LOSS', 'OP1', '원본', 1),
+    ('W1', 2, 'LOSS', 'OP1', '원본', 2),
+    ('W2', 1, 'LOSS', 'OP2', '보정', 3),
+    ('W3', 1, None, 'OP2', '원본', 4),
+]
+
+
+def _rows(table):
+    return sorted(tuple(r.values()) for r in table.to_pylist())
+
+
+def test_delta_replaces_matching_keys():
+    # delta 는 Trino 결과 타입(컬럼 순서, int32, dictionary)이어도 스냅샷 스키마로 맞춰짐
+    delta = pa.table({'data_type': pa.array(['원본', '원본']).dictionary_encode(),
+                      'loss_qty': pa.array([20, 5], pa.int32()), 'oper_id': ['OP1', 'OP3'],
+                      'div_cd': ['LOSS', 'LOSS'], 'waf_seq': pa.array([2, 1], pa.int32()), 'waf_id': ['W1', 'W4']})
+    merged = merge_snapshot(_table(SNAPSHOT), delta)
+    assert merged.schema == SCHEMA
+    assert _rows(merged) == sorted([SNAPSHOT[0], ('W1', 2, 'LOSS', 'OP1', '원본', 20), SNAPSHOT[2], SNAPSHOT[3],
+                                    ('W4', 1, 'LOSS', 'OP3', '원본', 5)])
+
+
+def test_duplicate_keys_need_full_pull():
+    delta = _table([('W1', 1, 'LOSS', 'OP1', '원본', 7), ('W1', 1, 'LOSS', 'OP1', '원본', 8)])
+    assert merge_snapshot(_table(SNAPSHOT), delta) is None
+
+
+def test_keys_drop_deleted_and_rekeyed_rows():
+    # W2 삭제, W1/2 는 OP1 → OP9 로 키 변경 (새 키 행만 delta 로 들어옴)
+    delta = _table([('W1', 2, 'LOSS', 'OP9', '원본', 2)])
+    keys = _keys([('W1', 1, 'LOSS', 'OP1', '원본'), ('W1', 2, 'LOSS', 'OP9', '원본'), ('W3', 1, None, 'OP2', '원본')])
+    merged = merge_snapshot(_table(SNAPSHOT), delta, keys)
+    assert _rows(merged) == sorted([SNAPSHOT[0], ('W1', 2, 'LOSS', 'OP9', '원본', 2), SNAPSHOT[3]])
+
+
+def test_keys_missing_from_merge_need_full_pull():
+    # 워터마크 이전 DATA_CHG_DTTM 으로 늦게 커밋된 행: 키 목록에는 있지만 delta 에는 없음
+    keys = _keys([*(r[:5] for r in SNAPSHOT), ('W5', 1, 'LOSS', 'OP1', '원본')])
+    assert merge_snapshot(_table(SNAPSHOT), _table([]), keys) is None
+    assert merge_snapshot(_table(SNAPSHOT), _table([]), _keys([SNAPSHOT[0][:5]] * 2)) is None
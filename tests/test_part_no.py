@@ -0,0 +1,30 @@
+import pandas as pd
+
+from wafering_part_no import resolve_part_no
+
+# ==============================================================================
+# F_GET_PART_NO: CREQ_Tn 에 'PART' 가 들어간 첫 항목의 값
+# ==============================================================================
+ROWS = [
+    # (t1, t2, t3, v1, v2, v3)
+    ('PART NO', 'PART', 'X', ' A:PN1 ', 'B:2', 'C:3'),         # 첫 항목 우선
+    ('X', 'part no', None, 'A:1', ' B: PN2', 'C:3'),           # 대소문자 무시
+    (None, 'Y', 'PART', 'A:1', 'B:2', 'NOCOLON '),             # t1 NULL 은 건너뜀
+    ('X', 'Y', 'Z', 'A:1', 'B:2', 'C:3'),                      # 없으면 ' '
+    ('PART', 'PART', 'PART', None, 'B:2', 'C:3'),              # 선택된 값이 NULL 이면 NULL
+    ('PART', None, None, 'K:' + 'x' * 120, None, None),        # ':' 뒤 100자
+]
+
+
+def _resolve(after_colon):
+    df = pd.DataFrame(ROWS, columns=['t1', 't2', 't3', 'v1', 'v2', 'v3'])
+    result = resolve_part_no(*(df[c] for c in df.columns), after_colon=after_colon)
+    return [None if pd.isna(v) else v for v in result]
+
+
+def test_waf_rule_trims_value():
+    assert _resolve(False) == ['A:PN1', 'B: PN2', 'NOCOLON', ' ', None, 'K:' + 'x' * 120]
+
+
+def test_lot_rule_takes_text_after_colon():
+    assert _resolve(True) == ['PN1', 'PN2', 'NOCOLON', ' ', None, 'x' * 100]
@@ -0,0 +1,70 @@
+from decimal import Decimal
+
+import pandas as pd
+
+from wafering_rollup import PartialStore, rollup_period
+
+# ==============================================================================
+# 일별 결과 → 일자 합산값 → 주 / 월 누계
+# ==============================================================================
+def _daily(rows):
+    """(rej_group, aft_bad_rsn_cd, loss_qty, mgr_qty) → 일별 Loss Rate 형식 (같은 그룹이 BEF 코드별로 여러 행)"""
+    return pd.DataFrame({
+        'category': 'D',
+        'rej_group': [r[0] for r in rows],
+        'aft_bad_rsn_cd': [r[1] for r in rows],
+        'loss_qty': pd.array([r[2] for r in rows], dtype='Int64'),
+        'mgr_qty': pd.array([r[3] for r in rows], dtype='Int64'),
+    })
+
+
+DAYS = {
+    '20261012': _daily([('RG1', 'A1', 6, 100), ('RG1', 'A1', 4, 100), ('RG2', 'A2', 5, 100)]),
+    '20261013': _daily([('RG1', 'A1', 20, 300), (None, 'A4', 3, None)]),
+    # COM_QTY 행이 없는 일자 (분모 NULL), RG3 은 이 일자에만 있지만 기간 분모를 받음
+    '20261014': _daily([('RG3', 'A3', 1, None)]),
+    # 불량 행이 REJ_GROUP NULL 뿐: 일별 결과로는 분모를 알 수 없음
+    '20261015': _daily([(None, 'A4', 2, None)]),
+}
+
+
+def _store(tmp_path):
+    store = PartialStore(tmp_path)
+    for base_dt, daily in DAYS.items():
+        store.put(base_dt, daily)
+    return store
+
+
+def test_partials_keep_known_com_qty_only(tmp_path):
+    store = _store(tmp_path)
+    loss, mgr = store.load([*DAYS, '20261016'])
+    assert mgr == {'20261012': 100, '20261013': 300, '20261014': None}
+    assert not store.has_com_qty('20261015')
+    assert sorted(loss['base_dt'].unique()) == sorted(DAYS)
+
+
+def test_rollup_period_applies_period_denominator_to_listed_groups(tmp_path):
+    loss, mgr = _store(tmp_path).load(list(DAYS))
+    loss = loss[loss['base_dt'].isin(mgr)]      # rollup_day 와 같이 분모 미확인 일자 제외
+    result = rollup_period(loss, mgr, 'W', '26-42', {'RG1': Decimal('0.05')})
+
+    rows = {(r.rej_group, r.aft_bad_rsn_cd): r for r in result.itertuples()}
+    assert list(result['category_name'].unique()) == ['주']
+    assert result['rej_group'].iloc[:3].tolist() == ['RG1', 'RG2', 'RG3'] and result['rej_group'].iloc[3:].isna().all()
+    assert rows['RG1', 'A1'].loss_qty == 30 and rows['RG1', 'A1'].mgr_qty == 400
+    assert rows['RG1', 'A1'].loss_ratio == Decimal('0.0750000000000000')
+    assert rows['RG1', 'A1'].gap_ratio == Decimal('0.0250000000000000')
+    assert rows['RG2', 'A2'].loss_ratio == Decimal('0.0125000000000000')
+    assert rows['RG3', 'A3'].mgr_qty == 400 and rows['RG3', 'A3'].goal_ratio == Decimal('0E-16')
+
+    # REJ_GROUP NULL 은 분모와 조인되지 않음 (20261015 의 A4 는 제외되어 3 만 남음)
+    null_row = result[result['rej_group'].isna()].iloc[0]
+    assert null_row['loss_qty'] == 3 and pd.isna(null_row['mgr_qty'])
+    assert null_row['loss_ratio'] == Decimal('0E-16')
+
+
+def test_rollup_period_without_com_qty(tmp_path):
+    loss, mgr = _store(tmp_path).load(['20261014'])
+    result = rollup_period(loss, mgr, 'M', '26-10', {})
+    assert result['mgr_qty'].isna().all()
+    assert result['loss_ratio'].tolist() == [Decimal('0E-16')]
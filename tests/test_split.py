@@ -0,0 +1,84 @@
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from wafering_sql import load_template
+from wafering_split import final_order_by, merge_parquet_parts
+
+# ==============================================================================
+# final_order_by
+# ==============================================================================
+def test_final_order_by_templates():
+    assert final_order_by(load_template('scrap_waf_grid')) == [
+        ('BASE_DT', 'ascending'), ('WAF_ID', 'ascending'), ('WAF_SEQ', 'ascending')]
+    assert final_order_by(load_template('loss_rate')) == [
+        ('BASE_DT_NM', 'ascending'), ('REJ_GROUP', 'ascending'), ('LOSS_QTY', 'descending')]
+
+
+def test_final_order_by_ignores_inner_and_commented_order():
+    sql = """SELECT A, ROW_NUMBER() OVER (PARTITION BY B ORDER BY C DESC) AS RN
+             FROM T -- ORDER BY A"""
+    assert final_order_by(sql) == []
+    assert final_order_by("SELECT * FROM (SELECT A FROM T ORDER BY A) X ORDER BY x.a desc;") == [('a', 'descending')]
+
+
+def test_final_order_by_rejects_expressions():
+    with pytest.raises(ValueError):
+        final_order_by("SELECT A FROM T ORDER BY A NULLS FIRST")
+
+# ==============================================================================
+# merge_parquet_parts
+# ==============================================================================
+SCHEMA = pa.schema([('k', pa.string()), ('q', pa.int64()), ('src', pa.string())])
+
+
+def _write_parts(tmp_path, parts):
+    paths = []
+    for i, rows in enumerate(parts):
+        path = tmp_path / f'part{i}.parquet'
+        table = pa.table({'k': [r[0] for r in rows], 'q': [r[1] for r in rows],
+                          'src': [f'{i}-{j}' for j in range(len(rows))]}, schema=SCHEMA)
+        pq.write_table(table, path, row_group_size=2)
+        paths.append(path)
+    return paths
+
+
+# 하위 쿼리별로 (k ASC, q DESC) 정렬된 결과, NULL 은 맨 뒤 (Trino / Arrow 기본)
+PARTS = [
+    [('a', 5), ('a', 1), ('c', 9), ('d', None), (None, 3)],
+    [('a', 5), ('b', 2), ('c', 9), ('c', 1), ('e', 4), ('e', 0), (None, None)],
+    [],
+    [('b', 7)],
+]
+
+
+def test_merge_sorted_parts(tmp_path):
+    paths = _write_parts(tmp_path, PARTS)
+    out = tmp_path / 'out.parquet'
+    merge_parquet_parts(paths, out, order_by=[('K', 'ascending'), ('Q', 'descending')])
+
+    # 분할 순서로 이어 붙인 뒤 안정 정렬한 결과와 같아야 함 (같은 키는 분할 순서)
+    expected = pa.concat_tables([pq.read_table(p) for p in paths]) \
+                 .sort_by([('k', 'ascending'), ('q', 'descending')])
+    assert pq.read_table(out).to_pylist() == expected.to_pylist()
+
+
+def test_merge_without_order_keeps_shard_order(tmp_path):
+    paths = _write_parts(tmp_path, PARTS)
+    out = tmp_path / 'out.parquet'
+    merge_parquet_parts(paths, out)
+    assert pq.read_table(out).to_pylist() == pa.concat_tables([pq.read_table(p) for p in paths]).to_pylist()
+
+
+def test_merge_failed_check_keeps_previous_file(tmp_path):
+    paths = _write_parts(tmp_path, PARTS)
+    out = tmp_path / 'out.parquet'
+    out.write_bytes(b'previous')
+
+    def check():
+        raise RuntimeError('budget')
+
+    with pytest.raises(RuntimeError):
+        merge_parquet_parts(paths, out, check=check)
+    assert out.read_bytes() == b'previous'
+    assert sorted(p.name for p in tmp_path.iterdir()) == sorted([out.name, *(p.name for p in paths)])
@@ -0,0 +1,359 @@
+import argparse
+import asyncio
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from wafering_cache import MAX_CACHE_GB, ResultCache
+from wafering_common import (DEFAULT_DECODE_PROCESSES, DEFAULT_RESULT_ENCODING, RESULT_ENCODINGS,
+                              create_trino_connection, open_cursor)
+from wafering_dataset import DATASET_DIR
+from wafering_fetch import DEFAULT_BATCH_SIZE, fetch_frame
+from wafering_metrics import record_query
+from wafering_preflight import EXPLAIN_TTL_SEC, ExplainCache, PreflightResult, policy_for
+from wafering_runner import (DEFAULT_WORKERS, OUTPUT_DIR, REPORTS, build_report_query, date_range,
+                             is_partition_done, preflight_report, report_sql, run_report, write_summary)
+from wafering_split import SPLIT_KEYS, SplitSpec
+from wafering_sql import DEFAULT_EXECUTE_MODE, EXECUTE_MODES
+from wafering_watchdog import budget_for
+
+# ==============================================================================
+# 제한 시간 / 취소 설정
+# ==============================================================================
+DEFAULT_QUERY_TIMEOUT_SEC = 3600        # 리포트 1건 (probe + 실행 + 수신) 제한 시간
+DEFAULT_PREFLIGHT_TIMEOUT_SEC = 120     # EXPLAIN 1건 제한 시간
+CANCEL_WAIT_SEC = 10                    # 서버 취소 요청 후 작업 스레드 정리 대기 (제출 응답 대기 포함)
+
+# ==============================================================================
+# 서버 쿼리 취소 (작업 스레드가 만든 cursor 추적)
+# ==============================================================================
+class QueryCancelled(Exception):
+    """제한 시간 초과 / 중단으로 서버 쿼리를 취소함 (reason: timeout / interrupted)"""
+
+    def __init__(self, name, reason, query_ids=()):
+        self.name = name
+        self.reason = reason
+        self.query_ids = list(query_ids)
+        label = '제한 시간 초과' if reason == 'timeout' else '중단'
+        super().__init__(f"[{name}] {label}로 서버 쿼리 취소 ({', '.join(self.query_ids) or 'query id 없음'})")
+
+
+class _ScopedConnection:
+    """cursor 생성 시 QueryScope 에 등록하는 연결 래퍼 (나머지 속성은 원래 연결 그대로)"""
+
+    def __init__(self, conn, scope):
+        self._conn = conn
+        self._scope = scope
+
+    def cursor(self, *args, **kwargs):
+        return self._scope.track(self._conn.cursor(*args, **kwargs))
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+
+class QueryScope:
+    """작업 1건(스레드)이 연 cursor 를 모아 두고, 이벤트 루프 쪽에서 한 번에 서버 취소
+
+    취소 뒤에는 추적 중인 cursor 로 새 쿼리를 제출하지 않고 (execute 에서 QueryCancelled),
+    제출 응답을 기다리는 중인 쿼리는 query id 가 생기는 대로 취소한다. 작업이 끝나면 check() 가
+    QueryCancelled 를 던져 취소로 중간에 끊긴 결과가 정상 결과로 쓰이지 않게 한다.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.reason = None
+        self._cursors = []
+        self._pending = {}      # 제출 중인 cursor → 제출 전 query (새 query 인지 구분용)
+        self._lock = threading.Lock()
+
+    def connection(self, conn):
+        return _ScopedConnection(conn, self)
+
+    def track(self, cur):
+        execute = cur.execute
+
+        def guarded_execute(*args, **kwargs):
+            with self._lock:
+                if self.reason is not None:
+                    raise QueryCancelled(self.name, self.reason)
+                self._pending[id(cur)] = cur._query
+            try:
+                return execute(*args, **kwargs)
+            finally:
+                with self._lock:
+                    self._pending.pop(id(cur), None)
+
+        cur.execute = guarded_execute
+        with self._lock:
+            self._cursors.append(cur)
+        return cur
+
+    def _cancel_cursor(self, cur, deadline):
+        """cursor 의 서버 쿼리 취소 (DELETE nextUri), 제출 응답 전이면 query id 가 생길 때까지 대기"""
+        while True:
+            with self._lock:
+                pending = id(cur) in self._pending
+                before = self._pending.get(id(cur))
+            query = cur._query
+            if query is not None and query.query_id is not None and (not pending or query is not before):
+                if not query.finished:
+                    try:
+                        query.cancel()
+                    except Exception as e:
+                        print(f"[{self.name}] 서버 쿼리 취소 실패 ({query.query_id}): {e}")
+                return query.query_id
+            if not pending or time.monotonic() >= deadline:
+                return None
+            time.sleep(0.1)
+
+    def cancel(self, reason):
+        """추적 중인 cursor 의 서버 쿼리를 모두 취소하고 query id 목록 반환"""
+        with self._lock:
+            self.reason = reason
+            cursors = list(self._cursors)
+        deadline = time.monotonic() + CANCEL_WAIT_SEC
+        return [qid for qid in (self._cancel_cursor(cur, deadline) for cur in cursors) if qid]
+
+    def check(self):
+        if self.reason is not None:
+            raise QueryCancelled(self.name, self.reason,
+                                 [c.query_id for c in self._cursors if getattr(c, 'query_id', None)])
+
+# ==============================================================================
+# 비동기 실행 기본 단위
+# ==============================================================================
+def _run_scoped(work, scope):
+    result = work(scope)
+    scope.check()
+    return result
+
+
+async def run_blocking(work, name, timeout=DEFAULT_QUERY_TIMEOUT_SEC, executor=None):
+    """work(scope) 를 스레드에서 실행하고 결과를 기다림
+
+    timeout(초) 을 넘기거나 태스크가 취소되면 (Ctrl-C 포함) scope 의 서버 쿼리를 취소하고
+    작업 스레드가 정리될 때까지 CANCEL_WAIT_SEC 만큼 기다린 뒤 QueryCancelled(시간 초과) 또는
+    CancelledError(중단) 를 던진다.
+    """
+    loop = asyncio.get_running_loop()
+    scope = QueryScope(name)
+    future = loop.run_in_executor(executor, _run_scoped, work, scope)
+    try:
+        return await asyncio.wait_for(asyncio.shield(future), timeout)
+    except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+        reason = 'timeout' if isinstance(e, asyncio.TimeoutError) else 'interrupted'
+        query_ids = await loop.run_in_executor(executor, scope.cancel, reason)
+        print(f"[{name}] {'제한 시간 초과' if reason == 'timeout' else '중단'} → 서버 쿼리 취소: "
+              f"{', '.join(query_ids) or '제출 전'}")
+        try:
+            await asyncio.wait_for(future, CANCEL_WAIT_SEC)
+        except BaseException:
+            pass
+        if reason == 'timeout':
+            raise QueryCancelled(name, reason, query_ids) from None
+        raise
+
+
+async def query_frame_async(query, name='query', timeout=DEFAULT_QUERY_TIMEOUT_SEC, batch_size=DEFAULT_BATCH_SIZE,
+                            encoding=DEFAULT_RESULT_ENCODING, decode_processes=DEFAULT_DECODE_PROCESSES,
+                            decimal_modes=None, executor=None):
+    """SQL 1건 실행 → DataFrame (제한 시간 초과 시 서버 쿼리 취소 후 QueryCancelled)"""
+    def work(scope):
+        conn = scope.connection(create_trino_connection(encoding, decode_processes))
+        try:
+            cur = open_cursor(conn)
+            try:
+                cur.execute(query)
+                return fetch_frame(cur, batch_size=batch_size, decimal_modes=decimal_modes)
+            finally:
+                cur.close()
+        finally:
+            conn.close()
+    return await run_blocking(work, name, timeout, executor)
+
+
+async def preflight_async(name, base_dt, explain_cache=None, timeout=DEFAULT_PREFLIGHT_TIMEOUT_SEC, executor=None):
+    """리포트 용량 점검 (EXPLAIN) - 제한 시간 초과는 EXPLAIN 실패와 같이 정책의 allow_on_failure 로 판단"""
+    query = build_report_query(name, base_dt)
+
+    def work(scope):
+        conn = scope.connection(create_trino_connection())
+        try:
+            return preflight_report(conn, name, query, base_dt, explain_cache)
+        finally:
+            conn.close()
+
+    try:
+        return await run_blocking(work, f"{name} EXPLAIN", timeout, executor)
+    except QueryCancelled:
+        policy = policy_for(name)
+        result = PreflightResult(name=name, decision='explain_failed', allowed=policy.allow_on_failure,
+                                 message=f"EXPLAIN 제한 시간 {timeout}초 초과")
+        print(f"[{name}] 용량 점검: {result.decision} - {result.message}")
+        return result
+
+
+async def run_report_async(name, base_dt, timeout=DEFAULT_QUERY_TIMEOUT_SEC, output_dir=OUTPUT_DIR,
+                           batch_size=DEFAULT_BATCH_SIZE, cache=None, execute_mode=DEFAULT_EXECUTE_MODE,
+                           encoding=DEFAULT_RESULT_ENCODING, decode_processes=DEFAULT_DECODE_PROCESSES,
+                           executor=None, budget=None, dataset_dir=None, split=None):
+    """wafering_runner.run_report 를 제한 시간 안에서 실행 (초과 시 status 'timeout', 서버 쿼리 취소)
+
+    budget(wafering_watchdog.budget_for)이 주어지면 제한 시간과 별도로 실행 중 서버 통계 한도도 감시한다.
+    split 으로 나눈 하위 쿼리도 같은 범위에서 추적되므로 제한 시간을 넘기면 모두 취소된다.
+    """
+    started = time.perf_counter()
+
+    def work(scope):
+        return run_report(name, build_report_query(name, base_dt), base_dt, output_dir, batch_size, cache,
+                          execute_mode, encoding, decode_processes,
+                          connect=lambda: scope.connection(create_trino_connection(encoding, decode_processes)),
+                          budget=budget, dataset_dir=dataset_dir, split=split)
+
+    try:
+        return await run_blocking(work, f"{name} {base_dt}", timeout, executor)
+    except QueryCancelled as e:
+        return {'report': name, 'base_dt': base_dt, 'status': 'timeout', 'rows': 0, 'attempt': 1,
+                'connect_sec': None, 'execute_sec': None, 'fetch_sec': None,
+                'total_sec': round(time.perf_counter() - started, 3), 'output': None, 'error': str(e),
+                'query_ids': e.query_ids}
+
+# ==============================================================================
+# 용량 점검 + 여러 리포트를 한 이벤트 루프에서 실행
+# ==============================================================================
+async def run_reports_async(names, base_dates, max_workers=DEFAULT_WORKERS, timeout=DEFAULT_QUERY_TIMEOUT_SEC,
+                            preflight_timeout=DEFAULT_PREFLIGHT_TIMEOUT_SEC, output_dir=OUTPUT_DIR,
+                            batch_size=DEFAULT_BATCH_SIZE, preflight=True, force=False, cache=None,
+                            explain_cache=None, execute_mode=DEFAULT_EXECUTE_MODE, encoding=DEFAULT_RESULT_ENCODING,
+                            decode_processes=DEFAULT_DECODE_PROCESSES, budget=True, budget_multiple=None,
+                            dataset_dir=None, split=None):
+    """(리포트, 일자) 작업을 max_workers 개까지 동시 실행하고 결과 목록 반환
+
+    리포트별 첫 일자 EXPLAIN 은 모두 동시에 시작하고, 각 리포트는 자기 점검이 끝나는 대로 실행된다.
+    제한 시간을 넘긴 작업은 서버 쿼리를 취소하고 'timeout' 으로 기록하며 재시도하지 않는다
+    (꼬리 지연을 timeout 으로 묶기 위해). budget=True 면 wafering_runner.run_reports 와 같은 실행 한도를 적용한다.
+    """
+    if isinstance(base_dates, str):
+        base_dates = [base_dates]
+    results = []
+    tasks = []
+    for base_dt in base_dates:
+        for name in names:
+            if not force and is_partition_done(output_dir, name, base_dt):
+                results.append({'report': name, 'base_dt': base_dt, 'status': 'skipped'})
+            else:
+                tasks.append((name, base_dt))
+
+    # 동시 리포트 + EXPLAIN + 취소 요청이 기본 스레드 풀 크기에 막히지 않도록 전용 풀 사용
+    executor = ThreadPoolExecutor(max_workers=max_workers * 2 + len(names), thread_name_prefix='async-query')
+    slots = asyncio.Semaphore(max_workers)
+    checks = {}
+    if preflight:
+        for name, base_dt in tasks:
+            if name not in checks:
+                checks[name] = asyncio.ensure_future(
+                    preflight_async(name, base_dt, explain_cache, preflight_timeout, executor))
+
+    async def one(name, base_dt):
+        check = await checks[name] if name in checks else None
+        if check is not None and not check.allowed:
+            return {'report': name, 'base_dt': base_dt, 'status': 'cancelled', 'preflight': check.to_dict()}
+        limits = budget_for(name, check, budget_multiple) if budget else None
+        async with slots:
+            r = await run_report_async(name, base_dt, timeout, output_dir, batch_size, cache, execute_mode,
+                                       encoding, decode_processes, executor, budget=limits, dataset_dir=dataset_dir,
+                                       split=split)
+        if r.get('stats') or r['status'] == 'timeout':
+            stats = r.get('stats') or {'query_id': (r.get('query_ids') or [None])[-1], 'state': 'CANCELED'}
+            record_query(name, base_dt, stats=stats, sql=report_sql(name), preflight=check, status=r['status'],
+                         attempt=1, rows=r['rows'], execute_sec=r['execute_sec'], fetch_sec=r['fetch_sec'],
+                         total_sec=r['total_sec'],
+                         **({'error': r['error']} if r['status'] == 'budget_exceeded' else {}))
+        for shard in r.get('shards') or []:
+            record_query(name, base_dt, stats=shard['stats'], sql=report_sql(name), preflight=check,
+                         status=r['status'], attempt=1, rows=shard['rows'], execute_sec=shard['execute_sec'],
+                         fetch_sec=shard['fetch_sec'], split=shard['shard'])
+        return r
+
+    try:
+        results.extend(await asyncio.gather(*(one(name, base_dt) for name, base_dt in tasks)))
+    finally:
+        for check in checks.values():
+            check.cancel()
+        executor.shutdown(wait=False, cancel_futures=True)
+    results.sort(key=lambda r: (r['base_dt'], r['report']))
+    return results
+
+# ==============================================================================
+# 메인 실행 함수
+# ==============================================================================
+def parse_args():
+    parser = argparse.ArgumentParser(description='wafering 리포트 비동기 실행 (쿼리별 제한 시간, 초과/중단 시 서버 쿼리 취소)')
+    parser.add_argument('--reports', nargs='+', choices=list(REPORTS), default=list(REPORTS))
+    parser.add_argument('--date', metavar='YYYYMMDD', help='기준일자 BASE_DT (기본: 어제)')
+    parser.add_argument('--from', dest='from_dt', metavar='YYYYMMDD')
+    parser.add_argument('--to', dest='to_dt', metavar='YYYYMMDD')
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS, help=f'동시 실행 쿼리 수 (기본 {DEFAULT_WORKERS})')
+    parser.add_argument('--timeout-min', type=float, default=DEFAULT_QUERY_TIMEOUT_SEC / 60,
+                        help=f'리포트 1건 제한 시간 (분, 기본 {DEFAULT_QUERY_TIMEOUT_SEC / 60:g})')
+    parser.add_argument('--preflight-timeout-sec', type=float, default=DEFAULT_PREFLIGHT_TIMEOUT_SEC,
+                        help=f'EXPLAIN 1건 제한 시간 (초, 기본 {DEFAULT_PREFLIGHT_TIMEOUT_SEC})')
+    parser.add_argument('--force', action='store_true', help='완료된 일자 파티션도 다시 계산')
+    parser.add_argument('--output-dir', default=str(OUTPUT_DIR))
+    parser.add_argument('--dataset-dir', nargs='?', const=str(DATASET_DIR), metavar='DIR',
+                        help='완료된 일자를 BASE_DT / FAC_ID 파티션 데이터셋에도 게시')
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument('--execute-mode', choices=EXECUTE_MODES, default=DEFAULT_EXECUTE_MODE)
+    parser.add_argument('--encoding', choices=RESULT_ENCODINGS, default=DEFAULT_RESULT_ENCODING)
+    parser.add_argument('--decode-processes', type=int, default=DEFAULT_DECODE_PROCESSES)
+    parser.add_argument('--skip-preflight', action='store_true', help='EXPLAIN 용량 사전 점검 생략')
+    parser.add_argument('--no-budget', action='store_true', help='실행 중 한도 감시 안 함')
+    parser.add_argument('--budget-multiple', type=float, help='처리 bytes 한도 = EXPLAIN 예상 입력 × 배수')
+    parser.add_argument('--explain-ttl-hours', type=float, default=EXPLAIN_TTL_SEC / 3600)
+    parser.add_argument('--split', choices=SPLIT_KEYS, help='Grid 리포트를 하위 쿼리로 나눠 동시 실행')
+    parser.add_argument('--split-parallel', type=int, help='하위 쿼리 수 (기본: fac_id 는 FAC 수, oper_id 는 4)')
+    parser.add_argument('--split-boundaries', nargs='+', metavar='OPER_ID', help='oper_id 분할 경계값')
+    parser.add_argument('--no-cache', action='store_true', help='결과 캐시 사용 안 함')
+    parser.add_argument('--cache-max-gb', type=float, default=MAX_CACHE_GB)
+    args = parser.parse_args()
+    if bool(args.from_dt) != bool(args.to_dt):
+        parser.error('--from 과 --to 는 함께 지정해야 합니다.')
+    return args
+
+
+def main():
+    args = parse_args()
+    if args.from_dt:
+        base_dates = date_range(args.from_dt, args.to_dt)
+    else:
+        base_dates = [args.date or (datetime.now() - timedelta(days=1)).strftime('%Y%m%d')]
+    print(f"일자: {base_dates[0]}{' ~ ' + base_dates[-1] if len(base_dates) > 1 else ''} | "
+          f"리포트: {', '.join(args.reports)} | 동시 실행: {args.workers} | 제한 시간: {args.timeout_min:g}분")
+
+    cache = None if args.no_cache else ResultCache(max_gb=args.cache_max_gb)
+    explain_cache = ExplainCache(ttl_sec=args.explain_ttl_hours * 3600) if args.explain_ttl_hours > 0 else None
+
+    started = time.perf_counter()
+    try:
+        results = asyncio.run(run_reports_async(
+            args.reports, base_dates, max_workers=args.workers, timeout=args.timeout_min * 60,
+            preflight_timeout=args.preflight_timeout_sec, output_dir=args.output_dir, batch_size=args.batch_size,
+            preflight=not args.skip_preflight, force=args.force, cache=cache, explain_cache=explain_cache,
+            execute_mode=args.execute_mode, encoding=args.encoding, decode_processes=args.decode_processes,
+            budget=not args.no_budget, budget_multiple=args.budget_multiple, dataset_dir=args.dataset_dir,
+            split=SplitSpec(args.split, args.split_parallel, tuple(args.split_boundaries or ()))
+            if args.split else None))
+    except KeyboardInterrupt:
+        print("\n중단됨: 실행 중이던 서버 쿼리는 취소 요청 완료")
+        sys.exit(130)
+    write_summary(results, args.output_dir, wall_sec=round(time.perf_counter() - started, 3))
+
+    if any(r['status'] in ('failed', 'timeout', 'budget_exceeded') for r in results):
+        sys.exit(1)
+
+# 실행
+if __name__ == "__main__":
+    main()
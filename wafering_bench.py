@@ -0,0 +1,516 @@
+import argparse
+import base64
+import json
+import os
+import tempfile
+import threading
+import time
+from datetime import datetime
+from multiprocessing import get_context
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+import trino
+
+from wafering_common import DEFAULT_DECODE_PROCESSES, RESULT_ENCODINGS
+from wafering_fetch import (CATEGORY_COLUMNS, DATETIME_COLUMNS, DEFAULT_BATCH_SIZE, INT_COLUMNS,
+                            column_value_mappers, fetch_frame, iter_pages, parse_decimal_modes, shutdown_decode_pool,
+                            write_parquet_stream)
+from wafering_sql import DEFAULT_PARAMS
+
+BASE_DIR = Path(__file__).resolve().parent
+BENCH_DIR = BASE_DIR / 'output' / 'bench'
+
+# ==============================================================================
+# 합성 데이터 스키마 (Trino 가 돌려주는 컬럼 순서 / 타입 그대로)
+# ==============================================================================
+_CODE = 'varchar(20)'
+_ID = 'varchar(30)'
+_QTY = 'decimal(38,0)'
+
+# WAF Grid (sql/waf_grid.sql 의 step5_part_no)
+WAF_COLUMNS = [
+    ('WAF_ID', _ID), ('WAF_SEQ', _QTY), ('WAF_SIZE', 'varchar(10)'), ('BASE_DT', 'varchar(8)'),
+    ('DIV_CD', _CODE), ('REJ_DIV_CD', _CODE), ('FAC_ID', 'varchar(10)'), ('OPER_ID', _CODE),
+    ('OWNR_CD', _CODE), ('CRET_CD', _CODE), ('PROD_ID', _ID), ('IGOT_ID', _ID), ('BLK_ID', _ID),
+    ('SUBLOT_ID', _ID), ('USER_LOT_ID', _ID), ('EQP_ID', _CODE), ('CUST_SITE_NM', 'varchar(100)'),
+    ('REJ_GROUP', _CODE), ('OPER1_GROUP', _CODE), ('OPER2_GROUP', _CODE), ('RESPON', _CODE),
+    ('ALLO_GROUP', _CODE), ('RESPON_RATIO', 'decimal(10,4)'), ('IN_QTY', _QTY), ('OUT_QTY', _QTY),
+    ('LOSS_QTY', _QTY), ('REAL_DPT_GROUP', _CODE), ('HST_REG_DTTM', 'timestamp(0)'), ('DATA_TYPE', 'varchar(3)'),
+    ('DATA_CHG_DTTM', 'timestamp(0)'), ('BASE_DT_NAME', 'varchar(8)'), ('GRD_CD_NM_CS', _CODE),
+    ('GRD_CD_NM_PS', _CODE), ('OPER_DIV_L', 'varchar(10)'), ('WEEK_DAY_NM', 'varchar(10)'),
+    ('BEF_BAD_RSN_CD', _CODE), ('AFT_BAD_RSN_CD', _CODE), ('PART_NO', 'varchar(50)'),
+]
+
+# LOT Grid (sql/lot_grid.sql 의 Z: 원본 + 보정 데이터 통합)
+LOT_Z_COLUMNS = [
+    ('WAF_SIZE', 'varchar(10)'), ('BASE_DT', 'varchar(8)'), ('DIV_CD', _CODE), ('REJ_DIV_CD', _CODE),
+    ('FAC_ID', 'varchar(10)'), ('OPER_ID', _CODE), ('OWNR_CD', _CODE), ('CRET_CD', _CODE), ('PROD_ID', _ID),
+    ('IGOT_ID', _ID), ('BLK_ID', _ID), ('SUBLOT_ID', _ID), ('USER_LOT_ID', _ID), ('EQP_ID', _CODE),
+    ('BEF_BAD_RSN_CD', _CODE), ('AFT_BAD_RSN_CD', _CODE), ('REJ_GROUP', _CODE), ('OPER1_GROUP', _CODE),
+    ('OPER2_GROUP', _CODE), ('RESPON', _CODE), ('ALLO_GROUP', _CODE), ('RESPON_RATIO', 'decimal(10,4)'),
+    ('IN_QTY', _QTY), ('OUT_QTY', _QTY), ('LOSS_QTY', _QTY), ('REAL_DPT_GROUP', _CODE),
+    ('GRD_CD_NM_CS', _CODE), ('GRD_CD_NM_PS', _CODE), ('CUST_SITE_NM', 'varchar(100)'),
+    ('WEEK_DAY_NM', 'varchar(10)'), ('DATA_CHG_DTTM', 'timestamp(0)'),
+]
+
+SCHEMAS = {'waf': WAF_COLUMNS, 'lot': LOT_Z_COLUMNS}
+
+# 코드 컬럼 값 목록 또는 (접두어, 종류 수) - 빈도는 Zipf 분포 (상위 코드에 몰림)
+CODE_VALUES = {
+    'WAF_SIZE': ['300'],
+    'OPER_DIV_L': ['WF'],
+    'FAC_ID': list(DEFAULT_PARAMS['fac_ids']),
+    'DIV_CD': ['COM_QTY', 'LOSS_QTY', 'RESC_HG_QTY', 'RWK_QTY', 'HOLD_QTY'],
+    'REJ_DIV_CD': ('RD', 6),
+    'OPER_ID': ('OP', 80),
+    'OWNR_CD': ('OW', 5),
+    'CRET_CD': ('CR', 8),
+    'PROD_ID': ('PRD', 800),
+    'EQP_ID': ('EQP', 300),
+    'CUST_SITE_NM': ('CUST', 40),
+    'REJ_GROUP': ('RG', 12),
+    'OPER1_GROUP': ('G1', 15),
+    'OPER2_GROUP': ('G2', 25),
+    'RESPON': ['PROD', 'ENG', 'ALLO', 'QA', 'EQP'],
+    'ALLO_GROUP': ('AG', 6),
+    'REAL_DPT_GROUP': ('DPT', 14),
+    'GRD_CD_NM_CS': ('GC', 10),
+    'GRD_CD_NM_PS': ('GP', 10),
+    'BEF_BAD_RSN_CD': ('RSN', 150),
+    'AFT_BAD_RSN_CD': ('RSN', 150),
+    'PART_NO': ('PN', 500),
+}
+# 행 수에 비례하는 LOT 계층 ID (행 N 개당 ID 1개)
+ROWS_PER_ID = {'IGOT_ID': 400, 'BLK_ID': 100, 'SUBLOT_ID': 25, 'USER_LOT_ID': 25}
+NULL_RATES = {'ALLO_GROUP': 0.7, 'CUST_SITE_NM': 0.05, 'GRD_CD_NM_CS': 0.1, 'EQP_ID': 0.02}
+MANUAL_RATE = 0.03                  # 보정(MNL) 행 비율
+
+DIRECT_PAGE_ROWS = 5000             # 행 프로토콜 페이지 크기 (서버 응답 1회분)
+SEGMENT_ROWS = 50000                # spooling 세그먼트 크기
+
+# ==============================================================================
+# 합성 데이터 생성 (Trino 응답 JSON 과 같은 원시 값: decimal / timestamp 는 문자열)
+# ==============================================================================
+def _zipf_choice(rng, values, n, skew=1.2):
+    weights = 1.0 / np.arange(1, len(values) + 1) ** skew
+    labels = np.empty(len(values), dtype=object)
+    labels[:] = values
+    return labels[rng.choice(len(values), size=n, p=weights / weights.sum())]
+
+
+def _code_column(rng, name, n):
+    spec = CODE_VALUES[name]
+    values = spec if isinstance(spec, list) else [f"{spec[0]}{i:04d}" for i in range(spec[1])]
+    return _zipf_choice(rng, values, n)
+
+
+def _decimal_strings(values, scale=0):
+    return np.char.mod(f'%.{scale}f', values).astype(object)
+
+
+def _timestamp_strings(rng, base_dt, n):
+    start = np.datetime64(datetime.strptime(base_dt, '%Y%m%d'), 's')
+    stamps = start + rng.integers(0, 86400 * 2, size=n).astype('timedelta64[s]')
+    return np.char.replace(np.datetime_as_string(stamps, unit='s'), 'T', ' ').astype(object)
+
+
+def _with_nulls(rng, column, rate):
+    column[rng.random(len(column)) < rate] = None
+    return column
+
+
+def generate_columns(columns, n, seed=0, base_dt='20261016'):
+    """스키마 컬럼별 원시 값 배열 (numpy object) 생성"""
+    rng = np.random.default_rng(seed)
+    in_qty = rng.integers(1, 26, size=n)
+    loss_qty = np.minimum(rng.geometric(0.6, size=n), in_qty)
+    manual = rng.random(n) < MANUAL_RATE
+    week = datetime.strptime(base_dt, '%Y%m%d').strftime('%y-%U')
+
+    data = {}
+    for name, type_code in columns:
+        if name in CODE_VALUES:
+            col = _code_column(rng, name, n)
+        elif name in ROWS_PER_ID:
+            ids = [f"{name[:3]}{i:07d}" for i in range(max(1, n // ROWS_PER_ID[name]))]
+            col = _zipf_choice(rng, ids, n, skew=0.5)
+        elif name == 'WAF_ID':
+            col = np.char.mod('W%010d', np.arange(n)).astype(object)
+        elif name == 'WAF_SEQ':
+            col = _decimal_strings(rng.integers(1, 26, size=n))
+        elif name in ('BASE_DT', 'BASE_DT_NAME'):
+            col = np.full(n, base_dt, dtype=object)
+        elif name == 'WEEK_DAY_NM':
+            col = np.full(n, week, dtype=object)
+        elif name == 'RESPON_RATIO':
+            col = _decimal_strings(rng.choice([1.0, 1.0, 1.0, 0.5, 0.3333, 0.25], size=n), scale=4)
+        elif name == 'IN_QTY':
+            col = _decimal_strings(in_qty)
+        elif name == 'OUT_QTY':
+            col = _decimal_strings(in_qty - loss_qty)
+        elif name == 'LOSS_QTY':
+            col = _decimal_strings(loss_qty)
+        elif name == 'DATA_TYPE':
+            col = np.where(manual, 'MNL', 'ORI').astype(object)
+        elif name == 'HST_REG_DTTM':
+            col = _timestamp_strings(rng, base_dt, n)
+            col[manual] = None
+        elif type_code.startswith('timestamp'):
+            col = _timestamp_strings(rng, base_dt, n)
+        else:
+            col = np.full(n, None, dtype=object)
+        if name in NULL_RATES:
+            col = _with_nulls(rng, col, NULL_RATES[name])
+        data[name] = col
+    return data
+
+
+# ==============================================================================
+# 합성 결과 / 페이지 단위 DB-API cursor
+# ==============================================================================
+class SyntheticDataset:
+    """합성 결과를 서버 응답처럼 JSON 페이지(bytes)로 보관하고 cursor 로 제공"""
+
+    def __init__(self, schema='waf', rows=1_000_000, seed=0, base_dt='20261016', page_rows=DIRECT_PAGE_ROWS):
+        self.columns = SCHEMAS[schema]
+        self.rows = rows
+        self.page_rows = page_rows
+        data = generate_columns(self.columns, rows, seed=seed, base_dt=base_dt)
+        arrays = [data[name] for name, _ in self.columns]
+        self.pages = [
+            json.dumps([list(r) for r in zip(*(a[start:start + page_rows] for a in arrays))]).encode('utf-8')
+            for start in range(0, rows, page_rows)
+        ]
+        self.wire_bytes = sum(len(p) for p in self.pages)
+
+    def cursor(self, encoding='rows', raw=True, decode_processes=DEFAULT_DECODE_PROCESSES):
+        """encoding='rows' 면 행 프로토콜 cursor, 그 외는 세그먼트 cursor
+
+        raw: 값 변환 없는 원시 값 (open_cursor 와 동일), False 면 기존 스크립트의 conn.cursor() 처럼 값마다 변환.
+        decode_processes: 원시 값 cursor 에만 적용 (변환 cursor 는 기존 스크립트처럼 수신 스레드에서 변환).
+        """
+        if encoding == 'rows':
+            connection = SimpleNamespace(result_encoding=encoding, decode_processes=decode_processes if raw else 0)
+            return SyntheticCursor(self, connection, raw=raw)
+        connection = SimpleNamespace(result_encoding=encoding, decode_processes=decode_processes)
+        return SyntheticSegmentCursor(self, connection, encoding)
+
+
+class SyntheticCursor:
+    """행 프로토콜 stand-in: 페이지마다 JSON 파싱 + 클라이언트 RowMapper 변환 (trino Cursor 와 같은 비용)"""
+
+    def __init__(self, dataset, connection, raw=False):
+        self.connection = connection
+        self.description = [(name.lower(), type_code, None, None, None, None, None)
+                            for name, type_code in dataset.columns]
+        self._mapper = None if raw else trino.mapper.RowMapper(column_value_mappers(self.description))
+        self._legacy_primitive_types = raw
+        self._pages = iter(dataset.pages)
+        self._rows = []
+        self.query_id = 'synthetic'
+        self.stats = {'state': 'FINISHED'}
+
+    def execute(self, operation, params=None):
+        return self
+
+    def _next_page(self):
+        page = next(self._pages, None)
+        if page is None:
+            return False
+        rows = json.loads(page)
+        self._rows.extend(self._mapper.map(rows) if self._mapper is not None else rows)
+        return True
+
+    def fetchmany(self, size=1):
+        while len(self._rows) < size and self._next_page():
+            pass
+        rows, self._rows = self._rows[:size], self._rows[size:]
+        return rows
+
+    def fetchone(self):
+        rows = self.fetchmany(1)
+        return rows[0] if rows else None
+
+    def fetchall(self):
+        while self._next_page():
+            pass
+        rows, self._rows = self._rows, []
+        return rows
+
+    def close(self):
+        self._pages = iter(())
+
+
+class SyntheticSegmentCursor(trino.dbapi.SegmentCursor):
+    """spooling stand-in: SEGMENT_ROWS 단위 inline 세그먼트 (json+zstd / json+lz4 는 압축)"""
+
+    def __init__(self, dataset, connection, encoding):
+        self._connection = connection
+        self._description = [(name.lower(), type_code, None, None, None, None, None)
+                             for name, type_code in dataset.columns]
+        per_segment = max(1, SEGMENT_ROWS // dataset.page_rows)
+        self._segments = iter([
+            self._segment(encoding, dataset.pages[i:i + per_segment])
+            for i in range(0, len(dataset.pages), per_segment)
+        ])
+
+    @staticmethod
+    def _segment(encoding, pages):
+        # 페이지 JSON 배열을 이어 붙여 세그먼트 1개로 구성
+        data = b'[' + b','.join(p[1:-1] for p in pages if len(p) > 2) + b']'
+        metadata = {'uncompressedSize': len(data), 'segmentSize': len(data)}
+        if encoding == 'json+zstd':
+            import zstandard
+            data = zstandard.ZstdCompressor().compress(data)
+        elif encoding == 'json+lz4':
+            import lz4.block
+            data = lz4.block.compress(data, store_size=False)
+        metadata['segmentSize'] = len(data)
+        segment = trino.client.InlineSegment({'type': 'inline', 'data': base64.b64encode(data).decode('ascii'),
+                                              'metadata': metadata})
+        return trino.client.DecodableSegment(encoding, metadata, segment)
+
+    @property
+    def description(self):
+        return self._description
+
+    @property
+    def query_id(self):
+        return 'synthetic'
+
+    @property
+    def stats(self):
+        return {'state': 'FINISHED'}
+
+    def execute(self, operation, params=None):
+        return self
+
+    def fetchone(self):
+        return next(self._segments, None)
+
+    def fetchmany(self, size=None):
+        return [s for s in (self.fetchone() for _ in range(size or 1)) if s is not None]
+
+    def close(self):
+        self._segments = iter(())
+
+# ==============================================================================
+# 벤치마크 단계 (단계마다 새 프로세스에서 실행 → 메모리 측정 분리)
+# ==============================================================================
+def _current_rss():
+    """현재 RSS bytes (Linux /proc 기준, 그 외 OS 는 None)"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+class _PeakMemory:
+    """단계 실행 중 RSS 를 주기적으로 읽어 시작 대비 최대 증가량 기록"""
+
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self.base = self.peak = _current_rss()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            rss = _current_rss()
+            if rss is not None and rss > self.peak:
+                self.peak = rss
+
+    def __enter__(self):
+        if self.base is not None:
+            self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        if self.base is not None:
+            self._thread.join()
+            self.peak = max(self.peak, _current_rss())
+
+    @property
+    def peak_mb(self):
+        return None if self.base is None else round((self.peak - self.base) / 1024 ** 2, 1)
+
+
+def legacy_convert_dtypes(df):
+    """기존 스크립트 방식 (fetchall → DataFrame) 이후 ColumnarResultBuilder 와 같은 dtype 으로 변환"""
+    for col in df.columns:
+        name = col.upper()
+        if name in DATETIME_COLUMNS:
+            df[col] = pd.to_datetime(df[col])
+        elif name in INT_COLUMNS:
+            df[col] = pd.to_numeric(df[col]).astype('Int64')
+        elif name in CATEGORY_COLUMNS:
+            df[col] = df[col].astype('category')
+    return df
+
+
+def _stage_fetch(cur, options, workdir):
+    rows = sum(len(page) for page, _ in iter_pages(cur, options['batch_size']))
+    return rows, {}
+
+
+def _fetch_all_rows(cur, batch_size):
+    """fetchall 과 같은 Python 값 행 목록 (segment cursor 는 세그먼트를 행으로 디코딩 후 값 변환)"""
+    if not isinstance(cur, trino.dbapi.SegmentCursor):
+        return cur.fetchall()
+    rows = []
+    for page, converters in iter_pages(cur, batch_size):
+        if converters is None:
+            rows.extend(page)
+            continue
+        columns = [list(values) if convert is None else convert(list(values))
+                   for values, convert in zip(zip(*page), converters)]
+        rows.extend(zip(*columns))
+    return rows
+
+
+def _stage_legacy_frame(cur, options, workdir):
+    started = time.perf_counter()
+    rows = _fetch_all_rows(cur, options['batch_size'])
+    t_fetch = time.perf_counter()
+    df = pd.DataFrame(rows, columns=[d[0] for d in cur.description])
+    del rows
+    t_build = time.perf_counter()
+    legacy_convert_dtypes(df)
+    t_dtype = time.perf_counter()
+    return len(df), {'fetch_sec': round(t_fetch - started, 3), 'build_sec': round(t_build - t_fetch, 3),
+                     'dtype_sec': round(t_dtype - t_build, 3)}
+
+
+def _stage_columnar_frame(cur, options, workdir):
+    df = fetch_frame(cur, batch_size=options['batch_size'], decimal_modes=options.get('decimal_modes'))
+    return len(df), {}
+
+
+def _stage_parquet_stream(cur, options, workdir):
+    path = Path(workdir) / 'stream.parquet'
+    rows = write_parquet_stream(cur, path, batch_size=options['batch_size'])
+    return rows, {'file_mb': round(path.stat().st_size / 1024 ** 2, 1)}
+
+
+def _stage_frame_parquet(cur, options, workdir):
+    started = time.perf_counter()
+    df = fetch_frame(cur, batch_size=options['batch_size'], decimal_modes=options.get('decimal_modes'))
+    t_frame = time.perf_counter()
+    path = Path(workdir) / 'frame.parquet'
+    df.to_parquet(path)
+    return len(df), {'frame_sec': round(t_frame - started, 3), 'write_sec': round(time.perf_counter() - t_frame, 3),
+                     'file_mb': round(path.stat().st_size / 1024 ** 2, 1)}
+
+
+MAPPED_STAGES = ('legacy_frame',)      # 기존 스크립트처럼 값마다 변환하는 cursor 로 실행
+
+STAGES = {
+    'fetch': _stage_fetch,                      # 페이지 수신 + 값 변환만
+    'legacy_frame': _stage_legacy_frame,        # fetchall → DataFrame → dtype 변환 (이전 방식)
+    'columnar_frame': _stage_columnar_frame,    # fetch_frame (컬럼 버퍼)
+    'parquet_stream': _stage_parquet_stream,    # write_parquet_stream
+    'frame_parquet': _stage_frame_parquet,      # fetch_frame → DataFrame.to_parquet
+}
+
+
+def run_stage(stage, options):
+    """합성 데이터 생성 후 단계 1개 실행 → 소요시간 / 처리량 / 최대 메모리 증가량"""
+    dataset = SyntheticDataset(options['schema'], options['rows'], seed=options['seed'],
+                               page_rows=options['page_rows'])
+    cur = dataset.cursor(options['encoding'], raw=stage not in MAPPED_STAGES,
+                         decode_processes=options['decode_processes'])
+    with tempfile.TemporaryDirectory() as workdir:
+        with _PeakMemory() as memory:
+            started = time.perf_counter()
+            rows, extra = STAGES[stage](cur, options, workdir)
+            sec = time.perf_counter() - started
+    return {'stage': stage, 'rows': rows, 'sec': round(sec, 3), 'rows_per_sec': round(rows / sec) if sec else None,
+            'wire_mb': round(dataset.wire_bytes / 1024 ** 2, 1), 'peak_mb': memory.peak_mb, **extra}
+
+
+def _stage_process(conn, stage, options):
+    try:
+        conn.send(run_stage(stage, options))
+    except Exception as e:
+        conn.send({'stage': stage, 'error': repr(e)})
+    finally:
+        conn.close()
+        shutdown_decode_pool()
+
+
+def run_benchmark(stages, options):
+    """단계별로 새 프로세스(spawn)에서 실행해 결과 목록 반환"""
+    ctx = get_context('spawn')
+    results = []
+    for stage in stages:
+        print(f"[{stage}] 실행 중...")
+        parent, child = ctx.Pipe(duplex=False)
+        process = ctx.Process(target=_stage_process, args=(child, stage, options))
+        process.start()
+        child.close()
+        try:
+            result = parent.recv()
+        except EOFError:
+            result = {'stage': stage, 'error': f'프로세스 비정상 종료 (exit code {process.exitcode})'}
+        process.join()
+        results.append(result)
+    return results
+
+
+def print_results(results, options):
+    print(f"\n================ 벤치마크 ({options['schema']}, {options['rows']:,}행, encoding={options['encoding']}, "
+          f"decode_processes={options['decode_processes']}) ================")
+    print(f"{'stage':<16} {'sec':>8} {'rows/s':>11} {'peak MB':>9}  detail")
+    for r in results:
+        if 'error' in r:
+            print(f"{r['stage']:<16} 오류: {r['error']}")
+            continue
+        detail = ', '.join(f"{k}={v}" for k, v in r.items()
+                           if k not in ('stage', 'rows', 'sec', 'rows_per_sec', 'peak_mb'))
+        peak = '-' if r['peak_mb'] is None else f"{r['peak_mb']:.1f}"
+        print(f"{r['stage']:<16} {r['sec']:>8.2f} {r['rows_per_sec'] or 0:>11,} {peak:>9}  {detail}")
+
+# ==============================================================================
+# 메인 실행 함수
+# ==============================================================================
+def parse_args():
+    parser = argparse.ArgumentParser(description='합성 불량 데이터로 결과 수신 / DataFrame / 파일 저장 단계 벤치마크 (Trino 불필요)')
+    parser.add_argument('--schema', choices=list(SCHEMAS), default='waf',
+                        help='waf: step5_part_no (WAF Grid), lot: Z (LOT Grid)')
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--stages', nargs='+', choices=list(STAGES), default=list(STAGES))
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument('--page-rows', type=int, default=DIRECT_PAGE_ROWS,
+                        help=f'서버 응답 페이지당 행 수 (기본 {DIRECT_PAGE_ROWS})')
+    parser.add_argument('--encoding', choices=RESULT_ENCODINGS, default='rows')
+    parser.add_argument('--decode-processes', type=int, default=DEFAULT_DECODE_PROCESSES)
+    parser.add_argument('--decimal-mode', nargs='+', metavar='[COLUMN=]MODE',
+                        help='DataFrame 단계의 DECIMAL 변환 방식 (object / float64 / scaled, 예: float64 RESPON_RATIO=scaled)')
+    parser.add_argument('--output-dir', default=str(BENCH_DIR))
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    options = {'schema': args.schema, 'rows': args.rows, 'seed': args.seed, 'batch_size': args.batch_size,
+               'page_rows': args.page_rows, 'encoding': args.encoding, 'decode_processes': args.decode_processes,
+               'decimal_modes': parse_decimal_modes(args.decimal_mode)}
+    results = run_benchmark(args.stages, options)
+    print_results(results, options)
+
+    output_dir = Path(args.output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    path = output_dir / f"bench_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    path.write_text(json.dumps({'options': options, 'results': results}, ensure_ascii=False, indent=2),
+                    encoding='utf-8')
+    print(f"결과 파일: {path}")
+
+# 실행
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+import hashlib
+import json
+import os
+import re
+import shutil
+import threading
+import time
+from pathlib import Path
+
+from wafering_sql import DEFAULT_PARAMS, execute_template
+
+BASE_DIR = Path(__file__).resolve().parent
+
+# ==============================================================================
+# 결과 캐시 설정
+# ==============================================================================
+CACHE_DIR = BASE_DIR / 'cache' / 'results'
+MAX_CACHE_GB = 20.0             # 초과 시 가장 오래 사용하지 않은 항목부터 삭제
+
+# ==============================================================================
+# 캐시 키 (정규화된 SQL 해시 + BASE_DT)
+# ==============================================================================
+_LINE_COMMENT_RE = re.compile(r"--[^\n]*")
+_BLOCK_COMMENT_RE = re.compile(r"/\*.*?\*/", re.S)
+_SPACE_RE = re.compile(r"\s+")
+
+
+def normalize_sql(sql):
+    """주석 제거 + 공백 정리 (들여쓰기/주석만 바뀐 쿼리는 같은 키)"""
+    sql = _BLOCK_COMMENT_RE.sub(' ', sql)
+    sql = _LINE_COMMENT_RE.sub(' ', sql)
+    return _SPACE_RE.sub(' ', sql).strip()
+
+
+def cache_key(sql, base_dt):
+    sql_hash = hashlib.sha256(normalize_sql(sql).encode('utf-8')).hexdigest()[:20]
+    return f"{base_dt}_{sql_hash}"
+
+# ==============================================================================
+# 재검증 probe (일자별 건수 + 최종 변경일시)
+# ==============================================================================
+_TABLE_RE = re.compile(r"^\w+$")
+
+
+def build_probe_query(tables):
+    """팩트/보정 테이블별 해당 일자 COUNT(*), MAX(DATA_CHG_DTTM) 조회 템플릿 (#{waf_size} / #{base_dt} 바인딩)"""
+    parts = []
+    for table in tables:
+        if not _TABLE_RE.match(table):
+            raise ValueError(f"probe 테이블 이름이 올바르지 않음: {table!r}")
+        parts.append(f"""SELECT '{table}' AS TBL, COUNT(*) AS CNT, CAST(MAX(DATA_CHG_DTTM) AS VARCHAR) AS MAX_CHG_DTTM
+    FROM oracle.PMDW_MGR.{table}
+    WHERE WAF_SIZE = #{{waf_size}} AND BASE_DT = #{{base_dt}}""")
+    return "\n    UNION ALL\n    ".join(parts)
+
+
+def run_probe(conn, tables, base_dt, params=None):
+    """probe 결과를 {테이블: [건수, 최종변경일시]} 로 반환 (WAF_SIZE 는 params, 기본 DEFAULT_PARAMS)"""
+    params = {**DEFAULT_PARAMS, **(params or {}), 'base_dt': base_dt}
+    cur = conn.cursor()
+    try:
+        execute_template(cur, 'probe', params, mode='immediate', template=build_probe_query(tables))
+        return {tbl: [int(cnt), max_chg] for tbl, cnt, max_chg in cur.fetchall()}
+    finally:
+        cur.close()
+
+# ==============================================================================
+# 디스크 결과 캐시
+# ==============================================================================
+class ResultCache:
+    """Parquet 결과 파일 캐시 (항목 = <key>.parquet + <key>.json 메타)
+
+    probe 값이 저장 당시와 같을 때만 재사용하고, 전체 크기가 max_gb 를 넘으면
+    마지막 사용 시각이 오래된 항목부터 삭제한다 (LRU).
+    """
+
+    def __init__(self, cache_dir=CACHE_DIR, max_gb=MAX_CACHE_GB):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = int(max_gb * 1024 ** 3)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def _paths(self, key):
+        return self.cache_dir / f"{key}.parquet", self.cache_dir / f"{key}.json"
+
+    def lookup(self, key, probe, dest_path=None):
+        """probe 가 일치하는 캐시 파일 경로, 없거나 변경됐으면 None
+
+        dest_path 가 주어지면 잠금을 쥔 채 결과 위치로 복사하고 dest_path 를 반환한다 (복사 전 정리 방지).
+        다른 프로세스가 그 사이 파일을 지웠으면 캐시 미스로 처리한다.
+        """
+        data_path, meta_path = self._paths(key)
+        with self._lock:
+            try:
+                meta = json.loads(meta_path.read_text(encoding='utf-8'))
+                if meta.get('probe') != probe or not data_path.exists():
+                    return None
+                if dest_path is not None:
+                    copy_cached_file(data_path, dest_path)
+                meta['last_access'] = time.time()
+                meta['hits'] = meta.get('hits', 0) + 1
+                meta_path.write_text(json.dumps(meta, ensure_ascii=False), encoding='utf-8')
+            except FileNotFoundError:
+                return None
+        return data_path if dest_path is None else Path(dest_path)
+
+    def store(self, key, src_path, probe, **extra):
+        """결과 파일을 캐시에 복사하고 메타 기록 후 용량 초과분 정리"""
+        data_path, meta_path = self._paths(key)
+        tmp_path = data_path.with_name(f".{data_path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        shutil.copyfile(src_path, tmp_path)
+        meta = {'key': key, 'probe': probe, 'size': tmp_path.stat().st_size,
+                'created': time.time(), 'last_access': time.time(), 'hits': 0, **extra}
+        with self._lock:
+            os.replace(tmp_path, data_path)
+            meta_path.write_text(json.dumps(meta, ensure_ascii=False), encoding='utf-8')
+            self._evict()
+
+    def _evict(self):
+        entries = []
+        for meta_path in self.cache_dir.glob('*.json'):
+            try:
+                meta = json.loads(meta_path.read_text(encoding='utf-8'))
+            except (OSError, ValueError):
+                continue
+            entries.append((meta.get('last_access', 0), meta.get('size', 0), meta_path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, meta_path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            meta_path.with_suffix('.parquet').unlink(missing_ok=True)
+            meta_path.unlink(missing_ok=True)
+            total -= size
+            print(f"캐시 정리: {meta_path.stem} ({size / 1024 ** 2:.1f} MB)")
+
+
+def copy_cached_file(cached_path, dest_path):
+    """캐시 파일을 결과 위치로 복사 (임시 파일 → 교체)"""
+    dest_path = Path(dest_path)
+    dest_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = dest_path.with_name(f".{dest_path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        shutil.copyfile(cached_path, tmp_path)
+        os.replace(tmp_path, dest_path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
@@ -0,0 +1,150 @@
+import os
+import threading
+import trino
+import warnings
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# ==============================================================================
+# 접속 정보 설정
+# ==============================================================================
+HOST = 'aidp-trino-analysis.sksiltron.co.kr'
+PORT = 31085
+USER = '253699'
+PASSWORD = '$iltron3501'
+
+# 사내 CA 번들 경로 (미지정 시 기존과 같이 인증서 검증 생략, 프로세스당 1회 경고)
+CA_BUNDLE = os.environ.get('TRINO_CA_BUNDLE')
+_insecure_warned = False
+
+# ==============================================================================
+# HTTP 연결 풀 / 재시도 설정
+# ==============================================================================
+HTTP_POOL_SIZE = 16                 # 호스트당 유지하는 keep-alive 연결 수 (동시 쿼리 수 이상)
+HTTP_RETRIES = 5                    # 일시 오류 재시도 횟수
+HTTP_BACKOFF_SEC = 0.5              # 재시도 대기 = 0.5, 1, 2, 4 ... 초 (+ jitter), 최대 HTTP_BACKOFF_MAX_SEC
+HTTP_BACKOFF_MAX_SEC = 10
+HTTP_BACKOFF_JITTER_SEC = 0.5
+RETRY_STATUS = (429, 502, 503, 504)
+SUBMIT_RETRY_STATUS = (429, 503)    # 서버가 쿼리를 받지 않은 응답
+
+
+class _TrinoRetry(Retry):
+    """상태 조회(GET/HEAD/DELETE)는 RETRY_STATUS / 읽기 오류 재시도,
+    쿼리 제출(POST)은 중복 실행되지 않도록 SUBMIT_RETRY_STATUS 응답만 재시도"""
+
+    def is_retry(self, method, status_code, has_retry_after=False):
+        if method == 'POST':
+            return status_code in SUBMIT_RETRY_STATUS
+        return super().is_retry(method, status_code, has_retry_after)
+
+
+class _SharedAdapter(HTTPAdapter):
+    """프로세스 전체가 공유하는 연결 풀 (연결 종료 시에도 풀은 유지)"""
+
+    def close(self):
+        pass
+
+
+_http_adapter = None
+_http_adapter_lock = threading.Lock()
+
+
+def _shared_http_adapter():
+    global _http_adapter
+    with _http_adapter_lock:
+        if _http_adapter is None:
+            retry = _TrinoRetry(
+                total=HTTP_RETRIES,
+                status_forcelist=RETRY_STATUS,
+                allowed_methods=frozenset({'GET', 'HEAD', 'DELETE'}),
+                backoff_factor=HTTP_BACKOFF_SEC,
+                backoff_max=HTTP_BACKOFF_MAX_SEC,
+                backoff_jitter=HTTP_BACKOFF_JITTER_SEC,
+                raise_on_status=False,      # 재시도 소진 시 마지막 응답을 Trino 클라이언트가 처리
+            )
+            _http_adapter = _SharedAdapter(pool_connections=4, pool_maxsize=HTTP_POOL_SIZE, max_retries=retry)
+        return _http_adapter
+
+
+def create_http_session():
+    """공유 연결 풀을 쓰는 연결별 HTTP 세션 (Trino 클라이언트가 세션 헤더를 바꾸므로 세션은 분리)"""
+    session = requests.Session()
+    adapter = _shared_http_adapter()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    session.verify = CA_BUNDLE or False
+    if not CA_BUNDLE:
+        _warn_insecure()
+    return session
+
+
+def _warn_insecure():
+    global _insecure_warned
+    with _http_adapter_lock:
+        if _insecure_warned:
+            return
+        _insecure_warned = True
+    warnings.warn('TRINO_CA_BUNDLE 미설정: Trino 서버 인증서를 검증하지 않습니다 '
+                  '(사내 CA 번들 경로를 TRINO_CA_BUNDLE 환경변수로 지정)', stacklevel=3)
+
+# ==============================================================================
+# 결과 수신 인코딩
+# ==============================================================================
+# rows: 기존 방식 (클라이언트가 결과를 행 단위로 Python 값으로 변환)
+# json+zstd / json+lz4 / json: spooling protocol 세그먼트 인코딩을 지정해 요청하고
+#   세그먼트를 그대로 받아 wafering_fetch 에서 컬럼 단위로 디코딩
+#   (서버가 spooling 을 지원하지 않으면 기존 JSON 행 프로토콜로 내려옴)
+RESULT_ENCODINGS = ('rows', 'json+zstd', 'json+lz4', 'json')
+DEFAULT_RESULT_ENCODING = 'rows'
+# 결과 페이지 디코딩 프로세스 수 (0: 수신 스레드에서 직접 변환, POSIX 공유 메모리 필요)
+DEFAULT_DECODE_PROCESSES = 0
+
+# ==============================================================================
+# Trino 연결 생성 함수
+# ==============================================================================
+def create_trino_connection(encoding=DEFAULT_RESULT_ENCODING, decode_processes=DEFAULT_DECODE_PROCESSES):
+    """Trino DB에 연결 (HTTP 연결 풀은 프로세스 공유, encoding / decode_processes 는 open_cursor 와 wafering_fetch 가 참조)"""
+    options = {} if encoding == 'rows' else {'encoding': encoding}
+    conn = trino.dbapi.connect(
+        host=HOST,
+        port=PORT,
+        user=USER,
+        http_scheme='https',
+        auth=trino.auth.BasicAuthentication(USER, PASSWORD),
+        http_session=create_http_session(),
+        max_attempts=1,                 # 재시도는 공유 연결 풀(_TrinoRetry)에서 backoff + jitter 로 처리
+        **options
+    )
+    conn.result_encoding = encoding
+    conn.decode_processes = decode_processes if os.name == 'posix' else 0
+    return conn
+
+
+def open_cursor(conn):
+    """결과 조회용 cursor
+
+    세그먼트 인코딩 연결이면 세그먼트를 그대로 돌려주는 segment cursor,
+    rows 인코딩이면 값 변환 없이 원시 JSON 값을 돌려주는 cursor (변환은 wafering_fetch 가 컬럼 단위로 수행,
+    디코딩 프로세스를 쓰면 프로세스에서 수행).
+    """
+    raw = bool(getattr(conn, 'decode_processes', 0))
+    if getattr(conn, 'result_encoding', DEFAULT_RESULT_ENCODING) == 'rows':
+        return conn.cursor(legacy_primitive_types=True)
+    return conn.cursor('segment', legacy_primitive_types=raw)
+
+# ==============================================================================
+# 안전한 float 변환
+# ==============================================================================
+def safe_float(val, default=0.0):
+    if isinstance(val, (int, float)):
+        return float(val)
+    if isinstance(val, str):
+        if val.strip().lower() == "nan":
+            return float('nan')
+        try:
+            return float(val)
+        except ValueError:
+            return default
+    return default
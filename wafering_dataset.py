@@ -0,0 +1,171 @@
+import argparse
+import os
+import shutil
+import sys
+import threading
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+BASE_DIR = Path(__file__).resolve().parent
+
+# ==============================================================================
+# 리포트 결과 데이터셋 (Hive 파티션: <리포트>/BASE_DT=YYYYMMDD/FAC_ID=XXX/part-0.parquet)
+# ==============================================================================
+DATASET_DIR = BASE_DIR / 'dataset'
+PARTITION_COLUMNS = ('BASE_DT', 'FAC_ID')      # FAC_ID 컬럼이 없는 리포트(팀 집계)는 BASE_DT 만
+PARQUET_COMPRESSION = 'zstd'
+PARQUET_COMPRESSION_LEVEL = 3
+ROW_GROUP_ROWS = 128 * 1024                     # 행 그룹 통계(min/max) 단위 - 작을수록 세밀하게 건너뜀
+PARTITION_SCHEMA = pa.schema([(c, pa.string()) for c in PARTITION_COLUMNS])
+
+# ==============================================================================
+# 파티션 경로 / 컬럼 정리
+# ==============================================================================
+def report_dir(root, name):
+    return Path(root) / name
+
+
+def day_dir(root, name, base_dt):
+    return report_dir(root, name) / f"BASE_DT={base_dt}"
+
+
+def _as_table(data):
+    """DataFrame / pyarrow Table / Parquet 파일 경로 → pyarrow Table"""
+    if isinstance(data, pa.Table):
+        return data
+    if isinstance(data, pd.DataFrame):
+        return pa.Table.from_pandas(data, preserve_index=False)
+    return pq.read_table(data)
+
+
+def _distinct_strings(column):
+    return {v for v in column.cast(pa.string()).unique().to_pylist() if v is not None}
+
+
+def _partition_table(table, base_dt):
+    """BASE_DT 컬럼은 경로 값으로 대신하고 제거, FAC_ID 는 문자열 파티션 컬럼으로 정리 (대소문자 무시)
+
+    반환: (파일에 쓸 Table, 하위 파티션 컬럼 목록)
+    """
+    lower = {c.lower(): c for c in table.column_names}
+    base_col = lower.get('base_dt')
+    if base_col is not None:
+        values = _distinct_strings(table[base_col])
+        if values - {base_dt}:
+            raise ValueError(f"BASE_DT 파티션({base_dt})과 다른 값이 있음: {sorted(values - {base_dt})[:5]}")
+        table = table.drop_columns([base_col])
+    sub_columns = []
+    fac_col = lower.get('fac_id')
+    if fac_col is not None:
+        index = table.column_names.index(fac_col)
+        table = table.set_column(index, 'FAC_ID', table[fac_col].cast(pa.string()))
+        sub_columns.append('FAC_ID')
+    return table, sub_columns
+
+# ==============================================================================
+# 일자 파티션 교체 기록 (임시 디렉터리에 쓰고 rename 으로 교체)
+# ==============================================================================
+def write_dataset(data, root, name, base_dt, compression=PARQUET_COMPRESSION, row_group_rows=ROW_GROUP_ROWS):
+    """리포트 1일치 결과를 <root>/<name>/BASE_DT=<base_dt>/FAC_ID=.../ 에 기록 (해당 일자만 교체)
+
+    다른 일자는 건드리지 않으므로 매일 실행하면 이력에 하루씩 추가되고, 같은 일자를 다시 실행하면
+    그 일자 파티션만 통째로 바뀐다. 새 파티션은 '.' 으로 시작하는 임시 디렉터리(조회 시 무시됨)에
+    모두 쓴 뒤 rename 으로 바꾸므로, 읽는 쪽은 이전 또는 새 일자 파티션 중 하나만 본다
+    (교체 순간 rename 두 번 사이에는 해당 일자가 잠깐 비어 보일 수 있음). 파티션 디렉터리 목록 반환.
+    """
+    table, sub_columns = _partition_table(_as_table(data), base_dt)
+    target = day_dir(root, name, base_dt)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    token = f"{os.getpid()}.{threading.get_ident()}"
+    staging = target.with_name(f".{target.name}.{token}.tmp")
+    trash = target.with_name(f".{target.name}.{token}.old")
+
+    file_options = ds.ParquetFileFormat().make_write_options(
+        compression=compression, compression_level=PARQUET_COMPRESSION_LEVEL if compression == 'zstd' else None,
+        use_dictionary=True, write_statistics=True)
+    try:
+        ds.write_dataset(
+            table, staging, format='parquet', file_options=file_options,
+            partitioning=ds.partitioning(pa.schema([(c, pa.string()) for c in sub_columns]), flavor='hive')
+            if sub_columns else None,
+            basename_template='part-{i}.parquet', existing_data_behavior='error',
+            max_rows_per_group=row_group_rows, min_rows_per_group=min(row_group_rows, 16 * 1024),
+            create_dir=True)
+        staging.mkdir(exist_ok=True)        # 결과 0행이어도 빈 일자 파티션을 남겨 '실행됨' 을 표시
+        if target.exists():
+            os.replace(target, trash)
+        os.replace(staging, target)
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+        shutil.rmtree(trash, ignore_errors=True)
+    return sorted(p.parent for p in target.rglob('*.parquet'))
+
+def publish_dataset(data, root, name, base_dt):
+    """write_dataset 후 결과 출력 (wafering_runner / 단독 스크립트 / 게시 CLI 공용), 파티션 디렉터리 목록 반환"""
+    dirs = write_dataset(data, root, name, base_dt)
+    print(f"[{name}] {base_dt} 데이터셋 게시 완료 | 파티션 {len(dirs)}개, 위치: {root}")
+    return dirs
+
+# ==============================================================================
+# 조회 (파티션 / 행 그룹 통계 기준 건너뛰기)
+# ==============================================================================
+def open_dataset(root, name):
+    """리포트 데이터셋 (BASE_DT / FAC_ID 는 문자열 파티션 컬럼)"""
+    return ds.dataset(report_dir(root, name), format='parquet',
+                      partitioning=ds.partitioning(PARTITION_SCHEMA, flavor='hive'))
+
+
+def read_dataset(root, name, base_dts=None, fac_ids=None, columns=None, where=None):
+    """일자 / FAC_ID 조건에 맞는 파티션 파일만 읽어 DataFrame 반환
+
+    base_dts / fac_ids 는 디렉터리 단위로, where(pyarrow 식)는 행 그룹 min/max 통계로 건너뛴다.
+    """
+    expr = where
+    if base_dts is not None:
+        cond = ds.field('BASE_DT').isin([str(v) for v in ([base_dts] if isinstance(base_dts, str) else base_dts)])
+        expr = cond if expr is None else expr & cond
+    if fac_ids is not None:
+        cond = ds.field('FAC_ID').isin([str(v) for v in ([fac_ids] if isinstance(fac_ids, str) else fac_ids)])
+        expr = cond if expr is None else expr & cond
+    return open_dataset(root, name).to_table(columns=columns, filter=expr).to_pandas()
+
+# ==============================================================================
+# 메인 실행 함수 (runner 출력 파티션 → 데이터셋 게시)
+# ==============================================================================
+def parse_args():
+    parser = argparse.ArgumentParser(description='리포트 결과(output/<리포트>/BASE_DT=*/data.parquet)를 '
+                                                 'BASE_DT / FAC_ID 파티션 데이터셋으로 게시')
+    parser.add_argument('--reports', nargs='+', required=True)
+    parser.add_argument('--output-dir', default=str(BASE_DIR / 'output'), help='wafering_runner 출력 디렉터리')
+    parser.add_argument('--dataset-dir', default=str(DATASET_DIR))
+    parser.add_argument('--dates', nargs='+', metavar='YYYYMMDD', help='게시할 일자 (기본: 완료된 전체 일자)')
+    return parser.parse_args()
+
+
+def main():
+    # wafering_runner 가 이 모듈을 쓰므로 출력 경로 규칙은 실행 시점에 가져옴
+    from wafering_runner import SUCCESS_MARKER, partition_dir
+
+    args = parse_args()
+    try:
+        for name in args.reports:
+            days = sorted(p.name.split('=', 1)[1] for p in Path(args.output_dir, name).glob('BASE_DT=*'))
+            for base_dt in days:
+                if args.dates and base_dt not in args.dates:
+                    continue
+                part_dir = partition_dir(args.output_dir, name, base_dt)
+                if not (part_dir / SUCCESS_MARKER).exists():
+                    print(f"[{name}] {base_dt} 미완료 파티션 건너뜀")
+                    continue
+                publish_dataset(part_dir / 'data.parquet', args.dataset_dir, name, base_dt)
+    except Exception as e:
+        print(f"데이터셋 게시 중 오류 발생: {e}")
+        sys.exit(1)
+
+# 실행
+if __name__ == "__main__":
+    main()
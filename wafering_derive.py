@@ -0,0 +1,813 @@
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from decimal import Decimal, ROUND_HALF_UP
+
+import numpy as np
+import pandas as pd
+
+from wafering_common import (DEFAULT_DECODE_PROCESSES, DEFAULT_RESULT_ENCODING, RESULT_ENCODINGS,
+                              create_trino_connection, open_cursor)
+from wafering_fetch import DEFAULT_BATCH_SIZE, fetch_frame
+from wafering_masters import MasterStore
+from wafering_metrics import record_query
+from wafering_part_no import PIMS_COLUMNS, PartNoStore, apply_part_no, resolve_part_no, with_part_no
+from wafering_runner import (DEFAULT_WORKERS, OUTPUT_DIR, build_report_query, date_range, report_template,
+                             write_partition_frame)
+from wafering_sql import DEFAULT_EXECUTE_MODE, DEFAULT_PARAMS, EXECUTE_MODES, execute_template, load_template
+
+# ==============================================================================
+# 단일 스캔 파생 모드 설정
+# ==============================================================================
+# WAF 단위 기준 데이터 1회 조회 → WAF Grid / LOT Grid 를 로컬에서 계산
+# 전제: LOT 테이블(DM_PP_AC_TOTALFAULTDTLSTD_S) = WAF 테이블(..WAFSTD_S)의 LOT 컬럼 기준 합계
+# 일별 Loss Rate 는 원본 리포트와 같이 LOT 테이블(+ 보정)을 집계 키 단위 합계로 따로 1회 조회
+# 폐기(3410)는 LOT 테이블의 원본 행이 창고폐기 제외 등 WAF 합계와 다를 수 있어
+# 폐기 LOT(..TOTALREJDTLSTD_S) / 폐기 WAF(..TOTALREJDTLWAFSTD_S + 보정) 를 같은 작업에서 각각 1회 조회
+PIMS_IN_CHUNK = 1000            # PART_NO 조회 시 PROD_ID IN 목록 최대 길이 (IGOT_ID 도 동일)
+LOSS_TEAM_TARGETS = ('A', 'L')  # 팀부서그룹 TARGET_DIV_CD (A=전체, L=Loss, R=폐기)
+SCRAP_TEAM_TARGETS = ('A', 'R')
+DECIMAL_SCALE = Decimal('1e-16')  # DECIMAL(24,16)
+
+# ==============================================================================
+# 조회 템플릿 (sql/derive_*.sql, 파라미터는 DEFAULT_PARAMS + base_dt)
+# ==============================================================================
+# 기준 데이터: 기준정보 조인까지 SQL 로 (masters 미사용) / 팩트 행만 (masters 로 로컬 조인)
+BASE_TEMPLATES = {
+    'base': ('derive_base', 'derive_fact'),
+    'loss': ('derive_loss_base', 'derive_loss_fact'),
+    'scrap_lot': ('derive_scrap_lot_base', 'derive_scrap_lot_fact'),
+    'scrap_waf': ('derive_scrap_waf_base', 'derive_scrap_waf_fact'),
+}
+# 소형 기준정보 (masters 가 주어지면 master_dimensions / 생산실적 로컬 조인으로 대체되는 항목 제외)
+DIMENSION_TEMPLATES = ('rej_alias', 'grade_codes', 'team_group', 'scrap_team_group', 'eqp_hist', 'eqp_apply',
+                       'daily_goal', 'eqp_name', 'scrap_goal', 'reject_sort', 'production')
+
+
+def derive_params(base_dt, params=None):
+    """템플릿 바인딩 파라미터 (params 로 DEFAULT_PARAMS 의 waf_size / oper_div_l / fac_ids 를 바꿀 수 있음)"""
+    return {**DEFAULT_PARAMS, **(params or {}), 'base_dt': base_dt}
+
+
+def dimension_query(name, params):
+    """기준정보 이름 → (템플릿 이름, 파라미터) (팀그룹은 Loss / 폐기 대상 구분만 다름)"""
+    if name == 'team_group':
+        return 'derive_team_group', {**params, 'team_targets': LOSS_TEAM_TARGETS}
+    if name == 'scrap_team_group':
+        return 'derive_team_group', {**params, 'team_targets': SCRAP_TEAM_TARGETS}
+    return f'derive_{name}', params
+
+# ==============================================================================
+# 조회 실행
+# ==============================================================================
+def _query_frame(conn, template_name, params, batch_size=DEFAULT_BATCH_SIZE, metric=None,
+                 execute_mode=DEFAULT_EXECUTE_MODE):
+    """sql/<template_name>.sql 실행 결과, metric=(이름, 기준일자) 가 주어지면 서버 실행 통계를 wafering_metrics 에 기록"""
+    cur = open_cursor(conn)
+    try:
+        execute_template(cur, template_name, params, mode=execute_mode)
+        started = time.perf_counter()
+        df = fetch_frame(cur, batch_size=batch_size)
+        if metric is not None:
+            record_query(*metric, cur, sql=load_template(template_name), status='ok', rows=len(df),
+                         fetch_sec=round(time.perf_counter() - started, 3))
+    finally:
+        cur.close()
+    df.columns = [c.lower() for c in df.columns]
+    # 로컬 조인/집계는 SQL 과 같은 값 비교가 되도록 category 를 일반 컬럼으로 풀어서 사용
+    for col in df.columns:
+        if isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype(object)
+    return df
+
+
+def load_day(conn, base_dt, batch_size=DEFAULT_BATCH_SIZE, masters=None, part_nos=None, params=None,
+             execute_mode=DEFAULT_EXECUTE_MODE):
+    """기준 데이터(불량 WAF, 불량 LOT 합계, 폐기 LOT, 폐기 WAF+보정) 각 1회 + 기준정보 조회 결과 dict
+
+    masters(MasterStore)가 주어지면 팩트 행만 조회하고 공정/제품/기준일 조인과
+    Alias·등급명·팀그룹 조회는 로컬 스냅샷으로 처리한다 (불량/폐기가 같은 스냅샷 공유).
+    part_nos(PartNoStore)가 주어지면 PART_NO 도 로컬 스냅샷에서 당일 PROD_ID 만 골라 쓴다.
+    params 는 derive_params 참고 (기본 DEFAULT_PARAMS).
+    """
+    params = derive_params(base_dt, params)
+
+    def query(template_name, query_params=params, metric=None):
+        return _query_frame(conn, template_name, query_params, batch_size, metric, execute_mode)
+
+    data = {}
+    for name, (base_template, fact_template) in BASE_TEMPLATES.items():
+        if masters is None:
+            data[name] = query(base_template, metric=(f'derive_{name}', base_dt))
+        else:
+            data[name] = query(fact_template, metric=(fact_template, base_dt))
+    if masters is not None:
+        data['base'] = enrich_facts(data['base'], masters, params)
+        data['loss'] = enrich_loss_facts(data['loss'], masters, params)
+        data['scrap_lot'] = enrich_scrap_facts(data['scrap_lot'], masters, params)
+        data['scrap_waf'] = enrich_scrap_facts(data['scrap_waf'], masters, params)
+        data.update(master_dimensions(masters, params))
+        data['production'] = _left_join(query('derive_production_fact'),
+                                        masters.frame('prod')[['prod_id', 'tst_forml_flag']], ['prod_id'], ['prod_id'])
+    for name in DIMENSION_TEMPLATES:
+        if name not in data:
+            data[name] = query(*dimension_query(name, params))
+
+    prod_ids = sorted(set(data['base']['prod_id'].dropna())
+                      | set(data['scrap_lot']['prod_id'].dropna())
+                      | set(data['scrap_waf']['prod_id'].dropna()))
+    if part_nos is None:
+        data['pims'] = with_part_no(_chunked_frame(query, prod_ids, 'prod_ids', {'pims': 'derive_pims'},
+                                                   {'pims': PIMS_COLUMNS}, params)['pims'])
+    else:
+        data['pims'] = part_nos.frame(prod_ids)
+
+    igot_ids = sorted(data['scrap_waf']['igot_id'].dropna().unique())
+    data.update(_chunked_frame(query, igot_ids, 'igot_ids', {'waf_blk': 'derive_waf_blk', 'waf_cut': 'derive_waf_cut'},
+                               {'waf_blk': ['igot_id', 'waf_seq', 'blk_id'],
+                                'waf_cut': ['igot_id', 'waf_seq', 'waf_cut_lo']}, params))
+    return data
+
+
+def _chunked_frame(query, values, param, templates, columns, params):
+    """IN 목록(param)을 PIMS_IN_CHUNK 단위로 나눠 템플릿별로 조회 후 이름별로 합침 (값이 없으면 빈 프레임)"""
+    frames = {name: [] for name in columns}
+    for i in range(0, len(values), PIMS_IN_CHUNK):
+        chunk_params = {**params, param: tuple(values[i:i + PIMS_IN_CHUNK])}
+        for name, template_name in templates.items():
+            frames[name].append(query(template_name, chunk_params))
+    return {name: pd.concat(parts, ignore_index=True) if parts else pd.DataFrame(columns=columns[name])
+            for name, parts in frames.items()}
+
+# ==============================================================================
+# SQL 의미를 그대로 따르는 로컬 연산
+# ==============================================================================
+def _left_join(left, right, left_on, right_on):
+    """SQL LEFT JOIN: NULL 키는 매칭되지 않고, 오른쪽 중복 행만큼 왼쪽 행이 늘어난다"""
+    right = right.dropna(subset=right_on)
+    merged = left.merge(right, how='left', left_on=left_on, right_on=right_on, suffixes=('', '_r'))
+    drop = [c for c in right_on if c not in left_on and c in merged.columns]
+    return merged.drop(columns=drop)
+
+
+def _inner_join(left, right, left_on, right_on):
+    """SQL INNER JOIN: NULL 키 행은 양쪽 모두 제외"""
+    merged = left.dropna(subset=left_on).merge(right.dropna(subset=right_on), how='inner',
+                                               left_on=left_on, right_on=right_on, suffixes=('', '_r'))
+    drop = [c for c in right_on if c not in left_on and c in merged.columns]
+    return merged.drop(columns=drop)
+
+
+def _coalesce(*series):
+    result = series[0]
+    for s in series[1:]:
+        result = result.where(result.notna(), s)
+    return result
+
+
+def _double_to_decimal(value):
+    """CAST(double AS DECIMAL(24,16)) : BigDecimal.valueOf(double) → HALF_UP"""
+    if value is None or pd.isna(value):
+        return None
+    d = Decimal(repr(float(value))).quantize(DECIMAL_SCALE, rounding=ROUND_HALF_UP)
+    return d.copy_abs() if d.is_zero() else d  # DECIMAL 에는 -0 이 없음 (-0.0 → 0)
+
+
+def _to_decimal(value):
+    """CAST(decimal AS DECIMAL(24,16)) : HALF_UP (double 이면 double 규칙)"""
+    if value is None or pd.isna(value):
+        return None
+    if isinstance(value, Decimal):
+        return value.quantize(DECIMAL_SCALE, rounding=ROUND_HALF_UP)
+    return _double_to_decimal(value)
+
+# ==============================================================================
+# 기준정보 스냅샷 기반 로컬 조인 (wafering_masters.MasterStore)
+# ==============================================================================
+def enrich_facts(facts, masters, params):
+    """derive_base.sql 의 BASEDATE / PROD_M(PS) / STDPOPER_M 조인을 로컬에서 수행"""
+    bd = masters.frame('basedate').astype(object)
+    bd = bd.assign(base_dt_name=bd['base_dt'], week_day_nm=bd['besof_base_yw_nm'].str[2:])
+    df = _inner_join(facts, bd[['base_dt', 'base_dt_name', 'week_day_nm']], ['base_dt'], ['base_dt'])
+
+    prod = masters.frame('prod')[['prod_id', 'cust_site_nm', 'grd_cd_nm', 'grd_cd_nm_ps']]
+    df = _left_join(df, prod, ['prod_id'], ['prod_id'])
+
+    oper = masters.frame('stdpoper')
+    oper = oper[oper['oper_div_l'] == params['oper_div_l']][['fac_id', 'oper_id', 'oper_div_l']]
+    return _inner_join(df, oper, ['fac_id', 'oper_id'], ['fac_id', 'oper_id'])
+
+
+def enrich_loss_facts(facts, masters, params):
+    """derive_loss_base.sql 의 STDPOPER_M 조인과 PN 제품 행 수(PN_ROWS)를 로컬에서 계산"""
+    oper = masters.frame('stdpoper')
+    oper = oper[oper['oper_div_l'] == params['oper_div_l']][['fac_id', 'oper_id', 'oper_div_l']]
+    df = _inner_join(facts, oper, ['fac_id', 'oper_id'], ['fac_id', 'oper_id'])
+
+    prod = masters.frame('prod')
+    pn = prod[(prod['spec_div_cd'] == 'PS') & ((prod['grd_cd_nm'] == 'PN') | (prod['grd_cd_nm_ps'] == 'PN'))]
+    pn_rows = pn.dropna(subset=['prod_id']).groupby('prod_id').size().rename('pn_rows').reset_index()
+    return _left_join(df, pn_rows, ['prod_id'], ['prod_id'])
+
+
+def enrich_scrap_facts(facts, masters, params):
+    """derive_scrap_*_base.sql 의 BASEDATE / PROD_M(PS) / STDPOPER_M 조인을 로컬에서 수행"""
+    bd = masters.frame('basedate').astype(object)
+    bd = bd.assign(week_day_nm=bd['besof_base_yw_nm'].str[2:])
+    df = _inner_join(facts, bd[['base_dt', 'week_day_nm']], ['base_dt'], ['base_dt'])
+
+    prod = masters.frame('prod')[['prod_id', 'grd_cd_nm', 'grd_cd_nm_ps']]
+    prod = prod.rename(columns={'grd_cd_nm': 'prod_grd_cd_nm', 'grd_cd_nm_ps': 'prod_grd_cd_nm_ps'})
+    df = _left_join(df, prod, ['prod_id'], ['prod_id'])
+
+    oper = masters.frame('stdpoper')
+    oper = oper[(oper['waf_size'] == params['waf_size']) & (oper['oper_div_l'] == params['oper_div_l'])][
+        ['fac_id', 'oper_id']]
+    return _inner_join(df, oper, ['fac_id', 'oper_id'], ['fac_id', 'oper_id'])
+
+
+def _team_group(masters, params, targets):
+    base_dt = params['base_dt']
+    keys = ['teamgrp_cd', 'waf_size', 'oper_div_l']
+    dtl = masters.frame('lossrejgrpdtl')
+    dtl = dtl[dtl['target_div_cd'].isin(list(targets))
+              & (dtl['waf_size'] == params['waf_size'])
+              & (dtl['oper_div_l'] == params['oper_div_l'])
+              & dtl['ed_dt'].notna() & (dtl['ed_dt'].astype(str) >= base_dt)
+              & dtl['st_dt'].notna() & (dtl['st_dt'].astype(str) <= base_dt)]
+    team = _inner_join(dtl, masters.frame('lossrejgrp'), keys, keys)
+    return team[['dpt_cd', 'st_dt', 'teamgrp_nm', 'sort_seq']].reset_index(drop=True)
+
+
+def master_dimensions(masters, params):
+    """DIMENSION_TEMPLATES 중 스냅샷으로 대체 가능한 항목 (rej_alias, grade_codes, 팀그룹 Loss/폐기)"""
+    rej = masters.frame('rejrsninfo')
+    rej = rej[(rej['waf_size'] == params['waf_size'])
+              & (rej['prod_div_cd'] == ('PW' if params['oper_div_l'] == 'WF' else 'EPI'))]
+    return {
+        'rej_alias': rej[['rej_rsn_grp', 'rej_rsn_cd', 'alias_rsn_cd']].reset_index(drop=True),
+        'grade_codes': masters.frame('fx_codes')[['cd_val', 'cd_nm']].reset_index(drop=True),
+        'team_group': _team_group(masters, params, LOSS_TEAM_TARGETS),
+        'scrap_team_group': _team_group(masters, params, SCRAP_TEAM_TARGETS),
+    }
+
+# ==============================================================================
+# WAF Grid (3210_DATA_WAF_wafering_300_trino.py 의 step5_part_no)
+# ==============================================================================
+WAF_COLUMNS = [
+    'waf_id', 'waf_seq', 'waf_size', 'base_dt', 'div_cd', 'rej_div_cd', 'fac_id', 'oper_id',
+    'ownr_cd', 'cret_cd', 'prod_id', 'igot_id', 'blk_id', 'sublot_id', 'user_lot_id', 'eqp_id',
+    'cust_site_nm', 'rej_group', 'oper1_group', 'oper2_group', 'respon', 'allo_group',
+    'respon_ratio', 'in_qty', 'out_qty', 'loss_qty', 'real_dpt_group', 'hst_reg_dttm',
+    'data_type', 'data_chg_dttm', 'base_dt_name', 'grd_cd_nm_cs', 'grd_cd_nm_ps', 'oper_div_l',
+    'week_day_nm', 'bef_bad_rsn_cd', 'aft_bad_rsn_cd', 'part_no',
+]
+
+
+def derive_waf_grid(data):
+    df = data['base']
+    alias = data['rej_alias'][['rej_rsn_grp', 'rej_rsn_cd', 'alias_rsn_cd']]
+
+    # 일반 LEFT JOIN (중복 Alias 가 있으면 SQL 과 같이 행이 늘어남)
+    df = _left_join(df, alias.rename(columns={'alias_rsn_cd': 'bef_alias'}),
+                    ['rej_group', 'bef_bad_rsn_cd'], ['rej_rsn_grp', 'rej_rsn_cd'])
+    df = _left_join(df, alias.rename(columns={'alias_rsn_cd': 'aft_alias'}),
+                    ['rej_group', 'aft_bad_rsn_cd'], ['rej_rsn_grp', 'rej_rsn_cd'])
+    df['bef_bad_rsn_cd'] = _coalesce(df['bef_alias'], df['bef_bad_rsn_cd'])
+    df['aft_bad_rsn_cd'] = _coalesce(df['aft_alias'], df['aft_bad_rsn_cd'])
+    df['grd_cd_nm_cs'] = df['grd_cd_nm']
+
+    df = apply_part_no(df, data['pims'])
+    return df[WAF_COLUMNS].reset_index(drop=True)
+
+# ==============================================================================
+# LOT Grid (3210_DATA_LOT_wafering_300_trino.py)
+# ==============================================================================
+LOT_GROUP_KEYS = [
+    'data_type', 'waf_size', 'base_dt', 'div_cd', 'rej_div_cd', 'fac_id', 'oper_id', 'ownr_cd',
+    'cret_cd', 'prod_id', 'igot_id', 'blk_id', 'sublot_id', 'user_lot_id', 'eqp_id', 'rej_group',
+    'oper1_group', 'oper2_group', 'respon', 'allo_group', 'respon_ratio', 'real_dpt_group',
+    'grd_cd_nm_cs', 'grd_cd_nm_ps', 'cust_site_nm', 'week_day_nm',
+    'bef_bad_rsn_cd', 'aft_bad_rsn_cd', 'bef_raw', 'aft_raw',
+]
+LOT_COLUMNS = [
+    'waf_size', 'base_dt', 'div_cd', 'rej_div_cd', 'fac_id', 'oper_id', 'ownr_cd', 'cret_cd',
+    'prod_id', 'igot_id', 'blk_id', 'sublot_id', 'user_lot_id', 'eqp_id', 'bef_bad_rsn_cd',
+    'aft_bad_rsn_cd', 'rej_group', 'oper1_group', 'oper2_group', 'respon', 'allo_group',
+    'respon_ratio', 'in_qty', 'out_qty', 'loss_qty', 'real_dpt_group', 'grd_cd_nm_cs',
+    'grd_cd_nm_ps', 'cust_site_nm', 'week_day_nm', 'data_chg_dttm',
+    'creq_t1', 'creq_t2', 'creq_t3', 'creq_v1', 'creq_v2', 'creq_v3',
+    'eqp_nm', 'teamgrp_nm', 'sort_cd', 'n_dpt_group', 'part_no',
+]
+
+
+def derive_lot_grid(data):
+    df = data['base']
+
+    # ROW_NUMBER() ... RN = 1 : (REJ_RSN_GRP, REJ_RSN_CD) 당 1건, Alias 는 TRIM 적용
+    alias = data['rej_alias'].dropna(subset=['rej_rsn_grp', 'rej_rsn_cd']) \
+                             .drop_duplicates(['rej_rsn_grp', 'rej_rsn_cd'])
+    alias = alias.assign(alias_rsn_cd=alias['alias_rsn_cd'].astype(object).str.strip())
+    df = df.assign(bef_raw=df['bef_bad_rsn_cd'], aft_raw=df['aft_bad_rsn_cd'])
+    df = _left_join(df, alias.rename(columns={'alias_rsn_cd': 'bef_alias'}),
+                    ['rej_group', 'bef_raw'], ['rej_rsn_grp', 'rej_rsn_cd'])
+    df = _left_join(df, alias.rename(columns={'alias_rsn_cd': 'aft_alias'}),
+                    ['rej_group', 'aft_raw'], ['rej_rsn_grp', 'rej_rsn_cd'])
+    df['bef_bad_rsn_cd'] = _coalesce(df['bef_alias'], df['bef_raw'])
+    df['aft_bad_rsn_cd'] = _coalesce(df['aft_alias'], df['aft_raw'])
+
+    # 등급 코드명 (TB_FX_CODES)
+    codes = data['grade_codes'][['cd_val', 'cd_nm']]
+    df = _left_join(df, codes.rename(columns={'cd_nm': 'grd_cd_nm_cs'}), ['grd_cd_nm'], ['cd_val'])
+    df = _left_join(df, codes.rename(columns={'cd_nm': 'grd_cd_nm_ps_nm'}), ['grd_cd_nm_ps'], ['cd_val'])
+    df['grd_cd_nm_ps'] = df['grd_cd_nm_ps_nm']
+
+    # WAF → LOT 집계 (원본/보정은 UNION ALL 각각이므로 DATA_TYPE 별로 따로 묶음)
+    z = df.groupby(LOT_GROUP_KEYS, dropna=False, sort=False).agg(
+        in_qty=('in_qty', lambda s: s.sum(min_count=1)),
+        out_qty=('out_qty', lambda s: s.sum(min_count=1)),
+        loss_qty=('loss_qty', lambda s: s.sum(min_count=1)),
+        data_chg_dttm=('data_chg_dttm', 'max'),
+    ).reset_index()
+
+    # Z_WITH_PIMS
+    pims = data['pims']
+    z = _left_join(z, pims[PIMS_COLUMNS], ['prod_id'], ['ms_code'])
+
+    # 팀부서그룹: DPT_CD 별 ST_DT 가 가장 늦은 1건 (LATERAL ... ORDER BY ST_DT DESC LIMIT 1)
+    team = data['team_group'].sort_values('st_dt', ascending=False, kind='stable') \
+                             .drop_duplicates('dpt_cd')[['dpt_cd', 'teamgrp_nm', 'sort_seq']]
+    z = _left_join(z, team.rename(columns={'sort_seq': 'sort_cd'}), ['real_dpt_group'], ['dpt_cd'])
+
+    # 설비명: X2(STDPEQP_M) 는 X1(STDPEQP_H) 에 붙으므로 X1 ⟕ X2 를 먼저 만든 뒤 Z 에 조인
+    eqp = _left_join(data['eqp_hist'], data['eqp_apply'][['fac_id', 'eqp_id']].assign(_apply=1),
+                     ['fac_id', 'eqp_id'], ['fac_id', 'eqp_id'])
+    z = _left_join(z, eqp, ['fac_id', 'eqp_id'], ['fac_id', 'eqp_id'])
+
+    z['n_dpt_group'] = _coalesce(z['teamgrp_nm'], z['real_dpt_group'])
+    z['part_no'] = resolve_part_no(z['creq_t1'], z['creq_t2'], z['creq_t3'],
+                                   z['creq_v1'], z['creq_v2'], z['creq_v3'], after_colon=True)
+    # CASE 의 ELSE ' ' 이전 분기에서 값이 NULL 이면 NULL 유지
+    return z[LOT_COLUMNS].reset_index(drop=True)
+
+# ==============================================================================
+# 일별 Loss Rate (3210_DATA_wafering_300_trino.py 의 FINAL_DATA)
+# ==============================================================================
+LOSS_COLUMNS = [
+    'category', 'base_dt_nm', 'rej_group', 'aft_bad_rsn_cd', 'loss_ratio', 'goal_ratio',
+    'goal_ratio_sum', 'gap_ratio', 'loss_qty', 'mgr_qty', 'com_qty', 'sort_cd', 'prod_grp',
+    'eqp_nm', 'eqp_model_nm', 'category_name',
+]
+
+
+def derive_loss_rate(data, base_dt):
+    df = data['loss']
+    # CONCAT(WAF_SIZE, OPER_DIV_L) NOT IN ('200WF', '300EPI')
+    df = df[~(df['waf_size'].astype(str) + df['oper_div_l'].astype(str)).isin(['200WF', '300EPI'])]
+    base_dt_nm = datetime.strptime(base_dt, '%Y%m%d').strftime('%y-%m-%d')
+
+    # 분자: DIV_CD <> 'COM_QTY' (NULL 은 제외), RESC_HG_QTY 는 BEF 코드 사용 (Alias 미적용)
+    loss = df[df['div_cd'].notna() & (df['div_cd'] != 'COM_QTY')]
+    aft = _coalesce(loss['bef_bad_rsn_cd'].where(loss['div_cd'] == 'RESC_HG_QTY', loss['aft_bad_rsn_cd']),
+                    pd.Series('N/A', index=loss.index))
+    # LEFT JOIN DW_BA_MS_PROD_M D (PS, PN) : 매칭되는 제품 행 수만큼 분자가 늘어남 (분모는 조인 없음)
+    loss = loss.assign(aft_bad_rsn_cd=aft, loss_qty=loss['loss_qty'] * loss['pn_rows'].fillna(1).astype('int64'))
+    mgr_loss = loss.groupby(['rej_group', 'aft_bad_rsn_cd', 'bef_bad_rsn_cd'], dropna=False, sort=False) \
+                   .agg(loss_qty=('loss_qty', lambda s: s.sum(min_count=1))).reset_index()
+
+    # 분모: COM_QTY 행의 IN_QTY 합계 (일자 1건, REJ_GROUP_LIST 전체에 동일 적용)
+    com = df[df['div_cd'] == 'COM_QTY']
+    mgr_qty = com['in_qty'].sum(min_count=1) if len(com) else None
+    mgr_qty = None if mgr_qty is None or pd.isna(mgr_qty) else mgr_qty
+
+    goal = data['daily_goal'].dropna(subset=['rej_group']).set_index('rej_group')['goal_ratio']
+    goals = mgr_loss['rej_group'].map(goal)
+
+    ratio = []
+    goal_ratio = []
+    gap_ratio = []
+    mgr_values = []
+    for rej_group, loss_qty, g in zip(mgr_loss['rej_group'], mgr_loss['loss_qty'], goals):
+        # C.REJ_GROUP = L.REJ_GROUP : NULL REJ_GROUP 은 분모와 조인되지 않음
+        mgr = None if rej_group is None or pd.isna(rej_group) else mgr_qty
+        mgr_values.append(mgr)
+        g = None if g is None or pd.isna(g) else g
+        g_dec = Decimal(0) if g is None else g            # COALESCE(G.GOAL_RATIO, 0.0)
+        g_dbl = float(g_dec)
+        if mgr is not None and mgr > 0:
+            # CAST(L.LOSS_QTY AS DOUBLE) / NULLIF(C.MGR_QTY, 0) : LOSS_QTY 가 NULL 이면 NULL
+            r = None if loss_qty is None or pd.isna(loss_qty) else float(loss_qty) / float(mgr)
+            ratio.append(_double_to_decimal(r))
+            gap_ratio.append(_double_to_decimal(None if r is None else r - g_dbl))
+        else:
+            ratio.append(_double_to_decimal(0.0))
+            gap_ratio.append(_double_to_decimal(-g_dbl))
+        goal_ratio.append(_to_decimal(g_dec))
+
+    final = pd.DataFrame({
+        'category': 'D',
+        'base_dt_nm': base_dt_nm,
+        'rej_group': mgr_loss['rej_group'].values,
+        'aft_bad_rsn_cd': mgr_loss['aft_bad_rsn_cd'].values,
+        'loss_ratio': ratio,
+        'goal_ratio': goal_ratio,
+        'goal_ratio_sum': goal_ratio,
+        'gap_ratio': gap_ratio,
+        'loss_qty': mgr_loss['loss_qty'].values,
+        'mgr_qty': mgr_values,
+        'com_qty': None,
+        'sort_cd': 99999,
+        'prod_grp': 'N/A',
+        'eqp_nm': 'N/A',
+        'eqp_model_nm': 'N/A',
+        'category_name': '일',
+    }, columns=LOSS_COLUMNS)
+    # ORDER BY BASE_DT_NM, REJ_GROUP, LOSS_QTY DESC (NULL 은 마지막)
+    final = final.sort_values(['rej_group', 'loss_qty'], ascending=[True, False],
+                              na_position='last', kind='stable')
+    return final.reset_index(drop=True)
+
+# ==============================================================================
+# 폐기 공통 (3410 쿼리의 Alias / 부서그룹 / 등급명 / 팀그룹 규칙)
+# ==============================================================================
+def _scrap_alias(data):
+    """ROW_NUMBER() ... RN = 1, COALESCE(NULLIF(TRIM(ALIAS_RSN_CD), ''), STD_REJ_RSN_CD) 용 Alias"""
+    alias = data['rej_alias'].dropna(subset=['rej_rsn_grp', 'rej_rsn_cd']) \
+                             .drop_duplicates(['rej_rsn_grp', 'rej_rsn_cd'])
+    alias_cd = alias['alias_rsn_cd'].astype(object).str.strip()
+    # 폐기 팩트에도 REJ_RSN_CD 컬럼이 있어 조인 키 이름을 바꿔서 사용
+    alias = alias.assign(std_alias=alias_cd.where(alias_cd != '', None))
+    return alias.rename(columns={'rej_rsn_grp': 'alias_grp', 'rej_rsn_cd': 'alias_cd'})[
+        ['alias_grp', 'alias_cd', 'std_alias']]
+
+
+def _scrap_dpt_group(df):
+    """2021년 이전 EPIRW 배분(ALLO, RATIO < 1) 행은 'EPI기술2팀', 그 외 REAL_DPT_GROUP"""
+    epi2 = ((df['base_dt'].astype(object) < '20210101') & (df['ownr_cd'] == 'EPIRW') & (df['waf_size'] == '300')
+            & (df['prod_div_cd'] == 'EPI') & (df['respon'] == 'ALLO') & (df['ratio'] < 1)).fillna(False).astype(bool)
+    return df['real_dpt_group'].where(~epi2, 'EPI기술2팀')
+
+
+def _scrap_rows(df, data, grades=True):
+    """Alias(STD_REJ_RSN_CD) / 부서그룹 적용, grades 면 등급명(CS, PS)도 조인 (폐기율 쿼리는 미조인)"""
+    df = df.assign(std_raw=df['std_rej_rsn_cd'])
+    df = _left_join(df, _scrap_alias(data), ['rj_group', 'std_raw'], ['alias_grp', 'alias_cd'])
+    df['std_rej_rsn_cd'] = _coalesce(df['std_alias'], df['std_raw'])
+    df['real_dpt_group'] = _scrap_dpt_group(df)
+    if not grades:
+        return df
+
+    codes = data['grade_codes'][['cd_val', 'cd_nm']]
+    df = _left_join(df, codes.rename(columns={'cd_nm': 'grd_cd_nm_cs'}), ['prod_grd_cd_nm'], ['cd_val'])
+    df = _left_join(df, codes.rename(columns={'cd_nm': 'grd_cd_nm_ps'}), ['prod_grd_cd_nm_ps'], ['cd_val'])
+    return df
+
+
+def _scrap_team(data):
+    """폐기 팀부서그룹 (A, R): DPT_CD 별 ST_DT 최신 1건"""
+    return data['scrap_team_group'].sort_values('st_dt', ascending=False, kind='stable') \
+                                   .drop_duplicates('dpt_cd')[['dpt_cd', 'teamgrp_nm']]
+
+# ==============================================================================
+# 폐기 WAF Grid (3410_DATA_WAF_wafering_300_trino.py)
+# ==============================================================================
+SCRAP_WAF_COLUMNS = [
+    'waf_id', 'waf_seq', 'base_dt', 'waf_size', 'rej_div_cd', 'rej_dtl_div_cd', 'trst_dttm', 'fac_id',
+    'igot_id', 'lot_id', 'user_lot_id', 'prod_id', 'bef_prod_id', 'wrkr_id', 'ownr_cd', 'cret_cd', 'eqp_id',
+    'oper_id', 'org_oper_id', 'last_oper_id', 'rej_rsn_cd', 'rej_rsn_cd2', 'org_rej_rsn_cd', 'rev_rej_rsn_cd',
+    'std_rej_rsn_cd', 'rj_group', 'rsn_div_cd', 'prod_div_cd', 'rej_rsn_div_cd', 'mt_id', 'grd_cd_nm',
+    'test_type', 'cust_stie', 'oper1_group', 'oper2_group', 'respon', 'allo_group', 'ratio', 'qty',
+    'real_dpt_group', 'blk_id', 'data_chg_dttm', 'week_day_nm', 'waf_cut_lo', 'data_type',
+    'grd_cd_nm_cs', 'grd_cd_nm_ps', 'part_no', 'mt_info', 'n_dpt_group', 'eqp_nm',
+]
+
+
+def derive_scrap_waf_grid(data):
+    df = data['scrap_waf']
+    # 창고폐기 제외는 보정(MNL) 행에도 적용 (원본은 조회 시 제외)
+    df = df[df['rej_dtl_div_cd'].fillna('') != '창고']
+    df = _scrap_rows(df, data)
+    df['data_chg_dttm'] = pd.NaT                # 원본 쿼리와 같이 NULL (보정 행 포함)
+
+    df = _left_join(df, data['waf_blk'][['igot_id', 'waf_seq', 'blk_id']],
+                    ['igot_id', 'waf_seq'], ['igot_id', 'waf_seq'])
+    df = _left_join(df, data['waf_cut'][['igot_id', 'waf_seq', 'waf_cut_lo']],
+                    ['igot_id', 'waf_seq'], ['igot_id', 'waf_seq'])
+    # WAF_ID 가 없는 행은 F_GET_WAF_CUT_POS 대상 → Trino 쿼리와 같이 NULL
+    no_waf = df['waf_id'].astype(object).str.strip().fillna('') == ''
+    df['waf_cut_lo'] = df['waf_cut_lo'].astype(object).where(~no_waf, None)
+
+    df = apply_part_no(df, data['pims'])
+
+    df = _left_join(df, _scrap_team(data), ['real_dpt_group'], ['dpt_cd'])
+    df['n_dpt_group'] = _coalesce(df['teamgrp_nm'], df['real_dpt_group'])
+    df = _left_join(df, data['eqp_name'][['fac_id', 'eqp_id', 'eqp_nm']], ['fac_id', 'eqp_id'], ['fac_id', 'eqp_id'])
+
+    df = df.sort_values(['base_dt', 'waf_id', 'waf_seq'], na_position='last', kind='stable')
+    return df[SCRAP_WAF_COLUMNS].reset_index(drop=True)
+
+# ==============================================================================
+# 폐기 LOT Grid (3410_DATA_LOT_wafering_300_trino.py)
+# ==============================================================================
+SCRAP_LOT_Z_COLUMNS = [
+    'base_dt', 'waf_size', 'rej_div_cd', 'rej_dtl_div_cd', 'trst_dttm', 'fac_id', 'igot_id', 'lot_id',
+    'user_lot_id', 'prod_id', 'bef_prod_id', 'wrkr_id', 'ownr_cd', 'cret_cd', 'eqp_id', 'oper_id',
+    'org_oper_id', 'last_oper_id', 'rej_rsn_cd', 'rej_rsn_cd2', 'org_rej_rsn_cd', 'rev_rej_rsn_cd',
+    'std_rej_rsn_cd', 'rj_group', 'rsn_div_cd', 'prod_div_cd', 'rej_rsn_div_cd', 'mt_id', 'grd_cd_nm',
+    'test_type', 'cust_stie', 'oper1_group', 'oper2_group', 'respon', 'allo_group', 'ratio', 'qty',
+    'real_dpt_group', 'data_chg_dttm', 'week_day_nm', 'grd_cd_nm_cs', 'grd_cd_nm_ps',
+]
+SCRAP_LOT_COLUMNS = SCRAP_LOT_Z_COLUMNS + ['n_dpt_group', 'eqp_nm', 'part_no']
+
+
+def derive_scrap_lot_grid(data, base_dt):
+    # (1-1) 원본 LOT 행 (창고폐기는 조회 시 제외)
+    ori = _scrap_rows(data['scrap_lot'], data)[SCRAP_LOT_Z_COLUMNS]
+
+    # (1-2) 보정: WAF 단위 → LOT 단위 합계 (창고폐기 포함)
+    mnl = data['scrap_waf']
+    mnl = _scrap_rows(mnl[mnl['data_type'] == 'MNL'], data)
+    keys = [c for c in SCRAP_LOT_Z_COLUMNS if c != 'qty']
+    mnl = mnl.groupby(keys, dropna=False, sort=False) \
+             .agg(qty=('qty', lambda s: s.sum(min_count=1))).reset_index()[SCRAP_LOT_Z_COLUMNS]
+    z = pd.concat([ori, mnl], ignore_index=True)
+
+    # 설비명: X1(STDPEQP_H, ED_DT >= BASE_DT) ⟕ X2(STDPEQP_M 적용 설비) → Z 에 조인
+    hist = data['eqp_hist']
+    hist = hist[hist['ed_dt'].notna() & (hist['ed_dt'].astype(str) >= base_dt)][['fac_id', 'eqp_id', 'eqp_nm']]
+    eqp = _left_join(hist, data['eqp_apply'][['fac_id', 'eqp_id']].assign(_apply=1),
+                     ['fac_id', 'eqp_id'], ['fac_id', 'eqp_id'])
+    z = _left_join(z, eqp, ['fac_id', 'eqp_id'], ['fac_id', 'eqp_id'])
+
+    z = _left_join(z, _scrap_team(data), ['real_dpt_group'], ['dpt_cd'])
+    z['n_dpt_group'] = _coalesce(z['teamgrp_nm'], z['real_dpt_group'])
+    z = apply_part_no(z, data['pims'])
+
+    z = z.sort_values('base_dt', kind='stable')
+    return z[SCRAP_LOT_COLUMNS].reset_index(drop=True)
+
+# ==============================================================================
+# 일별 팀 폐기율 (3410_DATA_wafering_300_trino.py)
+# ==============================================================================
+SCRAP_RATE_COLUMNS = [
+    'category', 'base_dt_nm', 'rj_group', 'rej_rsn_cd', 'oper_id', 'dis_ratio', 'goal_ratio',
+    'goal_ratio_sum', 'gap_ratio', 'dis_qty', 'mgr_qty', 'sort_cd',
+]
+
+
+def _sum(s):
+    return s.sum(min_count=1)
+
+
+def _none(v):
+    return None if v is None or pd.isna(v) else v
+
+
+def derive_scrap_rate(data, base_dt):
+    base_dt_nm = datetime.strptime(base_dt, '%Y%m%d').strftime('%y-%m-%d')
+
+    # SCRAP_DATA: 원본 LOT(창고폐기 제외) + 보정(창고폐기 포함), REJ_RSN_CD 는 Alias, 부서는 팀그룹
+    mnl = data['scrap_waf']
+    scrap = pd.concat([data['scrap_lot'], mnl[mnl['data_type'] == 'MNL']], ignore_index=True)
+    scrap = _scrap_rows(scrap, data, grades=False)
+    scrap = _left_join(scrap, _scrap_team(data), ['real_dpt_group'], ['dpt_cd'])
+    total_dis = _none(_sum(scrap['qty'])) if len(scrap) else None
+
+    # 분모: 생산실적(시험/양산 구분 L, N, V 제외) + 폐기실적, 둘 다 없으면 분모 행 없음
+    prod = data['production']
+    prod = prod[~prod['tst_forml_flag'].fillna(' ').isin(['L', 'N', 'V'])]
+    acc_parts = ([_none(_sum(prod['qty']))] if len(prod) else []) + ([total_dis] if len(scrap) else [])
+    acc_values = [v for v in acc_parts if v is not None]
+    acc_qty = sum(acc_values) if acc_values else None
+    mgr_values = ([_none(_sum(prod['qty']))] if len(prod) else []) + ([0] if len(scrap) else [])
+    mgr_values = [v for v in mgr_values if v is not None]
+    mgr_qty = sum(mgr_values) if mgr_values else None
+
+    def ratio(dis_qty):
+        if acc_qty is None or acc_qty == 0:
+            return None
+        return float(dis_qty) / float(acc_qty)
+
+    # (D) 그룹별 폐기율: 분자(HAVING SUM <> 0) + 목표 UNION 후 그룹별 합계
+    s1 = scrap.groupby('rj_group', dropna=False, sort=False).agg(dis_qty=('qty', _sum)).reset_index()
+    s1 = s1[s1['dis_qty'].notna() & (s1['dis_qty'] != 0)]
+    goal = data['scrap_goal'].dropna(subset=['rj_group'])
+    goal = goal[goal['rj_group'] != 'R&D']
+    goal_sum = _none(_sum(goal['goal'])) if len(goal) else None
+
+    groups = {}
+    for rj_group, dis_qty in zip(s1['rj_group'], s1['dis_qty']):
+        key = _none(rj_group)
+        groups[key] = {'ratio': [ratio(dis_qty)], 'dis': [dis_qty],
+                       'mgr': [mgr_qty], 'goal': [0]}
+    for rj_group, g in zip(goal['rj_group'], goal['goal']):
+        entry = groups.setdefault(rj_group, {'ratio': [], 'dis': [], 'mgr': [], 'goal': []})
+        entry['ratio'].append(0.0)
+        entry['dis'].append(0)
+        entry['mgr'].append(0)
+        entry['goal'].append(g)
+
+    def total(values):
+        values = [v for v in values if _none(v) is not None]
+        return sum(values) if values else None
+
+    rows = []
+    for rj_group, entry in groups.items():
+        dis_ratio = total(entry['ratio'])
+        goal_ratio = total(entry['goal'])
+        goal_ratio = Decimal(0) if goal_ratio is None else goal_ratio
+        rows.append({
+            'category': 'D', 'base_dt_nm': base_dt_nm, 'rj_group': rj_group,
+            'rej_rsn_cd': None, 'oper_id': None,
+            'dis_ratio': _double_to_decimal(dis_ratio),
+            'goal_ratio': _to_decimal(goal_ratio),
+            'goal_ratio_sum': _to_decimal(Decimal(0) if goal_sum is None else goal_sum),
+            'gap_ratio': _double_to_decimal(None if dis_ratio is None else dis_ratio - float(goal_ratio)),
+            'dis_qty': total(entry['dis']),
+            'mgr_qty': total(entry['mgr']),
+        })
+
+    # (D-DIS_RSN) 불량코드 / 공정별 상세
+    rsn = scrap.groupby(['rj_group', 'std_rej_rsn_cd', 'oper_id'], dropna=False, sort=False) \
+               .agg(dis_qty=('qty', _sum)).reset_index()
+    rsn = rsn[rsn['dis_qty'].notna() & (rsn['dis_qty'] != 0)]
+    zero = _to_decimal(Decimal('0.0'))
+    for rj_group, rsn_cd, oper_id, dis_qty in zip(rsn['rj_group'], rsn['std_rej_rsn_cd'], rsn['oper_id'],
+                                                  rsn['dis_qty']):
+        rows.append({
+            'category': 'D-DIS_RSN', 'base_dt_nm': base_dt_nm, 'rj_group': _none(rj_group),
+            'rej_rsn_cd': 'UNKNOWN' if _none(rsn_cd) is None else rsn_cd, 'oper_id': _none(oper_id),
+            'dis_ratio': _double_to_decimal(ratio(dis_qty)),
+            'goal_ratio': zero, 'goal_ratio_sum': zero, 'gap_ratio': zero,
+            'dis_qty': dis_qty, 'mgr_qty': 0,
+        })
+
+    final = pd.DataFrame(rows, columns=SCRAP_RATE_COLUMNS[:-1])
+    # R&D 목표는 0.9% 로 일괄 표시 (상세 행 포함)
+    final.loc[final['rj_group'] == 'R&D', 'goal_ratio'] = _to_decimal(Decimal('0.009'))
+    sort = data['reject_sort'][['cd_val', 'sort_order']]
+    final = _left_join(final, sort, ['rj_group'], ['cd_val'])
+    final['sort_cd'] = final['sort_order'].where(final['sort_order'].notna(), 99999)
+    final = final.sort_values(['category', 'base_dt_nm', 'sort_cd', 'rj_group'], na_position='last', kind='stable')
+    return final[SCRAP_RATE_COLUMNS].reset_index(drop=True)
+
+# ==============================================================================
+# 결과 비교 (기존 SQL 리포트와 값 단위 대조)
+# ==============================================================================
+def _canonical_value(v):
+    if v is None or (not isinstance(v, str) and pd.isna(v)):
+        return '<NULL>'
+    if isinstance(v, (bool, np.bool_)):
+        return str(bool(v))
+    if isinstance(v, (int, float, Decimal, np.integer, np.floating)):
+        d = Decimal(repr(float(v))) if isinstance(v, (float, np.floating)) else Decimal(int(v)) \
+            if isinstance(v, np.integer) else Decimal(v)
+        return format(d.normalize(), 'f')
+    if isinstance(v, (datetime, pd.Timestamp)):
+        return pd.Timestamp(v).isoformat()
+    return str(v)
+
+
+def compare_frames(expected, actual):
+    """행 순서를 무시하고 값 단위로 비교, 불일치 정보 dict 반환 (빈 dict = 일치)"""
+    expected = expected.rename(columns=str.lower)
+    actual = actual.rename(columns=str.lower)
+    diff = {}
+    if list(expected.columns) != list(actual.columns):
+        diff['columns'] = {'missing': sorted(set(expected.columns) - set(actual.columns)),
+                           'extra': sorted(set(actual.columns) - set(expected.columns))}
+        return diff
+    if len(expected) != len(actual):
+        diff['rows'] = {'expected': len(expected), 'actual': len(actual)}
+
+    def canonical_rows(df):
+        rows = [tuple(_canonical_value(v) for v in row) for row in df.astype(object).itertuples(index=False)]
+        return sorted(rows)
+
+    exp_rows = canonical_rows(expected)
+    act_rows = canonical_rows(actual)
+    mismatched = {}
+    for e, a in zip(exp_rows, act_rows):
+        for col, ev, av in zip(expected.columns, e, a):
+            if ev != av:
+                mismatched[col] = mismatched.get(col, 0) + 1
+    if mismatched:
+        diff['mismatched_columns'] = mismatched
+    return diff
+
+# ==============================================================================
+# 일자 단위 실행
+# ==============================================================================
+def derive_day(base_dt, output_dir=OUTPUT_DIR, verify=False, batch_size=DEFAULT_BATCH_SIZE, masters=None,
+               encoding=DEFAULT_RESULT_ENCODING, decode_processes=DEFAULT_DECODE_PROCESSES, part_nos=None,
+               execute_mode=DEFAULT_EXECUTE_MODE):
+    """불량/폐기 기준 데이터 각 1회 조회 → 6개 리포트 계산 후 일자 파티션에 저장"""
+    started = time.perf_counter()
+    conn = create_trino_connection(encoding, decode_processes)
+    try:
+        data = load_day(conn, base_dt, batch_size, masters, part_nos, execute_mode=execute_mode)
+        t_fetch = time.perf_counter()
+        frames = {
+            'waf_grid': derive_waf_grid(data),
+            'lot_grid': derive_lot_grid(data),
+            'loss_rate': derive_loss_rate(data, base_dt),
+            'scrap_waf_grid': derive_scrap_waf_grid(data),
+            'scrap_lot_grid': derive_scrap_lot_grid(data, base_dt),
+            'scrap_rate': derive_scrap_rate(data, base_dt),
+        }
+        t_derive = time.perf_counter()
+
+        result = {'base_dt': base_dt, 'base_rows': len(data['base']),
+                  'scrap_rows': len(data['scrap_lot']) + len(data['scrap_waf']),
+                  'fetch_sec': round(t_fetch - started, 3), 'derive_sec': round(t_derive - t_fetch, 3)}
+        for name, df in frames.items():
+            write_partition_frame(df, output_dir, name, base_dt)
+            result[f'{name}_rows'] = len(df)
+
+        if verify:
+            for name, df in frames.items():
+                cur = open_cursor(conn)
+                try:
+                    template = report_template(name)
+                    if template is not None:
+                        execute_template(cur, template[0], template[1](base_dt), mode=execute_mode)
+                    else:
+                        cur.execute(build_report_query(name, base_dt))
+                    expected = fetch_frame(cur, batch_size=batch_size)
+                finally:
+                    cur.close()
+                diff = compare_frames(expected, df)
+                result[f'{name}_verify'] = diff or 'match'
+                print(f"[{name}] {base_dt} 검증: {'일치' if not diff else diff}")
+        return result
+    finally:
+        conn.close()
+
+# ==============================================================================
+# 메인 실행 함수
+# ==============================================================================
+def parse_args():
+    parser = argparse.ArgumentParser(description='불량/폐기 기준 데이터 1회 조회로 WAF/LOT Grid, 일별 Loss Rate·폐기율 계산')
+    parser.add_argument('--date', metavar='YYYYMMDD', help='기준일자 BASE_DT (기본: 어제)')
+    parser.add_argument('--from', dest='from_dt', metavar='YYYYMMDD')
+    parser.add_argument('--to', dest='to_dt', metavar='YYYYMMDD')
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS)
+    parser.add_argument('--output-dir', default=str(OUTPUT_DIR))
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument('--encoding', choices=RESULT_ENCODINGS, default=DEFAULT_RESULT_ENCODING,
+                        help='결과 수신 방식 (기본 rows: 기존 행 단위, json+zstd/json+lz4/json: spooling 세그먼트)')
+    parser.add_argument('--decode-processes', type=int, default=DEFAULT_DECODE_PROCESSES,
+                        help=f'결과 페이지 디코딩 프로세스 수 (기본 0: 사용 안 함, 이 서버 코어 수 {os.cpu_count()})')
+    parser.add_argument('--execute-mode', choices=EXECUTE_MODES, default=DEFAULT_EXECUTE_MODE,
+                        help='immediate: EXECUTE IMMEDIATE 바인딩 (기본), prepare: PREPARE/EXECUTE, literal: 리터럴 SQL')
+    parser.add_argument('--masters', action='store_true',
+                        help='기준정보 조인·PART_NO 를 로컬 스냅샷으로 처리 (실행 전 변경된 테이블/파일만 갱신)')
+    parser.add_argument('--verify', action='store_true',
+                        help='기존 SQL 리포트도 실행해 값 단위로 대조 (검증용, 스캔 6회 추가)')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    if args.from_dt and args.to_dt:
+        base_dates = date_range(args.from_dt, args.to_dt)
+    else:
+        base_dates = [args.date or (datetime.now() - timedelta(days=1)).strftime('%Y%m%d')]
+
+    masters = part_nos = None
+    if args.masters:
+        masters = MasterStore()
+        part_nos = PartNoStore()
+        conn = create_trino_connection()
+        try:
+            for name, state in masters.refresh(conn).items():
+                print(f"기준정보 {name}: {state}")
+            print(f"PART_NO: {part_nos.refresh(conn)}")
+        finally:
+            conn.close()
+
+    failed = False
+    with ThreadPoolExecutor(max_workers=args.workers) as pool:
+        futures = {pool.submit(derive_day, dt, args.output_dir, args.verify, args.batch_size, masters,
+                               args.encoding, args.decode_processes, part_nos, args.execute_mode): dt
+                   for dt in base_dates}
+        for future, dt in futures.items():
+            try:
+                r = future.result()
+                print(f"{dt} 완료 | 기준 행 수: {r['base_rows']}, WAF: {r['waf_grid_rows']}, "
+                      f"LOT: {r['lot_grid_rows']}, Loss: {r['loss_rate_rows']} | "
+                      f"폐기 기준 행 수: {r['scrap_rows']}, WAF: {r['scrap_waf_grid_rows']}, "
+                      f"LOT: {r['scrap_lot_grid_rows']}, 폐기율: {r['scrap_rate_rows']} "
+                      f"(조회 {r['fetch_sec']:.1f}초, 계산 {r['derive_sec']:.1f}초)")
+            except Exception as e:
+                failed = True
+                print(f"{dt} 처리 중 오류 발생: {e}")
+    if failed:
+        sys.exit(1)
+
+# 실행
+if __name__ == "__main__":
+    main()
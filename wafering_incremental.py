@@ -0,0 +1,239 @@
+import argparse
+import hashlib
+import json
+import os
+import sys
+from datetime import datetime, timedelta
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from wafering_common import create_trino_connection, open_cursor
+from wafering_fetch import DEFAULT_BATCH_SIZE, PARQUET_COMPRESSION, fetch_table, write_parquet_stream
+from wafering_masters import build_master_probe_query
+from wafering_part_no import build_files_query
+from wafering_runner import OUTPUT_DIR, SUCCESS_MARKER, WATERMARK_FILE, load_report_module, partition_dir
+from wafering_sql import DEFAULT_EXECUTE_MODE, EXECUTE_MODES, execute_template, load_template
+
+# ==============================================================================
+# 증분 추출 설정 (WAF 단위 Grid)
+# ==============================================================================
+REPORT_NAME = 'waf_grid'
+# 스냅샷 병합 키: WAF_ID/WAF_SEQ/DIV_CD + 한 웨이퍼가 하루에 여러 공정에서 COM_QTY 를 갖고
+# 원본(ORI)/보정(MNL) 행이 UNION ALL 로 따로 존재하므로 OPER_ID, DATA_TYPE 포함
+MERGE_KEYS = ('WAF_ID', 'WAF_SEQ', 'DIV_CD', 'OPER_ID', 'DATA_TYPE')
+CHANGE_COLUMN = 'DATA_CHG_DTTM'
+# 워터마크보다 늦게 커밋되었지만 DATA_CHG_DTTM 은 더 이른 행을 잡기 위해 증분 기준을 이만큼 앞당김
+# (다시 받은 행은 같은 키로 교체되므로 겹쳐도 결과는 같음)
+CHANGE_LAG = timedelta(hours=1)
+# waf_grid 가 조인하는 기준정보 (wafering_masters.MASTERS 이름) - 값이 바뀌면 DATA_CHG_DTTM 과 무관하게 전체 재추출
+TEMPLATE_MASTERS = ('stdpoper', 'prod', 'basedate', 'rejrsninfo')
+
+# ==============================================================================
+# 워터마크 (일자별 최종 DATA_CHG_DTTM)
+# ==============================================================================
+def read_watermark(part_dir):
+    path = part_dir / WATERMARK_FILE
+    if not path.exists() or not (part_dir / 'data.parquet').exists():
+        return None
+    return json.loads(path.read_text(encoding='utf-8'))
+
+
+def write_watermark(part_dir, watermark, rows, mode, masters=None):
+    info = {'data_chg_dttm': watermark, 'rows': rows, 'mode': mode, 'masters': masters,
+            'updated': datetime.now().isoformat()}
+    (part_dir / WATERMARK_FILE).write_text(json.dumps(info, ensure_ascii=False, indent=2), encoding='utf-8')
+
+
+def _column(names, name):
+    """Trino 는 컬럼명을 소문자로 반환하므로 대소문자 무시하고 찾기"""
+    for col in names:
+        if col.upper() == name:
+            return col
+    raise KeyError(name)
+
+
+def max_change_dttm(table):
+    value = pc.max(table.column(_column(table.column_names, CHANGE_COLUMN))).as_py()
+    return None if value is None else pd.Timestamp(value).strftime('%Y-%m-%d %H:%M:%S')
+
+
+def stamp_watermark(part_dir, mode='full', masters=None):
+    """일자 파티션 data.parquet 의 최종 DATA_CHG_DTTM 으로 워터마크 기록 (wafering_runner 가 파티션을 새로 쓴 뒤 호출)
+
+    masters(master_fingerprint)가 없으면 다음 증분 갱신은 기준정보 변경 여부를 알 수 없어 전체 재추출한다.
+    """
+    data_path = part_dir / 'data.parquet'
+    table = pq.read_table(data_path, columns=[_column(pq.read_schema(data_path).names, CHANGE_COLUMN)])
+    write_watermark(part_dir, max_change_dttm(table), table.num_rows, mode, masters)
+
+
+def lagged_since(watermark):
+    """증분 조회 기준 일시 = 워터마크 - CHANGE_LAG"""
+    since = datetime.strptime(watermark, '%Y-%m-%d %H:%M:%S') - CHANGE_LAG
+    return since.strftime('%Y-%m-%d %H:%M:%S')
+
+
+def master_fingerprint(conn):
+    """조인 기준정보 probe (건수 + checksum, wafering_masters) + pims_prod 파일 목록 해시 (wafering_part_no)"""
+    fingerprint = {}
+    cur = conn.cursor()
+    try:
+        for name in TEMPLATE_MASTERS:
+            cur.execute(build_master_probe_query(name))
+            cnt, chk = cur.fetchone()
+            fingerprint[name] = [int(cnt), chk]
+        cur.execute(build_files_query())
+        files = sorted(f"{content}:{path}" for path, content in cur.fetchall())
+        fingerprint['pims_prod'] = hashlib.sha256('\n'.join(files).encode('utf-8')).hexdigest()[:20]
+    finally:
+        cur.close()
+    return fingerprint
+
+
+def build_key_query(template_name):
+    """템플릿 최종 결과의 병합 키만 조회 (삭제 / 키 변경 / 늦게 커밋된 행 확인용, 값 컬럼은 전송하지 않음)"""
+    return f"SELECT {', '.join(MERGE_KEYS)}\nFROM (\n{load_template(template_name)}\n) K"
+
+# ==============================================================================
+# 스냅샷 병합 (Arrow 테이블, 스냅샷 파일 스키마 기준)
+# ==============================================================================
+def _key_frame(table):
+    keys = [_column(table.column_names, k) for k in MERGE_KEYS]
+    df = table.select(keys).to_pandas()
+    return df.astype(object).where(df.notna(), '').astype(str)
+
+
+def merge_snapshot(snapshot, delta, keys=None):
+    """delta 에 있는 키는 새 행으로 교체, 나머지는 기존 스냅샷 유지 (키가 유일하지 않으면 None)
+
+    delta 는 스냅샷의 Arrow 스키마로 맞춘 뒤 병합하므로 결과 파일의 컬럼 타입은 wafering_runner 가 쓴 파일과 같다.
+    keys(현재 일자의 전체 병합 키)가 주어지면 그 안에 없는 행(삭제 / 키가 바뀐 이전 행)을 빼고,
+    병합 결과의 키 집합이 keys 와 다르면(delta 에 없는 늦은 커밋 행 등) None 을 반환한다.
+    """
+    delta = delta.select(snapshot.schema.names).cast(snapshot.schema)
+    snap_keys = pd.MultiIndex.from_frame(_key_frame(snapshot))
+    delta_keys = pd.MultiIndex.from_frame(_key_frame(delta))
+    if snap_keys.has_duplicates or delta_keys.has_duplicates:
+        return None
+    kept = snapshot.filter(pa.array(~snap_keys.isin(delta_keys)))
+    merged = pa.concat_tables([kept, delta])
+    if keys is None:
+        return merged
+
+    names = [_column(snapshot.column_names, k) for k in MERGE_KEYS]
+    key_schema = pa.schema([snapshot.schema.field(name) for name in names])
+    keys = keys.select([_column(keys.column_names, k) for k in MERGE_KEYS]).rename_columns(names).cast(key_schema)
+    current = pd.MultiIndex.from_frame(_key_frame(keys))
+    if current.has_duplicates:
+        return None
+    alive = pd.MultiIndex.from_frame(_key_frame(merged)).isin(current)
+    if alive.sum() != len(current):
+        return None
+    return merged.filter(pa.array(alive))
+
+
+def _write_table(table, path):
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    try:
+        pq.write_table(table, tmp_path, compression=PARQUET_COMPRESSION)
+        os.replace(tmp_path, path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+# ==============================================================================
+# 일자 단위 증분 갱신
+# ==============================================================================
+def refresh_day(conn, base_dt, output_dir=OUTPUT_DIR, full=False, batch_size=DEFAULT_BATCH_SIZE,
+                execute_mode=DEFAULT_EXECUTE_MODE):
+    """워터마크 이후 변경분만 조회해 일자 스냅샷에 병합 (최초/키 중복 시 전체 재추출)
+
+    증분 기준은 워터마크에서 CHANGE_LAG 만큼 앞당기고, 현재 일자의 전체 병합 키를 함께 받아
+    삭제 / 키가 바뀐 행을 스냅샷에서 빼고 건수가 맞지 않으면 전체 재추출한다.
+    조인 기준정보(TEMPLATE_MASTERS, pims_prod)가 워터마크 기록 이후 바뀌었으면 바로 전체 재추출한다.
+    """
+    module = load_report_module(REPORT_NAME)
+    part_dir = partition_dir(output_dir, REPORT_NAME, base_dt)
+    part_dir.mkdir(parents=True, exist_ok=True)
+    data_path = part_dir / 'data.parquet'
+    watermark = None if full else read_watermark(part_dir)
+    # 기준정보 probe 는 조회 전에 기록해 두어 조회 중 바뀐 경우 다음 갱신에서 다시 전체 재추출되도록 함
+    masters = master_fingerprint(conn)
+
+    cur = open_cursor(conn)
+    try:
+        incremental = bool(watermark and watermark.get('data_chg_dttm') and data_path.exists())
+        if incremental and watermark.get('masters') != masters:
+            print(f"[{REPORT_NAME}] {base_dt} 기준정보 변경(또는 기록 없음) → 전체 재추출")
+            incremental = False
+        if incremental:
+            since = lagged_since(watermark['data_chg_dttm'])
+            print(f"[{REPORT_NAME}] {base_dt} 증분 조회 (DATA_CHG_DTTM >= {since})")
+            execute_template(cur, module.TEMPLATE, module.query_params(base_dt, changed_since=since),
+                             mode=execute_mode)
+            delta = fetch_table(cur, batch_size=batch_size)
+            execute_template(cur, module.TEMPLATE, module.query_params(base_dt), mode=execute_mode,
+                             template=build_key_query(module.TEMPLATE))
+            keys = fetch_table(cur, batch_size=batch_size)
+            print(f"[{REPORT_NAME}] {base_dt} 변경 행 수: {delta.num_rows}, 현재 키 수: {keys.num_rows}")
+
+            merged = merge_snapshot(pq.read_table(data_path), delta, keys)
+            if merged is not None:
+                new_mark = max(filter(None, [watermark['data_chg_dttm'], max_change_dttm(delta)]))
+                (part_dir / SUCCESS_MARKER).unlink(missing_ok=True)
+                if delta.num_rows or merged.num_rows != watermark.get('rows'):
+                    _write_table(merged, data_path)
+                write_watermark(part_dir, new_mark, merged.num_rows, 'incremental', masters)
+                (part_dir / SUCCESS_MARKER).write_text(datetime.now().isoformat(), encoding='utf-8')
+                return {'base_dt': base_dt, 'mode': 'incremental', 'changed': delta.num_rows,
+                        'rows': merged.num_rows}
+            print(f"[{REPORT_NAME}] {base_dt} 병합 키 {MERGE_KEYS} 가 유일하지 않거나 현재 키 집합과 맞지 않아 전체 재추출")
+
+        print(f"[{REPORT_NAME}] {base_dt} 전체 조회")
+        execute_template(cur, module.TEMPLATE, module.query_params(base_dt), mode=execute_mode)
+        (part_dir / SUCCESS_MARKER).unlink(missing_ok=True)
+        (part_dir / WATERMARK_FILE).unlink(missing_ok=True)
+        rows = write_parquet_stream(cur, data_path, batch_size=batch_size)
+        stamp_watermark(part_dir, masters=masters)
+        (part_dir / SUCCESS_MARKER).write_text(datetime.now().isoformat(), encoding='utf-8')
+        return {'base_dt': base_dt, 'mode': 'full', 'changed': rows, 'rows': rows}
+    finally:
+        cur.close()
+
+# ==============================================================================
+# 메인 실행 함수
+# ==============================================================================
+def parse_args():
+    parser = argparse.ArgumentParser(description='WAF 단위 Grid 증분 갱신 (DATA_CHG_DTTM 워터마크)')
+    parser.add_argument('--date', metavar='YYYYMMDD', help='기준일자 BASE_DT (기본: 어제)')
+    parser.add_argument('--full', action='store_true', help='워터마크 무시하고 전체 재추출')
+    parser.add_argument('--output-dir', default=str(OUTPUT_DIR))
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument('--execute-mode', choices=EXECUTE_MODES, default=DEFAULT_EXECUTE_MODE,
+                        help='immediate: EXECUTE IMMEDIATE 바인딩 (기본), prepare: PREPARE/EXECUTE, literal: 리터럴 SQL')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    base_dt = args.date or (datetime.now() - timedelta(days=1)).strftime('%Y%m%d')
+
+    conn = None
+    try:
+        conn = create_trino_connection()
+        result = refresh_day(conn, base_dt, args.output_dir, full=args.full, batch_size=args.batch_size,
+                             execute_mode=args.execute_mode)
+        print(f"갱신 완료 | 일자: {base_dt}, 방식: {result['mode']}, 변경: {result['changed']}, 전체 행 수: {result['rows']}")
+    except Exception as e:
+        print(f"증분 갱신 중 오류 발생: {e}")
+        sys.exit(1)
+    finally:
+        if conn:
+            conn.close()
+
+# 실행
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+import argparse
+import json
+import os
+import sys
+import threading
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+from wafering_common import create_trino_connection
+from wafering_fetch import DEFAULT_BATCH_SIZE, write_parquet_stream
+
+BASE_DIR = Path(__file__).resolve().parent
+
+# ==============================================================================
+# 기준정보(마스터) 테이블 목록
+# ==============================================================================
+# 이름 → 원본 테이블, 보관 컬럼, 적재 조건 (조회 쿼리들이 실제로 쓰는 범위만 적재)
+MASTERS = {
+    'stdpoper': {
+        'table': 'oracle.PMDW_MGR.DW_BA_CM_STDPOPER_M',
+        'columns': ('FAC_ID', 'OPER_ID', 'OPER_DIV_L', 'WAF_SIZE'),
+    },
+    'prod': {
+        'table': 'oracle.PMDW_MGR.DW_BA_MS_PROD_M',
+        'columns': ('PROD_ID', 'SPEC_DIV_CD', 'CUST_SITE_NM', 'GRD_CD_NM', 'GRD_CD_NM_PS', 'TST_FORML_FLAG'),
+        'where': "SPEC_DIV_CD = 'PS'",
+    },
+    'rejrsninfo': {
+        'table': 'oracle.PMDW_MGR.DW_BA_CM_REJRSNINFO_M',
+        'columns': ('WAF_SIZE', 'PROD_DIV_CD', 'REJ_RSN_GRP', 'REJ_RSN_CD', 'ALIAS_RSN_CD'),
+    },
+    'lossrejgrp': {
+        'table': 'oracle.PMDW_MGR.DW_BA_CM_LOSSREJGRP_M',
+        'columns': ('TEAMGRP_CD', 'WAF_SIZE', 'OPER_DIV_L', 'TEAMGRP_NM', 'SORT_SEQ'),
+    },
+    'lossrejgrpdtl': {
+        'table': 'oracle.PMDW_MGR.DW_BA_CM_LOSSREJGRPDTL_M',
+        'columns': ('TEAMGRP_CD', 'WAF_SIZE', 'OPER_DIV_L', 'TARGET_DIV_CD', 'DPT_CD', 'ST_DT', 'ED_DT'),
+    },
+    'basedate': {
+        'table': 'oracle.PMDW_MGR.DW_BA_CM_BASEDATE_M',
+        'columns': ('BASE_DT', 'BESOF_BASE_YW_NM'),
+    },
+    'fx_codes': {
+        'table': 'oracle.DMS_MGR.TB_FX_CODES',
+        'columns': ('UP_CD', 'SYS_CD', 'CD_VAL', 'CD_NM'),
+        'where': "UP_CD = 'DMS010' AND SYS_CD = 'DMS'",
+    },
+    # 아래는 로컬 재실행(wafering_offline.py)에서만 사용
+    'stdpeqp_h': {
+        'table': 'oracle.PMDW_MGR.DW_BA_CM_STDPEQP_H',
+        'columns': ('FAC_ID', 'EQP_ID', 'EQP_NM', 'ST_DT', 'ED_DT'),
+    },
+    'stdpeqp': {
+        'table': 'oracle.PMDW_MGR.DW_BA_CM_STDPEQP_M',
+        'columns': ('FAC_ID', 'EQP_ID', 'EQP_NM', 'APPLY_YN'),
+    },
+    'yldplan': {
+        'table': 'oracle.PMDW_MGR.DW_BA_CM_YLDPLAN_M',
+        'columns': ('BASE_YM', 'WAF_SIZE', 'YLD_DIV1_CD', 'YLD_DIV3_CD', 'GOAL_DIV_CD', 'YLD_PLAN_TYPE', 'REF_DIV2',
+                    'GOAL_VAL'),
+    },
+}
+
+MASTER_DIR = BASE_DIR / 'cache' / 'masters'
+MANIFEST_FILE = 'manifest.json'
+KEEP_VERSIONS = 2               # 이전 버전 1개는 남겨 두어 읽는 중인 작업이 깨지지 않게 함
+
+# ==============================================================================
+# 조회 쿼리 (변경 probe / 전체 적재)
+# ==============================================================================
+def _where(spec):
+    return f"WHERE {spec['where']}" if spec.get('where') else ''
+
+
+def build_master_probe_query(name):
+    """건수 + 순서 무관 checksum (행 1건만 전송)"""
+    spec = MASTERS[name]
+    return f"""
+        SELECT COUNT(*) AS CNT, to_hex(checksum(ROW({', '.join(spec['columns'])}))) AS CHK
+        FROM {spec['table']}
+        {_where(spec)}"""
+
+
+def build_master_load_query(name):
+    spec = MASTERS[name]
+    return f"""
+        SELECT {', '.join(spec['columns'])}
+        FROM {spec['table']}
+        {_where(spec)}"""
+
+# ==============================================================================
+# 로컬 스냅샷 저장소 (cache/masters/<name>/vNNNNN.parquet + manifest.json)
+# ==============================================================================
+class MasterStore:
+    """기준정보 테이블 스냅샷 (probe 결과가 바뀐 테이블만 다시 적재)"""
+
+    def __init__(self, master_dir=MASTER_DIR):
+        self.master_dir = Path(master_dir)
+        self.master_dir.mkdir(parents=True, exist_ok=True)
+        self._frames = {}
+        self._lock = threading.Lock()
+
+    def _manifest_path(self, name):
+        return self.master_dir / name / MANIFEST_FILE
+
+    def manifest(self, name):
+        path = self._manifest_path(name)
+        if not path.exists():
+            return None
+        return json.loads(path.read_text(encoding='utf-8'))
+
+    def refresh(self, conn, names=None, force=False, batch_size=DEFAULT_BATCH_SIZE):
+        """테이블별 probe 후 변경된 것만 새 버전으로 적재, {이름: 상태} 반환"""
+        status = {}
+        for name in names or MASTERS:
+            manifest = self.manifest(name)
+            cur = conn.cursor()
+            try:
+                cur.execute(build_master_probe_query(name))
+                cnt, chk = cur.fetchone()
+                probe = [int(cnt), chk]
+                if not force and manifest and manifest.get('probe') == probe:
+                    status[name] = 'unchanged'
+                    continue
+
+                version = (manifest or {}).get('version', 0) + 1
+                table_dir = self.master_dir / name
+                table_dir.mkdir(parents=True, exist_ok=True)
+                cur.execute(build_master_load_query(name))
+                rows = write_parquet_stream(cur, table_dir / f"v{version:05d}.parquet", batch_size=batch_size)
+            finally:
+                cur.close()
+
+            self._write_manifest(name, {'version': version, 'probe': probe, 'rows': rows,
+                                        'loaded': datetime.now().isoformat()})
+            self._prune(name, version)
+            status[name] = f"v{version} ({rows} rows)"
+        return status
+
+    def _write_manifest(self, name, manifest):
+        path = self._manifest_path(name)
+        tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        tmp_path.write_text(json.dumps(manifest, ensure_ascii=False, indent=2), encoding='utf-8')
+        os.replace(tmp_path, path)
+
+    def _prune(self, name, version):
+        for path in (self.master_dir / name).glob('v*.parquet'):
+            if int(path.stem[1:]) <= version - KEEP_VERSIONS:
+                path.unlink(missing_ok=True)
+
+    def path(self, name):
+        """현재 버전 스냅샷 Parquet 경로"""
+        manifest = self.manifest(name)
+        if manifest is None:
+            raise FileNotFoundError(f"기준정보 스냅샷 없음: {name} (wafering_masters.py 로 먼저 적재)")
+        return self.master_dir / name / f"v{manifest['version']:05d}.parquet"
+
+    def frame(self, name):
+        """현재 버전 스냅샷 DataFrame (컬럼명 소문자, 버전별로 메모리에 1회만 로드)"""
+        path = self.path(name)
+        key = (name, path.name)
+        with self._lock:
+            if key not in self._frames:
+                df = pd.read_parquet(path)
+                df.columns = [c.lower() for c in df.columns]
+                self._frames = {k: v for k, v in self._frames.items() if k[0] != name}
+                self._frames[key] = df
+            return self._frames[key]
+
+# ==============================================================================
+# 메인 실행 함수
+# ==============================================================================
+def parse_args():
+    parser = argparse.ArgumentParser(description='기준정보 테이블 로컬 스냅샷 갱신 (변경된 테이블만 재적재)')
+    parser.add_argument('--names', nargs='+', choices=list(MASTERS), default=list(MASTERS))
+    parser.add_argument('--force', action='store_true', help='probe 결과와 관계없이 전체 재적재')
+    parser.add_argument('--master-dir', default=str(MASTER_DIR))
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    conn = None
+    try:
+        conn = create_trino_connection()
+        status = MasterStore(args.master_dir).refresh(conn, args.names, force=args.force)
+        for name, state in status.items():
+            print(f"  - {name:<14} {state}")
+    except Exception as e:
+        print(f"기준정보 갱신 중 오류 발생: {e}")
+        sys.exit(1)
+    finally:
+        if conn:
+            conn.close()
+
+# 실행
+if __name__ == "__main__":
+    main()
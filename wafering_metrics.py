@@ -0,0 +1,181 @@
+import argparse
+import hashlib
+import json
+import statistics
+import threading
+from datetime import datetime
+from pathlib import Path
+
+from wafering_cache import normalize_sql
+
+BASE_DIR = Path(__file__).resolve().parent
+
+# ==============================================================================
+# 쿼리 실행 통계 저장 위치 (실행 1건 = JSONL 1줄)
+# ==============================================================================
+METRICS_PATH = BASE_DIR / 'metrics' / 'query_metrics.jsonl'
+
+# Trino StatementStats 항목 → 기록 항목 (밀리초 항목은 초로 변환)
+STAT_FIELDS = {
+    'queued_sec': 'queuedTimeMillis',
+    'elapsed_sec': 'elapsedTimeMillis',
+    'cpu_sec': 'cpuTimeMillis',
+    'wall_sec': 'wallTimeMillis',
+    'processed_rows': 'processedRows',
+    'processed_bytes': 'processedBytes',
+    'physical_input_bytes': 'physicalInputBytes',
+    'peak_memory_bytes': 'peakMemoryBytes',
+    'spilled_bytes': 'spilledBytes',
+    'nodes': 'nodes',
+    'splits': 'totalSplits',
+}
+
+# ==============================================================================
+# cursor 통계 추출
+# ==============================================================================
+def query_stats(cur):
+    """실행이 끝난 cursor 의 query id / 서버 통계 (결과를 끝까지 받은 뒤 호출해야 최종값)"""
+    stats = getattr(cur, 'stats', None) or {}
+    entry = {'query_id': getattr(cur, 'query_id', None) or stats.get('queryId'), 'state': stats.get('state')}
+    for name, key in STAT_FIELDS.items():
+        value = stats.get(key)
+        if value is not None and key.endswith('Millis'):
+            value = round(value / 1000, 3)
+        entry[name] = value
+    return entry
+
+
+def sql_hash(sql):
+    """SQL 본문(템플릿) 식별값: 주석/공백만 바뀐 경우는 같은 값"""
+    if not sql:
+        return None
+    return hashlib.sha256(normalize_sql(sql).encode('utf-8')).hexdigest()[:12]
+
+# ==============================================================================
+# 통계 저장소
+# ==============================================================================
+class MetricsLog:
+    """쿼리 실행 통계를 JSONL 파일에 누적 (여러 스레드에서 동시에 기록 가능)"""
+
+    def __init__(self, path=METRICS_PATH):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+
+    def append(self, entry):
+        line = json.dumps(entry, ensure_ascii=False, default=str)
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(line + '\n')
+
+    def read(self, reports=None):
+        if not self.path.exists():
+            return []
+        entries = []
+        with open(self.path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue        # 기록 중 중단된 줄
+                if reports is None or entry.get('report') in reports:
+                    entries.append(entry)
+        return entries
+
+
+_default_log = MetricsLog()
+
+
+def record_query(report, base_dt, cur=None, stats=None, sql=None, preflight=None, log=None, **fields):
+    """실행 1건 기록 (cur 또는 query_stats 결과, EXPLAIN 추정치, 수신 소요시간 등 추가 항목)
+
+    기록 실패는 리포트 실행에 영향을 주지 않도록 경고만 출력한다.
+    """
+    entry = {'recorded_at': datetime.now().isoformat(timespec='seconds'), 'report': report, 'base_dt': base_dt,
+             'sql_hash': sql_hash(sql)}
+    entry.update(stats if stats is not None else query_stats(cur))
+    if preflight is not None:
+        entry['explain_gb'] = preflight.estimate_gb
+        entry['explain_cached'] = preflight.cached
+    entry.update(fields)
+    try:
+        (log or _default_log).append(entry)
+    except OSError as e:
+        print(f"[{report}] 실행 통계 기록 실패: {e}")
+    return entry
+
+# ==============================================================================
+# 추이 리포트
+# ==============================================================================
+def _gb(value):
+    return None if value is None else value / 1024 ** 3
+
+
+def _fmt(value, spec):
+    return '-' if value is None else format(value, spec)
+
+
+def _median(entries, field):
+    values = [e[field] for e in entries if e.get(field) is not None]
+    return statistics.median(values) if values else None
+
+
+def print_trend(entries, last=20):
+    """리포트별 최근 실행 추이 출력 (SQL 이 바뀐 실행은 * 표시, 직전 SQL 대비 중앙값 비교)"""
+    by_report = {}
+    for entry in entries:
+        by_report.setdefault(entry['report'], []).append(entry)
+
+    for report, runs in sorted(by_report.items()):
+        runs.sort(key=lambda e: e['recorded_at'])
+        print(f"\n================ {report} (최근 {min(last, len(runs))}/{len(runs)}건) ================")
+        print(f"{'recorded_at':<20} {'base_dt':<9} {'sql':<13} {'state':<9} {'queued':>7} {'elapsed':>8} "
+              f"{'cpu':>8} {'rows':>11} {'read GB':>8} {'peak GB':>8} {'explain':>8} {'fetch':>7}")
+        shown = runs[-last:]
+        previous_hash = runs[-last - 1].get('sql_hash') if len(runs) > len(shown) else None
+        for e in shown:
+            changed = previous_hash is not None and e.get('sql_hash') != previous_hash
+            previous_hash = e.get('sql_hash')
+            sql = (e.get('sql_hash') or '-') + ('*' if changed else '')
+            print(f"{e['recorded_at']:<20} {e.get('base_dt') or '-':<9} {sql:<13} {e.get('state') or '-':<9} "
+                  f"{_fmt(e.get('queued_sec'), '.1f'):>7} {_fmt(e.get('elapsed_sec'), '.1f'):>8} "
+                  f"{_fmt(e.get('cpu_sec'), '.1f'):>8} {_fmt(e.get('processed_rows'), 'd'):>11} "
+                  f"{_fmt(_gb(e.get('processed_bytes')), '.2f'):>8} {_fmt(_gb(e.get('peak_memory_bytes')), '.2f'):>8} "
+                  f"{_fmt(e.get('explain_gb'), '.2f'):>8} {_fmt(e.get('fetch_sec'), '.1f'):>7}")
+
+        # 현재 SQL 과 직전 SQL 의 실행시간 중앙값 비교
+        current = runs[-1].get('sql_hash')
+        i = len(runs)
+        while i > 0 and runs[i - 1].get('sql_hash') == current:
+            i -= 1
+        same = runs[i:]
+        before_hash = runs[i - 1].get('sql_hash') if i else None
+        before = [e for e in runs[:i] if e.get('sql_hash') == before_hash]
+        now_elapsed, before_elapsed = _median(same, 'elapsed_sec'), _median(before, 'elapsed_sec')
+        if now_elapsed is not None and before_elapsed:
+            print(f"현재 SQL {current} elapsed 중앙값 {now_elapsed:.1f}초 "
+                  f"(이전 SQL {before_hash} {before_elapsed:.1f}초 대비 {now_elapsed / before_elapsed:.2f}배, "
+                  f"queued {_fmt(_median(same, 'queued_sec'), '.1f')} / {_fmt(_median(before, 'queued_sec'), '.1f')}초)")
+
+# ==============================================================================
+# 메인 실행 함수
+# ==============================================================================
+def parse_args():
+    parser = argparse.ArgumentParser(description='리포트별 Trino 쿼리 실행 통계 추이')
+    parser.add_argument('--reports', nargs='+', help='조회할 리포트 (기본: 전체)')
+    parser.add_argument('--last', type=int, default=20, help='리포트별 표시할 최근 실행 수 (기본 20)')
+    parser.add_argument('--path', default=str(METRICS_PATH))
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    entries = MetricsLog(args.path).read(set(args.reports) if args.reports else None)
+    if not entries:
+        print(f"기록된 실행 통계가 없습니다: {args.path}")
+        return
+    print_trend(entries, last=args.last)
+
+# 실행
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,331 @@
+import argparse
+import json
+import os
+import re
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import duckdb
+
+from wafering_cache import run_probe
+from wafering_common import create_trino_connection
+from wafering_derive import compare_frames
+from wafering_fetch import DEFAULT_BATCH_SIZE, ColumnarResultBuilder, fetch_frame, write_parquet_stream
+from wafering_masters import MasterStore
+from wafering_part_no import PIMS_TABLE, PartNoStore
+from wafering_runner import OUTPUT_DIR, date_range, report_template, write_partition_frame
+from wafering_sql import DEFAULT_PARAMS, bind, execute_template, load_template
+
+BASE_DIR = Path(__file__).resolve().parent
+
+# ==============================================================================
+# 로컬 재실행 대상 / 스냅샷 위치
+# ==============================================================================
+# 3210 리포트 SQL 템플릿을 Trino 대신 로컬 Parquet 스냅샷 위에서 DuckDB 로 실행
+OFFLINE_REPORTS = ('loss_rate', 'lot_grid', 'waf_grid')
+
+# 일자별 팩트/보정 테이블: WAF_SIZE + BASE_DT 단위로 전체 컬럼 적재 (FAC_ID 등 필터는 로컬에서 변경 가능)
+FACT_TABLES = ('DM_PP_AC_TOTALFAULTDTLSTD_S', 'DM_PP_AC_TOTALFAULTDTLWAFSTD_S', 'DW_BA_CM_TOTALFAULTMANUAL_S')
+FACT_SCHEMA = 'oracle.PMDW_MGR'
+
+# 템플릿이 참조하는 기준정보 테이블 → wafering_masters 스냅샷 이름
+# (prod 는 SPEC_DIV_CD = 'PS', fx_codes 는 DMS010 만 적재: 템플릿 조인 조건과 같은 범위)
+# pims_prod 는 wafering_part_no.PartNoStore 의 CS 스냅샷 사용
+MASTER_TABLES = {
+    'oracle.PMDW_MGR.DW_BA_CM_STDPOPER_M': 'stdpoper',
+    'oracle.PMDW_MGR.DW_BA_MS_PROD_M': 'prod',
+    'oracle.PMDW_MGR.DW_BA_CM_REJRSNINFO_M': 'rejrsninfo',
+    'oracle.PMDW_MGR.DW_BA_CM_LOSSREJGRP_M': 'lossrejgrp',
+    'oracle.PMDW_MGR.DW_BA_CM_LOSSREJGRPDTL_M': 'lossrejgrpdtl',
+    'oracle.PMDW_MGR.DW_BA_CM_BASEDATE_M': 'basedate',
+    'oracle.DMS_MGR.TB_FX_CODES': 'fx_codes',
+    'oracle.PMDW_MGR.DW_BA_CM_STDPEQP_H': 'stdpeqp_h',
+    'oracle.PMDW_MGR.DW_BA_CM_STDPEQP_M': 'stdpeqp',
+    'oracle.PMDW_MGR.DW_BA_CM_YLDPLAN_M': 'yldplan',
+}
+
+FACT_DIR = BASE_DIR / 'cache' / 'offline'
+OFFLINE_OUTPUT_DIR = OUTPUT_DIR / 'offline'
+MANIFEST_FILE = 'manifest.json'
+
+_TABLE_RE = re.compile(r"\b(oracle|iceberg)\.(\w+)\.(\w+)", re.I)
+
+
+def template_tables(template):
+    """템플릿이 참조하는 catalog.schema.table 목록 (대소문자 무시, 등장 순서)"""
+    return list(dict.fromkeys('.'.join(m.groups()).lower() for m in _TABLE_RE.finditer(template)))
+
+# ==============================================================================
+# Trino → DuckDB SQL 방언 변환
+# ==============================================================================
+# date_parse / date_format (MySQL 형식 문자) → strptime / strftime (C 형식 문자)
+# 형식 문자열은 DuckDB 에서 상수여야 하므로 리터럴 자체를 변환한다.
+_DATE_FN_RE = re.compile(r"\b(date_parse|date_format)\s*\(((?:[^()']|'[^']*'|\([^()]*\))*?),\s*'([^']*)'\s*\)", re.I)
+_DATE_FN = {'date_parse': 'strptime', 'date_format': 'strftime'}
+_MYSQL_FORMAT = {'%i': '%M', '%s': '%S', '%T': '%H:%M:%S', '%e': '%-d', '%c': '%-m', '%h': '%I', '%k': '%-H',
+                 '%l': '%-I', '%r': '%I:%M:%S %p'}
+_FORMAT_RE = re.compile(r"%.")
+
+
+def to_duckdb(sql):
+    """Trino 전용 함수를 DuckDB 함수로 바꾼 SQL (중첩 호출은 안쪽부터 반복 변환)"""
+    def repl(match):
+        fmt = _FORMAT_RE.sub(lambda m: _MYSQL_FORMAT.get(m.group(0), m.group(0)), match.group(3))
+        return f"{_DATE_FN[match.group(1).lower()]}({match.group(2)}, '{fmt}')"
+
+    while True:
+        converted = _DATE_FN_RE.sub(repl, sql)
+        if converted == sql:
+            return sql
+        sql = converted
+
+
+# DuckDB 결과 타입 → Trino type_code (ColumnarResultBuilder 가 Trino 결과와 같은 dtype 을 만들도록)
+_TYPE_ALIASES = {'hugeint': 'bigint', 'ubigint': 'bigint', 'uinteger': 'bigint', 'usmallint': 'integer',
+                 'utinyint': 'smallint', 'float': 'real', 'timestamp_s': 'timestamp', 'timestamp_ms': 'timestamp',
+                 'timestamp_ns': 'timestamp', 'timestamp with time zone': 'timestamp with time zone'}
+
+
+def _description(cur):
+    """DuckDB cursor.description → Trino 형식 (소문자 컬럼명, type_code)"""
+    return [(name.lower(), _TYPE_ALIASES.get(str(type_code).lower(), str(type_code).lower()))
+            for name, type_code, *_ in cur.description]
+
+
+def _sql_string(value):
+    return "'" + str(value).replace("'", "''") + "'"
+
+# ==============================================================================
+# 팩트 스냅샷 (cache/offline/<테이블>/BASE_DT=YYYYMMDD/data.parquet + manifest.json)
+# ==============================================================================
+def build_fact_snapshot_query(table, base_dt, waf_size=DEFAULT_PARAMS['waf_size']):
+    return f"""
+        SELECT *
+        FROM {FACT_SCHEMA}.{table}
+        WHERE WAF_SIZE = '{waf_size}'
+          AND BASE_DT = '{base_dt}'"""
+
+
+class FactSnapshotStore:
+    """일자별 팩트/보정 테이블 스냅샷 (probe 결과가 바뀐 일자/테이블만 다시 적재)"""
+
+    def __init__(self, fact_dir=FACT_DIR):
+        self.fact_dir = Path(fact_dir)
+        self.fact_dir.mkdir(parents=True, exist_ok=True)
+
+    def part_dir(self, table, base_dt):
+        return self.fact_dir / table / f"BASE_DT={base_dt}"
+
+    def manifest(self, table, base_dt):
+        path = self.part_dir(table, base_dt) / MANIFEST_FILE
+        if not path.exists():
+            return None
+        return json.loads(path.read_text(encoding='utf-8'))
+
+    def has_day(self, table, base_dt):
+        return self.manifest(table, base_dt) is not None
+
+    def files(self, table):
+        """적재된 일자 파일 목록 (manifest 가 있는 = 적재가 끝난 일자만)"""
+        manifests = (self.fact_dir / table).glob(f"BASE_DT=*/{MANIFEST_FILE}")
+        return sorted(path.parent / 'data.parquet' for path in manifests)
+
+    def refresh_day(self, conn, base_dt, force=False, batch_size=DEFAULT_BATCH_SIZE):
+        """팩트 테이블별 probe 후 변경된 것만 다시 적재, {테이블: 상태} 반환"""
+        probe = run_probe(conn, FACT_TABLES, base_dt)
+        status = {}
+        for table in FACT_TABLES:
+            manifest = self.manifest(table, base_dt)
+            if not force and manifest and manifest.get('probe') == probe[table]:
+                status[table] = 'unchanged'
+                continue
+            part_dir = self.part_dir(table, base_dt)
+            (part_dir / MANIFEST_FILE).unlink(missing_ok=True)
+            cur = conn.cursor()
+            try:
+                cur.execute(build_fact_snapshot_query(table, base_dt))
+                rows = write_parquet_stream(cur, part_dir / 'data.parquet', batch_size=batch_size)
+            finally:
+                cur.close()
+            path = part_dir / MANIFEST_FILE
+            tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+            tmp_path.write_text(json.dumps({'probe': probe[table], 'rows': rows, 'loaded': datetime.now().isoformat()},
+                                           ensure_ascii=False), encoding='utf-8')
+            os.replace(tmp_path, path)
+            status[table] = f"{rows} rows"
+        return status
+
+
+def refresh_snapshots(conn, base_dates, masters=None, facts=None, force=False, part_nos=None):
+    """오프라인 실행에 필요한 기준정보 + PART_NO + 일자별 팩트 스냅샷 갱신 (변경된 것만)"""
+    masters = masters or MasterStore()
+    facts = facts or FactSnapshotStore()
+    for name, state in masters.refresh(conn, sorted(set(MASTER_TABLES.values())), force=force).items():
+        print(f"기준정보 {name}: {state}")
+    print(f"PART_NO: {(part_nos or PartNoStore()).refresh(conn, force=force)}")
+    for base_dt in base_dates:
+        for table, state in facts.refresh_day(conn, base_dt, force=force).items():
+            print(f"팩트 {base_dt} {table}: {state}")
+
+# ==============================================================================
+# DuckDB 로컬 엔진
+# ==============================================================================
+class OfflineEngine:
+    """로컬 스냅샷 위에 Trino 와 같은 catalog.schema.table 이름의 뷰를 만들고 sql/ 템플릿 실행
+
+    팩트 뷰는 적재된 모든 일자 파일을 묶으므로 BASE_DT 조건은 Parquet 통계로 파일 단위 건너뛰기가 된다.
+    한 엔진을 여러 스레드에서 써도 되며 (쿼리마다 DuckDB cursor 분리), 스냅샷이 갱신되면
+    다음 실행 시 뷰가 새 파일을 가리킨다.
+    """
+
+    def __init__(self, masters=None, facts=None, threads=None, part_nos=None):
+        self.masters = masters or MasterStore()
+        self.facts = facts or FactSnapshotStore()
+        self.part_nos = part_nos or PartNoStore()
+        self.conn = duckdb.connect()
+        if threads:
+            self.conn.execute(f"SET threads = {int(threads)}")
+        self._sources = {}
+        self._schemas = set()
+        self.missing = set()
+
+    def _ensure_schema(self, catalog, schema):
+        if (catalog, schema) in self._schemas:
+            return
+        if not any(c == catalog for c, _ in self._schemas):
+            self.conn.execute(f"ATTACH ':memory:' AS {catalog}")
+        self.conn.execute(f"CREATE SCHEMA IF NOT EXISTS {catalog}.{schema}")
+        self._schemas.add((catalog, schema))
+
+    def _table_source(self, full_name):
+        """뷰가 읽을 Parquet 파일 목록 (스냅샷이 없으면 None)"""
+        catalog_schema, _, table = full_name.rpartition('.')
+        if catalog_schema == FACT_SCHEMA.lower() and table.upper() in FACT_TABLES:
+            return [str(p) for p in self.facts.files(table.upper())] or None
+        if full_name == PIMS_TABLE.lower():
+            return [str(self.part_nos.path)] if self.part_nos.path.exists() else None
+        for name, master in MASTER_TABLES.items():
+            if name.lower() == full_name:
+                try:
+                    return [str(self.masters.path(master))]
+                except FileNotFoundError:
+                    return None
+        raise KeyError(f"로컬 스냅샷 대상이 아닌 테이블: {full_name}")
+
+    def refresh_views(self, tables):
+        """테이블별 뷰를 현재 스냅샷 파일로 (다시) 생성, 스냅샷이 없는 테이블은 self.missing 에 기록"""
+        for full_name in tables:
+            files = self._table_source(full_name)
+            if files is None:
+                self.missing.add(full_name)
+                continue
+            self.missing.discard(full_name)
+            if self._sources.get(full_name) == files:
+                continue
+            catalog, schema, table = full_name.split('.')
+            self._ensure_schema(catalog, schema)
+            file_list = ', '.join(_sql_string(f) for f in files)
+            # 경로의 BASE_DT=YYYYMMDD 를 hive 파티션으로 읽으면 BASE_DT 가 숫자로 바뀌므로 끈다
+            self.conn.execute(f"CREATE OR REPLACE VIEW {catalog}.{schema}.{table} AS SELECT * FROM "
+                              f"read_parquet([{file_list}], union_by_name = true, hive_partitioning = false)")
+            self._sources[full_name] = files
+
+    def run_sql(self, sql, params=None):
+        """Trino SQL 템플릿(#{이름} 파라미터)을 DuckDB 로 실행해 Trino 결과와 같은 dtype 의 DataFrame 반환"""
+        tables = template_tables(sql)
+        self.refresh_views(tables)
+        missing = sorted(self.missing & set(tables))
+        if missing:
+            raise FileNotFoundError(f"로컬 스냅샷 없음: {', '.join(missing)} (--snapshot 으로 먼저 적재)")
+        query, args = bind(to_duckdb(sql), params or {})
+        cur = self.conn.cursor()
+        try:
+            cur.execute(query, args)
+            builder = ColumnarResultBuilder(_description(cur))
+            for batch in cur.fetch_record_batch(DEFAULT_BATCH_SIZE):
+                builder.append_batch(batch)
+        finally:
+            cur.close()
+        return builder.to_frame()
+
+    def run_report(self, name, base_dt, **overrides):
+        """리포트 템플릿을 기준일자 파라미터(+ 변경할 파라미터)로 로컬 실행"""
+        if name not in OFFLINE_REPORTS:
+            raise ValueError(f"로컬 실행을 지원하지 않는 리포트: {name} (가능: {', '.join(OFFLINE_REPORTS)})")
+        template_name, query_params = report_template(name)
+        template = load_template(template_name)
+        days = [t for t in FACT_TABLES if f"{FACT_SCHEMA}.{t}".lower() in template_tables(template)
+                and not self.facts.has_day(t, base_dt)]
+        if days:
+            raise FileNotFoundError(f"{base_dt} 팩트 스냅샷 없음: {', '.join(days)} (--snapshot 으로 먼저 적재)")
+        return self.run_sql(template, {**query_params(base_dt), **overrides})
+
+# ==============================================================================
+# 메인 실행 함수
+# ==============================================================================
+def parse_args():
+    parser = argparse.ArgumentParser(description='3210 리포트를 로컬 Parquet 스냅샷 + DuckDB 로 재실행 (Trino 조회 없음)')
+    parser.add_argument('--date', metavar='YYYYMMDD', help='기준일자 BASE_DT (기본: 어제)')
+    parser.add_argument('--from', dest='from_dt', metavar='YYYYMMDD')
+    parser.add_argument('--to', dest='to_dt', metavar='YYYYMMDD')
+    parser.add_argument('--reports', nargs='+', choices=OFFLINE_REPORTS, default=list(OFFLINE_REPORTS))
+    parser.add_argument('--fac-ids', nargs='+', help=f"FAC_ID 필터 변경 (기본 {' '.join(DEFAULT_PARAMS['fac_ids'])})")
+    parser.add_argument('--snapshot', action='store_true',
+                        help='실행 전 Trino 에서 기준정보 / 일자별 팩트 스냅샷 갱신 (변경된 것만)')
+    parser.add_argument('--force', action='store_true', help='--snapshot 시 probe 결과와 관계없이 전체 재적재')
+    parser.add_argument('--verify', action='store_true', help='같은 템플릿을 Trino 에서도 실행해 값 단위로 대조')
+    parser.add_argument('--output-dir', default=str(OFFLINE_OUTPUT_DIR))
+    parser.add_argument('--threads', type=int, help='DuckDB 스레드 수 (기본: 코어 수)')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    if args.from_dt and args.to_dt:
+        base_dates = date_range(args.from_dt, args.to_dt)
+    else:
+        base_dates = [args.date or (datetime.now() - timedelta(days=1)).strftime('%Y%m%d')]
+    overrides = {'fac_ids': tuple(args.fac_ids)} if args.fac_ids else {}
+
+    conn = None
+    failed = False
+    try:
+        if args.snapshot or args.verify:
+            conn = create_trino_connection()
+        if args.snapshot:
+            refresh_snapshots(conn, base_dates, force=args.force)
+
+        engine = OfflineEngine(threads=args.threads)
+        for base_dt in base_dates:
+            for name in args.reports:
+                try:
+                    started = time.perf_counter()
+                    df = engine.run_report(name, base_dt, **overrides)
+                    elapsed = time.perf_counter() - started
+                    output_path = write_partition_frame(df, args.output_dir, name, base_dt)
+                    print(f"[{name}] {base_dt} 로컬 실행 완료 | 행 수: {len(df)}, {elapsed:.2f}초 → {output_path}")
+                    if args.verify:
+                        template_name, query_params = report_template(name)
+                        cur = conn.cursor()
+                        try:
+                            execute_template(cur, template_name, {**query_params(base_dt), **overrides})
+                            expected = fetch_frame(cur)
+                        finally:
+                            cur.close()
+                        diff = compare_frames(expected, df)
+                        print(f"[{name}] {base_dt} 검증: {'일치' if not diff else diff}")
+                        failed = failed or bool(diff)
+                except Exception as e:
+                    failed = True
+                    print(f"[{name}] {base_dt} 처리 중 오류 발생: {e}")
+    finally:
+        if conn:
+            conn.close()
+    if failed:
+        sys.exit(1)
+
+# 실행
+if __name__ == "__main__":
+    main()
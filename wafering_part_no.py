@@ -0,0 +1,209 @@
+import argparse
+import json
+import os
+import sys
+import threading
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from wafering_common import create_trino_connection, open_cursor
+from wafering_fetch import DEFAULT_BATCH_SIZE, fetch_frame
+
+BASE_DIR = Path(__file__).resolve().parent
+
+# ==============================================================================
+# PIMS 제품 사양 (PART_NO 원천) 설정
+# ==============================================================================
+PIMS_TABLE = 'iceberg.ibg_lake.pims_prod'
+PIMS_COLUMNS = ['ms_code', 'creq_t1', 'creq_t2', 'creq_t3', 'creq_v1', 'creq_v2', 'creq_v3']
+SNAPSHOT_COLUMNS = PIMS_COLUMNS + ['spec_type']     # spec_type 은 로컬 재실행(wafering_offline.py) 템플릿 조건용
+PART_NO_DIR = BASE_DIR / 'cache' / 'part_no'
+DATA_FILE = 'pims_cs.parquet'
+MANIFEST_FILE = 'manifest.json'
+PATH_IN_CHUNK = 200             # 증분 적재 시 "$path" IN 목록 최대 길이
+MAX_INCREMENTAL_FILES = 1000    # 새 데이터 파일이 이보다 많으면 전체 재적재
+
+# ==============================================================================
+# F_GET_PART_NO (벡터 연산)
+# ==============================================================================
+def resolve_part_no(t1, t2, t3, v1, v2, v3, after_colon=False):
+    """CREQ_Tn 에 'PART' 가 들어간 첫 항목의 값, 없으면 ' '
+
+    WAF(step5_part_no): TRIM(CREQ_Vn)
+    LOT(Z_WITH_PIMS)  : TRIM(SUBSTR(CREQ_Vn, STRPOS(CREQ_Vn, ':') + 1, 100)) - ':' 가 없으면 앞 100자
+    선택된 항목의 값이 NULL 이면 NULL 유지 (CASE 의 ELSE ' ' 로 가지 않음)
+    """
+    result = pd.Series(' ', index=t1.index, dtype=object)
+    decided = np.zeros(len(t1), dtype=bool)
+    for t, v in ((t1, v1), (t2, v2), (t3, v3)):
+        hit = t.astype(object).str.upper().str.contains('PART', regex=False).fillna(False).to_numpy(dtype=bool) \
+            & ~decided
+        if not hit.any():
+            continue
+        v = v.astype(object)
+        if after_colon:
+            parts = v.str.partition(':')
+            v = parts[2].where(parts[1] == ':', parts[0]).where(v.notna()).str.slice(0, 100)
+        result = result.where(~hit, v.str.strip())
+        decided |= hit
+    return result
+
+
+def with_part_no(pims):
+    """pims 행(PIMS_COLUMNS)에 WAF / LOT 규칙 PART_NO 컬럼(part_no, part_no_lot) 추가"""
+    args = [pims[c] for c in PIMS_COLUMNS[1:]]
+    return pims.assign(part_no=resolve_part_no(*args), part_no_lot=resolve_part_no(*args, after_colon=True))
+
+
+def apply_part_no(df, pims, column='part_no', source='part_no', key='prod_id'):
+    """df[key] → PART_NO 조회 후 df[column] 에 넣음 (매칭 없으면 ' ', SQL 의 COALESCE(..., ' '))
+
+    ms_code 가 유일하면 인덱스 조회로 바로 붙이고, 중복이 있으면 SQL LEFT JOIN 과 같이 행이 늘어난다.
+    """
+    pims = pims.dropna(subset=['ms_code'])
+    if pims['ms_code'].is_unique:
+        positions = pd.Index(pims['ms_code'].astype(object)).get_indexer(df[key].astype(object))
+        values = pims[source].to_numpy(dtype=object)[positions]
+        values[positions < 0] = ' '
+        return df.assign(**{column: pd.Series(values, index=df.index).where(lambda s: s.notna(), ' ')})
+    merged = df.merge(pims[['ms_code', source]].rename(columns={source: '_part_no'}), how='left',
+                      left_on=key, right_on='ms_code', suffixes=('', '_r'))
+    merged[column] = merged['_part_no'].where(merged['_part_no'].notna(), ' ')
+    return merged.drop(columns=['_part_no'] + (['ms_code'] if key != 'ms_code' else []))
+
+# ==============================================================================
+# 조회 쿼리 (iceberg 메타데이터 / 전체 / 증분)
+# ==============================================================================
+def build_files_query():
+    """현재 스냅샷의 파일 목록 (content: 0 = 데이터, 1/2 = 삭제 파일) - 메타데이터만 읽음"""
+    catalog, schema, table = PIMS_TABLE.split('.')
+    return f'SELECT file_path, content FROM {catalog}.{schema}."{table}$files"'
+
+
+def build_load_query(paths=None):
+    """spec_type = 'CS' 행 전체, paths 가 주어지면 해당 데이터 파일의 행만 (증분)"""
+    where = ''
+    if paths:
+        where = '\n          AND "$path" IN ({})'.format(', '.join("'" + p.replace("'", "''") + "'" for p in paths))
+    return f"""
+        SELECT {', '.join(SNAPSHOT_COLUMNS)}
+        FROM {PIMS_TABLE}
+        WHERE spec_type = 'CS'{where}"""
+
+# ==============================================================================
+# PROD_ID → PART_NO 로컬 스냅샷 (cache/part_no/pims_cs.parquet + manifest.json)
+# ==============================================================================
+class PartNoStore:
+    """pims_prod(CS) 스냅샷 + PART_NO 사전 계산 컬럼
+
+    iceberg $files 의 데이터 파일 목록을 저장해 두고, 새 파일만 추가된 경우(append)는
+    새 파일의 행만 읽어 붙인다. 파일이 빠졌거나(compaction/overwrite) 삭제 파일이 있으면 전체 재적재.
+    """
+
+    def __init__(self, part_no_dir=PART_NO_DIR):
+        self.part_no_dir = Path(part_no_dir)
+        self.part_no_dir.mkdir(parents=True, exist_ok=True)
+        self._frame = None
+        self._lock = threading.Lock()
+
+    @property
+    def path(self):
+        return self.part_no_dir / DATA_FILE
+
+    def manifest(self):
+        path = self.part_no_dir / MANIFEST_FILE
+        if not path.exists():
+            return None
+        return json.loads(path.read_text(encoding='utf-8'))
+
+    def _query(self, conn, query, batch_size=DEFAULT_BATCH_SIZE):
+        cur = open_cursor(conn)
+        try:
+            cur.execute(query)
+            df = fetch_frame(cur, batch_size=batch_size)
+        finally:
+            cur.close()
+        df.columns = [c.lower() for c in df.columns]
+        return df.astype({c: object for c in SNAPSHOT_COLUMNS if c in df.columns})
+
+    def refresh(self, conn, force=False, batch_size=DEFAULT_BATCH_SIZE):
+        """변경 없음 / 증분 / 전체 적재 후 상태 문자열 반환"""
+        cur = conn.cursor()
+        try:
+            cur.execute(build_files_query())
+            files = cur.fetchall()
+        finally:
+            cur.close()
+        data_files = sorted({path for path, content in files if content == 0})
+        has_deletes = any(content != 0 for _, content in files)
+
+        manifest = self.manifest()
+        known = set(manifest['files']) if manifest else set()
+        added = [path for path in data_files if path not in known]
+        if not force and manifest and not has_deletes and not added and known == set(data_files):
+            return 'unchanged'
+
+        if force or manifest is None or has_deletes or (known - set(data_files)) or len(added) > MAX_INCREMENTAL_FILES:
+            df = with_part_no(self._query(conn, build_load_query(), batch_size))
+            mode = 'full'
+        else:
+            parts = [self._query(conn, build_load_query(added[i:i + PATH_IN_CHUNK]), batch_size)
+                     for i in range(0, len(added), PATH_IN_CHUNK)]
+            df = pd.concat([self.frame()] + [with_part_no(p) for p in parts], ignore_index=True)
+            mode = f'incremental (+{len(added)} files)'
+
+        tmp_path = self.path.with_name(f".{DATA_FILE}.{os.getpid()}.tmp")
+        df.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, self.path)
+        self._write_manifest({'files': data_files, 'rows': len(df), 'loaded': datetime.now().isoformat()})
+        with self._lock:
+            self._frame = None
+        return f"{mode} ({len(df)} rows)"
+
+    def _write_manifest(self, manifest):
+        path = self.part_no_dir / MANIFEST_FILE
+        tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        tmp_path.write_text(json.dumps(manifest, ensure_ascii=False), encoding='utf-8')
+        os.replace(tmp_path, path)
+
+    def frame(self, prod_ids=None):
+        """스냅샷 DataFrame (SNAPSHOT_COLUMNS + part_no, part_no_lot), prod_ids 가 주어지면 해당 제품만"""
+        with self._lock:
+            if self._frame is None:
+                if not self.path.exists():
+                    raise FileNotFoundError(f"PART_NO 스냅샷 없음: {self.path} (wafering_part_no.py 로 먼저 적재)")
+                self._frame = pd.read_parquet(self.path).astype(object)
+            df = self._frame
+        if prod_ids is not None:
+            df = df[df['ms_code'].isin(list(prod_ids))]
+        return df.reset_index(drop=True)
+
+# ==============================================================================
+# 메인 실행 함수
+# ==============================================================================
+def parse_args():
+    parser = argparse.ArgumentParser(description='PROD_ID → PART_NO 로컬 스냅샷 갱신 (iceberg 새 파일만 증분 적재)')
+    parser.add_argument('--force', action='store_true', help='파일 목록과 관계없이 전체 재적재')
+    parser.add_argument('--part-no-dir', default=str(PART_NO_DIR))
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    conn = None
+    try:
+        conn = create_trino_connection()
+        print(f"PART_NO 스냅샷: {PartNoStore(args.part_no_dir).refresh(conn, force=args.force)}")
+    except Exception as e:
+        print(f"PART_NO 스냅샷 갱신 중 오류 발생: {e}")
+        sys.exit(1)
+    finally:
+        if conn:
+            conn.close()
+
+# 실행
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+from wafering_cache import normalize_sql
+from wafering_common import safe_float
+
+BASE_DIR = Path(__file__).resolve().parent
+
+# ==============================================================================
+# 용량 사전 점검 정책 (리포트별)
+# ==============================================================================
+@dataclass(frozen=True)
+class PreflightPolicy:
+    """hard_limit_gb 초과 → 실행 차단, warn_limit_gb 초과 → 경고 후 실행,
+    EXPLAIN 실패 시 allow_on_failure 에 따라 실행/차단"""
+    hard_limit_gb: float = None
+    warn_limit_gb: float = 1.0
+    allow_on_failure: bool = True
+
+
+DEFAULT_POLICY = PreflightPolicy()
+REPORT_POLICIES = {
+    'loss_rate': PreflightPolicy(hard_limit_gb=20.0, warn_limit_gb=1.0),
+    'lot_grid': PreflightPolicy(hard_limit_gb=50.0, warn_limit_gb=5.0),
+    'waf_grid': PreflightPolicy(hard_limit_gb=100.0, warn_limit_gb=10.0),
+    'scrap_rate': PreflightPolicy(hard_limit_gb=20.0, warn_limit_gb=1.0),
+    'scrap_lot_grid': PreflightPolicy(hard_limit_gb=50.0, warn_limit_gb=5.0),
+    'scrap_waf_grid': PreflightPolicy(hard_limit_gb=100.0, warn_limit_gb=10.0),
+}
+
+EXPLAIN_CACHE_DIR = BASE_DIR / 'cache' / 'explain'
+EXPLAIN_TTL_SEC = 6 * 3600      # 같은 템플릿 + 파라미터의 EXPLAIN 결과 재사용 시간
+
+
+def policy_for(name):
+    return REPORT_POLICIES.get(name, DEFAULT_POLICY)
+
+# ==============================================================================
+# 점검 결과
+# ==============================================================================
+@dataclass
+class PreflightResult:
+    """decision: ok / warn / blocked / explain_failed, allowed: 본 쿼리 실행 여부"""
+    name: str = None
+    decision: str = 'ok'
+    allowed: bool = True
+    input_gb: float = 0.0
+    output_gb: float = None
+    estimate_gb: float = 0.0       # 판단에 사용한 값 (출력 추정 불가 시 입력 기준)
+    tables: dict = field(default_factory=dict)
+    cached: bool = False
+    message: str = ''
+
+    def to_dict(self):
+        return asdict(self)
+
+# ==============================================================================
+# EXPLAIN (TYPE IO) 결과 해석 / 캐시
+# ==============================================================================
+def parse_explain_io(json_str):
+    """EXPLAIN IO JSON → (테이블별 예상 스캔 bytes, 전체 입력 bytes, 출력 bytes 또는 NaN)"""
+    io_stats = json.loads(json_str)
+    tables = {}
+    for table_info in io_stats.get("inputTableColumnInfos", []):
+        table_name = table_info["table"]["schemaTable"]["table"]
+        size_bytes = safe_float(table_info.get("estimate", {}).get("outputSizeInBytes"), 0)
+        tables[table_name] = tables.get(table_name, 0.0) + size_bytes
+    output_bytes = safe_float(io_stats.get("estimate", {}).get("outputSizeInBytes"), float('nan'))
+    return tables, sum(tables.values()), output_bytes
+
+
+def explain_key(template, params=None):
+    """템플릿(정규화 SQL) + 바인딩 파라미터 기준 캐시 키"""
+    text = normalize_sql(template) + '\x00' + json.dumps(params or {}, sort_keys=True, default=str)
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()[:24]
+
+
+class ExplainCache:
+    """EXPLAIN IO 원본 JSON 을 TTL 동안 파일로 보관 (항목 = <key>.json)"""
+
+    def __init__(self, cache_dir=EXPLAIN_CACHE_DIR, ttl_sec=EXPLAIN_TTL_SEC):
+        self.cache_dir = Path(cache_dir)
+        self.ttl_sec = ttl_sec
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def get(self, key):
+        path = self.cache_dir / f"{key}.json"
+        try:
+            entry = json.loads(path.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return None
+        if time.time() - entry.get('created', 0) > self.ttl_sec:
+            return None
+        return entry['explain']
+
+    def put(self, key, explain_json):
+        path = self.cache_dir / f"{key}.json"
+        tmp_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp_path.write_text(json.dumps({'created': time.time(), 'explain': explain_json}), encoding='utf-8')
+        os.replace(tmp_path, path)
+
+# ==============================================================================
+# 정책 기반 사전 점검 (입력 대기 / sys.exit 없음)
+# ==============================================================================
+def run_preflight(conn, query, policy=DEFAULT_POLICY, name=None, cache=None, template=None, params=None):
+    """EXPLAIN IO 예상 크기를 정책과 비교해 PreflightResult 반환
+
+    cache(ExplainCache)가 주어지면 template + params 키로 EXPLAIN 결과를 재사용한다
+    (template 미지정 시 쿼리 본문을 템플릿으로 사용).
+    """
+    result = PreflightResult(name=name)
+    key = explain_key(template or query, params) if cache is not None else None
+    explain_json = cache.get(key) if cache is not None else None
+    result.cached = explain_json is not None
+
+    try:
+        if explain_json is None:
+            cur = conn.cursor()
+            try:
+                cur.execute(f"EXPLAIN (TYPE IO, FORMAT JSON) {query}")
+                explain_json = cur.fetchall()[0][0]
+            finally:
+                cur.close()
+        tables, input_bytes, output_bytes = parse_explain_io(explain_json)
+    except Exception as e:
+        result.decision = 'explain_failed'
+        result.allowed = policy.allow_on_failure
+        result.message = f"EXPLAIN 분석 중 오류 발생: {e}"
+        return result
+
+    if cache is not None and not result.cached:
+        cache.put(key, explain_json)
+
+    result.tables = {t: round(b / 1024 ** 3, 3) for t, b in tables.items()}
+    result.input_gb = round(input_bytes / 1024 ** 3, 3)
+    output_usable = output_bytes == output_bytes and output_bytes != float('inf')
+    result.output_gb = round(output_bytes / 1024 ** 3, 3) if output_usable else None
+    # 출력 추정 불가 시 입력 기준으로 판단 (기존 check_data_size_before_query 와 동일)
+    estimate_gb = output_bytes / 1024 ** 3 if output_usable else input_bytes / 1024 ** 3
+    result.estimate_gb = round(estimate_gb, 3)
+
+    if policy.hard_limit_gb is not None and estimate_gb > policy.hard_limit_gb:
+        result.decision = 'blocked'
+        result.allowed = False
+        result.message = f"예상 {estimate_gb:.3f} GB > 차단 기준 {policy.hard_limit_gb} GB"
+    elif policy.warn_limit_gb is not None and estimate_gb > policy.warn_limit_gb:
+        result.decision = 'warn'
+        result.message = f"예상 {estimate_gb:.3f} GB > 경고 기준 {policy.warn_limit_gb} GB (실행 계속)"
+    else:
+        result.message = f"예상 {estimate_gb:.3f} GB"
+    return result
+
+
+def print_preflight(result):
+    label = f"[{result.name}] " if result.name else ''
+    source = ' (EXPLAIN 캐시)' if result.cached else ''
+    print(f"{label}용량 점검{source}: {result.decision} - {result.message}")
+    for table, gb in result.tables.items():
+        print(f"  - 테이블: {table} 예상 스캔 {gb:.3f} GB")
+
+# ==============================================================================
+# 단독 스크립트용 점검 (터미널에서 실행할 때만 경고 시 확인 입력)
+# ==============================================================================
+def check_data_size_before_query(conn, query, policy=DEFAULT_POLICY, cache=None, template=None, params=None):
+    """정책 점검 후 차단이면 종료, 경고는 터미널이면 (y/N) 확인 / 아니면 그대로 진행"""
+    result = run_preflight(conn, query, policy=policy, cache=cache, template=template, params=params)
+    print_preflight(result)
+
+    if not result.allowed:
+        print("정책에 의해 쿼리 취소됨.")
+        sys.exit(0)
+    if result.decision in ('warn', 'explain_failed') and sys.stdin.isatty():
+        confirm = input("계속 진행하시겠습니까? (y/N): ").strip().lower()
+        if confirm not in ['y', 'yes']:
+            print("사용자에 의해 쿼리 취소됨.")
+            sys.exit(0)
+    print("용량 확인 완료. 실제 쿼리 실행을 시작합니다.")
+    return result
@@ -0,0 +1,322 @@
+import argparse
+import json
+import os
+import sys
+import threading
+from datetime import datetime, timedelta
+from decimal import Decimal, ROUND_HALF_UP
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from wafering_common import create_trino_connection
+from wafering_derive import DECIMAL_SCALE, LOSS_COLUMNS
+from wafering_masters import MasterStore
+from wafering_runner import OUTPUT_DIR, SUCCESS_MARKER, write_partition_frame
+from wafering_sql import DEFAULT_PARAMS, execute_template
+
+BASE_DIR = Path(__file__).resolve().parent
+
+# ==============================================================================
+# 주 / 월 Loss Rate 누적 설정
+# ==============================================================================
+# 일별 Loss Rate(CATEGORY 'D') 결과에서 합산 가능한 값만 일자별로 보관하고,
+# 주(W) / 월(M) 은 기간 내 보관분을 더해 계산 (일별 결과를 다시 조회하지 않음)
+#   분자: REJ_GROUP × AFT_BAD_RSN_CD 별 LOSS_QTY 합
+#   분모: 일자별 COM_QTY 합계(MGR_QTY) 를 기간 내 일자만큼 합, REJ_GROUP_LIST 에 든 그룹에만 적용
+#         (일별 결과에서는 모든 REJ_GROUP 행에 같은 값, 불량 행이 없는 날은 rollup_com_qty 템플릿으로 조회)
+SOURCE_REPORT = 'loss_rate'
+ROLLUP_REPORT = 'loss_rate_rollup'
+ROLLUP_DIR = BASE_DIR / 'cache' / 'rollup' / SOURCE_REPORT    # BASE_DT=YYYYMMDD.parquet (일자별 합산값)
+SOURCE_MTIME_KEY = b'source_mtime'
+COM_QTY_KEY = b'com_qty'        # 일자 분모 (JSON, null = COM_QTY 행 없음, 키 없음 = 확인 못 함)
+COM_QTY_TEMPLATE = 'rollup_com_qty'
+CATEGORIES = {'W': '주', 'M': '월'}
+
+# ==============================================================================
+# 일자별 합산값 (분자 / 분모)
+# ==============================================================================
+_UNKNOWN = object()     # 일자 분모를 일별 결과만으로 알 수 없음
+
+
+def day_partials(daily):
+    """일별 Loss Rate DataFrame → (REJ_GROUP × AFT_BAD_RSN_CD 별 LOSS_QTY + listed, 일자 COM_QTY 합계)
+
+    일별 결과는 BEF_BAD_RSN_CD 단위로 나뉘어 있어 같은 REJ_GROUP / AFT_BAD_RSN_CD 가 여러 행일 수 있다.
+    listed: REJ_GROUP_LIST 포함 여부 (불량 행은 같은 일자 DIV_CD <> 'COM_QTY' 행이므로 REJ_GROUP 이 NULL 이 아니면 포함).
+    COM_QTY 합계는 REJ_GROUP 이 있는 행의 MGR_QTY 이고 (모두 NULL 이면 COM_QTY 행 없음 = None),
+    그런 행이 없으면 일별 결과에 분모가 실리지 않으므로 _UNKNOWN.
+    """
+    daily = daily.rename(columns=str.lower)
+    if 'category' in daily.columns:
+        daily = daily[daily['category'] == 'D']
+    loss = daily.groupby(['rej_group', 'aft_bad_rsn_cd'], dropna=False, sort=False) \
+                .agg(loss_qty=('loss_qty', lambda s: s.sum(min_count=1))).reset_index()
+    loss['listed'] = loss['rej_group'].notna()
+    if not loss['listed'].any():
+        return loss, _UNKNOWN
+    mgr = pd.to_numeric(daily.loc[daily['rej_group'].notna(), 'mgr_qty'], errors='coerce').dropna()
+    return loss, (int(mgr.max()) if len(mgr) else None)
+
+
+def query_com_qty(conn, base_dt, params=DEFAULT_PARAMS):
+    """일자 COM_QTY 합계 조회 (rollup_com_qty 템플릿, COM_QTY 행이 없으면 None)"""
+    cur = conn.cursor()
+    try:
+        execute_template(cur, COM_QTY_TEMPLATE, {**params, 'base_dt': base_dt})
+        value = cur.fetchone()[0]
+    finally:
+        cur.close()
+    return None if value is None else int(value)
+
+
+class PartialStore:
+    """일자별 합산값 파일 (cache/rollup/loss_rate/BASE_DT=YYYYMMDD.parquet)
+
+    원본 일자 파티션(data.parquet)의 수정 시각을 파일 메타데이터에 남겨, 원본이 다시 계산된 일자만 갱신한다.
+    """
+
+    def __init__(self, rollup_dir=ROLLUP_DIR):
+        self.rollup_dir = Path(rollup_dir)
+        self.rollup_dir.mkdir(parents=True, exist_ok=True)
+
+    def path(self, base_dt):
+        return self.rollup_dir / f"BASE_DT={base_dt}.parquet"
+
+    def days(self):
+        return sorted(p.stem.split('=', 1)[1] for p in self.rollup_dir.glob('BASE_DT=*.parquet'))
+
+    def _schema(self, base_dt):
+        """보관 파일 스키마 (없거나 listed 컬럼이 없는 이전 형식이면 None → 다시 만듦)"""
+        path = self.path(base_dt)
+        if not path.exists():
+            return None
+        schema = pq.read_schema(path)
+        return schema if 'listed' in schema.names else None
+
+    def source_mtime(self, base_dt):
+        schema = self._schema(base_dt)
+        if schema is None:
+            return None
+        return float((schema.metadata or {}).get(SOURCE_MTIME_KEY, b'0'))
+
+    def has_com_qty(self, base_dt):
+        schema = self._schema(base_dt)
+        return schema is not None and COM_QTY_KEY in (schema.metadata or {})
+
+    def put(self, base_dt, daily, source_mtime=None, conn=None):
+        """일별 결과 1일치를 합산값으로 저장 (같은 일자는 교체)
+
+        일별 결과에 분모가 없는 일자는 conn 이 있으면 COM_QTY 합계를 조회해 함께 저장하고,
+        없으면 분모 미확인으로 남겨 누계에서 누락 일자로 다룬다.
+        """
+        loss, com_qty = day_partials(daily)
+        if com_qty is _UNKNOWN and conn is not None:
+            com_qty = query_com_qty(conn, base_dt)
+        metadata = {SOURCE_MTIME_KEY: str(source_mtime or 0).encode()}
+        if com_qty is not _UNKNOWN:
+            metadata[COM_QTY_KEY] = json.dumps(com_qty).encode()
+        table = pa.Table.from_pandas(loss, preserve_index=False)
+        table = table.replace_schema_metadata({**(table.schema.metadata or {}), **metadata})
+        path = self.path(base_dt)
+        tmp_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        pq.write_table(table, tmp_path, compression='zstd')
+        os.replace(tmp_path, path)
+        return len(loss)
+
+    def sync(self, output_dir=OUTPUT_DIR, until=None, conn=None):
+        """runner / derive 출력의 완료된 일별 파티션 중 새로 생겼거나 다시 계산된 일자만 반영, 반영 일자 목록 반환"""
+        updated = []
+        for day_dir in sorted(Path(output_dir, SOURCE_REPORT).glob('BASE_DT=*')):
+            base_dt = day_dir.name.split('=', 1)[1]
+            data_path = day_dir / 'data.parquet'
+            if (until and base_dt > until) or not (day_dir / SUCCESS_MARKER).exists() or not data_path.exists():
+                continue
+            mtime = data_path.stat().st_mtime
+            # 분모 미확인으로 보관된 일자는 연결이 있을 때 다시 반영
+            if self.source_mtime(base_dt) == mtime and (conn is None or self.has_com_qty(base_dt)):
+                continue
+            self.put(base_dt, pd.read_parquet(data_path), source_mtime=mtime, conn=conn)
+            updated.append(base_dt)
+        return updated
+
+    def load(self, base_dts):
+        """기간 내 일자 합산값 (loss: 일자 × REJ_GROUP × AFT_BAD_RSN_CD, mgr: {일자: COM_QTY 합계})
+
+        보관되지 않았거나 분모를 확인하지 못한 일자는 mgr 에 없다.
+        """
+        frames = []
+        mgr = {}
+        for base_dt in base_dts:
+            path = self.path(base_dt)
+            if not path.exists():
+                continue
+            table = pq.read_table(path)
+            com_qty = (table.schema.metadata or {}).get(COM_QTY_KEY)
+            if com_qty is not None:
+                mgr[base_dt] = json.loads(com_qty)
+            frames.append(table.to_pandas().assign(base_dt=base_dt))
+        loss = pd.concat(frames, ignore_index=True) if frames else \
+            pd.DataFrame(columns=['rej_group', 'aft_bad_rsn_cd', 'loss_qty', 'listed', 'base_dt'])
+        return loss, mgr
+
+# ==============================================================================
+# 기간 / 목표 (DW_BA_CM_BASEDATE_M, DW_BA_CM_YLDPLAN_M 스냅샷)
+# ==============================================================================
+def period_days(masters, base_dt):
+    """기준일이 속한 주(BESOF_BASE_YW_NM) / 월의 시작일~기준일 목록과 표시명
+
+    반환: {'W': (표시명, [일자...]), 'M': (표시명, [일자...])}
+    """
+    bd = masters.frame('basedate').astype(object)
+    week = bd.loc[bd['base_dt'] == base_dt, 'besof_base_yw_nm']
+    if week.empty:
+        raise ValueError(f"BASEDATE 스냅샷에 없는 일자: {base_dt} (wafering_masters.py 로 갱신)")
+    week_days = sorted(bd.loc[(bd['besof_base_yw_nm'] == week.iloc[0]) & (bd['base_dt'] <= base_dt), 'base_dt'])
+    month_start = base_dt[:6] + '01'
+    end = datetime.strptime(base_dt, '%Y%m%d')
+    month_days = [(datetime.strptime(month_start, '%Y%m%d') + timedelta(days=i)).strftime('%Y%m%d')
+                  for i in range(end.day)]
+    return {'W': (str(week.iloc[0])[2:], week_days), 'M': (end.strftime('%y-%m'), month_days)}
+
+
+def monthly_goals(masters, params=DEFAULT_PARAMS):
+    """월(BASE_YM) × REJ_GROUP 목표 (일별 쿼리 DAILY_GOAL 과 같은 조건, DISTINCT 후 GOAL_VAL 합)"""
+    plan = masters.frame('yldplan').astype(object)
+    plan = plan[(plan['waf_size'] == params['waf_size']) & (plan['yld_div1_cd'] == params['oper_div_l'])
+                & (plan['goal_div_cd'] == 'BAD-RATE') & (plan['yld_plan_type'] == 'BP') & (plan['ref_div2'] == 'PN')]
+    plan = plan.drop_duplicates()
+    return plan.groupby(['base_ym', 'yld_div3_cd'])['goal_val'].sum()
+
+
+def period_goal(goals, days):
+    """기간 목표: 기간 내 일자가 가장 많은 월의 목표 (원본 주 목표의 ROW_NUMBER ... COUNT(BASE_DT) DESC)"""
+    if not days:
+        return {}
+    months = pd.Series([d[:6] for d in days]).value_counts()
+    base_ym = sorted(months[months == months.max()].index)[0]
+    if base_ym not in goals.index.get_level_values(0):
+        return {}
+    return goals.loc[base_ym].to_dict()
+
+# ==============================================================================
+# 주 / 월 Loss Rate 계산 (일별 FINAL_DATA 와 같은 컬럼)
+# ==============================================================================
+def _decimal(value):
+    """DECIMAL(24,16) 값 (double 은 BigDecimal.valueOf 규칙, HALF_UP)"""
+    if value is None or pd.isna(value):
+        return None
+    if not isinstance(value, Decimal):
+        value = Decimal(repr(float(value)))
+    return value.quantize(DECIMAL_SCALE, rounding=ROUND_HALF_UP)
+
+
+def rollup_period(loss, mgr, category, name, goals):
+    """기간 내 일자 합산값 → CATEGORY W / M 행
+
+    분모는 기간 내 일자 COM_QTY 합계 (모두 NULL 이면 NULL) 이고, 기간 내 어느 일자에서든 REJ_GROUP_LIST 에
+    든(listed) 그룹에만 적용된다 (일별 쿼리의 MGR_COMQTY_INFO CROSS JOIN REJ_GROUP_LIST).
+    """
+    grouped = loss.groupby(['rej_group', 'aft_bad_rsn_cd'], dropna=False, sort=False) \
+                  .agg(loss_qty=('loss_qty', lambda s: s.sum(min_count=1)), listed=('listed', 'any')).reset_index()
+    values = [v for v in mgr.values() if v is not None]
+    mgr_qty = sum(values) if values else None
+    listed = set(grouped.loc[grouped['listed'].astype(bool), 'rej_group'])
+
+    ratio, goal_ratio, gap_ratio, mgr_values = [], [], [], []
+    for rej_group, loss_qty in zip(grouped['rej_group'], grouped['loss_qty']):
+        mgr_row = mgr_qty if rej_group in listed else None
+        goal = goals.get(rej_group)
+        goal = Decimal(0) if goal is None or pd.isna(goal) else Decimal(str(goal))
+        mgr_values.append(mgr_row)
+        if mgr_row is not None and mgr_row > 0:
+            r = None if loss_qty is None or pd.isna(loss_qty) else float(loss_qty) / float(mgr_row)
+            ratio.append(_decimal(r))
+            gap_ratio.append(_decimal(None if r is None else r - float(goal)))
+        else:
+            ratio.append(_decimal(0.0))
+            gap_ratio.append(_decimal(-float(goal)))
+        goal_ratio.append(_decimal(goal))
+
+    final = pd.DataFrame({
+        'category': category,
+        'base_dt_nm': name,
+        'rej_group': grouped['rej_group'].values,
+        'aft_bad_rsn_cd': grouped['aft_bad_rsn_cd'].values,
+        'loss_ratio': ratio,
+        'goal_ratio': goal_ratio,
+        'goal_ratio_sum': goal_ratio,
+        'gap_ratio': gap_ratio,
+        'loss_qty': grouped['loss_qty'].values,
+        'mgr_qty': mgr_values,
+        'com_qty': None,
+        'sort_cd': 99999,
+        'prod_grp': 'N/A',
+        'eqp_nm': 'N/A',
+        'eqp_model_nm': 'N/A',
+        'category_name': CATEGORIES[category],
+    }, columns=LOSS_COLUMNS)
+    final = final.sort_values(['rej_group', 'loss_qty'], ascending=[True, False], na_position='last', kind='stable')
+    return final.reset_index(drop=True)
+
+
+def rollup_day(base_dt, masters, store, params=DEFAULT_PARAMS):
+    """기준일 기준 주 / 월 누계 행 (W 다음 M), 기간 내 보관되지 않았거나 분모 미확인 일자는 경고 후 제외"""
+    goals = monthly_goals(masters, params)
+    frames = []
+    for category, (name, days) in period_days(masters, base_dt).items():
+        loss, mgr = store.load(days)
+        missing = [d for d in days if d not in mgr]
+        loss = loss[~loss['base_dt'].isin(missing)]
+        if missing:
+            print(f"[{ROLLUP_REPORT}] {base_dt} {CATEGORIES[category]}({name}) 누락 일자 {len(missing)}일 제외: "
+                  f"{', '.join(missing[:7])}{' ...' if len(missing) > 7 else ''}")
+        frames.append(rollup_period(loss, mgr, category, name, period_goal(goals, days)))
+    return pd.concat(frames, ignore_index=True)
+
+# ==============================================================================
+# 메인 실행 함수
+# ==============================================================================
+def parse_args():
+    parser = argparse.ArgumentParser(description='일별 Loss Rate 보관분으로 주(W) / 월(M) 누계 계산 (일별 결과 재조회 없음)')
+    parser.add_argument('--date', metavar='YYYYMMDD', help='기준일자 BASE_DT (기본: 어제)')
+    parser.add_argument('--output-dir', default=str(OUTPUT_DIR), help='일별 결과 위치이자 누계 저장 위치')
+    parser.add_argument('--rollup-dir', default=str(ROLLUP_DIR))
+    parser.add_argument('--refresh-masters', action='store_true',
+                        help='BASEDATE / YLDPLAN 스냅샷을 먼저 갱신 (변경된 테이블만)')
+    parser.add_argument('--offline', action='store_true',
+                        help='Trino 에 연결하지 않음 (불량 행이 없는 일자의 분모를 조회하지 못해 누락 일자로 처리)')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    base_dt = args.date or (datetime.now() - timedelta(days=1)).strftime('%Y%m%d')
+    conn = None
+    try:
+        masters = MasterStore()
+        conn = None if args.offline else create_trino_connection()
+        if args.refresh_masters and conn is not None:
+            for name, state in masters.refresh(conn, ['basedate', 'yldplan']).items():
+                print(f"기준정보 {name}: {state}")
+
+        store = PartialStore(args.rollup_dir)
+        updated = store.sync(args.output_dir, until=base_dt, conn=conn)
+        print(f"일자별 합산값 반영: {len(updated)}일{' (' + ', '.join(updated[-5:]) + ')' if updated else ''}")
+
+        df = rollup_day(base_dt, masters, store)
+        output_path = write_partition_frame(df, args.output_dir, ROLLUP_REPORT, base_dt)
+        print(f"주/월 누계 완료 | 행 수: {len(df)}, 파일: {output_path}")
+        print(df.head())
+    except Exception as e:
+        print(f"주/월 누계 계산 중 오류 발생: {e}")
+        sys.exit(1)
+    finally:
+        if conn:
+            conn.close()
+
+# 실행
+if __name__ == "__main__":
+    main()
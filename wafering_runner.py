@@ -0,0 +1,596 @@
+import argparse
+import importlib.util
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pyarrow.parquet as pq
+
+from wafering_cache import MAX_CACHE_GB, ResultCache, cache_key, run_probe
+from wafering_common import (DEFAULT_DECODE_PROCESSES, DEFAULT_RESULT_ENCODING, RESULT_ENCODINGS,
+                              create_trino_connection, open_cursor)
+from wafering_dataset import DATASET_DIR, publish_dataset
+from wafering_fetch import DEFAULT_BATCH_SIZE, fetch_frame, parse_decimal_modes, write_parquet_stream
+from wafering_metrics import query_stats, record_query
+from wafering_preflight import (EXPLAIN_TTL_SEC, ExplainCache, check_data_size_before_query, policy_for,
+                                print_preflight, run_preflight)
+from wafering_split import SPLIT_KEYS, SplitSpec, is_splittable, run_split
+from wafering_sql import DEFAULT_EXECUTE_MODE, EXECUTE_MODES, execute_template, load_template
+from wafering_watchdog import BudgetExceeded, QueryWatchdog, budget_for, describe_budget
+
+BASE_DIR = Path(__file__).resolve().parent
+
+# ==============================================================================
+# 리포트 목록 (이름 → 쿼리 스크립트, 각 스크립트는 build_query(base_dt) 제공,
+# sql/ 템플릿을 쓰는 스크립트는 TEMPLATE / query_params(base_dt) 도 제공)
+# ==============================================================================
+REPORTS = {
+    'loss_rate': '3210_DATA_wafering_300_trino.py',      # 일별 팀 Loss Rate
+    'lot_grid': '3210_DATA_LOT_wafering_300_trino.py',   # LOT 단위 불량 Grid
+    'waf_grid': '3210_DATA_WAF_wafering_300_trino.py',   # WAF 단위 불량 Grid
+    'scrap_rate': '3410_DATA_wafering_300_trino.py',           # 일별 팀 폐기율
+    'scrap_lot_grid': '3410_DATA_LOT_wafering_300_trino.py',   # LOT 단위 폐기 Grid
+    'scrap_waf_grid': '3410_DATA_WAF_wafering_300_trino.py',   # WAF 단위 폐기 Grid
+}
+
+DEFAULT_WORKERS = 3
+DEFAULT_RETRIES = 2             # 실패한 일자만 다시 실행하는 횟수
+RETRY_WAIT_SEC = 30
+OUTPUT_DIR = BASE_DIR / 'output'
+SUCCESS_MARKER = '_SUCCESS'
+WATERMARK_FILE = '_WATERMARK.json'     # 증분 갱신 기준 (wafering_incremental)
+
+# ==============================================================================
+# 리포트 스크립트 로드 (파일명이 숫자로 시작해 import 문으로는 불가)
+# ==============================================================================
+_report_modules = {}
+
+
+def load_report_module(name):
+    if name not in _report_modules:
+        path = BASE_DIR / REPORTS[name]
+        spec = importlib.util.spec_from_file_location(f"report_{name}", path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        _report_modules[name] = module
+    return _report_modules[name]
+
+
+def build_report_query(name, base_dt):
+    return load_report_module(name).build_query(base_dt)
+
+
+def report_template(name):
+    """(템플릿 이름, 바인딩 파라미터 함수) - sql/ 템플릿으로 전환된 리포트만, 아니면 None"""
+    module = load_report_module(name)
+    if not hasattr(module, 'TEMPLATE'):
+        return None
+    return module.TEMPLATE, module.query_params
+
+
+def report_sql(name):
+    """실행 통계의 SQL 식별용 템플릿 본문 (템플릿 미사용 리포트는 None)"""
+    template = report_template(name)
+    return load_template(template[0]) if template is not None else None
+
+
+def report_probe_tables(name):
+    return getattr(load_report_module(name), 'PROBE_TABLES', None)
+
+# ==============================================================================
+# 일자 파티션 (output/<report>/BASE_DT=YYYYMMDD/)
+# ==============================================================================
+def date_range(from_dt, to_dt):
+    """'YYYYMMDD' 시작~종료일(포함) 목록"""
+    start = datetime.strptime(from_dt, '%Y%m%d')
+    end = datetime.strptime(to_dt, '%Y%m%d')
+    if start > end:
+        raise ValueError(f"시작일({from_dt})이 종료일({to_dt})보다 늦습니다.")
+    return [(start + timedelta(days=i)).strftime('%Y%m%d') for i in range((end - start).days + 1)]
+
+
+def partition_dir(output_dir, name, base_dt):
+    return Path(output_dir) / name / f"BASE_DT={base_dt}"
+
+
+def is_partition_done(output_dir, name, base_dt):
+    return (partition_dir(output_dir, name, base_dt) / SUCCESS_MARKER).exists()
+
+
+def _incremental():
+    # wafering_incremental 이 이 모듈의 파티션 함수를 쓰므로 실행 시점에 가져옴
+    import wafering_incremental
+    return wafering_incremental
+
+
+def is_incremental(name):
+    return name == _incremental().REPORT_NAME
+
+
+def restamp_watermark(part_dir, name):
+    """파티션을 새로 쓴 뒤 증분 갱신 리포트면 새 파일 기준으로 워터마크를 다시 기록 (이전 워터마크는 쓰기 전에 삭제)"""
+    if is_incremental(name):
+        _incremental().stamp_watermark(part_dir)
+
+
+def write_partition_frame(df, output_dir, name, base_dt):
+    """로컬에서 계산한 DataFrame 을 일자 파티션에 저장 (임시 파일 → 교체 → 완료 표시)"""
+    part_dir = partition_dir(output_dir, name, base_dt)
+    part_dir.mkdir(parents=True, exist_ok=True)
+    output_path = part_dir / 'data.parquet'
+    (part_dir / SUCCESS_MARKER).unlink(missing_ok=True)
+    (part_dir / WATERMARK_FILE).unlink(missing_ok=True)
+    tmp_path = output_path.with_name(f".{output_path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    df.to_parquet(tmp_path, index=False, compression='zstd')
+    os.replace(tmp_path, output_path)
+    restamp_watermark(part_dir, name)
+    (part_dir / SUCCESS_MARKER).write_text(datetime.now().isoformat(), encoding='utf-8')
+    return output_path
+
+# ==============================================================================
+# 리포트 쿼리 1건 실행 + 실행 중 한도 감시 (run_report / 단독 스크립트 공용)
+# ==============================================================================
+def execute_query(cur, name, base_dt, consume, query=None, execute_mode=DEFAULT_EXECUTE_MODE, budget=None):
+    """리포트 쿼리 실행 후 consume(cur, check) 로 결과를 받아 (consume 결과, execute_sec, fetch_sec) 반환
+
+    sql/ 템플릿 리포트는 바인딩해 실행하고 아니면 query 를 실행한다. budget(wafering_watchdog.budget_for)이
+    주어지면 실행 / 수신 중 서버 통계를 감시해 한도를 넘은 쿼리를 취소하고 BudgetExceeded 를 던진다
+    (취소 뒤 클라이언트 오류(USER_CANCELED 등)가 나도 취소 사유로 바꿔 던짐). check 는 결과를 쓰기 전에 호출.
+    """
+    watchdog = QueryWatchdog(cur, budget, name=f"{name} {base_dt}").start()
+    try:
+        started = time.perf_counter()
+        template = report_template(name)
+        if template is not None:
+            template_name, query_params = template
+            execute_template(cur, template_name, query_params(base_dt), mode=execute_mode)
+        else:
+            cur.execute(query)
+        t_execute = time.perf_counter()
+        result = consume(cur, watchdog.check)
+        watchdog.check()
+        return result, round(t_execute - started, 3), round(time.perf_counter() - t_execute, 3)
+    except BudgetExceeded:
+        raise
+    except Exception as e:
+        if watchdog.reason is not None:
+            raise BudgetExceeded(watchdog.name, watchdog.reason, watchdog.query_id) from e
+        raise
+    finally:
+        watchdog.stop()
+
+# ==============================================================================
+# 리포트 1건 실행 (스레드 작업 단위)
+# ==============================================================================
+def run_report(name, query, base_dt, output_dir=OUTPUT_DIR, batch_size=DEFAULT_BATCH_SIZE, cache=None,
+               execute_mode=DEFAULT_EXECUTE_MODE, encoding=DEFAULT_RESULT_ENCODING,
+               decode_processes=DEFAULT_DECODE_PROCESSES, connect=None, budget=None, dataset_dir=None, split=None,
+               incremental=False):
+    """쿼리 실행 → 일자 파티션에 Parquet 저장 후 단계별 소요시간 dict 반환 (예외는 결과에 기록)
+
+    cache 가 주어지면 probe 쿼리로 팩트/보정 테이블의 변경 여부를 먼저 확인하고,
+    변경이 없으면 본 쿼리 대신 캐시된 결과를 사용한다. encoding 이 'rows' 가 아니면
+    결과를 압축 세그먼트로 받아 컬럼 단위로 디코딩하고, decode_processes 가 주어지면
+    페이지 디코딩을 프로세스 풀에 넘긴다. connect 가 주어지면 연결 생성에 사용한다
+    (wafering_async 가 cursor 를 추적해 서버 쿼리를 취소할 수 있도록). budget(wafering_watchdog.budget_for)이
+    주어지면 실행 중 서버 통계를 감시해 한도를 넘은 쿼리를 취소하고 status 'budget_exceeded' 로 기록한다.
+    dataset_dir 이 주어지면 결과를 BASE_DT / FAC_ID 파티션 데이터셋(wafering_dataset)에도 게시한다.
+    split(wafering_split.SplitSpec)이 주어지면 Grid 리포트는 분할 키 기준 하위 쿼리를 동시에 실행해 이어 붙이고,
+    하위 쿼리별 결과를 timing['shards'] 에 남긴다. incremental=True 이고 워터마크가 있으면
+    wafering_incremental.refresh_day 로 변경분만 조회해 병합하고 (timing['refresh'] 에 방식 / 변경 행 수),
+    그 외 경로로 파티션을 새로 쓰면 워터마크를 새 파일 기준으로 다시 기록한다.
+    """
+    timing = {'report': name, 'base_dt': base_dt, 'status': 'ok', 'rows': 0, 'attempt': 1,
+              'connect_sec': None, 'execute_sec': None, 'fetch_sec': None, 'total_sec': None,
+              'output': None, 'error': None}
+    started = time.perf_counter()
+    conn = None
+    cur = None
+    try:
+        conn = connect() if connect else create_trino_connection(encoding, decode_processes)
+        cur = open_cursor(conn)
+        t_connect = time.perf_counter()
+        timing['connect_sec'] = round(t_connect - started, 3)
+
+        part_dir = partition_dir(output_dir, name, base_dt)
+        output_path = part_dir / 'data.parquet'
+        refresh = incremental and _incremental().read_watermark(part_dir) is not None
+        (part_dir / SUCCESS_MARKER).unlink(missing_ok=True)
+        if not refresh:
+            (part_dir / WATERMARK_FILE).unlink(missing_ok=True)
+
+        key = probe = cached_path = None
+        probe_tables = report_probe_tables(name)
+        if cache is not None and probe_tables and not refresh:
+            key = cache_key(query, base_dt)
+            template = report_template(name)
+            probe = run_probe(conn, probe_tables, base_dt, template[1](base_dt) if template is not None else None)
+            cached_path = cache.lookup(key, probe, dest_path=output_path)
+
+        if refresh:
+            refreshed = _incremental().refresh_day(conn, base_dt, output_dir, batch_size=batch_size,
+                                                   execute_mode=execute_mode)
+            timing['refresh'] = {'mode': refreshed['mode'], 'changed': refreshed['changed']}
+            timing['rows'] = refreshed['rows']
+            timing['execute_sec'] = round(time.perf_counter() - t_connect, 3)
+        elif cached_path is not None:
+            timing['status'] = 'cached'
+            timing['rows'] = pq.ParquetFile(output_path).metadata.num_rows
+            timing['execute_sec'] = round(time.perf_counter() - t_connect, 3)
+        elif split is not None and is_splittable(name) and report_template(name) is not None:
+            template_name, query_params = report_template(name)
+            shards = run_split(template_name, query_params(base_dt), output_path, split, name=f"{name} {base_dt}",
+                               connect=connect or (lambda: create_trino_connection(encoding, decode_processes)),
+                               execute_mode=execute_mode, batch_size=batch_size, budget=budget)
+            timing['shards'] = shards
+            timing['rows'] = sum(r['rows'] for r in shards)
+            timing['execute_sec'] = max(r['execute_sec'] for r in shards)
+            timing['fetch_sec'] = round(time.perf_counter() - t_connect - timing['execute_sec'], 3)
+            if probe is not None:
+                cache.store(key, output_path, probe, report=name, base_dt=base_dt)
+        else:
+            print(f"[{name}] {base_dt} 쿼리 실행 중...")
+            timing['rows'], timing['execute_sec'], timing['fetch_sec'] = execute_query(
+                cur, name, base_dt, lambda cur, check: write_parquet_stream(cur, output_path, batch_size=batch_size,
+                                                                            check=check),
+                query=query, execute_mode=execute_mode, budget=budget)
+            timing['stats'] = query_stats(cur)
+            if probe is not None:
+                cache.store(key, output_path, probe, report=name, base_dt=base_dt)
+
+        if not refresh:
+            restamp_watermark(part_dir, name)
+        if dataset_dir is not None:
+            publish_dataset(output_path, dataset_dir, name, base_dt)
+
+        # 파일 교체가 끝난 뒤에 완료 표시 → 중간 실패한 일자는 다음 실행 때 다시 계산
+        (part_dir / SUCCESS_MARKER).write_text(datetime.now().isoformat(), encoding='utf-8')
+        timing['output'] = str(output_path)
+        status = '캐시 재사용' if cached_path is not None else '완료'
+        print(f"[{name}] {base_dt} {status} | 행 수: {timing['rows']}, 파일: {output_path}")
+
+    except Exception as e:
+        timing['error'] = str(e)
+        if cur is not None and cur.query_id:
+            timing['stats'] = query_stats(cur)
+        if isinstance(e, BudgetExceeded):
+            # 같은 결과가 나오므로 재시도 안 함
+            timing['status'] = 'budget_exceeded'
+        else:
+            timing['status'] = 'failed'
+        print(f"[{name}] {base_dt} 쿼리 실행 중 오류 발생: {timing['error']}")
+
+    finally:
+        if cur:
+            cur.close()
+        if conn:
+            conn.close()
+        timing['total_sec'] = round(time.perf_counter() - started, 3)
+    return timing
+
+# ==============================================================================
+# 여러 리포트 × 일자 동시 실행
+# ==============================================================================
+def preflight_report(conn, name, query, base_dt, explain_cache=None):
+    """리포트 정책으로 용량 점검 1건 (EXPLAIN 캐시 키는 템플릿 + 파라미터)"""
+    template = report_template(name)
+    if template is not None:
+        template_name, query_params = template
+        key_template, key_params = load_template(template_name), query_params(base_dt)
+    else:
+        key_template, key_params = query, {'report': name, 'base_dt': base_dt}
+    result = run_preflight(conn, query, policy=policy_for(name), name=name, cache=explain_cache,
+                           template=key_template, params=key_params)
+    print_preflight(result)
+    return result
+
+
+def _preflight(queries, explain_cache=None):
+    """리포트별 정책으로 용량 점검 (입력 대기 없음), {리포트: PreflightResult} 반환"""
+    results = {}
+    conn = create_trino_connection()
+    try:
+        for name, (query, base_dt) in queries.items():
+            results[name] = preflight_report(conn, name, query, base_dt, explain_cache)
+    finally:
+        conn.close()
+    return results
+
+
+def run_reports(names, base_dates, max_workers=DEFAULT_WORKERS, output_dir=OUTPUT_DIR,
+                batch_size=DEFAULT_BATCH_SIZE, preflight=True, retries=DEFAULT_RETRIES, force=False,
+                cache=None, explain_cache=None, execute_mode=DEFAULT_EXECUTE_MODE, encoding=DEFAULT_RESULT_ENCODING,
+                decode_processes=DEFAULT_DECODE_PROCESSES, budget=True, budget_multiple=None, dataset_dir=None,
+                split=None, incremental=False):
+    """(리포트, 일자) 작업을 제한된 스레드 풀에서 동시 실행하고 타이밍 목록 반환
+
+    완료 표시(_SUCCESS)가 있는 일자는 건너뛰고 (force=True 면 재계산),
+    실패한 (리포트, 일자)만 retries 회까지 다시 실행한다. cache(ResultCache)가 주어지면
+    변경되지 않은 일자는 캐시 결과를 사용한다. 용량 점검은 REPORT_POLICIES 의 차단 기준을
+    넘는 리포트만 제외하며 입력을 기다리지 않는다. 쿼리를 실행한 시도는 서버 통계를
+    EXPLAIN 추정치와 함께 wafering_metrics 에 기록한다. budget=True 면 REPORT_BUDGETS 와 EXPLAIN 예상 입력
+    (× budget_multiple) 기준으로 실행 중 쿼리를 감시하고, 한도를 넘은 일자는 취소 후 재시도하지 않는다.
+    dataset_dir 이 주어지면 완료된 일자를 파티션 데이터셋에도 게시한다. split 이 주어지면 Grid 리포트는
+    하위 쿼리로 나눠 실행하고 (동시 쿼리 수 = max_workers × 하위 쿼리 수), 통계는 하위 쿼리별로 기록한다.
+    incremental=True 면 증분 갱신 리포트(wafering_incremental.REPORT_NAME)의 완료된 일자도 건너뛰지 않고
+    워터마크 이후 변경분만 병합한다 (force=True 면 전체 재계산 후 워터마크를 새로 기록).
+    """
+    if isinstance(base_dates, str):
+        base_dates = [base_dates]
+    results = []
+    tasks = []
+    checks = {}
+    for base_dt in base_dates:
+        for name in names:
+            if incremental and not force and is_incremental(name):
+                tasks.append((name, base_dt))
+            elif not force and is_partition_done(output_dir, name, base_dt):
+                results.append({'report': name, 'base_dt': base_dt, 'status': 'skipped'})
+            else:
+                tasks.append((name, base_dt))
+
+    # 용량 점검은 리포트별로 첫 대상 일자만 수행 (일자별 규모는 비슷함)
+    if preflight and tasks:
+        first_day = {}
+        for name, base_dt in tasks:
+            first_day.setdefault(name, base_dt)
+        checks = _preflight({name: (build_report_query(name, dt), dt) for name, dt in first_day.items()},
+                            explain_cache=explain_cache)
+        cancelled = {name for name, check in checks.items() if not check.allowed}
+        for name, base_dt in tasks:
+            if name in cancelled:
+                results.append({'report': name, 'base_dt': base_dt, 'status': 'cancelled',
+                                'preflight': checks[name].to_dict()})
+        tasks = [t for t in tasks if t[0] not in cancelled]
+
+    budgets = {}
+    if budget:
+        for name in {name for name, _ in tasks}:
+            budgets[name] = budget_for(name, checks.get(name), budget_multiple)
+            print(f"[{name}] 실행 한도: {describe_budget(budgets[name])}")
+
+    attempt = 1
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='report') as pool:
+        while tasks:
+            futures = [
+                pool.submit(run_report, name, build_report_query(name, base_dt), base_dt, output_dir, batch_size, cache,
+                            execute_mode, encoding, decode_processes, budget=budgets.get(name),
+                            dataset_dir=dataset_dir, split=split,
+                            incremental=incremental and not force and is_incremental(name))
+                for name, base_dt in tasks
+            ]
+            round_results = [f.result() for f in futures]
+            for r in round_results:
+                r['attempt'] = attempt
+                if r.get('stats'):
+                    record_query(r['report'], r['base_dt'], stats=r['stats'], sql=report_sql(r['report']),
+                                 preflight=checks.get(r['report']), status=r['status'], attempt=attempt,
+                                 rows=r['rows'], execute_sec=r['execute_sec'], fetch_sec=r['fetch_sec'],
+                                 **({'error': r['error']} if r['status'] == 'budget_exceeded' else {}))
+                for shard in r.get('shards') or []:
+                    record_query(r['report'], r['base_dt'], stats=shard['stats'], sql=report_sql(r['report']),
+                                 preflight=checks.get(r['report']), status=r['status'], attempt=attempt,
+                                 rows=shard['rows'], execute_sec=shard['execute_sec'], fetch_sec=shard['fetch_sec'],
+                                 split=shard['shard'])
+            failed = [r for r in round_results if r['status'] == 'failed']
+            results.extend(r for r in round_results if r['status'] != 'failed')
+
+            if not failed or attempt > retries:
+                results.extend(failed)
+                break
+            print(f"\n실패 {len(failed)}건 재시도 ({attempt}/{retries}) - {RETRY_WAIT_SEC}초 후")
+            time.sleep(RETRY_WAIT_SEC)
+            tasks = [(r['report'], r['base_dt']) for r in failed]
+            attempt += 1
+
+    results.sort(key=lambda r: (r['base_dt'], r['report']))
+    return results
+
+
+def write_summary(results, output_dir=OUTPUT_DIR, wall_sec=None):
+    """실행 결과를 JSON 한 파일로 저장하고 콘솔에 표로 출력"""
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    summary_path = output_dir / f"run_summary_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    summary = {'wall_sec': wall_sec, 'reports': results}
+    summary_path.write_text(json.dumps(summary, ensure_ascii=False, indent=2), encoding='utf-8')
+
+    print("\n================ 실행 요약 ================")
+    print(f"{'report':<12} {'base_dt':<10} {'status':<10} {'try':>4} {'rows':>10} {'execute':>9} {'fetch':>9} {'total':>9}")
+    for r in results:
+        print(f"{r['report']:<12} {r['base_dt']:<10} {r['status']:<10} {r.get('attempt') or '-':>4} {r.get('rows') or 0:>10} "
+              f"{r.get('execute_sec') or 0:>9.1f} {r.get('fetch_sec') or 0:>9.1f} {r.get('total_sec') or 0:>9.1f}")
+    if wall_sec is not None:
+        print(f"전체 소요시간: {wall_sec:.1f}초")
+    print(f"요약 파일: {summary_path}")
+    return summary_path
+
+# ==============================================================================
+# 단독 리포트 스크립트 (3210_* / 3410_*) 공용 실행
+# ==============================================================================
+def script_parser(decimal_columns=()):
+    # wafering_server 가 이 모듈을 쓰므로 실행 시점에 가져옴
+    from wafering_server import DEFAULT_URL
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--stream', metavar='PARQUET_PATH',
+                        help='fetchmany 배치 단위로 Parquet 파일에 바로 기록 (DataFrame 미생성, 대용량 조회용)')
+    parser.add_argument('--dataset', nargs='?', const=str(DATASET_DIR), metavar='DIR',
+                        help=f'결과를 BASE_DT / FAC_ID 파티션 데이터셋에 저장 (같은 일자는 교체, DIR 생략 시 {DATASET_DIR})')
+    parser.add_argument('--server', nargs='?', const=DEFAULT_URL, metavar='URL',
+                        help=f'결과 공유 서버(wafering_server.py)에서 받음 - 같은 일자는 한 번만 추출 (URL 생략 시 {DEFAULT_URL})')
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+                        help=f'fetchmany 배치 크기 (기본 {DEFAULT_BATCH_SIZE})')
+    parser.add_argument('--execute-mode', choices=EXECUTE_MODES, default=DEFAULT_EXECUTE_MODE,
+                        help='immediate: EXECUTE IMMEDIATE 바인딩 (기본), prepare: PREPARE/EXECUTE, literal: 리터럴 SQL')
+    if decimal_columns:
+        parser.add_argument('--decimal-mode', nargs='+', metavar='[COLUMN=]MODE',
+                            help=f"DECIMAL 컬럼({', '.join(decimal_columns)}) 변환 방식: object (Decimal, 기본) / "
+                                 "float64 (유효숫자 15자리) / scaled (int64 = 값 × 10^16, 정확). "
+                                 "예: --decimal-mode float64 GAP_RATIO=scaled")
+    return parser
+
+
+def run_script(name, decimal_columns=()):
+    """리포트 스크립트의 main: 어제 일자 1건을 조회해 화면에 출력 (--stream 이면 Parquet 파일로 기록)
+
+    용량 점검은 터미널이면 경고 시 확인 입력을 받고, 실행 / 한도 감시는 run_report 와 같은 execute_query,
+    데이터셋 게시 / 공유 서버 수신은 wafering_dataset / wafering_server 를 그대로 쓴다.
+    decimal_columns 가 주어지면 --decimal-mode 옵션을 받는다.
+    """
+    args = script_parser(decimal_columns).parse_args()
+
+    # 오늘 날짜 기준 어제 날짜 생성
+    base_dt = (datetime.now() - timedelta(days=1)).strftime('%Y%m%d')
+    print(f"일자: 어제 ({base_dt})")
+
+    if args.server:
+        # 서버가 이미 추출했거나 추출 중이면 그 결과를 함께 사용 (Trino 조회 없음)
+        from wafering_server import print_shared_report
+        print_shared_report(name, base_dt, url=args.server)
+        return
+
+    template_name, query_params = report_template(name)
+    decimal_modes = parse_decimal_modes(getattr(args, 'decimal_mode', None))
+    conn = None
+    cur = None
+    try:
+        # 1. 연결 생성
+        conn = create_trino_connection()
+        print("Trino에 연결되었습니다.")
+
+        # 2. 용량 사전 점검
+        preflight = check_data_size_before_query(conn, build_report_query(name, base_dt), cache=ExplainCache(),
+                                                 template=load_template(template_name), params=query_params(base_dt))
+
+        # 3. 실제 쿼리 실행 (실행 중 한도 감시: EXPLAIN 예상 대비 처리량 / 메모리 / 경과 시간 초과 시 서버 쿼리 취소)
+        cur = open_cursor(conn)
+        print("\n실제 쿼리 실행 중...")
+
+        def consume(cur, check):
+            if args.stream:
+                # 스트리밍 모드: 배치 단위로 Parquet 기록 (최대 메모리 = 배치 1개)
+                return write_parquet_stream(cur, args.stream, batch_size=args.batch_size, check=check)
+            # 페이지 단위로 타입별 컬럼 버퍼에 적재 (코드 컬럼 category, 수량 int64, 일시 datetime64)
+            return fetch_frame(cur, batch_size=args.batch_size, decimal_modes=decimal_modes)
+
+        result, execute_sec, fetch_sec = execute_query(cur, name, base_dt, consume, execute_mode=args.execute_mode,
+                                                       budget=budget_for(name, preflight))
+        if args.stream:
+            row_count = result
+            print(f"스트리밍 저장 완료 | 행 수: {row_count}, 파일: {args.stream}")
+        else:
+            row_count = len(result)
+            print(f"데이터 로드 완료 | 행 수: {row_count}, 열 수: {len(result.columns)}")
+            print(result.head())
+
+        if args.dataset:
+            publish_dataset(args.stream or result, args.dataset, name, base_dt)
+
+        # 4. 서버 실행 통계 기록 (python wafering_metrics.py 로 리포트별 추이 확인)
+        record_query(name, base_dt, cur, sql=load_template(template_name), preflight=preflight, status='ok',
+                     rows=row_count, execute_sec=execute_sec, fetch_sec=fetch_sec)
+
+    except Exception as e:
+        print(f"쿼리 실행 중 오류 발생: {e}")
+        sys.exit(1)
+
+    finally:
+        if cur:
+            cur.close()
+        if conn:
+            conn.close()
+        print("데이터베이스 연결이 종료되었습니다.")
+
+# ==============================================================================
+# 메인 실행 함수
+# ==============================================================================
+def parse_args():
+    parser = argparse.ArgumentParser(description='wafering 리포트 통합 실행')
+    parser.add_argument('--reports', nargs='+', choices=list(REPORTS), default=list(REPORTS),
+                        help='실행할 리포트 (기본: 전체)')
+    parser.add_argument('--date', metavar='YYYYMMDD',
+                        help='기준일자 BASE_DT (기본: 어제)')
+    parser.add_argument('--from', dest='from_dt', metavar='YYYYMMDD',
+                        help='백필 시작일 (--to 와 함께 사용, 일자별 파티션으로 분할 실행)')
+    parser.add_argument('--to', dest='to_dt', metavar='YYYYMMDD',
+                        help='백필 종료일 (포함)')
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS,
+                        help=f'동시 실행 쿼리 수 (기본 {DEFAULT_WORKERS})')
+    parser.add_argument('--retries', type=int, default=DEFAULT_RETRIES,
+                        help=f'실패한 일자 재시도 횟수 (기본 {DEFAULT_RETRIES})')
+    parser.add_argument('--force', action='store_true',
+                        help='완료된 일자 파티션도 다시 계산')
+    parser.add_argument('--output-dir', default=str(OUTPUT_DIR))
+    parser.add_argument('--dataset-dir', nargs='?', const=str(DATASET_DIR), metavar='DIR',
+                        help=f'완료된 일자를 BASE_DT / FAC_ID 파티션 데이터셋에도 게시 (DIR 생략 시 {DATASET_DIR})')
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument('--execute-mode', choices=EXECUTE_MODES, default=DEFAULT_EXECUTE_MODE,
+                        help='immediate: EXECUTE IMMEDIATE 바인딩 (기본), prepare: PREPARE/EXECUTE, literal: 리터럴 SQL')
+    parser.add_argument('--encoding', choices=RESULT_ENCODINGS, default=DEFAULT_RESULT_ENCODING,
+                        help='결과 수신 방식 (기본 rows: 기존 행 단위, json+zstd/json+lz4/json: spooling 세그먼트)')
+    parser.add_argument('--decode-processes', type=int, default=DEFAULT_DECODE_PROCESSES,
+                        help=f'결과 페이지 디코딩 프로세스 수 (기본 0: 사용 안 함, 이 서버 코어 수 {os.cpu_count()})')
+    parser.add_argument('--skip-preflight', action='store_true',
+                        help='EXPLAIN 용량 사전 점검 생략')
+    parser.add_argument('--no-budget', action='store_true',
+                        help='실행 중 한도 감시 안 함 (wafering_watchdog.REPORT_BUDGETS)')
+    parser.add_argument('--budget-multiple', type=float,
+                        help='처리 bytes 한도 = EXPLAIN 예상 입력 × 배수 (기본: 리포트 정책 값, 0 이면 절대 한도만)')
+    parser.add_argument('--explain-ttl-hours', type=float, default=EXPLAIN_TTL_SEC / 3600,
+                        help=f'EXPLAIN 결과 재사용 시간 (기본 {EXPLAIN_TTL_SEC / 3600:g}시간, 0 이면 매번 실행)')
+    parser.add_argument('--split', choices=SPLIT_KEYS,
+                        help='Grid 리포트를 FAC_ID 묶음 / OPER_ID 범위별 하위 쿼리로 나눠 동시 실행 후 이어 붙임')
+    parser.add_argument('--split-parallel', type=int,
+                        help='하위 쿼리 수 (기본: fac_id 는 FAC 수, oper_id 는 4)')
+    parser.add_argument('--split-boundaries', nargs='+', metavar='OPER_ID',
+                        help='oper_id 분할 경계값 (기본: STDPOPER 스냅샷의 OPER_ID 를 개수 기준으로 등분)')
+    parser.add_argument('--incremental', action='store_true',
+                        help='WAF 단위 Grid 는 완료된 일자도 워터마크 이후 변경분만 조회해 병합 (--force 면 전체 재계산)')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='결과 캐시 사용 안 함 (probe 없이 항상 본 쿼리 실행)')
+    parser.add_argument('--cache-max-gb', type=float, default=MAX_CACHE_GB,
+                        help=f'결과 캐시 최대 용량 GB (기본 {MAX_CACHE_GB})')
+    args = parser.parse_args()
+    if bool(args.from_dt) != bool(args.to_dt):
+        parser.error('--from 과 --to 는 함께 지정해야 합니다.')
+    if args.from_dt and args.date:
+        parser.error('--date 와 --from/--to 는 함께 사용할 수 없습니다.')
+    return args
+
+
+def main():
+    args = parse_args()
+    if args.from_dt:
+        base_dates = date_range(args.from_dt, args.to_dt)
+        print(f"백필: {args.from_dt} ~ {args.to_dt} ({len(base_dates)}일)", end=' | ')
+    else:
+        base_dates = [args.date or (datetime.now() - timedelta(days=1)).strftime('%Y%m%d')]
+        print(f"일자: {base_dates[0]}", end=' | ')
+    print(f"리포트: {', '.join(args.reports)} | 동시 실행: {args.workers}")
+
+    cache = None if args.no_cache else ResultCache(max_gb=args.cache_max_gb)
+    explain_cache = ExplainCache(ttl_sec=args.explain_ttl_hours * 3600) if args.explain_ttl_hours > 0 else None
+
+    started = time.perf_counter()
+    results = run_reports(args.reports, base_dates, max_workers=args.workers, output_dir=args.output_dir,
+                          batch_size=args.batch_size, preflight=not args.skip_preflight,
+                          retries=args.retries, force=args.force, cache=cache, explain_cache=explain_cache,
+                          execute_mode=args.execute_mode, encoding=args.encoding,
+                          decode_processes=args.decode_processes, budget=not args.no_budget,
+                          budget_multiple=args.budget_multiple, dataset_dir=args.dataset_dir,
+                          split=SplitSpec(args.split, args.split_parallel, tuple(args.split_boundaries or ()))
+                          if args.split else None, incremental=args.incremental)
+    write_summary(results, args.output_dir, wall_sec=round(time.perf_counter() - started, 3))
+
+    if any(r['status'] in ('failed', 'budget_exceeded') for r in results):
+        sys.exit(1)
+
+# 실행
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,311 @@
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import Future
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from wafering_cache import MAX_CACHE_GB, ResultCache
+from wafering_common import create_trino_connection
+from wafering_metrics import record_query
+from wafering_preflight import ExplainCache
+from wafering_runner import OUTPUT_DIR, REPORTS, build_report_query, preflight_report, report_sql, run_report
+from wafering_sql import DEFAULT_EXECUTE_MODE, EXECUTE_MODES
+from wafering_watchdog import budget_for
+
+BASE_DIR = Path(__file__).resolve().parent
+
+# ==============================================================================
+# 결과 공유 서버 설정
+# ==============================================================================
+SERVE_DIR = BASE_DIR / 'cache' / 'serve'        # <리포트>/BASE_DT=YYYYMMDD.arrow (Arrow IPC, 비압축 → mmap)
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+DEFAULT_URL = f"http://{DEFAULT_HOST}:{DEFAULT_PORT}"
+DEFAULT_MAX_AGE_MIN = 30        # 이보다 오래된 결과는 다음 요청 때 재검증 (probe 로 변경 없으면 Trino 본 쿼리 없음)
+CLIENT_TIMEOUT_SEC = 3 * 3600   # 서버가 대신 추출하는 동안 기다리는 시간
+
+# ==============================================================================
+# 결과 파일 (Arrow IPC) / 필터
+# ==============================================================================
+def arrow_path(serve_dir, name, base_dt):
+    return Path(serve_dir) / name / f"BASE_DT={base_dt}.arrow"
+
+
+def parquet_to_arrow(src_path, dest_path):
+    """Parquet 결과 → Arrow IPC 파일 (행 그룹 단위 변환, 임시 파일 → 교체)
+
+    교체는 rename 이므로 이미 mmap 으로 열고 있는 클라이언트는 이전 파일을 끝까지 읽는다.
+    """
+    dest_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = dest_path.with_name(f".{dest_path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    source = pq.ParquetFile(src_path)
+    rows = 0
+    try:
+        with pa.OSFile(str(tmp_path), 'wb') as sink, pa.ipc.new_file(sink, source.schema_arrow) as writer:
+            for i in range(source.num_row_groups):
+                table = source.read_row_group(i)
+                writer.write_table(table)
+                rows += table.num_rows
+        os.replace(tmp_path, dest_path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+    return rows
+
+
+def read_arrow(path, fac_ids=None, columns=None):
+    """mmap 으로 Arrow IPC 파일을 열어 Table 반환 (컬럼 선택은 복사 없음, FAC_ID 필터는 해당 행만 복사)"""
+    path = Path(path)
+    table = pa.ipc.open_file(pa.memory_map(str(path), 'r')).read_all()
+    lower = {c.lower(): c for c in table.column_names}
+    if fac_ids:
+        fac_col = lower.get('fac_id')
+        if fac_col is None:
+            raise ValueError(f"FAC_ID 컬럼이 없는 결과: {path.name}")
+        table = table.filter(pc.is_in(table[fac_col].cast(pa.string()), value_set=pa.array(list(fac_ids))))
+    if columns:
+        missing = [c for c in columns if c.lower() not in lower]
+        if missing:
+            raise ValueError(f"없는 컬럼: {', '.join(missing)}")
+        table = table.select([lower[c.lower()] for c in columns])
+    return table
+
+# ==============================================================================
+# 결과 관리 (요청 시 확인 → 없거나 오래되면 1회만 추출)
+# ==============================================================================
+class ResultServer:
+    """리포트 × 일자 결과를 Arrow IPC 파일로 보관하고, 같은 결과의 동시 추출 요청은 한 번의 Trino 실행으로 합침
+
+    추출은 wafering_runner.run_report 를 그대로 사용한다 (결과 캐시 probe, 용량 점검, 실행 한도 포함).
+    """
+
+    def __init__(self, serve_dir=SERVE_DIR, output_dir=OUTPUT_DIR, cache=None, explain_cache=None,
+                 max_age_sec=DEFAULT_MAX_AGE_MIN * 60, budget=True, execute_mode=DEFAULT_EXECUTE_MODE):
+        self.serve_dir = Path(serve_dir)
+        self.output_dir = output_dir
+        self.cache = cache
+        self.explain_cache = explain_cache
+        self.max_age_sec = max_age_sec
+        self.budget = budget
+        self.execute_mode = execute_mode
+        self._inflight = {}     # (리포트, 일자) → Future (진행 중인 추출)
+        self._lock = threading.Lock()
+        self.counters = {'hit': 0, 'fetched': 0, 'joined': 0, 'failed': 0}
+
+    def _count(self, key):
+        with self._lock:
+            self.counters[key] += 1
+
+    def _fresh(self, path):
+        return path.exists() and (self.max_age_sec is None or time.time() - path.stat().st_mtime <= self.max_age_sec)
+
+    def ensure(self, name, base_dt, refresh=False):
+        """결과 파일 경로 정보 반환, status: hit (보관 중) / fetched (이 요청이 추출) / joined (진행 중인 추출에 합류)"""
+        if name not in REPORTS:
+            raise KeyError(f"알 수 없는 리포트: {name}")
+        datetime.strptime(base_dt, '%Y%m%d')
+        path = arrow_path(self.serve_dir, name, base_dt)
+        if not refresh and self._fresh(path):
+            self._count('hit')
+            return {'status': 'hit', 'path': str(path), 'updated': path.stat().st_mtime}
+
+        key = (name, base_dt)
+        with self._lock:
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[key] = Future()
+        if leader:
+            try:
+                flight.set_result(self._fetch(name, base_dt, path))
+            except BaseException as e:
+                flight.set_exception(e)
+            finally:
+                with self._lock:
+                    self._inflight.pop(key, None)
+        try:
+            info = flight.result()
+        except BaseException:
+            self._count('failed')
+            raise
+        self._count('fetched' if leader else 'joined')
+        return {**info, 'status': 'fetched' if leader else 'joined'}
+
+    def _fetch(self, name, base_dt, path):
+        print(f"[{name}] {base_dt} 추출 시작 (대기 중인 요청은 이 결과를 함께 사용)")
+        query = build_report_query(name, base_dt)
+        check = None
+        if self.budget:
+            conn = create_trino_connection()
+            try:
+                check = preflight_report(conn, name, query, base_dt, self.explain_cache)
+            finally:
+                conn.close()
+            if not check.allowed:
+                raise RuntimeError(f"[{name}] 용량 점검 차단: {check.message}")
+        r = run_report(name, query, base_dt, self.output_dir, cache=self.cache, execute_mode=self.execute_mode,
+                       budget=budget_for(name, check) if self.budget else None)
+        if r.get('stats'):
+            record_query(name, base_dt, stats=r['stats'], sql=report_sql(name), preflight=check, status=r['status'],
+                         rows=r['rows'], execute_sec=r['execute_sec'], fetch_sec=r['fetch_sec'], source='server')
+        if r['status'] not in ('ok', 'cached'):
+            raise RuntimeError(r['error'] or r['status'])
+        rows = parquet_to_arrow(r['output'], path)
+        return {'path': str(path), 'rows': rows, 'updated': path.stat().st_mtime, 'source': r['status']}
+
+# ==============================================================================
+# HTTP 처리 (GET /fetch → 파일 경로 JSON, GET /data → Arrow IPC stream, GET /health)
+# ==============================================================================
+def _split(value):
+    return [v for v in value.split(',') if v] if value else None
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server_version = 'wafering-server'
+
+    def log_message(self, fmt, *args):
+        print(f"{datetime.now():%H:%M:%S} {self.address_string()} {fmt % args}")
+
+    def _send(self, code, body, content_type='application/json'):
+        if isinstance(body, (dict, list)):
+            body = json.dumps(body, ensure_ascii=False).encode('utf-8')
+        self.send_response(code)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        url = urllib.parse.urlsplit(self.path)
+        params = {k: v[-1] for k, v in urllib.parse.parse_qs(url.query).items()}
+        results = self.server.results
+        if url.path == '/health':
+            self._send(200, {'status': 'ok', 'counters': results.counters, 'inflight': len(results._inflight)})
+            return
+        if url.path not in ('/fetch', '/data'):
+            self._send(404, {'error': f"없는 경로: {url.path}"})
+            return
+        try:
+            info = results.ensure(params['report'], params['base_dt'], refresh=params.get('refresh') == '1')
+            if url.path == '/fetch':
+                self._send(200, info)
+                return
+            table = read_arrow(info['path'], _split(params.get('fac_id')), _split(params.get('columns')))
+            sink = pa.BufferOutputStream()
+            with pa.ipc.new_stream(sink, table.schema) as writer:
+                writer.write_table(table)
+            self._send(200, sink.getvalue().to_pybytes(), 'application/vnd.apache.arrow.stream')
+        except (KeyError, ValueError) as e:
+            self._send(400, {'error': e.args[0] if e.args else str(e)})
+        except Exception as e:
+            self._send(502, {'error': str(e)})
+
+
+def serve(results, host=DEFAULT_HOST, port=DEFAULT_PORT):
+    httpd = ThreadingHTTPServer((host, port), _Handler)
+    httpd.daemon_threads = True
+    httpd.results = results
+    print(f"결과 공유 서버 시작: http://{host}:{port} (보관 위치: {results.serve_dir})")
+    try:
+        httpd.serve_forever()
+    finally:
+        httpd.server_close()
+
+# ==============================================================================
+# 클라이언트 (같은 서버에서는 파일을 직접 mmap, 원격이면 Arrow stream 수신)
+# ==============================================================================
+def _request(url, path, params, timeout):
+    query = urllib.parse.urlencode({k: v for k, v in params.items() if v})
+    try:
+        with urllib.request.urlopen(f"{url.rstrip('/')}{path}?{query}", timeout=timeout) as response:
+            return response.read()
+    except urllib.error.HTTPError as e:
+        raise RuntimeError(json.loads(e.read().decode('utf-8')).get('error', str(e))) from None
+
+
+def request_report(name, base_dt, fac_ids=None, columns=None, url=DEFAULT_URL, refresh=False, local=True,
+                timeout=CLIENT_TIMEOUT_SEC):
+    """서버에 리포트 결과를 요청해 DataFrame 반환
+
+    local=True 면 서버가 알려준 Arrow 파일을 이 프로세스에서 mmap 으로 직접 읽고 (같은 서버/공유 디스크),
+    False 면 필터된 결과를 Arrow stream 으로 받는다.
+    """
+    params = {'report': name, 'base_dt': base_dt, 'refresh': '1' if refresh else None,
+              'fac_id': ','.join(fac_ids) if fac_ids else None, 'columns': ','.join(columns) if columns else None}
+    if local:
+        info = json.loads(_request(url, '/fetch', params, timeout))
+        return read_arrow(info['path'], fac_ids, columns).to_pandas()
+    return pa.ipc.open_stream(_request(url, '/data', params, timeout)).read_all().to_pandas()
+
+def print_shared_report(name, base_dt, url=DEFAULT_URL):
+    """단독 스크립트 --server 용: 서버에서 결과를 받아 요약 출력 (Trino 조회 없음), 요청 실패 시 종료 코드 1"""
+    try:
+        df = request_report(name, base_dt, url=url)
+    except Exception as e:
+        print(f"결과 공유 서버 요청 중 오류 발생: {e}")
+        sys.exit(1)
+    print(f"서버 결과 수신 | 행 수: {len(df)}, 열 수: {len(df.columns)}")
+    print(df.head())
+    return df
+
+# ==============================================================================
+# 메인 실행 함수
+# ==============================================================================
+def parse_args():
+    parser = argparse.ArgumentParser(description='리포트 결과 공유 서버 (같은 리포트/일자 추출은 1회만, Arrow IPC mmap 제공)')
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--serve-dir', default=str(SERVE_DIR))
+    parser.add_argument('--output-dir', default=str(OUTPUT_DIR))
+    parser.add_argument('--max-age-min', type=float, default=DEFAULT_MAX_AGE_MIN,
+                        help=f'보관 결과 재검증 주기 (분, 기본 {DEFAULT_MAX_AGE_MIN})')
+    parser.add_argument('--execute-mode', choices=EXECUTE_MODES, default=DEFAULT_EXECUTE_MODE)
+    parser.add_argument('--no-cache', action='store_true', help='결과 캐시 probe 사용 안 함')
+    parser.add_argument('--cache-max-gb', type=float, default=MAX_CACHE_GB)
+    parser.add_argument('--no-budget', action='store_true', help='용량 점검 / 실행 한도 감시 안 함')
+    parser.add_argument('--warm', nargs='+', metavar='REPORT', choices=list(REPORTS),
+                        help='시작 시 어제 결과를 미리 추출할 리포트')
+    return parser.parse_args()
+
+
+def _warm(results, name, base_dt):
+    try:
+        print(f"[{name}] {base_dt} 미리 추출: {results.ensure(name, base_dt)['status']}")
+    except Exception as e:
+        print(f"[{name}] {base_dt} 미리 추출 실패: {e}")
+
+
+def main():
+    args = parse_args()
+    results = ResultServer(args.serve_dir, args.output_dir,
+                           cache=None if args.no_cache else ResultCache(max_gb=args.cache_max_gb),
+                           explain_cache=ExplainCache(), max_age_sec=args.max_age_min * 60,
+                           budget=not args.no_budget, execute_mode=args.execute_mode)
+    if args.warm:
+        yesterday = (datetime.now() - timedelta(days=1)).strftime('%Y%m%d')
+        for name in args.warm:
+            threading.Thread(target=lambda n=name: _warm(results, n, yesterday), daemon=True).start()
+    try:
+        serve(results, args.host, args.port)
+    except KeyboardInterrupt:
+        print("\n결과 공유 서버 종료")
+    except OSError as e:
+        print(f"결과 공유 서버 시작 실패: {e}")
+        sys.exit(1)
+
+
+# 실행
+if __name__ == "__main__":
+    main()
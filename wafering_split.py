@@ -0,0 +1,291 @@
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from wafering_cache import normalize_sql
+from wafering_common import create_trino_connection, open_cursor
+from wafering_fetch import DEFAULT_BATCH_SIZE, PARQUET_COMPRESSION, write_parquet_stream
+from wafering_masters import MasterStore
+from wafering_metrics import query_stats
+from wafering_sql import DEFAULT_EXECUTE_MODE, execute_template, load_template
+from wafering_watchdog import BudgetExceeded, QueryWatchdog
+
+# ==============================================================================
+# 분할 실행 설정
+# ==============================================================================
+# 한 쿼리를 분할 키 기준의 독립 하위 쿼리로 나눠 동시에 실행하고, 결과를 분할 순서대로 이어 붙인다
+# (coordinator 연결 1개 / Python 소비자 1개로 받던 결과를 여러 연결이 나눠 받음).
+#   fac_id : 템플릿의 #{fac_ids} 목록을 나눠 바인딩 (팩트 테이블 스캔부터 나뉨)
+#   oper_id: 템플릿의 #{split_from} / #{split_to} 에 OPER_ID 범위를 바인딩 (팩트 테이블 조건이라 스캔부터 나뉨,
+#            경계값 미지정 시 STDPOPER 스냅샷의 OPER_ID 를 개수 기준으로 등분)
+# 결과 행마다 FAC_ID / OPER_ID 가 그대로 남고 분할 키를 넘는 집계가 없는 Grid 리포트만 대상
+# (loss_rate / scrap_rate 는 FAC 전체를 합산하므로 분할하면 결과가 달라짐).
+# Grid 템플릿은 OPER_ID 를 STDPOPER 와 내부 조인하므로 NULL OPER_ID 행은 결과에 없다.
+# 템플릿 끝에 ORDER BY 가 있으면 하위 쿼리도 같은 ORDER BY 로 정렬되어 오므로, 결과 파일을 행 그룹 단위로
+# k-way 병합해 분할하지 않은 실행과 같은 순서로 기록한다 (전체 결과를 메모리에 올리지 않음).
+SPLIT_KEYS = ('fac_id', 'oper_id')
+SPLIT_REPORTS = ('lot_grid', 'waf_grid', 'scrap_lot_grid', 'scrap_waf_grid')
+DEFAULT_OPER_PARALLEL = 4       # oper_id 분할 기본 개수 (fac_id 는 기본 FAC 1개당 1개)
+
+# 최상위 문장 끝의 ORDER BY 목록 (괄호가 없어야 함 → 하위 쿼리 / OVER 절의 ORDER BY 는 제외)
+_FINAL_ORDER_RE = re.compile(r"\bORDER\s+BY\s+([^()]+?)\s*;?\s*$", re.IGNORECASE)
+_ORDER_ITEM_RE = re.compile(r"^(?:\w+\.)?(\w+)(?:\s+(ASC|DESC))?$", re.IGNORECASE)
+# 하루치 실행에서 값이 하나뿐인 정렬 컬럼 (병합 기준에서 제외, 남는 키가 없으면 이어 붙이기만 함)
+CONSTANT_ORDER_COLUMNS = frozenset({'BASE_DT'})
+_SRC_COL = '__split_src'
+_ROW_COL = '__split_row'
+
+
+@dataclass(frozen=True)
+class SplitSpec:
+    """분할 키 / 동시 하위 쿼리 수 (parallel) / OPER_ID 경계값 (앞 범위의 끝 = 다음 범위의 시작)
+
+    결과 행 순서는 템플릿의 최종 ORDER BY 를 따르고 (final_order_by), ORDER BY 가 없으면 분할 순서대로 이어 붙인다.
+    """
+    key: str = 'fac_id'
+    parallel: int = None
+    boundaries: tuple = ()
+
+
+@dataclass
+class Shard:
+    label: str
+    params: dict
+
+
+def is_splittable(name):
+    return name in SPLIT_REPORTS
+
+# ==============================================================================
+# 하위 쿼리 구성
+# ==============================================================================
+def _chunks(values, parts):
+    """순서를 유지한 채 parts 개의 연속 구간으로 (앞 구간이 1개씩 더 많음)"""
+    values = list(values)
+    parts = max(1, min(parts, len(values)))
+    size, extra = divmod(len(values), parts)
+    chunks, start = [], 0
+    for i in range(parts):
+        end = start + size + (1 if i < extra else 0)
+        chunks.append(values[start:end])
+        start = end
+    return chunks
+
+
+def oper_boundaries(fac_ids, parts, masters=None):
+    """STDPOPER 스냅샷에서 대상 FAC 의 OPER_ID 를 정렬해 개수 기준으로 parts 등분한 경계값
+
+    공정별 불량 건수는 고르지 않으므로 치우침이 크면 --split-boundaries 로 직접 지정한다.
+    """
+    oper = (masters or MasterStore()).frame('stdpoper')
+    values = sorted({str(v) for v in oper.loc[oper['fac_id'].isin(list(fac_ids)), 'oper_id'].dropna()})
+    if len(values) < 2 or parts < 2:
+        return ()
+    step = len(values) / parts
+    return tuple(dict.fromkeys(values[int(step * i)] for i in range(1, parts)))
+
+
+def final_order_by(template):
+    """템플릿 최종 ORDER BY 의 (출력 컬럼, 'ascending' | 'descending') 목록 (없으면 빈 목록)
+
+    하위 쿼리 결과를 이어 붙인 뒤 다시 정렬하는 기준. 컬럼 이름 / ASC / DESC 외의 정렬식은 ValueError.
+    """
+    match = _FINAL_ORDER_RE.search(normalize_sql(template))
+    if match is None:
+        return []
+    keys = []
+    for item in match.group(1).split(','):
+        parsed = _ORDER_ITEM_RE.match(item.strip())
+        if parsed is None:
+            raise ValueError(f"분할 결과를 다시 정렬할 수 없는 ORDER BY 항목: {item.strip()!r}")
+        column, direction = parsed.groups()
+        keys.append((column, 'descending' if (direction or '').upper() == 'DESC' else 'ascending'))
+    return keys
+
+
+def plan_shards(spec, params, masters=None):
+    """SplitSpec → 하위 쿼리 목록 (이 순서대로 결과를 이어 붙임)"""
+    if spec.key not in SPLIT_KEYS:
+        raise ValueError(f"지원하지 않는 분할 키: {spec.key} (가능: {', '.join(SPLIT_KEYS)})")
+    fac_ids = tuple(params['fac_ids'])
+    if spec.key == 'fac_id':
+        return [Shard(f"FAC_ID={','.join(group)}", {**params, 'fac_ids': tuple(group)})
+                for group in _chunks(fac_ids, spec.parallel or len(fac_ids))]
+
+    boundaries = tuple(sorted(spec.boundaries)) or oper_boundaries(fac_ids, spec.parallel or DEFAULT_OPER_PARALLEL,
+                                                                   masters)
+    edges = [None, *boundaries, None]
+    return [Shard(f"OPER_ID[{lo or ''}~{hi or ''})", {**params, 'split_from': lo, 'split_to': hi})
+            for lo, hi in zip(edges, edges[1:])]
+
+# ==============================================================================
+# 동시 실행 → 분할 순서대로 Parquet 병합
+# ==============================================================================
+def _sort_keys(schema, order_by):
+    """ORDER BY 컬럼 → 결과 스키마의 컬럼 이름 (Trino 는 컬럼 이름을 소문자로 돌려주므로 대소문자 무시)"""
+    names = {name.lower(): name for name in schema.names}
+    missing = [column for column, _ in order_by if column.lower() not in names]
+    if missing:
+        raise ValueError(f"분할 결과에 ORDER BY 컬럼이 없음: {', '.join(missing)}")
+    return [(names[column.lower()], direction) for column, direction in order_by]
+
+
+def _iter_row_groups(part_path):
+    part = pq.ParquetFile(part_path)
+    for i in range(part.num_row_groups):
+        yield part.read_row_group(i)
+
+
+def _merge_sorted(readers, sort_keys, writer):
+    """각각 sort_keys 로 정렬된 행 그룹 스트림들을 k-way 병합해 writer 에 기록
+
+    하위 쿼리마다 현재 행 그룹 1개만 들고 있다가, 마지막 행이 가장 작은 스트림(frontier)의 마지막 행까지를
+    정렬해 내보낸다. 나머지 스트림의 이후 행은 모두 그 값 이상이므로 순서가 맞고, 정렬이 안정 정렬이라
+    각 스트림에 남는 행은 원래 버퍼의 뒷부분이다. frontier 스트림은 매번 비워지므로 반드시 진행한다.
+    """
+    buffers = [None] * len(readers)
+    while True:
+        for i, reader in enumerate(readers):
+            while reader is not None and (buffers[i] is None or buffers[i].num_rows == 0):
+                buffers[i] = next(reader, None)
+                if buffers[i] is None:
+                    readers[i] = reader = None
+        active = [i for i, buffer in enumerate(buffers) if buffer is not None and buffer.num_rows]
+        if len(active) <= 1:
+            break
+
+        lasts = pa.concat_tables([buffers[i].slice(buffers[i].num_rows - 1) for i in active])
+        frontier = active[pc.sort_indices(lasts, sort_keys=sort_keys)[0].as_py()]
+        tagged = pa.concat_tables([
+            buffers[i].append_column(_SRC_COL, pa.array([i] * buffers[i].num_rows, pa.int32()))
+                      .append_column(_ROW_COL, pa.array(range(buffers[i].num_rows), pa.int64()))
+            for i in active])
+        ordered = tagged.sort_by(sort_keys)
+        src = ordered.column(_SRC_COL).to_numpy()
+        row = ordered.column(_ROW_COL).to_numpy()
+        cut = int(((src == frontier) & (row == buffers[frontier].num_rows - 1)).nonzero()[0][0]) + 1
+        writer.write_table(ordered.slice(0, cut).drop_columns([_SRC_COL, _ROW_COL]))
+        for i in active:
+            left = int((src[cut:] == i).sum())
+            buffers[i] = buffers[i].slice(buffers[i].num_rows - left)
+
+    for i, buffer in enumerate(buffers):
+        if buffer is not None and buffer.num_rows:
+            writer.write_table(buffer)
+            for table in readers[i] or ():
+                writer.write_table(table)
+
+
+def merge_parquet_parts(part_paths, path, compression=PARQUET_COMPRESSION, check=None, order_by=()):
+    """하위 쿼리 결과 파일을 path 에 기록 (임시 파일 → 교체)
+
+    order_by (final_order_by) 가 없으면 주어진 순서대로 행 그룹 단위로 이어 붙이고, 있으면 각 파일이
+    그 순서로 정렬되어 있다고 보고 행 그룹 단위 k-way 병합 (같은 키는 분할 순서, NULL 은 Trino 기본과 같이 맨 뒤).
+    """
+    path = Path(path)
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        schema = pq.read_schema(part_paths[0])
+        with pq.ParquetWriter(tmp_path, schema, compression=compression) as writer:
+            if order_by:
+                _merge_sorted([_iter_row_groups(p) for p in part_paths], _sort_keys(schema, order_by), writer)
+            else:
+                for part_path in part_paths:
+                    for table in _iter_row_groups(part_path):
+                        writer.write_table(table)
+        if check is not None:
+            check()
+        os.replace(tmp_path, path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+
+def run_split(template_name, params, output_path, spec, name=None, connect=None, execute_mode=DEFAULT_EXECUTE_MODE,
+              batch_size=DEFAULT_BATCH_SIZE, budget=None, masters=None):
+    """하위 쿼리를 연결별로 동시 실행해 output_path 에 병합, 하위 쿼리별 결과 목록 반환
+
+    [{'shard', 'rows', 'execute_sec', 'fetch_sec', 'stats'}, ...] (분할 순서). 하나라도 실패하면 나머지
+    서버 쿼리를 취소하고 예외를 다시 던지며 기존 결과 파일은 그대로 남는다. budget 은 하위 쿼리마다 적용한다.
+    """
+    name = name or template_name
+    connect = connect or create_trino_connection
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    shards = plan_shards(spec, params, masters)
+    order_by = [key for key in final_order_by(load_template(template_name))
+                if key[0].upper() not in CONSTANT_ORDER_COLUMNS]
+    token = f"{os.getpid()}.{threading.get_ident()}"
+    part_paths = [output_path.with_name(f".{output_path.name}.part{i:03d}.{token}") for i in range(len(shards))]
+    cursors = []
+    lock = threading.Lock()
+    first_error = []            # 먼저 실패한 하위 쿼리의 원인 (나머지는 취소로 인한 오류)
+    print(f"[{name}] {spec.key} 기준 {len(shards)}개 하위 쿼리 동시 실행: {', '.join(s.label for s in shards)}")
+
+    def cancel_others(own):
+        with lock:
+            others = [c for c in cursors if c is not own]
+        for cur in others:
+            try:
+                cur.cancel()
+            except Exception as e:
+                print(f"[{name}] 하위 쿼리 취소 실패: {e}")
+
+    def run_shard(i):
+        shard = shards[i]
+        label = f"{name} {shard.label}"
+        conn = cur = watchdog = None
+        try:
+            conn = connect()
+            cur = open_cursor(conn)
+            with lock:
+                if first_error:
+                    raise RuntimeError(f"[{label}] 다른 하위 쿼리 실패로 실행 안 함")
+                cursors.append(cur)
+            watchdog = QueryWatchdog(cur, budget, name=label).start()
+            started = time.perf_counter()
+            execute_template(cur, template_name, shard.params, mode=execute_mode)
+            t_execute = time.perf_counter()
+            rows = write_parquet_stream(cur, part_paths[i], batch_size=batch_size, check=watchdog.check)
+            return {'shard': shard.label, 'rows': rows, 'execute_sec': round(t_execute - started, 3),
+                    'fetch_sec': round(time.perf_counter() - t_execute, 3), 'stats': query_stats(cur)}
+        except Exception as e:
+            error = e
+            if watchdog is not None and watchdog.reason is not None:
+                error = BudgetExceeded(watchdog.name, watchdog.reason, watchdog.query_id)
+            with lock:
+                if not first_error:
+                    first_error.append(error)
+            cancel_others(cur)
+            if error is not e:
+                raise error from e
+            raise
+        finally:
+            if watchdog is not None:
+                watchdog.stop()
+            if cur is not None:
+                cur.close()
+            if conn is not None:
+                conn.close()
+
+    try:
+        with ThreadPoolExecutor(max_workers=len(shards), thread_name_prefix=f"split-{name}") as pool:
+            futures = [pool.submit(run_shard, i) for i in range(len(shards))]
+        if first_error:
+            raise first_error[0]
+        results = [f.result() for f in futures]
+        merge_parquet_parts(part_paths, output_path, order_by=order_by)
+    finally:
+        for part_path in part_paths:
+            part_path.unlink(missing_ok=True)
+    for r in results:
+        print(f"[{name}] {r['shard']} | 행 수: {r['rows']}, 실행 {r['execute_sec']}s, 수신 {r['fetch_sec']}s")
+    return results
@@ -0,0 +1,170 @@
+import hashlib
+import re
+import threading
+import weakref
+from datetime import date, datetime
+from decimal import Decimal
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent
+
+# ==============================================================================
+# SQL 템플릿 설정 (sql/<이름>.sql, 파라미터는 #{이름})
+# ==============================================================================
+SQL_DIR = BASE_DIR / 'sql'
+DEFAULT_PARAMS = {
+    'waf_size': '300',
+    'oper_div_l': 'WF',
+    'fac_ids': ('WF7', 'WF8', 'WFA', 'FPC7', 'FPC8'),
+    # Grid 템플릿의 OPER_ID 범위 [split_from, split_to) (wafering_split 의 oper_id 분할, None 이면 조건 없음)
+    'split_from': None,
+    'split_to': None,
+}
+# immediate: EXECUTE IMMEDIATE ... USING (기본, 요청 1번, 문장이 이후 요청 헤더에 실리지 않음)
+# prepare: 연결당 1회 PREPARE 후 EXECUTE ... USING (같은 연결로 같은 템플릿을 여러 번 실행할 때만 이득,
+#   PREPARE 왕복이 1번 더 들고 문장이 매 poll 요청 헤더(X-Trino-Prepared-Statement)에 실림)
+# literal: 값을 SQL 에 직접 넣어 실행 (이전 방식)
+EXECUTE_MODES = ('prepare', 'immediate', 'literal')
+DEFAULT_EXECUTE_MODE = 'immediate'     # 리포트 / 하위 쿼리 / 요청마다 새 연결을 열므로 PREPARE 재사용이 없음
+
+_PARAM_RE = re.compile(r"#\{(\w+)\}")
+# 문자열 리터럴 / 따옴표 식별자는 그대로 두고 주석과 공백만 골라내는 토큰 (앞에서부터 일치하므로 리터럴 안의 -- 는 주석이 아님)
+_SQL_TOKEN_RE = re.compile(r"'(?:[^']|'')*'|\"(?:[^\"]|\"\")*\"|(?:--[^\n]*|/\*.*?\*/|\s)+", re.S)
+_templates = {}
+_templates_lock = threading.Lock()
+
+# ==============================================================================
+# 템플릿 로드 / 바인딩
+# ==============================================================================
+def load_template(name):
+    with _templates_lock:
+        if name not in _templates:
+            _templates[name] = (SQL_DIR / f"{name}.sql").read_text(encoding='utf-8')
+        return _templates[name]
+
+
+def compact_sql(sql):
+    """실행용 주석 제거 + 공백 정리 (문자열 리터럴 / 따옴표 식별자 내부는 그대로 유지)
+
+    wafering_cache.normalize_sql 은 캐시 키 전용이라 리터럴 안의 -- 나 공백까지 바꾸므로 실행 SQL 에 쓰지 않는다.
+    """
+    def repl(match):
+        token = match.group(0)
+        return token if token[0] in '\'"' else ' '
+
+    return _SQL_TOKEN_RE.sub(repl, sql).strip()
+
+
+def template_params(template):
+    """템플릿에 쓰인 파라미터 이름 (등장 순서, 중복 제거)"""
+    return list(dict.fromkeys(_PARAM_RE.findall(template)))
+
+
+def _value(params, name):
+    if name not in params:
+        raise KeyError(f"SQL 템플릿 파라미터 누락: {name}")
+    return params[name]
+
+
+def bind(template, params):
+    """#{이름} → ? 로 바꾼 SQL 과 값 목록 (list/tuple 파라미터는 ?, ?, ... 로 펼침)"""
+    args = []
+
+    def repl(match):
+        value = _value(params, match.group(1))
+        if isinstance(value, (list, tuple)):
+            args.extend(value)
+            return ', '.join('?' * len(value))
+        args.append(value)
+        return '?'
+
+    return _PARAM_RE.sub(repl, template), args
+
+
+def sql_literal(value):
+    """EXECUTE ... USING / 리터럴 SQL 용 값 표현"""
+    if value is None:
+        return 'NULL'
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, int):
+        return str(value)
+    if isinstance(value, float):
+        return f"DOUBLE '{value!r}'"
+    if isinstance(value, Decimal):
+        return f"DECIMAL '{format(value, 'f')}'"
+    if isinstance(value, datetime):
+        return f"TIMESTAMP '{value.strftime('%Y-%m-%d %H:%M:%S.%f')}'"
+    if isinstance(value, date):
+        return f"DATE '{value.strftime('%Y-%m-%d')}'"
+    if isinstance(value, str):
+        return "'" + value.replace("'", "''") + "'"
+    raise TypeError(f"지원하지 않는 파라미터 타입: {type(value).__name__}")
+
+
+def render_literal(template, params):
+    """값을 리터럴로 넣은 SQL (EXPLAIN, 캐시 키, literal 실행 모드용)"""
+    def repl(match):
+        value = _value(params, match.group(1))
+        if isinstance(value, (list, tuple)):
+            return ', '.join(sql_literal(v) for v in value)
+        return sql_literal(value)
+
+    return _PARAM_RE.sub(repl, template)
+
+# ==============================================================================
+# Prepared statement 실행
+# ==============================================================================
+# 연결별로 이미 PREPARE 한 문장 이름 (Trino 클라이언트는 세션 헤더로 문장을 유지)
+_prepared = weakref.WeakKeyDictionary()
+_prepared_lock = threading.Lock()
+
+
+def statement_name(sql):
+    return 'wf_' + hashlib.sha1(sql.encode('utf-8')).hexdigest()[:16]
+
+
+def _using(args):
+    return f" USING {', '.join(sql_literal(v) for v in args)}" if args else ''
+
+
+def _ensure_prepared(cur, sql):
+    conn = cur.connection
+    name = statement_name(sql)
+    with _prepared_lock:
+        names = _prepared.setdefault(conn, set())
+        if name in names:
+            return name
+    cur.execute(f"PREPARE {name} FROM {sql}")
+    cur.fetchall()
+    with _prepared_lock:
+        names.add(name)
+    return name
+
+
+def execute_template(cur, template_name, params, mode=DEFAULT_EXECUTE_MODE, template=None):
+    """sql/<template_name>.sql 을 파라미터 바인딩으로 실행 (cur 반환, 이후 fetch 는 기존과 동일)
+
+    prepare 모드는 같은 연결에서 같은 템플릿을 다시 실행할 때 PREPARE 를 생략하고
+    EXECUTE 만 보낸다. PREPARE 가 실패하면 EXECUTE IMMEDIATE 로 한 번 더 시도한다.
+    template 이 주어지면 파일 대신 그 본문을 실행한다 (wafering_cache 의 probe 처럼 코드로 만든 쿼리).
+    """
+    if template is None:
+        template = load_template(template_name)
+    if mode == 'literal':
+        return cur.execute(render_literal(template, params))
+
+    # 주석/공백 정리: 문장 본문(EXECUTE IMMEDIATE) / prepared statement 헤더를 짧게 유지
+    sql, args = bind(compact_sql(template), params)
+    if mode == 'prepare':
+        try:
+            name = _ensure_prepared(cur, sql)
+        except Exception as e:
+            print(f"PREPARE 실패 → EXECUTE IMMEDIATE 로 실행: {e}")
+        else:
+            return cur.execute(f"EXECUTE {name}{_using(args)}")
+    if args:
+        # 클라이언트 바인딩(cur.execute(sql, args))은 서버 지원 여부 확인 쿼리나 PREPARE 를 더 보낼 수 있고
+        # segment cursor 는 바인딩을 받지 않으므로 EXECUTE IMMEDIATE 를 직접 구성
+        return cur.execute(f"EXECUTE IMMEDIATE {sql_literal(sql)}{_using(args)}")
+    return cur.execute(sql)
@@ -0,0 +1,166 @@
+import threading
+import time
+from dataclasses import dataclass
+
+# ==============================================================================
+# 실행 중 예산 정책 (리포트별)
+# ==============================================================================
+@dataclass(frozen=True)
+class BudgetPolicy:
+    """실행 중 서버 통계가 한도를 넘으면 쿼리 취소
+
+    처리 bytes 한도 = max(EXPLAIN 예상 입력 × estimate_multiple, min_budget_gb) 와 max_processed_gb 중 작은 값
+    (EXPLAIN 실패 / 미실행이면 절대 한도만 적용). None 인 항목은 검사하지 않는다.
+    """
+    estimate_multiple: float = 10.0
+    min_budget_gb: float = 5.0
+    max_processed_gb: float = None
+    max_peak_memory_gb: float = None
+    max_elapsed_min: float = 60
+    max_rows: int = None
+
+
+DEFAULT_BUDGET = BudgetPolicy()
+REPORT_BUDGETS = {
+    'loss_rate': BudgetPolicy(max_processed_gb=100.0, max_peak_memory_gb=20.0, max_elapsed_min=30),
+    'lot_grid': BudgetPolicy(max_processed_gb=250.0, max_peak_memory_gb=50.0, max_elapsed_min=45),
+    'waf_grid': BudgetPolicy(max_processed_gb=500.0, max_peak_memory_gb=80.0, max_elapsed_min=60,
+                             max_rows=50_000_000),
+    'scrap_rate': BudgetPolicy(max_processed_gb=100.0, max_peak_memory_gb=20.0, max_elapsed_min=30),
+    'scrap_lot_grid': BudgetPolicy(max_processed_gb=250.0, max_peak_memory_gb=50.0, max_elapsed_min=45),
+    'scrap_waf_grid': BudgetPolicy(max_processed_gb=500.0, max_peak_memory_gb=80.0, max_elapsed_min=60,
+                                   max_rows=50_000_000),
+}
+
+WATCH_POLL_SEC = 5      # 서버 통계 확인 주기 (통계는 클라이언트가 nextUri 를 받을 때마다 갱신됨)
+
+
+def budget_policy_for(name):
+    return REPORT_BUDGETS.get(name, DEFAULT_BUDGET)
+
+
+def resolve_budget(policy=DEFAULT_BUDGET, preflight=None, estimate_multiple=None):
+    """정책 + EXPLAIN 결과(PreflightResult) → {Trino 통계 항목: 한도} (elapsed 는 초)"""
+    multiple = estimate_multiple if estimate_multiple is not None else policy.estimate_multiple
+    processed_gb = policy.max_processed_gb
+    if preflight is not None and preflight.decision != 'explain_failed' and preflight.input_gb and multiple:
+        relative_gb = max(preflight.input_gb * multiple, policy.min_budget_gb)
+        processed_gb = relative_gb if processed_gb is None else min(processed_gb, relative_gb)
+    limits = {
+        'processedBytes': processed_gb * 1024 ** 3 if processed_gb is not None else None,
+        'peakMemoryBytes': policy.max_peak_memory_gb * 1024 ** 3 if policy.max_peak_memory_gb is not None else None,
+        'elapsedSec': policy.max_elapsed_min * 60 if policy.max_elapsed_min is not None else None,
+        'processedRows': policy.max_rows,
+    }
+    return {key: value for key, value in limits.items() if value is not None}
+
+
+def budget_for(name, preflight=None, estimate_multiple=None):
+    """리포트 정책 기준 실행 한도"""
+    return resolve_budget(budget_policy_for(name), preflight, estimate_multiple)
+
+
+def describe_budget(limits):
+    parts = []
+    for key, label in (('processedBytes', '처리'), ('peakMemoryBytes', '메모리')):
+        if key in limits:
+            parts.append(f"{label} {limits[key] / 1024 ** 3:.1f} GB")
+    if 'elapsedSec' in limits:
+        parts.append(f"경과 {limits['elapsedSec'] / 60:g}분")
+    if 'processedRows' in limits:
+        parts.append(f"행 {limits['processedRows']:,}")
+    return ', '.join(parts) or '없음'
+
+# ==============================================================================
+# 실행 중 감시 (한도 초과 시 서버 쿼리 취소)
+# ==============================================================================
+class BudgetExceeded(Exception):
+    """실행 중 한도 초과로 서버 쿼리를 취소함"""
+
+    def __init__(self, name, reason, query_id=None):
+        self.name = name
+        self.reason = reason
+        self.query_id = query_id
+        super().__init__(f"[{name}] 실행 한도 초과로 쿼리 취소 ({query_id or 'query id 없음'}): {reason}")
+
+
+class QueryWatchdog:
+    """cursor 의 현재 쿼리 통계(processedBytes / processedRows / peakMemoryBytes / 경과 시간)를 주기적으로 확인
+
+    한도를 넘으면 사유를 남기고 서버 쿼리를 취소한다 (DELETE nextUri). 취소된 쿼리는 클라이언트에서
+    오류 없이 결과가 끊길 수 있으므로, 결과를 쓰기 전에 check() 로 BudgetExceeded 를 던진다.
+    PREPARE / EXECUTE 처럼 같은 cursor 로 여러 쿼리를 실행하면 그때그때 현재 쿼리를 감시한다.
+    """
+
+    def __init__(self, cur, limits, name='query', poll_sec=WATCH_POLL_SEC):
+        self.cur = cur
+        self.limits = dict(limits or {})
+        self.name = name
+        self.poll_sec = poll_sec
+        self.reason = None
+        self.query_id = None
+        self.stats = None
+        self._started = {}          # query id → 처음 확인한 시각 (통계의 경과 시간이 늦게 갱신될 때 보완)
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self.limits and self._thread is None:
+            self._thread = threading.Thread(target=self._run, name=f"watchdog-{self.name}", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _run(self):
+        while not self._stop.wait(self.poll_sec):
+            if self.poll():
+                return
+
+    def _exceeded(self, stats, elapsed_sec):
+        """한도 초과 사유 문자열, 없으면 None"""
+        values = {'processedBytes': stats.get('processedBytes'), 'peakMemoryBytes': stats.get('peakMemoryBytes'),
+                  'processedRows': stats.get('processedRows'), 'elapsedSec': elapsed_sec}
+        for key, limit in self.limits.items():
+            value = values.get(key)
+            if value is None or value <= limit:
+                continue
+            if key.endswith('Bytes'):
+                return f"{key} {value / 1024 ** 3:.2f} GB > 한도 {limit / 1024 ** 3:.2f} GB"
+            if key == 'elapsedSec':
+                return f"경과 {value / 60:.1f}분 > 한도 {limit / 60:g}분"
+            return f"{key} {value:,} > 한도 {limit:,}"
+        return None
+
+    def poll(self):
+        """현재 쿼리 1회 확인, 한도 초과로 취소했으면 True"""
+        query = getattr(self.cur, '_query', None)
+        if query is None or query.query_id is None or query.finished or query.cancelled:
+            return False
+        started = self._started.setdefault(query.query_id, time.monotonic())
+        stats = dict(query.stats)
+        elapsed_sec = max((stats.get('elapsedTimeMillis') or 0) / 1000, time.monotonic() - started)
+        reason = self._exceeded(stats, elapsed_sec)
+        if reason is None:
+            return False
+
+        self.reason, self.query_id, self.stats = reason, query.query_id, stats
+        print(f"[{self.name}] 실행 한도 초과 → 서버 쿼리 취소: {query.query_id} ({reason})")
+        try:
+            query.cancel()
+        except Exception as e:
+            print(f"[{self.name}] 서버 쿼리 취소 실패 ({query.query_id}): {e}")
+        return True
+
+    def check(self):
+        if self.reason is not None:
+            raise BudgetExceeded(self.name, self.reason, self.query_id)